@@ -0,0 +1,60 @@
+"""Add data_export_jobs table
+
+Revision ID: 5a7c9e1b3d2f
+Revises: 4e8b2f1c9a7d
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5a7c9e1b3d2f"
+down_revision: str | None = "4e8b2f1c9a7d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_export_jobs",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("uid", sa.String(length=128), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("file_path", sa.String(length=512), nullable=True),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["uid"], ["users.uid"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_data_export_jobs_uid_created_at",
+        "data_export_jobs",
+        ["uid", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_data_export_jobs_status",
+        "data_export_jobs",
+        ["status"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_data_export_jobs_status", table_name="data_export_jobs")
+    op.drop_index("ix_data_export_jobs_uid_created_at", table_name="data_export_jobs")
+    op.drop_table("data_export_jobs")
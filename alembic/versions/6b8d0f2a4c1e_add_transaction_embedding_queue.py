@@ -0,0 +1,51 @@
+"""Add transaction embedding queue flag and HNSW index
+
+Revision ID: 6b8d0f2a4c1e
+Revises: 5a7c9e1b3d2f
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6b8d0f2a4c1e"
+down_revision: str | None = "5a7c9e1b3d2f"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # The embedding column predates migrations (init-db.sql); make sure it exists.
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS embedding vector(768)")
+
+    # Existing rows are queued by the backfill job, not by the migration, so
+    # adding the column does not trigger a surprise full re-embed.
+    op.add_column(
+        "transactions",
+        sa.Column("embedding_needed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.alter_column("transactions", "embedding_needed_at", server_default=sa.text("now()"))
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_embedding_needed_at "
+            "ON transactions (embedding_needed_at) WHERE embedding_needed_at IS NOT NULL"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_embedding_hnsw "
+            "ON transactions USING hnsw (embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_embedding_hnsw")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_embedding_needed_at")
+    op.drop_column("transactions", "embedding_needed_at")
@@ -0,0 +1,95 @@
+"""Add recurring_series tables and transactions (uid, updated_at) index
+
+Revision ID: 7c0e2b4d6f8a
+Revises: 6b8d0f2a4c1e
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c0e2b4d6f8a"
+down_revision: str | None = "6b8d0f2a4c1e"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recurring_series",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("uid", sa.String(length=128), nullable=False),
+        sa.Column("series_key", sa.String(length=160), nullable=False),
+        sa.Column("merchant", sa.String(length=80), nullable=False),
+        sa.Column("category", sa.String(length=64), nullable=True),
+        sa.Column(
+            "occurrences",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'[]'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("window_start", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_recurring", sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column("cadence", sa.String(length=16), nullable=True),
+        sa.Column("cadence_days", sa.Integer(), nullable=True),
+        sa.Column("average_amount", sa.Float(), nullable=True),
+        sa.Column("last_date", sa.Date(), nullable=True),
+        sa.Column("next_date", sa.Date(), nullable=True),
+        sa.Column("occurrence_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["uid"], ["users.uid"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("uid", "series_key", name="uq_recurring_series_uid_key"),
+    )
+    op.create_index(
+        "ix_recurring_series_uid_next_date",
+        "recurring_series",
+        ["uid", "next_date"],
+        unique=False,
+        postgresql_where=sa.text("is_recurring"),
+    )
+    op.create_index(
+        "ix_recurring_series_uid_window_start",
+        "recurring_series",
+        ["uid", "window_start"],
+        unique=False,
+    )
+
+    # Every user starts with rebuild_needed = true (the column default), so
+    # existing data is picked up lazily on the first forecast or sync.
+    op.create_table(
+        "recurring_series_state",
+        sa.Column("uid", sa.String(length=128), nullable=False),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rebuild_needed", sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column("rebuilt_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["uid"], ["users.uid"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("uid"),
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_uid_updated_at "
+            "ON transactions (uid, updated_at)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_transactions_uid_updated_at")
+    op.drop_table("recurring_series_state")
+    op.drop_index("ix_recurring_series_uid_window_start", table_name="recurring_series")
+    op.drop_index("ix_recurring_series_uid_next_date", table_name="recurring_series")
+    op.drop_table("recurring_series")
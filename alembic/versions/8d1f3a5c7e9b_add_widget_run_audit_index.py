@@ -0,0 +1,31 @@
+"""Add partial index for widget_run audit events
+
+Revision ID: 8d1f3a5c7e9b
+Revises: 7c0e2b4d6f8a
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d1f3a5c7e9b"
+down_revision: str | None = "7c0e2b4d6f8a"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # The monthly payout aggregation range-scans this month's runs only.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_log_widget_run_ts "
+            "ON audit.audit_log (ts) WHERE action = 'widget_run' AND NOT archived"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS audit.ix_audit_log_widget_run_ts")
@@ -0,0 +1,62 @@
+"""Add ledger_archive_checkpoints table
+
+Revision ID: 9e2a4b6c8d0f
+Revises: 8d1f3a5c7e9b
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9e2a4b6c8d0f"
+down_revision: str | None = "8d1f3a5c7e9b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ledger_archive_checkpoints",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("run_id", sa.String(length=32), nullable=False),
+        sa.Column("uid", sa.String(length=128), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("upper_bound", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("blob_name", sa.String(length=512), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("row_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("compressed_bytes", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("pruned_rows", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("blob_name"),
+    )
+    op.create_index(
+        "ix_ledger_archive_checkpoints_status",
+        "ledger_archive_checkpoints",
+        ["status"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_ledger_archive_checkpoints_status", table_name="ledger_archive_checkpoints"
+    )
+    op.drop_table("ledger_archive_checkpoints")
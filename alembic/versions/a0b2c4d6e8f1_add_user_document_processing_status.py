@@ -0,0 +1,40 @@
+"""Add processing status to user_documents
+
+Revision ID: a0b2c4d6e8f1
+Revises: 9e2a4b6c8d0f
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a0b2c4d6e8f1"
+down_revision: str | None = "9e2a4b6c8d0f"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_documents",
+        sa.Column(
+            "processing_status",
+            sa.String(length=16),
+            server_default="ready",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "user_documents",
+        sa.Column("processing_error", sa.String(length=64), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_documents", "processing_error")
+    op.drop_column("user_documents", "processing_status")
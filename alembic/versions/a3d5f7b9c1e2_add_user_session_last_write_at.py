@@ -0,0 +1,30 @@
+"""Add last_write_at to user sessions
+
+Revision ID: a3d5f7b9c1e2
+Revises: f8c0e2b4d6a9
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d5f7b9c1e2"
+down_revision: str | None = "f8c0e2b4d6a9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_sessions",
+        sa.Column("last_write_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_sessions", "last_write_at")
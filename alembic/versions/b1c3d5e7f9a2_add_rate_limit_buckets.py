@@ -0,0 +1,45 @@
+"""Add rate_limit_buckets table
+
+Revision ID: b1c3d5e7f9a2
+Revises: a0b2c4d6e8f1
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b1c3d5e7f9a2"
+down_revision: str | None = "a0b2c4d6e8f1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Bucket state is disposable, so skip WAL: losing it on a crash only
+    # resets limits.
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.String(length=256), nullable=False),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("last_refill", sa.Float(), nullable=False),
+        sa.Column("full_at", sa.Float(), nullable=False),
+        sa.Column("allowed", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index(
+        "ix_rate_limit_buckets_full_at",
+        "rate_limit_buckets",
+        ["full_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rate_limit_buckets_full_at", table_name="rate_limit_buckets")
+    op.drop_table("rate_limit_buckets")
@@ -0,0 +1,295 @@
+"""Partition transactions by month on ts
+
+Revision ID: d4f6a8c0e2b5
+Revises: c2d4e6f8a0b3
+Create Date: 2026-10-19 20:00:00.000000
+
+The heap is rewritten into a RANGE (ts) partitioned table with one partition
+per calendar month plus a default partition for out-of-range rows. Date-bounded
+queries then only touch the months they cover, and expired months can be
+detached (see ``backend.services.transaction_partitions``).
+
+A unique index on a partitioned table must contain the partition key, so the
+(account_id, external_id) and (uid, external_id) guarantees move to the
+``transaction_external_ids`` key table, kept in step by a row trigger that
+reports duplicates as ``idx_transactions_external_id_account`` violations.
+
+``CREATE TABLE ... LIKE`` copies neither row level security nor grants, so the
+RLS flags, policies (``transaction_isolation``) and table privileges are read
+from the old table first and re-applied to the new one; the key table gets the
+same privileges because the trigger writes to it as the calling role.
+
+The copy runs inside the migration transaction; schedule it in a maintenance
+window sized to the table.
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, date, datetime
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f6a8c0e2b5"
+down_revision: str | None = "c2d4e6f8a0b3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+MONTHS_AHEAD = 3
+
+_SHARED_INDEXES = (
+    "CREATE INDEX idx_transactions_uid_ts_desc ON transactions (uid, ts DESC)",
+    "CREATE INDEX idx_transactions_uid_category ON transactions (uid, category)",
+    "CREATE INDEX idx_transactions_account_id ON transactions (account_id)",
+    "CREATE INDEX idx_transactions_uid_updated_at ON transactions (uid, updated_at)",
+    "CREATE INDEX idx_transactions_merchant_description "
+    "ON transactions (merchant_name, description)",
+    "CREATE INDEX idx_transactions_embedding_hnsw ON transactions "
+    "USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)",
+    "CREATE INDEX idx_transactions_embedding_needed_at ON transactions "
+    "(embedding_needed_at) WHERE embedding_needed_at IS NOT NULL",
+)
+
+_EXTERNAL_ID_GUARD = """
+CREATE FUNCTION transactions_external_id_guard() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.external_id IS NOT NULL THEN
+        DELETE FROM transaction_external_ids
+        WHERE account_id = OLD.account_id
+          AND external_id = OLD.external_id
+          AND transaction_id = OLD.id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.external_id IS NOT NULL THEN
+        -- A row moving between partitions re-inserts its own key.
+        INSERT INTO transaction_external_ids
+            (account_id, external_id, uid, transaction_id, ts)
+        VALUES (NEW.account_id, NEW.external_id, NEW.uid, NEW.id, NEW.ts)
+        ON CONFLICT (account_id, external_id) DO UPDATE
+            SET uid = EXCLUDED.uid, ts = EXCLUDED.ts
+            WHERE transaction_external_ids.transaction_id = EXCLUDED.transaction_id;
+        IF NOT FOUND THEN
+            RAISE unique_violation USING
+                MESSAGE = 'duplicate key value violates unique constraint '
+                    '"idx_transactions_external_id_account"',
+                DETAIL = format(
+                    'Key (account_id, external_id)=(%s, %s) already exists.',
+                    NEW.account_id,
+                    NEW.external_id
+                ),
+                CONSTRAINT = 'idx_transactions_external_id_account',
+                TABLE = 'transactions';
+        END IF;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+
+_POLICY_COMMANDS = {"r": "SELECT", "a": "INSERT", "w": "UPDATE", "d": "DELETE", "*": "ALL"}
+
+
+def _capture_table_security(table: str) -> dict:
+    """Read RLS flags, policies and non-owner grants of ``table``."""
+    bind = op.get_bind()
+    params = {"table": table}
+    flags = bind.execute(
+        sa.text(
+            "SELECT relrowsecurity, relforcerowsecurity FROM pg_class "
+            "WHERE oid = CAST(:table AS regclass)"
+        ),
+        params,
+    ).one()
+    policies = bind.execute(
+        sa.text(
+            "SELECT quote_ident(polname) AS name, polpermissive AS permissive, "
+            "polcmd AS command, "
+            "ARRAY(SELECT CASE WHEN role = 0 THEN 'PUBLIC' "
+            "ELSE quote_ident(pg_get_userbyid(role)) END "
+            "FROM unnest(polroles) AS role) AS roles, "
+            "pg_get_expr(polqual, polrelid) AS using_expr, "
+            "pg_get_expr(polwithcheck, polrelid) AS check_expr "
+            "FROM pg_policy WHERE polrelid = CAST(:table AS regclass) ORDER BY polname"
+        ),
+        params,
+    ).all()
+    grants = bind.execute(
+        sa.text(
+            "SELECT CASE WHEN acl.grantee = 0 THEN 'PUBLIC' "
+            "ELSE quote_ident(pg_get_userbyid(acl.grantee)) END AS grantee, "
+            "acl.privilege_type, acl.is_grantable "
+            "FROM pg_class AS c, aclexplode(c.relacl) AS acl "
+            "WHERE c.oid = CAST(:table AS regclass) AND acl.grantee <> c.relowner "
+            "ORDER BY 1, 2"
+        ),
+        params,
+    ).all()
+    return {
+        "row_security": flags.relrowsecurity,
+        "force_row_security": flags.relforcerowsecurity,
+        "policies": policies,
+        "grants": grants,
+    }
+
+
+def _apply_grants(table: str, security: dict) -> None:
+    for grant in security["grants"]:
+        option = " WITH GRANT OPTION" if grant.is_grantable else ""
+        op.execute(f"GRANT {grant.privilege_type} ON {table} TO {grant.grantee}{option}")
+
+
+def _apply_table_security(table: str, security: dict) -> None:
+    """Re-create what ``_capture_table_security`` read on ``table``."""
+    if security["row_security"]:
+        op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    if security["force_row_security"]:
+        op.execute(f"ALTER TABLE {table} FORCE ROW LEVEL SECURITY")
+    for policy in security["policies"]:
+        statement = (
+            f"CREATE POLICY {policy.name} ON {table} "
+            f"AS {'PERMISSIVE' if policy.permissive else 'RESTRICTIVE'} "
+            f"FOR {_POLICY_COMMANDS[policy.command]} TO {', '.join(policy.roles)}"
+        )
+        if policy.using_expr:
+            statement += f" USING ({policy.using_expr})"
+        if policy.check_expr:
+            statement += f" WITH CHECK ({policy.check_expr})"
+        op.execute(statement)
+    _apply_grants(table, security)
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partition(month: date) -> None:
+    upper = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE transactions_p{month:%Y%m} PARTITION OF transactions "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+    )
+
+
+def upgrade() -> None:
+    security = _capture_table_security("transactions")
+    op.execute("ALTER TABLE transactions RENAME TO transactions_unpartitioned")
+    op.execute(
+        "ALTER TABLE transactions_unpartitioned "
+        "RENAME CONSTRAINT transactions_pkey TO transactions_unpartitioned_pkey"
+    )
+
+    # LIKE keeps column order, types (including vector(768)), NOT NULLs and
+    # defaults, so the copy below can be a plain SELECT *.
+    op.execute(
+        "CREATE TABLE transactions "
+        "(LIKE transactions_unpartitioned INCLUDING DEFAULTS INCLUDING STORAGE) "
+        "PARTITION BY RANGE (ts)"
+    )
+    op.execute("ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY (id, ts)")
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_uid_fkey "
+        "FOREIGN KEY (uid) REFERENCES users (uid) ON DELETE CASCADE"
+    )
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_account_id_fkey "
+        "FOREIGN KEY (account_id) REFERENCES accounts (id) ON DELETE CASCADE"
+    )
+
+    # Partitions are cut on UTC month boundaries whatever the session time zone.
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+    oldest = op.get_bind().execute(
+        sa.text("SELECT min(ts) FROM transactions_unpartitioned")
+    ).scalar()
+    current = _month_start(datetime.now(UTC).date())
+    month = _month_start(oldest.astimezone(UTC).date()) if oldest else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        _create_month_partition(month)
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+
+    op.create_table(
+        "transaction_external_ids",
+        sa.Column("account_id", sa.UUID(), nullable=False),
+        sa.Column("external_id", sa.String(length=128), nullable=False),
+        sa.Column("uid", sa.String(length=128), nullable=False),
+        sa.Column("transaction_id", sa.UUID(), nullable=False),
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("account_id", "external_id"),
+        sa.UniqueConstraint("uid", "external_id", name="uq_transaction_external_ids_uid"),
+    )
+    # Detaching a month drops its keys by range.
+    op.create_index("ix_transaction_external_ids_ts", "transaction_external_ids", ["ts"])
+
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_unpartitioned")
+    op.execute(
+        "INSERT INTO transaction_external_ids "
+        "(account_id, external_id, uid, transaction_id, ts) "
+        "SELECT account_id, external_id, uid, id, ts FROM transactions "
+        "WHERE external_id IS NOT NULL"
+    )
+    op.execute("DROP TABLE transactions_unpartitioned")
+    _apply_table_security("transactions", security)
+    _apply_grants("transaction_external_ids", security)
+
+    for statement in _SHARED_INDEXES:
+        op.execute(statement)
+    # Lookups by key still use an index on the parent; uniqueness lives in the key table.
+    op.execute(
+        "CREATE INDEX idx_transactions_external_id_account "
+        "ON transactions (account_id, external_id)"
+    )
+
+    op.execute(_EXTERNAL_ID_GUARD)
+    op.execute(
+        "CREATE TRIGGER transactions_external_id_guard "
+        "AFTER INSERT OR DELETE OR UPDATE OF account_id, external_id, uid, ts "
+        "ON transactions FOR EACH ROW EXECUTE FUNCTION transactions_external_id_guard()"
+    )
+    op.execute("ANALYZE transactions")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER transactions_external_id_guard ON transactions")
+    op.execute("DROP FUNCTION transactions_external_id_guard()")
+
+    security = _capture_table_security("transactions")
+    op.execute("ALTER TABLE transactions RENAME TO transactions_partitioned")
+    op.execute(
+        "ALTER TABLE transactions_partitioned "
+        "RENAME CONSTRAINT transactions_pkey TO transactions_partitioned_pkey"
+    )
+    op.execute(
+        "CREATE TABLE transactions "
+        "(LIKE transactions_partitioned INCLUDING DEFAULTS INCLUDING STORAGE)"
+    )
+    op.execute("INSERT INTO transactions SELECT * FROM transactions_partitioned")
+    op.execute("DROP TABLE transactions_partitioned CASCADE")
+    op.drop_table("transaction_external_ids")
+    _apply_table_security("transactions", security)
+
+    op.execute("ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_uid_fkey "
+        "FOREIGN KEY (uid) REFERENCES users (uid) ON DELETE CASCADE"
+    )
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_account_id_fkey "
+        "FOREIGN KEY (account_id) REFERENCES accounts (id) ON DELETE CASCADE"
+    )
+    for statement in _SHARED_INDEXES:
+        op.execute(statement)
+    op.execute(
+        "CREATE UNIQUE INDEX idx_transactions_external_id_account "
+        "ON transactions (account_id, external_id)"
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX idx_transactions_external_id_uid "
+        "ON transactions (uid, external_id)"
+    )
@@ -0,0 +1,34 @@
+"""Add support ticket queue pagination indexes
+
+Revision ID: f8c0e2b4d6a9
+Revises: e6a8c0e2b4d7
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f8c0e2b4d6a9"
+down_revision: str | None = "e6a8c0e2b4d7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_INDEXES = {
+    "ix_support_tickets_created_id": ["created_at", "id"],
+    "ix_support_tickets_status_created_id": ["status", "created_at", "id"],
+    "ix_support_tickets_queue_status_created_id": ["queue_status", "created_at", "id"],
+    "ix_support_tickets_assignee_created_id": ["assigned_agent_uid", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in _INDEXES.items():
+        op.create_index(name, "support_tickets", columns, unique=False)
+
+
+def downgrade() -> None:
+    for name in reversed(list(_INDEXES)):
+        op.drop_index(name, table_name="support_tickets")
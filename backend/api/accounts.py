@@ -14,7 +14,11 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, selectinload
 
 from backend.core.config import settings
-from backend.core.constants import SubscriptionPlans, TierLimits
+from backend.core.constants import (
+    ESSENTIAL_RETENTION_DAYS,
+    SubscriptionPlans,
+    TierLimits,
+)
 from backend.core.dependencies import (
     enforce_account_limit,
     get_current_active_subscription,
@@ -32,6 +36,8 @@ from backend.models import (
 from backend.services.analytics import invalidate_analytics_cache
 from backend.services.categorization import predict_category
 from backend.services.connectors import build_connector
+from backend.services.embeddings import mark_embedding_needed
+from backend.services.financial_context import invalidate_financial_context_cache
 from backend.services.household_service import get_household_member_uids
 from backend.services.plaid import (
     remove_item,
@@ -40,6 +46,7 @@ from backend.services.plaid_sync import (
     PLAID_SYNC_STATUS_ACTIVE,
     PLAID_SYNC_STATUS_NEEDS_REAUTH,
 )
+from backend.services.recurring import mark_recurring_series_stale
 from backend.services.tatum_history import (
     ProviderError,
     ProviderOverloaded,
@@ -839,6 +846,7 @@ def link_web3_account(
     )
     db.add(audit)
     db.commit()
+    invalidate_financial_context_cache(current_user.uid)
 
     return _serialize_account(account)
 
@@ -943,6 +951,7 @@ def link_cex_account(
     )
     db.add(audit)
     db.commit()
+    invalidate_financial_context_cache(current_user.uid)
 
     return _serialize_account(account)
 
@@ -1255,6 +1264,7 @@ def _process_single_transaction(
         existing.description = description
         existing.raw_json = _clean_raw(txn)
         existing.external_id = tx_id
+        mark_embedding_needed(existing)
         db.add(existing)
         return None
 
@@ -1305,11 +1315,11 @@ def _resolve_sync_dates(
 def _retention_min_date_for_plan(plan_code: str) -> date | None:
     """
     Return the minimum transaction date allowed for the plan.
-    Essential is capped to a rolling 365-day window.
+    Essential is capped to a rolling ``ESSENTIAL_RETENTION_DAYS`` window.
     """
     base_tier = SubscriptionPlans.get_base_tier(plan_code)
     if base_tier == SubscriptionPlans.ESSENTIAL:
-        return date.today() - timedelta(days=365)
+        return date.today() - timedelta(days=ESSENTIAL_RETENTION_DAYS)
     return None
 
 
@@ -1367,6 +1377,8 @@ def _save_sync_batch(
             new_ids.append(new_txn.id)
     if is_web3:
         _dedupe_web3_transactions(db, uid, account_id)
+        # Dedupe hard-deletes rows, which incremental series updates cannot see.
+        mark_recurring_series_stale(db, uid)
     return synced, new_count, new_ids
 
 
@@ -1526,7 +1538,7 @@ def sync_account_transactions(
 
     if retention_min_date:
         retention_cutoff = datetime.combine(retention_min_date, datetime.min.time(), tzinfo=UTC)
-        (
+        pruned = (
             db.query(Transaction)
             .filter(
                 Transaction.uid == current_user.uid,
@@ -1534,6 +1546,8 @@ def sync_account_transactions(
             )
             .delete(synchronize_session=False)
         )
+        if pruned:
+            mark_recurring_series_stale(db, current_user.uid)
 
     if account.account_type == "web3" and update_cursor:
         account.web3_sync_cursor = next_cursor
@@ -1684,6 +1698,7 @@ def create_manual_account(
     )
     db.add(audit)
     db.commit()
+    invalidate_financial_context_cache(current_user.uid)
 
     return _serialize_account(account)
 
@@ -1737,6 +1752,7 @@ def update_account(
     db.add(account)
     db.commit()
     invalidate_analytics_cache(current_user.uid)
+    invalidate_financial_context_cache(current_user.uid)
     db.refresh(account)
 
     return _serialize_account(account)
@@ -1836,7 +1852,9 @@ def delete_account(
     )
     db.add(audit)
     db.delete(account)
+    mark_recurring_series_stale(db, current_user.uid)
     db.commit()
+    invalidate_financial_context_cache(current_user.uid)
 
     return {"message": "Account deleted"}
 
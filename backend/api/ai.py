@@ -10,6 +10,7 @@ from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
 from backend.core import settings
+from backend.core.executors import run_db
 from backend.middleware.auth import get_current_user
 from backend.models import LLMLog, Subscription, User
 from backend.services.ai import (
@@ -37,6 +38,35 @@ def _active_model_name() -> str:
     return settings.ai_model_prod or settings.ai_model
 
 
+def _resolve_tier(db: Session, user_id: str) -> str:
+    subscription = db.query(Subscription).filter(Subscription.uid == user_id).first()
+    return subscription.plan.lower() if subscription else "free"
+
+
+def _store_llm_log(
+    db: Session, user_id: str, model: str, prompt: str, response: str
+) -> None:
+    """Encrypt and persist a chat exchange (blocking; run via run_db)."""
+    # TIER 3.4: Encryption
+    # Encrypt response as well (since model requires encrypted_response)
+    # 2025-12-10 16:46 CST - store ciphertext as bytes to satisfy BYTEA columns
+    encrypted_prompt = encrypt_prompt(prompt, user_dek_ref=user_id).encode("utf-8")
+    encrypted_response = encrypt_prompt(response, user_dek_ref=user_id).encode("utf-8")
+
+    log_entry = LLMLog(
+        uid=user_id,
+        model=model,
+        encrypted_prompt=encrypted_prompt,
+        encrypted_response=encrypted_response,
+        # context_used not in model
+        tokens=0,  # tokens_used -> tokens
+        user_dek_ref=user_id,
+        archived=False,
+    )
+    db.add(log_entry)
+    db.commit()
+
+
 class ChatRequest(BaseModel):
     message: str = Field(example="Give me a spending summary for this week.")
     client_context: dict[str, Any] | None = Field(
@@ -142,8 +172,7 @@ async def chat_endpoint(
         raise HTTPException(status_code=400, detail="Please enter a message for the AI assistant.")
 
     # 1. Get User Subscription/Tier
-    subscription = db.query(Subscription).filter(Subscription.uid == user_id).first()
-    tier = subscription.plan.lower() if subscription else "free"
+    tier = await run_db(_resolve_tier, db, user_id)
 
     # 2. Check rate limit before doing extra work (RAG/model)
     precheck = await check_rate_limit(user_id)
@@ -214,28 +243,7 @@ async def chat_endpoint(
 
     # 5. Log to Audit (LLMLog) - skip for free tier to keep sessions ephemeral
     if tier != "free":
-        # TIER 3.4: Encryption
-        # Encrypt response as well (since model requires encrypted_response)
-        # 2025-12-10 16:46 CST - store ciphertext as bytes to satisfy BYTEA columns
-        encrypted_prompt = encrypt_prompt(message, user_dek_ref=user_id).encode(
-            "utf-8"
-        )
-        encrypted_response = encrypt_prompt(ai_response, user_dek_ref=user_id).encode(
-            "utf-8"
-        )
-
-        log_entry = LLMLog(
-            uid=user_id,
-            model=effective_model,
-            encrypted_prompt=encrypted_prompt,
-            encrypted_response=encrypted_response,
-            # context_used not in model
-            tokens=0,  # tokens_used -> tokens
-            user_dek_ref=user_id,
-            archived=False,
-        )
-        db.add(log_entry)
-        db.commit()
+        await run_db(_store_llm_log, db, user_id, effective_model, message, ai_response)
 
     return ChatResponse(
         response=ai_response,
@@ -265,8 +273,7 @@ async def chat_stream_endpoint(
         raise HTTPException(status_code=400, detail="Please enter a message for the AI assistant.")
 
     # 1. Get User Subscription/Tier
-    subscription = db.query(Subscription).filter(Subscription.uid == user_id).first()
-    tier = subscription.plan.lower() if subscription else "free"
+    tier = await run_db(_resolve_tier, db, user_id)
 
     # 2. Check rate limit before doing extra work (RAG/model)
     precheck = await check_rate_limit(user_id)
@@ -354,20 +361,14 @@ async def chat_stream_endpoint(
 
             # 4. Log to Audit (LLMLog) - skip for free tier to keep sessions ephemeral
             if effective_tier != "free" and final_response:
-                encrypted_prompt = encrypt_prompt(message, user_dek_ref=user_id).encode("utf-8")
-                encrypted_response = encrypt_prompt(final_response, user_dek_ref=user_id).encode("utf-8")
-
-                log_entry = LLMLog(
-                    uid=user_id,
-                    model=effective_model or _active_model_name(),
-                    encrypted_prompt=encrypted_prompt,
-                    encrypted_response=encrypted_response,
-                    tokens=0,
-                    user_dek_ref=user_id,
-                    archived=False,
+                await run_db(
+                    _store_llm_log,
+                    db,
+                    user_id,
+                    effective_model or _active_model_name(),
+                    message,
+                    final_response,
                 )
-                db.add(log_entry)
-                db.commit()
 
             payload_complete = {
                 "type": "complete",
@@ -385,11 +386,11 @@ async def chat_stream_endpoint(
             }
             yield f"data: {json.dumps(payload_complete)}\n\n"
         except HTTPException as exc:
-            db.rollback()
+            await run_db(db.rollback)
             err = {"type": "error", "error": str(exc.detail)}
             yield f"data: {json.dumps(err)}\n\n"
         except Exception as exc:
-            db.rollback()
+            await run_db(db.rollback)
             logger.error("Streaming chat failed: %s", exc, exc_info=True)
             err = {"type": "error", "error": "We encountered an issue while streaming your AI response."}
             yield f"data: {json.dumps(err)}\n\n"
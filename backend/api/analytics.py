@@ -13,7 +13,7 @@ from backend.services.analytics import (
     NetWorthResponse,
     SpendingByCategoryResponse,
 )
-from backend.utils import get_db
+from backend.utils import get_read_db
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 logger = logging.getLogger(__name__)
@@ -30,7 +30,7 @@ def get_net_worth(
     category: str | None = Query(default=None, description="Filter by transaction category"),
     is_manual: bool | None = Query(default=None, description="Filter by manual transactions (true) or automated (false)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     exclude_types_list = None
     if exclude_account_types:
@@ -56,7 +56,7 @@ def get_cash_flow(
     category: str | None = Query(default=None, description="Filter by transaction category"),
     is_manual: bool | None = Query(default=None, description="Filter by manual transactions (true) or automated (false)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     exclude_types_list = None
     if exclude_account_types:
@@ -81,7 +81,7 @@ def get_spending_by_category(
     category: str | None = Query(default=None, description="Filter by transaction category"),
     is_manual: bool | None = Query(default=None, description="Filter by manual transactions (true) or automated (false)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     exclude_types_list = None
     if exclude_account_types:
@@ -6,17 +6,15 @@ import random
 import re
 import string
 import uuid
-from collections import defaultdict, deque
 from datetime import UTC, datetime, timedelta
-from threading import Lock
 from urllib.parse import parse_qs, urlparse
 
 import pyotp
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session, joinedload, lazyload
 
 try:
     from webauthn import (
@@ -41,19 +39,17 @@ except ModuleNotFoundError:
 from backend.core import settings
 from backend.core.constants import UserStatus
 from backend.core.legal import REQUIRED_SIGNUP_AGREEMENTS
+from backend.core.query_metrics import query_budget
 from backend.middleware.auth import (
     get_current_identity,
     get_current_identity_with_user_guard,
     get_current_user,
 )
 from backend.models import (
-    AISettings,
     AuditLog,
     HouseholdInvite,
     HouseholdMember,
-    LegalAgreementAcceptance,
     PendingSignup,
-    Subscription,
     User,
     UserSession,
 )
@@ -70,18 +66,13 @@ from backend.services.auth import (
     verify_password,
     verify_token,
 )
-from backend.services.email import get_email_client
+from backend.services.email_outbox import enqueue_email, schedule_email_delivery
 from backend.utils import get_db
+from backend.utils.rate_limit import TokenBucketLimiter
 
 router = APIRouter(tags=["auth"])
 logger = logging.getLogger(__name__)
-OTP_DELIVERY_ERROR_MESSAGE = (
-    "We couldn't send the verification code right now. Please try again shortly."
-)
-
-
-class OtpDeliveryError(RuntimeError):
-    """Raised when OTP delivery fails after code generation."""
+OTP_TTL = timedelta(minutes=10)
 
 
 def _require_webauthn() -> None:
@@ -323,6 +314,27 @@ class ProfileUpdateRequest(BaseModel):
 
 
 # Structured helpers ---------------------------------------------------------
+# Relationships _serialize_profile reads; User's other selectin collections stay unloaded.
+_PROFILE_RELATIONSHIPS = (
+    User.subscriptions,
+    User.ai_settings,
+    User.developer,
+    User.household_member,
+)
+
+
+def _load_user(db: Session, uid: str, *relationships) -> User | None:
+    """
+    Load one user with ``relationships`` joined into the same SELECT.
+
+    Everything else, including the joined rows' own relationships, is left to
+    load lazily, so this is one round trip instead of a selectin query per
+    relationship on User.
+    """
+    options = [lazyload("*"), *(joinedload(rel).lazyload("*") for rel in relationships)]
+    return db.scalars(select(User).options(*options).where(User.uid == uid)).unique().first()
+
+
 def _serialize_profile(user: User) -> dict:
     """Build a complete profile payload."""
     all_subs = sorted(
@@ -412,18 +424,21 @@ def _serialize_identity_pending_profile(uid: str, email: str | None) -> dict:
     }
 
 
-# Simple in-memory rate limiter keyed by client IP
-_login_attempts: dict[str, deque[float]] = defaultdict(deque)
-_login_lock = Lock()
-_login_window_seconds = 60
-_login_max_attempts = 10
+# Login and signup limiters keyed by client IP, shared across workers via the
+# configured rate-limit backend.
+_LOGIN_WINDOW_SECONDS = 60
+_LOGIN_MAX_ATTEMPTS = 10
+_login_limiter = TokenBucketLimiter.per_window(
+    "login", _LOGIN_MAX_ATTEMPTS, _LOGIN_WINDOW_SECONDS
+)
 
 # Dedicated signup limiter to protect onboarding endpoints without coupling
 # them to the global "/api" limiter bucket.
-_signup_attempts: dict[str, deque[float]] = defaultdict(deque)
-_signup_lock = Lock()
-_signup_window_seconds = 600
-_signup_max_attempts = 20
+_SIGNUP_WINDOW_SECONDS = 600
+_SIGNUP_MAX_ATTEMPTS = 20
+_signup_limiter = TokenBucketLimiter.per_window(
+    "signup", _SIGNUP_MAX_ATTEMPTS, _SIGNUP_WINDOW_SECONDS
+)
 
 
 def _client_ip(request: Request) -> str:
@@ -434,39 +449,19 @@ def _client_ip(request: Request) -> str:
 
 
 def _rate_limit(request: Request) -> None:
-    import time
-
-    client_ip = _client_ip(request)
-    now = time.time()
-
-    with _login_lock:
-        attempts = _login_attempts[client_ip]
-        while attempts and attempts[0] <= now - _login_window_seconds:
-            attempts.popleft()
-        if len(attempts) >= _login_max_attempts:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many login attempts. Please wait before retrying.",
-            )
-        attempts.append(now)
+    if not _login_limiter.hit(_client_ip(request)).allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please wait before retrying.",
+        )
 
 
 def _signup_rate_limit(request: Request) -> None:
-    import time
-
-    client_ip = _client_ip(request)
-    now = time.time()
-
-    with _signup_lock:
-        attempts = _signup_attempts[client_ip]
-        while attempts and attempts[0] <= now - _signup_window_seconds:
-            attempts.popleft()
-        if len(attempts) >= _signup_max_attempts:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded. Please try again later.",
-            )
-        attempts.append(now)
+    if not _signup_limiter.hit(_client_ip(request)).allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded. Please try again later.",
+        )
 
 
 def _verify_totp(user: User, mfa_code: str) -> None:
@@ -948,42 +943,23 @@ def _create_db_user_safe(
         ) from exc
 
 
-def _cleanup_partial_signup(db: Session, uid: str) -> None:
-    """Best-effort cleanup for partially created signup data."""
-    try:
-        db.query(PendingSignup).filter(PendingSignup.uid == uid).delete()
-        db.query(Subscription).filter(Subscription.uid == uid).delete()
-        db.query(AISettings).filter(AISettings.uid == uid).delete()
-        db.query(LegalAgreementAcceptance).filter(LegalAgreementAcceptance.uid == uid).delete()
-        db.query(User).filter(User.uid == uid).delete()
-        db.commit()
-    except Exception as exc:
-        logger.error(
-            "Failed to cleanup partial signup data.",
-            extra={"uid": uid},
-            exc_info=exc,
-        )
-        db.rollback()
-
-
 def _generate_and_send_otp(target: User | PendingSignup, db: Session) -> None:
-    """Helper to generate OTP and send via email."""
+    """Generate an OTP and queue its email in the same commit."""
     code = "".join(random.choices(string.digits, k=6))
+    expires_at = datetime.utcnow() + OTP_TTL
     target.email_otp = code
-    target.email_otp_expires_at = datetime.utcnow() + timedelta(minutes=10)
+    target.email_otp_expires_at = expires_at
+    enqueue_email(
+        db,
+        "send_otp",
+        target.email,
+        message_key=f"otp:{target.uid}:{expires_at.isoformat()}",
+        # A late code is useless; the user asks for a new one instead.
+        expires_at=expires_at.replace(tzinfo=UTC),
+        code=code,
+    )
     db.commit()
 
-    try:
-        client = get_email_client()
-        client.send_otp(target.email, code)
-    except Exception as exc:
-        logger.error(
-            "Failed to send OTP email.",
-            extra={"email": target.email, "uid": getattr(target, "uid", None)},
-            exc_info=exc,
-        )
-        raise OtpDeliveryError("OTP delivery failed.") from exc
-
 
 def _store_pending_signup(
     db: Session,
@@ -1020,6 +996,7 @@ def _store_pending_signup(
 def signup_pending(
     payload: PendingSignupRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     identity: dict = Depends(get_current_identity),
     db: Session = Depends(get_db),
 ) -> dict:
@@ -1085,13 +1062,8 @@ def signup_pending(
         status=UserStatus.PENDING_VERIFICATION,
     )
 
-    try:
-        _generate_and_send_otp(pending_signup, db)
-    except OtpDeliveryError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=OTP_DELIVERY_ERROR_MESSAGE,
-        ) from exc
+    _generate_and_send_otp(pending_signup, db)
+    schedule_email_delivery(background_tasks, db)
 
     return {"uid": uid, "email": email, "message": "Signup started."}
 
@@ -1100,6 +1072,7 @@ def signup_pending(
 def signup(
     payload: SignupRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ) -> dict:
     """
@@ -1195,28 +1168,20 @@ def signup(
     )
 
     # Automatically send verification OTP
-    try:
-        _generate_and_send_otp(pending_signup, db)
-    except OtpDeliveryError as exc:
-        _cleanup_partial_signup(db, uid)
-        if is_fresh_identity_user and record:
-            _rollback_identity_user(
-                uid,
-                email=email_addr,
-                reason="otp_send_failed",
-            )
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=OTP_DELIVERY_ERROR_MESSAGE,
-        ) from exc
+    _generate_and_send_otp(pending_signup, db)
+    schedule_email_delivery(background_tasks, db)
 
     return {"uid": uid, "email": email_addr, "message": "Signup started."}
 
 
 @router.post("/login")
+# One SELECT for the user, the session and welcome-email writes, one reload
+# after the commit, and headroom for MFA verification.
+@query_budget(8)
 def login(  # noqa: C901
     payload: TokenRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ) -> dict:
     """
@@ -1244,12 +1209,7 @@ def login(  # noqa: C901
             detail="Invalid session data.",
         )
 
-    user = (
-        db.query(User)
-        .options(selectinload(User.developer))
-        .filter(User.uid == uid)
-        .first()
-    )
+    user = _load_user(db, uid, User.subscriptions, User.developer)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1269,7 +1229,22 @@ def login(  # noqa: C901
             session_rec.mfa_method_verified = user.mfa_method
             db.add(session_rec)
 
-    if session_rec is not None:
+    subscription = user.subscriptions[0] if user.subscriptions else None
+    welcome_queued = False
+    if subscription and subscription.plan not in ["free", "trial"] and not subscription.welcome_email_sent:
+        # Delayed Welcome Email Trigger: the flag and the queued email commit
+        # together with the session.
+        enqueue_email(
+            db,
+            "send_subscription_welcome",
+            user.email,
+            message_key=f"subscription_welcome:{uid}:{subscription.plan}",
+            plan_name=subscription.plan,
+        )
+        subscription.welcome_email_sent = True
+        welcome_queued = True
+
+    if session_rec is not None or welcome_queued:
         try:
             db.commit()
         except Exception as exc:
@@ -1278,18 +1253,14 @@ def login(  # noqa: C901
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to establish login session. Please try again.",
             ) from exc
+        # The commit expired ``user``; reload it in one SELECT rather than
+        # letting attribute access refresh it with User's selectin fan-out.
+        user = _load_user(db, uid, User.subscriptions, User.developer)
+        subscription = user.subscriptions[0] if user.subscriptions else None
 
-    subscription = db.query(Subscription).filter(Subscription.uid == uid).first()
-    if subscription and subscription.plan not in ["free", "trial"] and not subscription.welcome_email_sent:
-        # Delayed Welcome Email Trigger
-        try:
-            email_client = get_email_client()
-            email_client.send_subscription_welcome(user.email, subscription.plan)
-            subscription.welcome_email_sent = True
-            db.commit()
-            logger.info(f"Sent delayed welcome email to {user.email} for plan {subscription.plan}")
-        except Exception as e:
-            logger.error(f"Failed to send delayed welcome email to {user.email}: {e}")
+    if welcome_queued:
+        schedule_email_delivery(background_tasks, db)
+        logger.info(f"Queued delayed welcome email to {user.email} for plan {subscription.plan}")
 
     profile = user.to_dict()
     if subscription:
@@ -1370,6 +1341,8 @@ def change_password(
 
 
 @router.get("/profile")
+# The auth dependency's user and session bookkeeping plus one profile SELECT.
+@query_budget(8)
 def get_profile(
     identity: dict = Depends(get_current_identity_with_user_guard),
     db: Session = Depends(get_db),
@@ -1381,17 +1354,7 @@ def get_profile(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session data."
         )
 
-    user = (
-        db.query(User)
-        .options(
-            selectinload(User.subscriptions),
-            selectinload(User.ai_settings),
-            selectinload(User.notification_preferences),
-            selectinload(User.developer),
-        )
-        .filter(User.uid == uid)
-        .first()
-    )
+    user = _load_user(db, uid, *_PROFILE_RELATIONSHIPS)
 
     if not user:
         pending_signup = db.query(PendingSignup).filter(PendingSignup.uid == uid).first()
@@ -1483,16 +1446,7 @@ def update_profile(  # noqa: C901
     """Update user profile information including name and username."""
     logger.info(f"Profile update request for user {current_user.uid}: first_name={payload.first_name}, last_name={payload.last_name}, username={payload.username}, display_name_pref={payload.display_name_pref}")
 
-    user = (
-        db.query(User)
-        .options(
-            selectinload(User.subscriptions),
-            selectinload(User.ai_settings),
-            selectinload(User.notification_preferences),
-        )
-        .filter(User.uid == current_user.uid)
-        .first()
-    )
+    user = _load_user(db, current_user.uid, *_PROFILE_RELATIONSHIPS)
 
     if not user:
         raise HTTPException(
@@ -1602,31 +1556,22 @@ def update_profile(  # noqa: C901
 @router.post("/mfa/email/request-code")
 def request_email_code(
     payload: ResetPasswordRequest,  # reusing email field
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ) -> dict:
     """Request an Email OTP for login or setup."""
     user = db.query(User).filter(User.email == payload.email).first()
     if user:
-        try:
-            _generate_and_send_otp(user, db)
-        except OtpDeliveryError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=OTP_DELIVERY_ERROR_MESSAGE,
-            ) from exc
+        _generate_and_send_otp(user, db)
+        schedule_email_delivery(background_tasks, db)
         return {"message": "Code sent."}
 
     pending_signup = (
         db.query(PendingSignup).filter(PendingSignup.email == payload.email).first()
     )
     if pending_signup:
-        try:
-            _generate_and_send_otp(pending_signup, db)
-        except OtpDeliveryError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=OTP_DELIVERY_ERROR_MESSAGE,
-            ) from exc
+        _generate_and_send_otp(pending_signup, db)
+        schedule_email_delivery(background_tasks, db)
         return {"message": "Code sent."}
 
     # Prevent enumeration
@@ -1636,6 +1581,7 @@ def request_email_code(
 @router.post("/mfa/email/enable")
 def enable_email_mfa(  # noqa: C901
     payload: MFAVerifyRequest,
+    background_tasks: BackgroundTasks,
     identity: dict = Depends(get_current_identity),
     db: Session = Depends(get_db),
 ) -> dict:
@@ -1686,6 +1632,7 @@ def enable_email_mfa(  # noqa: C901
                     )
                 logger.info(f"User {current_user.uid} verified email. Already a household member. Status -> ACTIVE")
                 db.commit()
+                schedule_email_delivery(background_tasks, db)
                 return {"message": "Email verified."}
 
             # 2. Check for pending household invites (Case-insensitive check)
@@ -14,7 +14,7 @@ from sqlalchemy.orm import Session
 from backend.middleware.auth import get_current_user
 from backend.models import Budget, HouseholdMember, Transaction, User
 from backend.services.household_service import get_household_member_uids
-from backend.utils import get_db
+from backend.utils import get_db, get_read_db
 
 router = APIRouter(prefix="/api/budgets", tags=["Budgets"])
 
@@ -349,7 +349,7 @@ def get_budget_history(
     lookback: int = Query(6, ge=1, le=24),
     scope: str = Query("personal", pattern="^(personal|household)$"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> Any:
     budget_owner_uid, spend_uids, _can_edit = _scope_context(db, current_user, scope)
     normalized = (period or "monthly").lower()
@@ -1,14 +1,26 @@
 
 import logging
-import os
 import uuid
+from datetime import UTC, datetime, timedelta
 from io import BytesIO
 from pathlib import Path
-
-from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from typing import BinaryIO
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Request,
+    UploadFile,
+)
 from fastapi.responses import FileResponse
+from sqlalchemy import update
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session
 
+from backend.core.executors import run_db, run_image, run_io
 from backend.middleware.auth import get_current_user
 from backend.models import User, UserDocument
 from backend.utils import get_db
@@ -79,6 +91,14 @@ HEIC_FAILURE_MESSAGES = {
 
 # App-level guardrail for large uploads. Cloud Run ingress has separate hard limits.
 MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+# Uploads are copied to storage this many bytes at a time.
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# A conversion still "processing" after this long died with its worker.
+HEIC_PROCESSING_STALE_AFTER = timedelta(minutes=15)
+
+
+class UploadTooLargeError(Exception):
+    pass
 
 
 class HeicNormalizationError(Exception):
@@ -87,6 +107,16 @@ class HeicNormalizationError(Exception):
         self.reason_code = reason_code
 
 
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=(
+            "Uploaded file is too large. Maximum supported size is "
+            f"{MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+        ),
+    )
+
+
 def _is_content_type_allowed(content_type: str | None) -> bool:
     if not content_type:
         return True
@@ -119,6 +149,121 @@ def _normalize_heic_bytes(file_bytes: bytes) -> bytes:
         raise HeicNormalizationError("HEIC_DECODE_FAILED") from None
 
 
+def _copy_upload(source: BinaryIO, file_path: Path, max_bytes: int) -> int:
+    """
+    Copy an upload to ``file_path`` in fixed-size chunks, enforcing ``max_bytes``.
+
+    Writes through a ``.part`` file renamed into place, so a rejected or failed
+    upload never leaves a partial document behind.
+    """
+    tmp_path = file_path.with_name(f"{file_path.name}.part")
+    size = 0
+    try:
+        with open(tmp_path, "wb") as buffer:
+            while chunk := source.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError()
+                buffer.write(chunk)
+        if size:
+            tmp_path.replace(file_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return size
+
+
+def _persist_document(db: Session, doc: UserDocument) -> dict:
+    db.add(doc)
+    db.commit()
+    db.refresh(doc)
+    return doc.to_dict()
+
+
+def _write_file(file_path: Path, data: bytes) -> int:
+    tmp_path = file_path.with_name(f"{file_path.name}.part")
+    with open(tmp_path, "wb") as buffer:
+        buffer.write(data)
+    tmp_path.replace(file_path)
+    return len(data)
+
+
+def _normalize_stored_heic(bind: Engine | Connection, doc_id: uuid.UUID) -> None:
+    """Convert a stored HEIC upload to JPEG and point the document at the result."""
+    db = Session(bind=bind, expire_on_commit=False)
+    try:
+        doc = db.query(UserDocument).filter(UserDocument.id == doc_id).first()
+        if not doc or doc.processing_status != "processing":
+            return
+
+        source_path = Path(doc.file_path)
+        target_path = source_path.with_suffix(".jpg")
+        try:
+            jpeg_bytes = _normalize_heic_bytes(source_path.read_bytes())
+            size_bytes = _write_file(target_path, jpeg_bytes)
+        except HeicNormalizationError as exc:
+            logger.warning(
+                "HEIC_NORMALIZATION_FAILED reason_code=%s doc_id=%s uid=%s",
+                exc.reason_code,
+                doc.id,
+                doc.uid,
+            )
+            doc.processing_status = "failed"
+            doc.processing_error = exc.reason_code
+            db.commit()
+            return
+
+        doc.file_type = "jpg"
+        doc.file_path = str(target_path)
+        doc.size_bytes = size_bytes
+        doc.processing_status = "ready"
+        doc.processing_error = None
+        db.commit()
+        source_path.unlink(missing_ok=True)
+    except Exception:
+        db.rollback()
+        logger.exception("HEIC normalization failed for document %s.", doc_id)
+    finally:
+        db.close()
+
+
+async def normalize_heic_document(bind: Engine | Connection, doc_id: uuid.UUID) -> None:
+    """Background task: HEIC decode/re-encode runs on the bounded image executor."""
+    await run_image(_normalize_stored_heic, bind, doc_id)
+
+
+def fail_stale_processing_documents(
+    bind: Engine | Connection,
+    *,
+    now: datetime | None = None,
+    stale_after: timedelta = HEIC_PROCESSING_STALE_AFTER,
+) -> int:
+    """
+    Mark documents whose HEIC conversion never finished as failed.
+
+    The conversion runs as an in-process background task, so a restart or a
+    crash mid-conversion would otherwise leave the document "processing"
+    forever. Returns the number of documents marked failed.
+    """
+    cutoff = (now or datetime.now(UTC)) - stale_after
+    with Session(bind=bind) as db:
+        failed = db.execute(
+            update(UserDocument)
+            .where(
+                UserDocument.processing_status == "processing",
+                UserDocument.updated_at < cutoff,
+            )
+            .values(
+                processing_status="failed",
+                processing_error="HEIC_NORMALIZATION_ABANDONED",
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+    if failed:
+        logger.warning("HEIC_NORMALIZATION_ABANDONED documents=%d", failed)
+    return failed
+
+
 @router.get("/")
 @router.get("", include_in_schema=False)
 def list_documents(
@@ -133,6 +278,7 @@ def list_documents(
 @router.post("/upload")
 async def upload_document(
     request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     type: str = "uploaded",
     current_user: User = Depends(get_current_user),
@@ -155,83 +301,65 @@ async def upload_document(
             detail="Unsupported file content type. Please upload a supported file format.",
         )
 
-    stored_file_ext = file_ext
-
-    try:
-        content_length_raw = request.headers.get("content-length")
-        if content_length_raw:
-            try:
-                if int(content_length_raw) > MAX_UPLOAD_BYTES:
-                    raise HTTPException(
-                        status_code=413,
-                        detail=(
-                            "Uploaded file is too large. Maximum supported size is "
-                            f"{MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
-                        ),
-                    )
-            except ValueError:
-                pass
-
-        raw_bytes = await file.read()
-        if len(raw_bytes) > MAX_UPLOAD_BYTES:
-            raise HTTPException(
-                status_code=413,
-                detail=(
-                    "Uploaded file is too large. Maximum supported size is "
-                    f"{MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
-                ),
-            )
-        if stored_file_ext in HEIC_EXTENSIONS:
-            raw_bytes = _normalize_heic_bytes(raw_bytes)
-            stored_file_ext = "jpg"
-    except HeicNormalizationError as exc:
+    is_heic = file_ext in HEIC_EXTENSIONS
+    if is_heic and (not HEIC_DECODER_AVAILABLE or Image is None):
         logger.warning(
-            "HEIC_NORMALIZATION_FAILED reason_code=%s filename=%s uid=%s",
-            exc.reason_code,
+            "HEIC_NORMALIZATION_FAILED reason_code=HEIC_DECODER_UNAVAILABLE filename=%s uid=%s",
             file.filename,
             current_user.uid,
         )
         raise HTTPException(
             status_code=400,
-            detail=HEIC_FAILURE_MESSAGES.get(
-                exc.reason_code,
-                "We couldn't process that HEIC image. Please export it as JPG or PNG and try again.",
-            ),
-        ) from exc
+            detail=HEIC_FAILURE_MESSAGES["HEIC_DECODER_UNAVAILABLE"],
+        )
 
-    if not raw_bytes:
-        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+    content_length_raw = request.headers.get("content-length")
+    if content_length_raw:
+        try:
+            if int(content_length_raw) > MAX_UPLOAD_BYTES:
+                raise _upload_too_large()
+        except ValueError:
+            pass
 
     # Generate secure filename
     file_id = uuid.uuid4()
-    secure_filename = f"{file_id}.{stored_file_ext}"
+    secure_filename = f"{file_id}.{file_ext}"
     file_path = UPLOAD_DIR / secure_filename
 
     try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(raw_bytes)
+        file_size = await run_io(_copy_upload, file.file, file_path, MAX_UPLOAD_BYTES)
+    except UploadTooLargeError:
+        raise _upload_too_large() from None
+    except Exception as e:
+        logger.error(f"Upload failed: {e}")
+        raise HTTPException(status_code=500, detail="We encountered an issue uploading your file. Please try again.") from e
 
-        file_size = os.path.getsize(file_path)
+    if not file_size:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
+    try:
         doc = UserDocument(
             id=file_id,
             uid=current_user.uid,
             name=file.filename,
             type=type,
-            file_type=stored_file_ext,
+            file_type=file_ext,
             file_path=str(file_path),
-            size_bytes=file_size
+            size_bytes=file_size,
+            processing_status="processing" if is_heic else "ready",
         )
-        db.add(doc)
-        db.commit()
-        db.refresh(doc)
-
-        return doc.to_dict()
-
+        payload = await run_db(_persist_document, db, doc)
     except Exception as e:
+        await run_io(file_path.unlink, missing_ok=True)
         logger.error(f"Upload failed: {e}")
         raise HTTPException(status_code=500, detail="We encountered an issue uploading your file. Please try again.") from e
 
+    # HEIC is converted to JPEG after the response; the document reports
+    # status "processing" until the background task updates it.
+    if is_heic:
+        background_tasks.add_task(normalize_heic_document, db.get_bind(), file_id)
+    return payload
+
 
 @router.get("/{doc_id}/download")
 def download_document(
@@ -4,7 +4,7 @@
 import logging
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy.orm import Session
 
@@ -12,6 +12,7 @@ from backend.api.users import get_current_user
 from backend.core.dependencies import require_feature
 from backend.models import Household, HouseholdMember, User
 from backend.services import household_service
+from backend.services.email_outbox import schedule_email_delivery
 from backend.services.legal import record_single_agreement
 from backend.utils import get_db
 
@@ -104,6 +105,7 @@ def get_my_household(
 @router.post("/invites")
 def create_invite(
     payload: InviteRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(require_feature("family.tracking")),
     db: Session = Depends(get_db),
 ):
@@ -114,6 +116,7 @@ def create_invite(
         invite = household_service.invite_member(
             db, current_user.uid, payload.email, payload.is_minor, payload.can_view_household
         )
+        schedule_email_delivery(background_tasks, db)
         return {"message": "Invite sent", "invite_id": str(invite.id)}
     except HTTPException as e:
         raise e
@@ -143,6 +146,7 @@ def check_invite_status(
 def accept_invite_endpoint(
     payload: InviteAccept,
     request: Request,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -166,6 +170,7 @@ def accept_invite_endpoint(
             source="frontend",
             metadata={"household_id": str(member.household_id)},
         )
+        schedule_email_delivery(background_tasks, db)
         return {"message": "Joined household successfully."}
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
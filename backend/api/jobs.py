@@ -10,12 +10,25 @@ from fastapi import APIRouter, Header, HTTPException
 from sqlalchemy.orm import Session
 
 from backend.core import settings
-from backend.models import SessionLocal
+from backend.middleware.security import get_event_loop_blocking_stats
+from backend.models import SessionLocal, engine
+from backend.services.billing import process_stripe_webhook_events
+from backend.services.data_export import (
+    process_pending_export_jobs,
+    purge_expired_export_artifacts,
+)
 from backend.services.digests import run_due_digests
+from backend.services.email_outbox import deliver_pending_emails, purge_finished_emails
+from backend.services.embeddings import (
+    backfill_transaction_embeddings,
+    process_transaction_embeddings,
+)
 from backend.services.plaid_sync import (
     cleanup_dormant_plaid_items,
     process_due_plaid_items,
 )
+from backend.services.transaction_partitions import maintain_transaction_partitions
+from backend.utils.cache import get_cache_stats
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
@@ -86,3 +99,104 @@ def run_plaid_cleanup_job(
         return {"status": "ok", **result}
     finally:
         db.close()
+
+
+@router.post("/exports/process")
+def run_export_process_job(
+    x_job_runner_secret: str | None = Header(default=None, alias="X-Job-Runner-Secret"),
+    limit: int = 10,
+):
+    _require_job_secret(x_job_runner_secret)
+
+    result = process_pending_export_jobs(engine, limit=limit)
+    expired = purge_expired_export_artifacts(engine)
+    return {"status": "ok", **result, "expired": expired}
+
+
+@router.post("/emails/process")
+def run_email_outbox_job(
+    x_job_runner_secret: str | None = Header(default=None, alias="X-Job-Runner-Secret"),
+    max_batches: int = 20,
+):
+    _require_job_secret(x_job_runner_secret)
+
+    result = deliver_pending_emails(engine, max_batches=max_batches)
+    purged = purge_finished_emails(engine)
+    return {"status": "ok", **result, "purged": purged}
+
+
+@router.post("/stripe-events/process")
+def run_stripe_event_process_job(
+    x_job_runner_secret: str | None = Header(default=None, alias="X-Job-Runner-Secret"),
+    max_customers: int = 500,
+):
+    _require_job_secret(x_job_runner_secret)
+
+    result = process_stripe_webhook_events(engine, max_customers=max_customers)
+    return {"status": "ok", **result}
+
+
+@router.post("/transactions/partitions")
+def run_transaction_partition_job(
+    x_job_runner_secret: str | None = Header(default=None, alias="X-Job-Runner-Secret"),
+):
+    _require_job_secret(x_job_runner_secret)
+
+    result = maintain_transaction_partitions(engine)
+    return {"status": "ok", **result}
+
+
+@router.post("/embeddings/process")
+def run_embedding_process_job(
+    x_job_runner_secret: str | None = Header(default=None, alias="X-Job-Runner-Secret"),
+    batch_size: int | None = None,
+    max_batches: int = 50,
+):
+    _require_job_secret(x_job_runner_secret)
+
+    db: Session = SessionLocal()
+    try:
+        result = process_transaction_embeddings(
+            db, batch_size=batch_size, max_batches=max_batches
+        )
+        return {"status": "ok", **result}
+    finally:
+        db.close()
+
+
+@router.post("/embeddings/backfill")
+def run_embedding_backfill_job(
+    x_job_runner_secret: str | None = Header(default=None, alias="X-Job-Runner-Secret"),
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+):
+    _require_job_secret(x_job_runner_secret)
+
+    db: Session = SessionLocal()
+    try:
+        result = backfill_transaction_embeddings(
+            db, batch_size=batch_size, max_batches=max_batches
+        )
+        return {"status": "ok", **result}
+    finally:
+        db.close()
+
+
+@router.get("/metrics/event-loop")
+def get_event_loop_metrics(
+    x_job_runner_secret: str | None = Header(default=None, alias="X-Job-Runner-Secret"),
+):
+    """Per-route event-loop blocking time for this worker process."""
+    _require_job_secret(x_job_runner_secret)
+
+    return {"status": "ok", "routes": get_event_loop_blocking_stats()}
+
+
+@router.get("/metrics/caches")
+def get_cache_metrics(
+    x_job_runner_secret: str | None = Header(default=None, alias="X-Job-Runner-Secret"),
+):
+    """Hit/miss/eviction counts for the in-process caches of this worker."""
+    _require_job_secret(x_job_runner_secret)
+
+    return {"status": "ok", "caches": get_cache_stats()}
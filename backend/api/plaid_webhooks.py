@@ -9,6 +9,7 @@ from fastapi import APIRouter, Depends, Header, Request
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from backend.core.executors import run_db, run_io
 from backend.models import PlaidWebhookEvent
 from backend.services.plaid_sync import mark_plaid_item_sync_needed
 from backend.services.plaid_webhooks import (
@@ -31,13 +32,31 @@ async def plaid_webhook(
 ):
     payload_raw = await request.body()
     payload_json = parse_plaid_webhook_payload(payload_raw)
-    signature_verified = verify_plaid_webhook_signature(
+    # May fetch Plaid's verification key over HTTP.
+    signature_verified = await run_io(
+        verify_plaid_webhook_signature,
         payload_raw,
         plaid_verification=plaid_verification,
         plaid_signature=plaid_signature,
     )
 
     dedupe_key = build_plaid_webhook_dedupe_key(payload_json, payload_raw)
+    return await run_db(
+        _record_plaid_webhook,
+        db,
+        payload_json,
+        dedupe_key=dedupe_key,
+        signature_verified=signature_verified,
+    )
+
+
+def _record_plaid_webhook(
+    db: Session,
+    payload_json: dict,
+    *,
+    dedupe_key: str,
+    signature_verified: bool,
+) -> dict[str, str]:
     item_id = str(payload_json.get("item_id") or "").strip() or None
 
     event = PlaidWebhookEvent(
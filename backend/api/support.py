@@ -26,6 +26,7 @@ from backend.models.support import (
     SupportTicketRating,
 )
 from backend.services.email import get_email_client
+from backend.services.financial_context import invalidate_financial_context_cache
 from backend.services.notifications import NotificationService
 from backend.utils import get_db
 
@@ -183,6 +184,7 @@ def create_ticket(
     )
     db.add(ticket)
     db.commit()
+    invalidate_financial_context_cache(current_user.uid)
     db.refresh(ticket)
 
     # Publish 'ticket_created' event to Pub/Sub
@@ -198,6 +200,7 @@ def create_ticket(
                 "timestamp": datetime.now(UTC).isoformat(),
             },
             attributes={"event_type": "ticket_created"},
+            ordering_key=str(ticket.id),
         )
     except Exception as e:
         logger.error(f"Failed to publish ticket_created event: {e}")
@@ -313,6 +316,7 @@ def update_ticket_status(
             notification = _create_resolution_notification_if_needed(db, ticket)
 
         db.commit()
+        invalidate_financial_context_cache(ticket.user_id)
         db.refresh(ticket)
 
         if notification:
@@ -372,6 +376,7 @@ def add_message(
                 "timestamp": datetime.now(UTC).isoformat(),
             },
             attributes={"event_type": "ticket_updated"},
+            ordering_key=str(ticket.id),
         )
     except Exception as e:
         logger.error(f"Failed to publish ticket_updated event: {e}")
@@ -428,6 +433,7 @@ def close_ticket(
     ticket.status = "closed"
     ticket.queue_status = "closed"
     db.commit()
+    invalidate_financial_context_cache(ticket.user_id)
     db.refresh(ticket)
 
     # Publish 'ticket_closed' event
@@ -441,6 +447,7 @@ def close_ticket(
                 "timestamp": datetime.now(UTC).isoformat(),
             },
             attributes={"event_type": "ticket_closed"},
+            ordering_key=str(ticket.id),
         )
     except Exception as e:
         logger.error(f"Failed to publish ticket_closed event: {e}")
@@ -1,14 +1,15 @@
+import base64
+import json
 import re
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import desc, tuple_
 from sqlalchemy.orm import Session, selectinload
 
 from backend.core.config import settings
 from backend.middleware.auth import require_support_agent
-from backend.models.audit import SupportPortalAction
 from backend.models.support import SupportTicket, SupportTicketMessage
 from backend.models.user import User
 from backend.schemas.support_portal import (
@@ -22,10 +23,18 @@ from backend.schemas.support_portal import (
     TicketStatusUpdate,
 )
 from backend.services.email import get_email_client
+from backend.services.financial_context import invalidate_financial_context_cache
+from backend.services.support_audit import (
+    queue_support_action,
+    queue_support_action_on_commit,
+)
 from backend.utils import get_db
 
 router = APIRouter(prefix="/api/support-portal", tags=["support-portal"])
 
+TICKET_PAGE_MAX = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 _EMAIL_RE = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.IGNORECASE)
 _PHONE_RE = re.compile(
     r"\b(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)\d{3}[-.\s]?\d{4}\b"
@@ -118,28 +127,59 @@ def _log_action(
     ticket: SupportTicket,
     action_type: str,
     action_details: dict,
+    on_commit: bool = True,
 ) -> None:
-    action = SupportPortalAction(
-        agent_id=agent.uid,
-        agent_company_id=getattr(agent, "auth_uid", "unknown"),
-        agent_name=_agent_display_name(agent),
-        ticket_id=str(ticket.id),
-        customer_uid=ticket.user_id,
-        action_type=action_type,
-        action_details=action_details,
-    )
-    db.add(action)
+    # Written in batches off the request path; see backend/services/support_audit.py.
+    # Actions that change the ticket are only recorded if the handler's commit
+    # succeeds; read-only actions are queued straight away.
+    fields = {
+        "agent_id": agent.uid,
+        "agent_company_id": getattr(agent, "auth_uid", "unknown"),
+        "agent_name": _agent_display_name(agent),
+        "ticket_id": str(ticket.id),
+        "customer_uid": ticket.user_id,
+        "action_type": action_type,
+        "action_details": action_details,
+    }
+    if on_commit:
+        queue_support_action_on_commit(db, **fields)
+    else:
+        queue_support_action(db.get_bind(), **fields)
+
+
+def _encode_ticket_cursor(ticket: SupportTicket) -> str:
+    payload = json.dumps({"created_at": ticket.created_at.isoformat(), "id": str(ticket.id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_ticket_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["created_at"]), uuid.UUID(payload["id"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid ticket cursor.",
+        ) from exc
 
 
 @router.get("/tickets", response_model=list[TicketResponse])
 def list_tickets(
+    response: Response,
     status: str | None = None,
     queue_status: str | None = None,
     assignee: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=TICKET_PAGE_MAX, ge=1, le=TICKET_PAGE_MAX),
     db: Session = Depends(get_db),
     agent: User = Depends(require_support_agent),
 ):
-    """List all tickets, optionally filtered by status/queue/assignee."""
+    """
+    List tickets newest first, optionally filtered by status/queue/assignee.
+
+    Pages are keyed on ``(created_at, id)``; when more tickets follow, the
+    ``X-Next-Cursor`` header holds the ``cursor`` for the next page.
+    """
     query = db.query(SupportTicket).options(selectinload(SupportTicket.assigned_agent))
 
     if status and status.lower() != "all":
@@ -156,7 +196,18 @@ def list_tickets(
         else:
             query = query.filter(SupportTicket.assigned_agent_uid == assignee)
 
-    tickets = query.order_by(desc(SupportTicket.created_at)).limit(200).all()
+    if cursor:
+        after = _decode_ticket_cursor(cursor)
+        query = query.filter(tuple_(SupportTicket.created_at, SupportTicket.id) < after)
+
+    tickets = (
+        query.order_by(desc(SupportTicket.created_at), desc(SupportTicket.id))
+        .limit(limit + 1)
+        .all()
+    )
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_ticket_cursor(tickets[-1])
     return [_serialize_ticket(ticket) for ticket in tickets]
 
 
@@ -188,8 +239,8 @@ def get_ticket_detail(
         ticket=ticket,
         action_type="VIEW_TICKET",
         action_details={"ticket_subject": ticket.subject},
+        on_commit=False,
     )
-    db.commit()
 
     return _serialize_ticket_detail(ticket)
 
@@ -238,6 +289,7 @@ def reply_to_ticket(
     )
 
     db.commit()
+    invalidate_financial_context_cache(ticket.user_id)
 
     try:
         get_email_client().send_support_ticket_notification(
@@ -295,6 +347,7 @@ def update_ticket_status(
     )
 
     db.commit()
+    invalidate_financial_context_cache(ticket.user_id)
 
     try:
         get_email_client().send_support_ticket_notification(
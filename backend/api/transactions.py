@@ -9,10 +9,11 @@ from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, ConfigDict, Field, model_validator
-from sqlalchemy import asc, desc, func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import asc, case, desc, func, or_, select, update
+from sqlalchemy.orm import Session, lazyload
 
-from backend.core.constants import SubscriptionPlans
+from backend.core.constants import ESSENTIAL_RETENTION_DAYS, SubscriptionPlans
+from backend.core.query_metrics import query_budget
 from backend.middleware.auth import get_current_user
 from backend.models import (
     Account,
@@ -24,6 +25,7 @@ from backend.models import (
     User,
 )
 from backend.services.analytics import invalidate_analytics_cache
+from backend.services.embeddings import mark_embedding_needed
 from backend.utils import get_db
 from backend.utils.normalization import normalize_category, normalize_merchant_name
 
@@ -31,6 +33,11 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/transactions", tags=["transactions"])
 
+# Several models eager-load their relationships (lazy="selectin"), so loading one
+# Subscription or Transaction pulls in the owning User and all of its
+# collections. The list path only reads columns; skip that fan-out.
+_NO_EAGER = lazyload("*")
+
 
 # Pydantic schemas
 class TransactionResponse(BaseModel):
@@ -193,6 +200,7 @@ def _should_include_user_names(
     # Check if current user has Ultimate tier
     user_sub = (
         db.query(Subscription)
+        .options(_NO_EAGER)
         .filter(Subscription.uid == current_user.uid, Subscription.status == "active")
         .first()
     )
@@ -204,12 +212,14 @@ def _should_include_user_names(
         # Verify household owner has Ultimate
         household = (
             db.query(Household)
+            .options(_NO_EAGER)
             .filter(Household.id == current_user.household_member.household_id)
             .first()
         )
         if household:
             owner_sub = (
                 db.query(Subscription)
+                .options(_NO_EAGER)
                 .filter(Subscription.uid == household.owner_uid, Subscription.status == "active")
                 .first()
             )
@@ -245,7 +255,10 @@ def _build_transaction_responses(
 
     # Load users for all transaction UIDs
     transaction_uids = list({t.uid for t in items})
-    users = {u.uid: u for u in db.query(User).filter(User.uid.in_(transaction_uids)).all()}
+    users = {
+        u.uid: u
+        for u in db.query(User).options(_NO_EAGER).filter(User.uid.in_(transaction_uids)).all()
+    }
 
     return [
         TransactionResponse(
@@ -307,21 +320,25 @@ def _apply_filters(
 
 def _essential_retention_cutoff(db: Session, uid: str) -> datetime | None:
     """
-    Essential tier users are limited to a rolling 365-day transaction window.
+    Essential tier users are limited to a rolling ``ESSENTIAL_RETENTION_DAYS`` window.
     """
     subscription = (
         db.query(Subscription)
+        .options(_NO_EAGER)
         .filter(Subscription.uid == uid, Subscription.status == "active")
         .first()
     )
     plan_code = subscription.plan if subscription else SubscriptionPlans.FREE
     base_tier = SubscriptionPlans.get_base_tier(plan_code)
     if base_tier == SubscriptionPlans.ESSENTIAL:
-        return datetime.now(UTC) - timedelta(days=365)
+        return datetime.now(UTC) - timedelta(days=ESSENTIAL_RETENTION_DAYS)
     return None
 
 
 @router.get("", response_model=TransactionListResponse)
+# Constant in page size, including the auth dependency's user and session
+# bookkeeping.
+@query_budget(30)
 def list_transactions(
     account_id: uuid.UUID | None = Query(default=None),
     category: str | None = Query(default=None),
@@ -360,6 +377,7 @@ def list_transactions(
         # Check permissions
         member = (
             db.query(HouseholdMember)
+            .options(_NO_EAGER)
             .filter(HouseholdMember.uid == current_user.uid)
             .first()
         )
@@ -371,13 +389,17 @@ def list_transactions(
 
         # Check Household Owner's Subscription
         household = (
-            db.query(Household).filter(Household.id == member.household_id).first()
+            db.query(Household)
+            .options(_NO_EAGER)
+            .filter(Household.id == member.household_id)
+            .first()
         )
         if not household:
             raise HTTPException(status_code=404, detail="The requested household profile could not be found.")
 
         owner_sub = (
             db.query(Subscription)
+            .options(_NO_EAGER)
             .filter(Subscription.uid == household.owner_uid)
             .first()
         )
@@ -396,6 +418,7 @@ def list_transactions(
         # Get all members of this household
         members = (
             db.query(HouseholdMember)
+            .options(_NO_EAGER)
             .filter(HouseholdMember.household_id == household.id)
             .all()
         )
@@ -404,7 +427,7 @@ def list_transactions(
     # 2. Query
     logger.info(f"Listing transactions. Scope={scope}, CurrentUser={current_user.uid}, TargetUIDs={target_uids}")
 
-    query = db.query(Transaction).filter(
+    query = db.query(Transaction).options(_NO_EAGER).filter(
         Transaction.uid.in_(target_uids),
         Transaction.archived.is_(False),
     )
@@ -737,38 +760,61 @@ def bulk_update_transactions(
     - **transaction_ids**: List of IDs to update.
     - **updates**: Fields to update (category, description).
 
-    Restricted to user's own transactions.
+    Restricted to the user's own, unarchived transactions within their
+    retention window; if any ID falls outside that, nothing is updated.
     """
     txn_ids = set(payload.transaction_ids)
-    txns = (
-        db.query(Transaction)
-        .filter(
-            Transaction.id.in_(txn_ids),
-            Transaction.uid == current_user.uid,
+    criteria = [
+        Transaction.id.in_(txn_ids),
+        Transaction.uid == current_user.uid,
+        Transaction.archived.is_(False),
+    ]
+    retention_cutoff = _essential_retention_cutoff(db, current_user.uid)
+    if retention_cutoff:
+        criteria.append(Transaction.ts >= retention_cutoff)
+
+    values: dict = {}
+    changed = []
+    if payload.updates.category is not None:
+        category = normalize_category(payload.updates.category)
+        values[Transaction.category] = category
+        changed.append(Transaction.category.is_distinct_from(category))
+    if payload.updates.description is not None:
+        values[Transaction.description] = payload.updates.description
+        changed.append(Transaction.description.is_distinct_from(payload.updates.description))
+
+    if values:
+        # One UPDATE for the whole selection; only rows whose embedded fields
+        # actually change are queued for re-embedding.
+        values[Transaction.embedding_needed_at] = case(
+            (or_(*changed), datetime.now(UTC)), else_=Transaction.embedding_needed_at
         )
-        .all()
-    )
+        updated_ids = list(
+            db.scalars(
+                update(Transaction)
+                .where(*criteria)
+                .values(values)
+                .returning(Transaction.id)
+                .execution_options(synchronize_session=False)
+            )
+        )
+    else:
+        updated_ids = list(db.scalars(select(Transaction.id).where(*criteria)))
 
-    if len(txns) != len(txn_ids):
+    if len(updated_ids) != len(txn_ids):
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Some of the selected transactions could not be updated.",
         )
 
-    for txn in txns:
-        if payload.updates.category is not None:
-            txn.category = normalize_category(payload.updates.category)
-        if payload.updates.description is not None:
-            txn.description = payload.updates.description
-        db.add(txn)
-
     audit = AuditLog(
         actor_uid=current_user.uid,
         target_uid=current_user.uid,
         action="transaction_bulk_edit",
         source="backend",
         metadata_json={
-            "transaction_ids": [str(t.id) for t in txns],
+            "transaction_ids": [str(txn_id) for txn_id in updated_ids],
             "updates": payload.updates.model_dump(exclude_none=True),
         },
     )
@@ -777,7 +823,7 @@ def bulk_update_transactions(
 
     invalidate_analytics_cache(current_user.uid)
 
-    return {"updated_count": len(txns)}
+    return {"updated_count": len(updated_ids)}
 
 
 @router.patch("/{transaction_id}", response_model=TransactionResponse)
@@ -834,6 +880,7 @@ def update_transaction(
                 detail="Amount, merchant name, and timestamp can only be edited for manual transactions.",
             )
 
+    mark_embedding_needed(txn)
     db.add(txn)
 
     # Build audit metadata
@@ -2,20 +2,22 @@
 
 # Last Updated: 2026-01-23 22:39 CST
 
-import json
 import logging
+import uuid
 from datetime import UTC, datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
 
 from backend.middleware.auth import get_current_user
 from backend.models import (
     Account,
     AISettings,
     AuditLog,
+    DataExportJob,
     LegalAgreementAcceptance,
     PlaidItem,
     PlaidItemAccount,
@@ -25,12 +27,16 @@ from backend.models import (
     Widget,
     WidgetRating,
 )
-from backend.models.budget import Budget
-from backend.models.category_rule import CategoryRule
-from backend.models.household import Household
 from backend.services import auth
+from backend.services.data_export import (
+    create_export_job,
+    open_export_artifact,
+    run_export_job,
+    stream_user_export,
+)
 from backend.services.notifications import NotificationService
 from backend.utils import get_db
+from backend.utils.database import read_bind_for
 from backend.utils.secret_manager import delete_secret
 
 router = APIRouter(prefix="/api/users", tags=["users"])
@@ -77,108 +83,109 @@ def export_user_data(
 ):
     """
     Export all data associated with the current user.
-    Returns a comprehensive JSON structure.
+    Streams a comprehensive JSON structure section by section so memory stays
+    bounded regardless of transaction history size.
     """
-    # Eager load everything attached to User
-    user = (
-        db.query(User)
-        .options(
-            selectinload(User.subscriptions),
-            selectinload(User.ai_settings),
-            selectinload(User.notification_preferences),
-            selectinload(User.developer),
-            selectinload(User.accounts).selectinload(Account.transactions),
-            selectinload(User.support_tickets),
-            selectinload(User.legal_acceptances),
-            selectinload(User.manual_assets),
-            selectinload(User.documents),
-            selectinload(User.payments),
-            selectinload(User.developer_payouts),
-            selectinload(User.household_member),
+    db.add(
+        AuditLog(
+            actor_uid=current_user.uid,
+            target_uid=current_user.uid,
+            action="ccpa_export_requested",
+            source="backend",
+            metadata_json={"endpoint": "/api/users/export"},
         )
-        .filter(User.uid == current_user.uid)
-        .first()
+    )
+    db.commit()
+
+    return StreamingResponse(
+        # The export only reads; send it to the replica unless this user just wrote.
+        stream_user_export(read_bind_for(db), current_user.uid),
+        media_type="application/json",
     )
 
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
+@router.post("/export/jobs", status_code=status.HTTP_202_ACCEPTED)
+def create_user_data_export_job(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue a background export for large accounts.
+    Poll the job and download the compressed artifact once it completes.
+    """
+    job = create_export_job(db, current_user.uid)
     db.add(
         AuditLog(
             actor_uid=current_user.uid,
             target_uid=current_user.uid,
             action="ccpa_export_requested",
             source="backend",
-            metadata_json={"endpoint": "/api/users/export"},
+            metadata_json={"endpoint": "/api/users/export/jobs", "job_id": str(job.id)},
         )
     )
     db.commit()
 
-    # Fetch data not directly linked via relationship on User model (or just to be safe)
-    budgets = db.query(Budget).filter(Budget.uid == user.uid).all()
-    category_rules = db.query(CategoryRule).filter(CategoryRule.uid == user.uid).all()
-    widget_ratings = db.query(WidgetRating).filter(WidgetRating.user_uid == user.uid).all()
-
-    # Handle Household data
-    household_data = None
-    if user.household_member:
-        # Load the household details if member
-        hh = (
-            db.query(Household)
-            .options(
-                selectinload(Household.members),
-                selectinload(Household.invites)
-            )
-            .filter(Household.id == user.household_member.household_id)
-            .first()
-        )
-        if hh:
-            household_data = hh.to_dict()
-
-    # Serialize Data
-    data = {
-        "profile": user.to_dict(),
-        "exported_at": datetime.now(UTC).isoformat(),
-        "ai_settings": user.ai_settings.to_dict() if user.ai_settings else None,
-        "subscriptions": [s.to_dict() for s in user.subscriptions],
-        "notification_preferences": [n.to_dict() for n in user.notification_preferences],
-
-        # Financials
-        "accounts": [],  # Filled below
-        "manual_assets": [m.to_dict() for m in user.manual_assets],
-        "payments": [p.to_dict() for p in user.payments],
-        "developer_payouts": [p.to_dict() for p in user.developer_payouts],
-        "budgets": [b.to_dict() for b in budgets],
-        "category_rules": [r.to_dict() for r in category_rules],
-
-        # Support & Legal
-        "support_tickets": [t.to_dict() for t in user.support_tickets],
-        "legal_acceptances": [acceptance.to_dict() for acceptance in user.legal_acceptances],
-        "documents": [d.to_dict() for d in user.documents],
-
-        # Household
-        "household_membership": user.household_member.to_dict() if user.household_member else None,
-        "household": household_data,
-
-        # Widgets
-        "developed_widgets": [], # Filled below
-        "widget_ratings": [r.to_dict() for r in widget_ratings],
-    }
-
-    # Process Accounts & Transactions
-    for account in user.accounts:
-        acc_data = account.to_dict()
-        acc_data["transactions"] = [t.to_dict() for t in account.transactions]
-        data["accounts"].append(acc_data)
-
-    # Process Developed Widgets if user is a developer
-    if user.developer:
-        widgets = db.query(Widget).filter(Widget.developer_uid == user.uid).all()
-        data["developed_widgets"] = [w.to_dict() for w in widgets]
-        data["developer_profile"] = user.developer.to_dict()
-
-    json_str = json.dumps(data, indent=2, default=str)
-    return Response(content=json_str, media_type="application/json")
+    background_tasks.add_task(run_export_job, db.get_bind(), job.id)
+    return job.to_dict()
+
+
+def _get_owned_export_job(db: Session, uid: str, job_id: uuid.UUID) -> DataExportJob:
+    job = (
+        db.query(DataExportJob)
+        .filter(DataExportJob.id == job_id, DataExportJob.uid == uid)
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+@router.get("/export/jobs/{job_id}")
+def get_user_data_export_job(
+    job_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Return the status of a background export job."""
+    return _get_owned_export_job(db, current_user.uid, job_id).to_dict()
+
+
+@router.get("/export/jobs/{job_id}/download")
+def download_user_data_export(
+    job_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Download the gzip-compressed JSON artifact of a completed export job."""
+    job = _get_owned_export_job(db, current_user.uid, job_id)
+    if job.status == "expired":
+        raise _export_gone()
+    if job.status != "completed" or not job.file_path:
+        raise HTTPException(status_code=409, detail="Export is not ready yet.")
+
+    expires_at = job.expires_at
+    if expires_at and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=UTC)
+    if expires_at and expires_at < datetime.now(UTC):
+        raise _export_gone()
+    chunks = open_export_artifact(job)
+    if chunks is None:
+        raise _export_gone()
+
+    filename = f"JuaLuma-export-{job.created_at.date().isoformat()}.json.gz"
+    return StreamingResponse(
+        chunks,
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _export_gone() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_410_GONE,
+        detail="This export has expired. Please request a new one.",
+    )
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,7 +1,7 @@
 # Updated 2025-12-19 02:40 CST
 import logging
 
-from fastapi import APIRouter, Depends, Header, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Request
 from sqlalchemy.orm import Session
 
 from backend.services.billing import handle_stripe_webhook
@@ -14,16 +14,18 @@ logger = logging.getLogger(__name__)
 @router.post("/webhook", include_in_schema=False)
 async def stripe_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     stripe_signature: str = Header(None),
     db: Session = Depends(get_db),
 ):
     """
     Stripe webhook endpoint.
     Delegates event construction and handling to the billing service.
+    Events are recorded and acknowledged here; handlers run in the background.
     """
     # Read the raw body as bytes
     payload = await request.body()
 
     # Delegate to service
     # This will raise HTTP exceptions on failure, which is what we want.
-    return await handle_stripe_webhook(payload, stripe_signature, db)
+    return await handle_stripe_webhook(payload, stripe_signature, db, background_tasks)
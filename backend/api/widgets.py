@@ -1,13 +1,11 @@
 # backend/api/widgets.py
 import logging
-import time
-from collections import defaultdict, deque
 from datetime import UTC, datetime
-from threading import Lock
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel, ConfigDict, Field, field_validator
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from backend.core.dependencies import (
@@ -17,7 +15,9 @@ from backend.core.dependencies import (
 from backend.middleware.auth import get_current_user
 from backend.models import AuditLog, User, Widget, WidgetRating
 from backend.services.access_control.registry import can_use_feature
+from backend.services.widget_engagement import record_widget_download
 from backend.utils import get_db
+from backend.utils.rate_limit import TokenBucketLimiter
 
 # Updated 2025-12-10 15:10 CST by ChatGPT
 # 2025-12-11 17:23 CST - add widget run event logging endpoint
@@ -92,27 +92,18 @@ class PaginatedWidgetResponse(BaseModel):
 
 # --- Endpoints ---
 
-# Simple in-memory rate limiter for submissions
-_submit_attempts: dict[str, deque[float]] = defaultdict(deque)
-_submit_lock = Lock()
+# Submissions per user, shared across workers via the configured rate-limit backend
 _SUBMIT_WINDOW = 3600  # 1 hour
 _SUBMIT_LIMIT = 5
+_submit_limiter = TokenBucketLimiter.per_window("widget_submit", _SUBMIT_LIMIT, _SUBMIT_WINDOW)
 
 
 def _check_submit_rate_limit(uid: str) -> None:
-    now = time.time()
-    with _submit_lock:
-        attempts = _submit_attempts[uid]
-        # Cleanup old attempts
-        while attempts and attempts[0] <= now - _SUBMIT_WINDOW:
-            attempts.popleft()
-
-        if len(attempts) >= _SUBMIT_LIMIT:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded for widget submissions. Please try again in an hour.",
-            )
-        attempts.append(now)
+    if not _submit_limiter.hit(uid).allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded for widget submissions. Please try again in an hour.",
+        )
 
 
 @router.get("/", response_model=PaginatedWidgetResponse)
@@ -350,8 +341,13 @@ def download_widget(
             detail="Pro or Ultimate subscription required to download widgets.",
         )
 
-    # Increment downloads
-    widget.downloads += 1
+    # Increment in SQL so concurrent downloads don't overwrite each other.
+    db.execute(
+        update(Widget)
+        .where(Widget.id == widget.id)
+        .values(downloads=Widget.downloads + 1)
+        .execution_options(synchronize_session=False)
+    )
 
     # Audit
     metadata = {
@@ -367,35 +363,10 @@ def download_widget(
     )
     db.add(log_entry)
 
-    # Firestore: Widget Engagement
-    try:
-        from google.cloud import firestore
-
-        from backend.utils.firestore import get_firestore_client
-
-        db_fs = get_firestore_client()
-        today = datetime.now(UTC).strftime("%Y-%m-%d")
-
-        # Structure: widget_engagement/{widget_id}/daily/{date}
-        doc_ref = (
-            db_fs.collection("widget_engagement")
-            .document(widget.id)
-            .collection("daily")
-            .document(today)
-        )
-
-        # Atomic Increment
-        if not doc_ref.get().exists:
-            doc_ref.set({"downloads": 1, "date": today})
-        else:
-            doc_ref.update({"downloads": firestore.Increment(1)})
-
-    except Exception as e:
-        # Don't fail the download if metrics fail, just log it
-        logger.error(f"Failed to record widget engagement stats: {e}")
-
     db.commit()
-    db.refresh(widget)
+
+    # Firestore engagement is buffered and flushed in the background.
+    record_widget_download(widget_id)
 
     # Return Manifest JSON
     manifest = {
@@ -30,13 +30,52 @@ class AppSettings(BaseSettings):
     rate_limit_window_seconds: int = Field(
         default=60, alias="RATE_LIMIT_WINDOW_SECONDS"
     )
+    # "database" shares buckets across workers; "local" is per-process (tests/dev).
+    rate_limit_backend: str = Field(default="database", alias="RATE_LIMIT_BACKEND")
+    # The global "/api" limiter runs on every API request; "database" would add a
+    # primary-DB upsert to each one, so it stays per-process unless opted in.
+    api_rate_limit_backend: str = Field(default="local", alias="API_RATE_LIMIT_BACKEND")
+    rate_limit_max_keys: int = Field(default=100_000, alias="RATE_LIMIT_MAX_KEYS")
 
     database_url: str = Field(..., alias="DATABASE_URL")
+    # Optional read replica (or the primary under a read-only DSN) for heavy reads.
+    database_replica_url: str | None = Field(default=None, alias="DATABASE_REPLICA_URL")
+    # After a user writes, their replica reads go to the primary for this long.
+    replica_read_your_writes_seconds: int = Field(
+        default=5, alias="REPLICA_READ_YOUR_WRITES_SECONDS"
+    )
     db_pool_size: int = Field(default=10, alias="DB_POOL_SIZE")
     db_max_overflow: int = Field(default=20, alias="DB_MAX_OVERFLOW")
     db_pool_timeout_seconds: int = Field(default=30, alias="DB_POOL_TIMEOUT_SECONDS")
     db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")
     db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    # Threads for sync DB work issued from async handlers; 0 sizes to the pool.
+    db_executor_max_workers: int = Field(default=0, alias="DB_EXECUTOR_MAX_WORKERS")
+    io_executor_max_workers: int = Field(default=16, alias="IO_EXECUTOR_MAX_WORKERS")
+    image_executor_max_workers: int = Field(default=2, alias="IMAGE_EXECUTOR_MAX_WORKERS")
+    # Log a warning when a request holds the event loop longer than this.
+    event_loop_block_warn_ms: int = Field(default=100, alias="EVENT_LOOP_BLOCK_WARN_MS")
+    # Fail requests that exceed their @query_budget instead of only logging.
+    query_budget_enforce: bool = Field(default=False, alias="QUERY_BUDGET_ENFORCE")
+
+    # Digest runner: schedules claimed per lease, how long a lease hides them
+    # from other runners, and how many AI calls run at once.
+    digest_lease_size: int = Field(default=25, alias="DIGEST_LEASE_SIZE")
+    digest_lease_seconds: int = Field(default=900, alias="DIGEST_LEASE_SECONDS")
+    digest_ai_concurrency: int = Field(default=8, alias="DIGEST_AI_CONCURRENCY")
+
+    # Email outbox: rows claimed per drain, how long a claim hides them from
+    # other workers, concurrent provider calls, sends before giving up, and how
+    # long sent/failed/expired rows are kept.
+    email_outbox_batch_size: int = Field(default=50, alias="EMAIL_OUTBOX_BATCH_SIZE")
+    email_outbox_lease_seconds: int = Field(default=120, alias="EMAIL_OUTBOX_LEASE_SECONDS")
+    email_outbox_concurrency: int = Field(default=8, alias="EMAIL_OUTBOX_CONCURRENCY")
+    email_outbox_max_attempts: int = Field(default=6, alias="EMAIL_OUTBOX_MAX_ATTEMPTS")
+    email_outbox_retention_days: int = Field(default=30, alias="EMAIL_OUTBOX_RETENTION_DAYS")
+
+    # GCS bucket holding background data-export artifacts; instances share it,
+    # so a download can land on any of them.
+    data_export_bucket: str = Field(default="jualuma-data-exports", alias="DATA_EXPORT_BUCKET")
 
     plaid_client_id: str = Field(..., alias="PLAID_CLIENT_ID")
     plaid_secret: str = Field(..., alias="PLAID_SECRET")
@@ -67,6 +106,33 @@ class AppSettings(BaseSettings):
     firestore_healthcheck_enabled: bool = Field(
         default=False, alias="FIRESTORE_HEALTHCHECK_ENABLED"
     )
+    # Pub/Sub publishing is batched and fire-and-forget; see backend/core/events.py.
+    pubsub_batch_max_messages: int = Field(default=100, alias="PUBSUB_BATCH_MAX_MESSAGES")
+    pubsub_batch_max_bytes: int = Field(default=1_000_000, alias="PUBSUB_BATCH_MAX_BYTES")
+    pubsub_batch_max_latency_seconds: float = Field(
+        default=0.05, alias="PUBSUB_BATCH_MAX_LATENCY_SECONDS"
+    )
+    pubsub_max_in_flight: int = Field(default=1000, alias="PUBSUB_MAX_IN_FLIGHT")
+    pubsub_backpressure_timeout_seconds: float = Field(
+        default=0.5, alias="PUBSUB_BACKPRESSURE_TIMEOUT_SECONDS"
+    )
+    pubsub_publish_retry_timeout_seconds: float = Field(
+        default=60.0, alias="PUBSUB_PUBLISH_RETRY_TIMEOUT_SECONDS"
+    )
+    pubsub_shutdown_timeout_seconds: float = Field(
+        default=10.0, alias="PUBSUB_SHUTDOWN_TIMEOUT_SECONDS"
+    )
+    # Widget engagement counters are buffered in memory; see
+    # backend/services/widget_engagement.py.
+    widget_engagement_flush_seconds: float = Field(
+        default=10.0, alias="WIDGET_ENGAGEMENT_FLUSH_SECONDS"
+    )
+    # Support portal audit actions are written in batches; see
+    # backend/services/support_audit.py.
+    support_audit_batch_size: int = Field(default=100, alias="SUPPORT_AUDIT_BATCH_SIZE")
+    support_audit_flush_seconds: float = Field(
+        default=5.0, alias="SUPPORT_AUDIT_FLUSH_SECONDS"
+    )
 
     stripe_secret_key: str | None = Field(default=None, alias="STRIPE_SECRET_KEY")
     stripe_webhook_secret: str | None = Field(
@@ -95,6 +161,21 @@ class AppSettings(BaseSettings):
     )
     ai_web_search_enabled: bool = Field(default=True, alias="AI_WEB_SEARCH_ENABLED")
     ai_web_search_max_results: int = Field(default=4, alias="AI_WEB_SEARCH_MAX_RESULTS")
+    # Per-section budget for RAG context assembly; slow sections are dropped.
+    ai_context_section_timeout_seconds: float = Field(
+        default=2.0, alias="AI_CONTEXT_SECTION_TIMEOUT_SECONDS"
+    )
+    ai_context_cache_ttl_seconds: int = Field(
+        default=60, alias="AI_CONTEXT_CACHE_TTL_SECONDS"
+    )
+    # "vertex" must match the model used by Cloud SQL embedding() at query time.
+    embedding_provider: str = Field(default="vertex", alias="EMBEDDING_PROVIDER")
+    embedding_model: str = Field(default="text-embedding-004", alias="EMBEDDING_MODEL")
+    embedding_batch_size: int = Field(default=100, alias="EMBEDDING_BATCH_SIZE")
+    # A transaction the provider rejects on its own is retried after this long.
+    embedding_retry_delay_seconds: int = Field(
+        default=3600, alias="EMBEDDING_RETRY_DELAY_SECONDS"
+    )
 
 
     gcp_location: str = Field(default="us-central1", alias="GCP_LOCATION")
@@ -169,6 +250,11 @@ class AppSettings(BaseSettings):
             raise ValueError(f"{info.field_name} cannot be empty.")
         return value.strip()
 
+    @field_validator("database_replica_url")
+    @classmethod
+    def _blank_replica_url_is_none(cls, value: str | None) -> str | None:
+        return (value or "").strip() or None
+
     @field_validator("plaid_env")
     @classmethod
     def _normalize_plaid_env(cls, value: str) -> str:
@@ -180,11 +266,24 @@ class AppSettings(BaseSettings):
             )
         return normalized
 
+    @field_validator("rate_limit_backend", "api_rate_limit_backend")
+    @classmethod
+    def _normalize_rate_limit_backend(cls, value: str, info) -> str:
+        normalized = value.lower().strip()
+        if normalized not in {"database", "local"}:
+            raise ValueError(f"{info.field_name} must be one of: database, local.")
+        return normalized
+
     @field_validator(
         "db_pool_size",
         "db_max_overflow",
         "db_pool_timeout_seconds",
         "db_pool_recycle_seconds",
+        "db_executor_max_workers",
+        "replica_read_your_writes_seconds",
+        "ai_context_cache_ttl_seconds",
+        "pubsub_backpressure_timeout_seconds",
+        "pubsub_shutdown_timeout_seconds",
     )
     @classmethod
     def _require_non_negative_int(cls, value: int, info) -> int:
@@ -192,6 +291,36 @@ class AppSettings(BaseSettings):
             raise ValueError(f"{info.field_name} must be >= 0.")
         return value
 
+    @field_validator(
+        "io_executor_max_workers",
+        "image_executor_max_workers",
+        "rate_limit_max_keys",
+        "pubsub_batch_max_messages",
+        "pubsub_batch_max_bytes",
+        "pubsub_batch_max_latency_seconds",
+        "pubsub_max_in_flight",
+        "pubsub_publish_retry_timeout_seconds",
+        "ai_context_section_timeout_seconds",
+        "embedding_batch_size",
+        "embedding_retry_delay_seconds",
+        "digest_lease_size",
+        "digest_lease_seconds",
+        "digest_ai_concurrency",
+        "email_outbox_batch_size",
+        "email_outbox_lease_seconds",
+        "email_outbox_concurrency",
+        "email_outbox_max_attempts",
+        "email_outbox_retention_days",
+        "widget_engagement_flush_seconds",
+        "support_audit_batch_size",
+        "support_audit_flush_seconds",
+    )
+    @classmethod
+    def _require_positive(cls, value: float, info) -> float:
+        if value <= 0:
+            raise ValueError(f"{info.field_name} must be > 0.")
+        return value
+
     @field_validator(
         "stripe_secret_key",
         "stripe_webhook_secret",
@@ -4,6 +4,10 @@ Centralized constants for the jualuma application.
 
 from backend.services.access_control.registry import account_limits_by_tier
 
+# Essential plans keep a rolling window of transaction history; the API, sync
+# and partition maintenance all enforce it.
+ESSENTIAL_RETENTION_DAYS = 365
+
 
 class TierLimits:
     LIMITS_BY_TIER = account_limits_by_tier
@@ -15,7 +15,7 @@ from backend.utils import get_db
 
 def get_current_active_subscription(user: User) -> Subscription | None:
     """Returns the user's current active subscription (latest created)."""
-    # Filtering in python since user.subscriptions is loaded eagerly
+    # Filtering in python since user.subscriptions is usually one row
     active = [s for s in user.subscriptions if s.status == "active"]
     if not active:
         return None
@@ -1,12 +1,23 @@
 """
 Core Event Bus implementation for Google Cloud Pub/Sub.
 Handles connection, topic creation (for emulators), and message publishing.
+
+Publishing is fire-and-forget: ``publish_event`` hands the message to the
+client's batcher and returns its future without waiting for the round trip.
+In-flight messages are bounded; when the bound is reached callers wait briefly
+and then fail fast with ``EventBackpressureError`` rather than queueing
+without limit. ``shutdown_events`` flushes everything still in flight and is
+called from the app lifespan.
 """
 
 import json
 import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, wait
 from typing import Any
 
+from google.api_core import retry as api_retry
 from google.cloud import pubsub_v1
 
 from backend.core.config import settings
@@ -14,6 +25,7 @@ from backend.core.config import settings
 logger = logging.getLogger(__name__)
 
 publisher: pubsub_v1.PublisherClient | None = None
+_publisher_lock = threading.Lock()
 # Log warning if no project ID is configured
 if not settings.resolved_gcp_project_id:
     logger.warning(
@@ -22,12 +34,42 @@ if not settings.resolved_gcp_project_id:
 
 project_id: str = settings.resolved_gcp_project_id or "local-project"
 
+FailureCallback = Callable[[str, dict[str, Any], BaseException], None]
+
+
+class EventBackpressureError(RuntimeError):
+    """Raised when too many events are already waiting to be published."""
+
+
+_in_flight: set[Future] = set()
+_in_flight_lock = threading.Lock()
+_in_flight_slots = threading.BoundedSemaphore(settings.pubsub_max_in_flight)
+_failure_callbacks: list[FailureCallback] = []
+_stats = {"published": 0, "failed": 0, "rejected": 0}
+
 
 def get_publisher() -> pubsub_v1.PublisherClient:
     global publisher
     if publisher is None:
-        logger.info("Initializing Pub/Sub Publisher for Production Cloud")
-        publisher = pubsub_v1.PublisherClient()
+        with _publisher_lock:
+            if publisher is None:
+                logger.info("Initializing Pub/Sub Publisher for Production Cloud")
+                publisher = pubsub_v1.PublisherClient(
+                    batch_settings=pubsub_v1.types.BatchSettings(
+                        max_messages=settings.pubsub_batch_max_messages,
+                        max_bytes=settings.pubsub_batch_max_bytes,
+                        max_latency=settings.pubsub_batch_max_latency_seconds,
+                    ),
+                    publisher_options=pubsub_v1.types.PublisherOptions(
+                        enable_message_ordering=True,
+                        retry=api_retry.Retry(
+                            initial=0.1,
+                            maximum=10.0,
+                            multiplier=2.0,
+                            timeout=settings.pubsub_publish_retry_timeout_seconds,
+                        ),
+                    ),
+                )
     return publisher
 
 
@@ -39,19 +81,127 @@ def initialize_events():
     logger.info("Pub/Sub initialization complete (Production Mode).")
 
 
+def add_publish_failure_callback(callback: FailureCallback) -> None:
+    """Register ``callback(topic_id, data, exc)`` for publishes that fail after retries."""
+    _failure_callbacks.append(callback)
+
+
+def remove_publish_failure_callback(callback: FailureCallback) -> None:
+    if callback in _failure_callbacks:
+        _failure_callbacks.remove(callback)
+
+
+def _on_publish_done(
+    future: Future,
+    *,
+    client: pubsub_v1.PublisherClient,
+    topic_id: str,
+    topic_path: str,
+    data: dict[str, Any],
+    ordering_key: str,
+) -> None:
+    exc = future.exception()
+    with _in_flight_lock:
+        _in_flight.discard(future)
+        _stats["failed" if exc is not None else "published"] += 1
+    _in_flight_slots.release()
+
+    if exc is None:
+        logger.debug("Published event to %s: %s", topic_id, future.result())
+        return
+
+    logger.error("Failed to publish event to %s: %s", topic_id, exc)
+    if ordering_key:
+        # The client pauses an ordering key after a failure until resumed.
+        client.resume_publish(topic_path, ordering_key)
+    for callback in list(_failure_callbacks):
+        try:
+            callback(topic_id, data, exc)
+        except Exception:
+            logger.exception("Event publish failure callback raised.")
+
+
 def publish_event(
-    topic_id: str, data: dict[str, Any], attributes: dict[str, str] = None
-) -> str:
+    topic_id: str,
+    data: dict[str, Any],
+    attributes: dict[str, str] = None,
+    *,
+    ordering_key: str = "",
+) -> Future:
     """
-    Publish a JSON event to the specified topic.
+    Publish a JSON event to the specified topic without waiting for delivery.
+
+    Messages sharing an ``ordering_key`` are delivered in publish order.
+    Returns the publish future; failures are logged and passed to the
+    registered failure callbacks.
     """
-    client = get_publisher()
-    topic_path = client.topic_path(project_id, topic_id)
+    if not _in_flight_slots.acquire(timeout=settings.pubsub_backpressure_timeout_seconds):
+        with _in_flight_lock:
+            _stats["rejected"] += 1
+        raise EventBackpressureError(
+            f"Too many Pub/Sub events in flight; dropping event for {topic_id}."
+        )
+
+    try:
+        client = get_publisher()
+        topic_path = client.topic_path(project_id, topic_id)
+        payload_bytes = json.dumps(data, default=str).encode("utf-8")
+        future = client.publish(
+            topic_path, payload_bytes, ordering_key=ordering_key, **(attributes or {})
+        )
+    except BaseException:
+        _in_flight_slots.release()
+        raise
+
+    with _in_flight_lock:
+        _in_flight.add(future)
+    future.add_done_callback(
+        lambda done: _on_publish_done(
+            done,
+            client=client,
+            topic_id=topic_id,
+            topic_path=topic_path,
+            data=data,
+            ordering_key=ordering_key,
+        )
+    )
+    return future
 
-    payload_bytes = json.dumps(data, default=str).encode("utf-8")
 
-    future = client.publish(topic_path, payload_bytes, **(attributes or {}))
-    message_id = future.result()
+def flush_events(timeout: float | None = None) -> bool:
+    """Wait for in-flight publishes; returns False if some are still pending."""
+    with _in_flight_lock:
+        pending = list(_in_flight)
+    if not pending:
+        return True
+    _, not_done = wait(pending, timeout=timeout)
+    if not_done:
+        logger.warning("%d Pub/Sub events still in flight after flush.", len(not_done))
+    return not not_done
+
+
+def shutdown_events(timeout: float | None = None) -> None:
+    """Flush pending batches and stop the publisher (called from the app lifespan)."""
+    global publisher
+    with _publisher_lock:
+        client, publisher = publisher, None
+    if client is None:
+        return
+    # stop() sends any partially filled batches and rejects further publishes.
+    client.stop()
+    flushed = flush_events(
+        settings.pubsub_shutdown_timeout_seconds if timeout is None else timeout
+    )
+    logger.info(
+        "Pub/Sub publisher stopped (flushed=%s published=%d failed=%d rejected=%d).",
+        flushed,
+        _stats["published"],
+        _stats["failed"],
+        _stats["rejected"],
+    )
+
 
-    logger.info(f"Published event to {topic_id}: {message_id}")
-    return message_id
+def get_event_publish_stats() -> dict[str, int]:
+    with _in_flight_lock:
+        in_flight = len(_in_flight)
+    return {**_stats, "in_flight": in_flight}
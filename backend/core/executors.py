@@ -0,0 +1,130 @@
+"""
+Bounded thread pools for blocking work issued from async request handlers.
+
+Sync SQLAlchemy sessions, file writes and provider SDK calls must not run on
+the event loop: one slow query would stall every concurrent SSE stream on the
+worker. Async handlers hand that work to these executors instead.
+
+- ``run_db``: database work. Sized to the SQLAlchemy pool so threads never
+  queue on ``pool_timeout`` behind each other.
+- ``run_io``: file system and outbound HTTP/SDK calls.
+- ``run_image``: CPU-heavy image decoding/re-encoding. Kept small and separate
+  so a burst of large photo conversions cannot starve ``run_io``.
+
+Both propagate contextvars (request id, etc.) into the worker thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, TypeVar
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_db_executor: ThreadPoolExecutor | None = None
+_io_executor: ThreadPoolExecutor | None = None
+_image_executor: ThreadPoolExecutor | None = None
+_executor_lock = Lock()
+
+
+def _db_executor_size() -> int:
+    configured = settings.db_executor_max_workers
+    if configured:
+        return configured
+    return max(settings.db_pool_size + settings.db_max_overflow, 1)
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        with _executor_lock:
+            if _db_executor is None:
+                _db_executor = ThreadPoolExecutor(
+                    max_workers=_db_executor_size(), thread_name_prefix="db-worker"
+                )
+    return _db_executor
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        with _executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=settings.io_executor_max_workers,
+                    thread_name_prefix="io-worker",
+                )
+    return _io_executor
+
+
+def get_image_executor() -> ThreadPoolExecutor:
+    global _image_executor
+    if _image_executor is None:
+        with _executor_lock:
+            if _image_executor is None:
+                _image_executor = ThreadPoolExecutor(
+                    max_workers=settings.image_executor_max_workers,
+                    thread_name_prefix="image-worker",
+                )
+    return _image_executor
+
+
+async def _run_in(
+    executor: ThreadPoolExecutor, func: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
+
+
+async def run_db(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run blocking database work on the bounded DB executor."""
+    return await _run_in(get_db_executor(), func, *args, **kwargs)
+
+
+async def run_io(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run blocking file/provider work on the bounded IO executor."""
+    return await _run_in(get_io_executor(), func, *args, **kwargs)
+
+
+async def run_image(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run CPU-heavy image work on the dedicated image executor."""
+    return await _run_in(get_image_executor(), func, *args, **kwargs)
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Drain and stop the executors (called from the app lifespan)."""
+    global _db_executor, _io_executor, _image_executor
+    with _executor_lock:
+        executors = [
+            e for e in (_db_executor, _io_executor, _image_executor) if e is not None
+        ]
+        _db_executor = None
+        _io_executor = None
+        _image_executor = None
+    for executor in executors:
+        executor.shutdown(wait=wait)
+    if executors:
+        logger.info("Shut down %d blocking-work executor(s).", len(executors))
+
+
+__all__ = [
+    "get_db_executor",
+    "get_image_executor",
+    "get_io_executor",
+    "run_db",
+    "run_image",
+    "run_io",
+    "shutdown_executors",
+]
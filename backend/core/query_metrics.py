@@ -0,0 +1,135 @@
+"""
+Per-request SQL statement counting.
+
+Cursor-execute hooks on every ``Engine`` add each statement's count and
+duration to the ``QueryStats`` of the current request (or of any block wrapped
+in ``track_queries``). The stats object is shared through a contextvar, so work
+handed to ``run_db``/``run_io`` or the sync-route threadpool is attributed to
+the request that issued it.
+
+Routes declare how many statements they may issue with ``@query_budget(n)``;
+the access log middleware reports overruns and, with
+``QUERY_BUDGET_ENFORCE`` set (as in tests), fails the request.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_BUDGET_ATTR = "__query_budget__"
+_START_KEY = "query_metrics_start"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A route issued more SQL statements than its declared budget."""
+
+
+class QueryStats:
+    """Statement count and DB time for one request; safe to update from threads."""
+
+    __slots__ = ("count", "total_ms", "max_ms", "_lock")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "db_queries": self.count,
+                "db_time_ms": round(self.total_ms, 2),
+                "db_max_ms": round(self.max_ms, 2),
+            }
+
+
+_stats_ctx: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+
+
+def get_query_stats() -> QueryStats | None:
+    return _stats_ctx.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements executed inside the block (and work it hands off)."""
+    stats = QueryStats()
+    token = _stats_ctx.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats_ctx.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _stats_ctx.get() is not None:
+        # Statements on one connection never overlap, so one slot is enough.
+        conn.info[_START_KEY] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _stats_ctx.get()
+    started = conn.info.pop(_START_KEY, None)
+    if stats is None or started is None:
+        return
+    stats.record((time.perf_counter() - started) * 1000)
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install_query_instrumentation() -> None:
+    """Hook every engine (primary, replicas, test engines) once per process."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """Declare the most SQL statements a route may issue per request."""
+
+    def decorator(func: F) -> F:
+        setattr(func, _BUDGET_ATTR, max_queries)
+        return func
+
+    return decorator
+
+
+def get_query_budget(endpoint: Any) -> int | None:
+    return getattr(endpoint, _BUDGET_ATTR, None)
+
+
+__all__ = [
+    "QueryBudgetExceeded",
+    "QueryStats",
+    "get_query_budget",
+    "get_query_stats",
+    "install_query_instrumentation",
+    "query_budget",
+    "track_queries",
+]
@@ -0,0 +1,330 @@
+"""
+Repeatable benchmarks for the backend's most expensive code paths.
+
+``prepare_benchmarks`` seeds the deterministic dataset from ``perf_data``
+(plus budgets and a Plaid item for the first user) and returns the context
+the benchmarks run against; external providers are expected to be replaced
+with ``fakes.install_fake_providers`` first. ``run_benchmarks`` times each
+benchmark over a few rounds after a warm-up, recording the median/min/max
+wall time and the SQL statement count of a round. ``compare_to_baseline``
+flags benchmarks that got slower than a saved run by more than a threshold,
+or that now issue more statements.
+
+Entry point: ``scripts/run_benchmarks.py``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from fastapi import params
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from backend.api import budgets as budgets_api
+from backend.api import transactions as transactions_api
+from backend.core.query_metrics import install_query_instrumentation, track_queries
+from backend.dev_tools.perf_data import PerfDataset, seed_perf_dataset
+from backend.models import (
+    Account,
+    Budget,
+    PlaidItem,
+    PlaidItemAccount,
+    Transaction,
+    User,
+)
+from backend.services import analytics, financial_context, plaid_sync, recurring
+from backend.utils.rls import set_db_user_context
+
+# Dataset sizes; "full" is the 10k users / 50M transactions production shape.
+SCALES: dict[str, dict[str, int]] = {
+    "ci": {"users": 5, "accounts_per_user": 2, "transactions_per_account": 200},
+    "dev": {"users": 200, "accounts_per_user": 3, "transactions_per_account": 500},
+    "full": {"users": 10_000, "accounts_per_user": 5, "transactions_per_account": 1_000},
+}
+BUDGET_CATEGORIES = ("Groceries", "Dining", "Transportation", "Shopping", "Entertainment")
+PLAID_TOKEN_PREFIX = "bench-plaid"
+
+
+@dataclass
+class BenchmarkContext:
+    db: Session
+    dataset: PerfDataset
+    user: User
+    plaid_item: PlaidItem
+    fakes: dict[str, Any]
+    today: date = field(default_factory=lambda: datetime.now(UTC).date())
+
+    @property
+    def uid(self) -> str:
+        return self.user.uid
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    run: Callable[[BenchmarkContext], Any]
+    # Untimed, before every round: drop caches and undo the previous round.
+    setup: Callable[[BenchmarkContext], None] | None = None
+    postgres_only: bool = False
+
+
+def _call_route(endpoint: Callable[..., Any], **kwargs: Any) -> Any:
+    """Call a route function directly, filling unspecified ``Query`` params with their defaults."""
+    for name, param in inspect.signature(endpoint).parameters.items():
+        if name not in kwargs and isinstance(param.default, params.Query):
+            kwargs[name] = param.default.default
+    return endpoint(**kwargs)
+
+
+def _ensure_plaid_item(db: Session, uid: str, fakes: dict[str, Any]) -> PlaidItem:
+    token = f"{PLAID_TOKEN_PREFIX}-{uid}"
+    item = db.scalars(
+        select(PlaidItem).where(PlaidItem.uid == uid, PlaidItem.item_id == token)
+    ).first()
+    if item is not None:
+        return item
+
+    now = datetime.now(UTC)
+    item = PlaidItem(
+        uid=uid,
+        item_id=token,
+        institution_name="Fake Bank",
+        secret_ref=token,
+        sync_status="sync_needed",
+        is_active=True,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(item)
+    db.flush()
+    for plaid_account in fakes["plaid"].fetch_accounts(token):
+        account = Account(
+            uid=uid,
+            account_type="traditional",
+            provider="Fake Bank",
+            account_name=plaid_account["name"],
+            account_number_masked=plaid_account["mask"],
+            secret_ref=token,
+            balance=Decimal("0"),
+            currency="USD",
+        )
+        db.add(account)
+        db.flush()
+        db.add(
+            PlaidItemAccount(
+                uid=uid,
+                plaid_item_id=item.id,
+                account_id=account.id,
+                plaid_account_id=plaid_account["account_id"],
+                is_active=True,
+                last_seen_at=now,
+            )
+        )
+    db.commit()
+    return item
+
+
+def prepare_benchmarks(
+    db: Session,
+    fakes: dict[str, Any],
+    *,
+    users: int,
+    accounts_per_user: int,
+    transactions_per_account: int,
+    seed: int = 1234,
+) -> BenchmarkContext:
+    """Seed (or reuse) the benchmark dataset and return the context for the first user."""
+    dataset = seed_perf_dataset(
+        db,
+        users=users,
+        accounts_per_user=accounts_per_user,
+        transactions_per_account=transactions_per_account,
+        prefix="bench_user",
+        seed=seed,
+    )
+    uid = dataset.user_uids[0]
+    existing = set(db.scalars(select(Budget.category).where(Budget.uid == uid)).all())
+    for n, category in enumerate(BUDGET_CATEGORIES):
+        if category not in existing:
+            db.add(Budget(uid=uid, category=category, amount=200.0 + 100 * n, period="monthly"))
+    db.commit()
+    item = _ensure_plaid_item(db, uid, fakes)
+    return BenchmarkContext(
+        db=db, dataset=dataset, user=db.get(User, uid), plaid_item=item, fakes=fakes
+    )
+
+
+def _clear_analytics_cache(ctx: BenchmarkContext) -> None:
+    ctx.fakes["firestore"].docs.clear()
+
+
+def _reset_plaid_item(ctx: BenchmarkContext) -> None:
+    account_ids = select(PlaidItemAccount.account_id).where(
+        PlaidItemAccount.plaid_item_id == ctx.plaid_item.id
+    )
+    ctx.db.execute(delete(Transaction).where(Transaction.account_id.in_(account_ids)))
+    ctx.plaid_item.next_cursor = None
+    ctx.db.commit()
+
+
+def _clear_financial_context_cache(ctx: BenchmarkContext) -> None:
+    financial_context.invalidate_financial_context_cache(ctx.uid)
+
+
+BENCHMARKS: tuple[Benchmark, ...] = (
+    Benchmark(
+        "analytics.get_net_worth",
+        lambda ctx: analytics.get_net_worth(
+            ctx.db, ctx.uid, ctx.today - timedelta(days=365), ctx.today, "daily"
+        ),
+        setup=_clear_analytics_cache,
+        # SQLite hands back naive timestamps the series code can't compare.
+        postgres_only=True,
+    ),
+    Benchmark(
+        "analytics.get_cash_flow",
+        lambda ctx: analytics.get_cash_flow(
+            ctx.db, ctx.uid, ctx.today - timedelta(days=365), ctx.today, "month"
+        ),
+        postgres_only=True,
+    ),
+    Benchmark(
+        "transactions.list_transactions",
+        lambda ctx: _call_route(
+            transactions_api.list_transactions, current_user=ctx.user, db=ctx.db
+        ),
+    ),
+    Benchmark(
+        "transactions.search_transactions",
+        lambda ctx: _call_route(
+            transactions_api.search_transactions, q="groceries", current_user=ctx.user, db=ctx.db
+        ),
+        postgres_only=True,
+    ),
+    Benchmark(
+        "plaid_sync.sync_plaid_item",
+        lambda ctx: plaid_sync.sync_plaid_item(ctx.db, ctx.plaid_item, trigger="benchmark"),
+        setup=_reset_plaid_item,
+    ),
+    Benchmark(
+        "recurring.detect_recurring_transactions",
+        lambda ctx: recurring.detect_recurring_transactions(ctx.db, ctx.uid),
+    ),
+    Benchmark(
+        "budgets.get_budget_history",
+        lambda ctx: _call_route(
+            budgets_api.get_budget_history, lookback=12, current_user=ctx.user, db=ctx.db
+        ),
+    ),
+    Benchmark(
+        "financial_context.get_financial_context",
+        lambda ctx: asyncio.run(
+            financial_context.get_financial_context(
+                ctx.uid, "How much did I spend on groceries?", db=ctx.db, days=90
+            )
+        ),
+        setup=_clear_financial_context_cache,
+    ),
+)
+
+
+def _run_one(ctx: BenchmarkContext, benchmark: Benchmark, *, rounds: int, warmup: int) -> dict[str, Any]:
+    is_postgres = ctx.db.get_bind().dialect.name == "postgresql"
+    timings: list[float] = []
+    queries = 0
+    for round_number in range(warmup + rounds):
+        if benchmark.setup is not None:
+            benchmark.setup(ctx)
+        if is_postgres:
+            set_db_user_context(ctx.db, ctx.uid)
+        with track_queries() as stats:
+            started = time.perf_counter()
+            benchmark.run(ctx)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        ctx.db.rollback()
+        if round_number >= warmup:
+            timings.append(elapsed_ms)
+            queries = stats.count
+    return {
+        "name": benchmark.name,
+        "rounds": rounds,
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "queries": queries,
+    }
+
+
+def run_benchmarks(
+    ctx: BenchmarkContext,
+    *,
+    rounds: int = 5,
+    warmup: int = 1,
+    only: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Run the selected benchmarks; on other databases Postgres-only ones are skipped."""
+    install_query_instrumentation()
+    is_postgres = ctx.db.get_bind().dialect.name == "postgresql"
+    results = []
+    for benchmark in BENCHMARKS:
+        if only and benchmark.name not in only:
+            continue
+        if benchmark.postgres_only and not is_postgres:
+            results.append({"name": benchmark.name, "skipped": "needs PostgreSQL"})
+            continue
+        results.append(_run_one(ctx, benchmark, rounds=rounds, warmup=warmup))
+    return results
+
+
+def compare_to_baseline(
+    results: list[dict[str, Any]],
+    baseline: list[dict[str, Any]],
+    *,
+    threshold: float = 0.25,
+    min_delta_ms: float = 2.0,
+) -> list[str]:
+    """
+    Describe each regression against ``baseline``.
+
+    A benchmark regresses when its median is more than ``threshold`` (a
+    fraction) and ``min_delta_ms`` slower than the baseline median, or when it
+    issues more SQL statements. Benchmarks missing from either side are ignored.
+    """
+    previous = {entry["name"]: entry for entry in baseline if "median_ms" in entry}
+    regressions = []
+    for entry in results:
+        before = previous.get(entry["name"])
+        if before is None or "median_ms" not in entry:
+            continue
+        delta = entry["median_ms"] - before["median_ms"]
+        ratio = delta / max(before["median_ms"], 0.001)
+        if delta > min_delta_ms and entry["median_ms"] > before["median_ms"] * (1 + threshold):
+            regressions.append(
+                f"{entry['name']}: median {before['median_ms']:.1f}ms -> "
+                f"{entry['median_ms']:.1f}ms (+{ratio:.0%})"
+            )
+        if entry["queries"] > before["queries"]:
+            regressions.append(
+                f"{entry['name']}: SQL statements {before['queries']} -> {entry['queries']}"
+            )
+    return regressions
+
+
+__all__ = [
+    "BENCHMARKS",
+    "SCALES",
+    "Benchmark",
+    "BenchmarkContext",
+    "compare_to_baseline",
+    "prepare_benchmarks",
+    "run_benchmarks",
+]
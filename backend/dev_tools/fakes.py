@@ -0,0 +1,407 @@
+"""
+In-process stand-ins for external providers, for load and benchmark runs.
+
+``install_fake_providers`` swaps the Firestore client, the Pub/Sub publisher,
+the outbound email client, Plaid, Tatum and the Vertex embedding provider for
+in-memory fakes with an optional fixed latency, so a locally started app or a
+benchmark run exercises its own code paths without credentials or network
+calls. Never install these in a deployed service.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+
+class _FakeSnapshot:
+    def __init__(self, reference: FakeDocument, data: dict[str, Any] | None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> dict[str, Any] | None:
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocument:
+    def __init__(self, store: FakeFirestore, path: str):
+        self._store = store
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self._store, f"{self.path}/{name}")
+
+    def get(self, *args: Any, **kwargs: Any) -> _FakeSnapshot:
+        self._store._pause()
+        with self._store._lock:
+            data = self._store.docs.get(self.path)
+            return _FakeSnapshot(self, dict(data) if data is not None else None)
+
+    def set(self, data: dict[str, Any], merge: bool = False) -> None:
+        self._store._pause()
+        self._store._write(self.path, data, merge=merge)
+
+    def update(self, data: dict[str, Any]) -> None:
+        self._store._pause()
+        with self._store._lock:
+            if self.path not in self._store.docs:
+                raise KeyError(f"No document to update: {self.path}")
+        self._store._write(self.path, data, merge=True)
+
+    def delete(self) -> None:
+        self._store._pause()
+        with self._store._lock:
+            self._store.docs.pop(self.path, None)
+
+
+class FakeCollection:
+    def __init__(self, store: FakeFirestore, path: str, filters: tuple = ()):
+        self._store = store
+        self.path = path
+        self._filters = filters
+
+    def document(self, name: str) -> FakeDocument:
+        return FakeDocument(self._store, f"{self.path}/{name}")
+
+    def where(self, field: str, op: str, value: Any) -> FakeCollection:
+        if op != "==":
+            raise NotImplementedError(f"FakeFirestore supports only '==' filters, not {op!r}")
+        return FakeCollection(self._store, self.path, (*self._filters, (field, value)))
+
+    def stream(self):
+        self._store._pause()
+        prefix = f"{self.path}/"
+        with self._store._lock:
+            matches = [
+                (path, dict(data))
+                for path, data in self._store.docs.items()
+                if path.startswith(prefix)
+                and "/" not in path[len(prefix) :]
+                and all(data.get(field) == value for field, value in self._filters)
+            ]
+        for path, data in matches:
+            yield _FakeSnapshot(FakeDocument(self._store, path), data)
+
+
+class _FakeBatch:
+    def __init__(self, store: FakeFirestore):
+        self._store = store
+        self._ops: list[tuple[str, FakeDocument, dict[str, Any] | None, bool]] = []
+
+    def set(self, doc: FakeDocument, data: dict[str, Any], merge: bool = False) -> None:
+        self._ops.append(("set", doc, data, merge))
+
+    def update(self, doc: FakeDocument, data: dict[str, Any]) -> None:
+        self._ops.append(("set", doc, data, True))
+
+    def delete(self, doc: FakeDocument) -> None:
+        self._ops.append(("delete", doc, None, False))
+
+    def commit(self) -> None:
+        self._store._pause()
+        for op, doc, data, merge in self._ops:
+            if op == "delete":
+                with self._store._lock:
+                    self._store.docs.pop(doc.path, None)
+            else:
+                self._store._write(doc.path, data or {}, merge=merge)
+        self._ops.clear()
+
+
+class FakeFirestore:
+    """Dict-backed Firestore client covering what the backend calls."""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.docs: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+    def batch(self) -> _FakeBatch:
+        return _FakeBatch(self)
+
+    def _pause(self) -> None:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+    def _write(self, path: str, data: dict[str, Any], *, merge: bool) -> None:
+        with self._lock:
+            doc = dict(self.docs.get(path, {})) if merge else {}
+            for field, value in data.items():
+                # firestore.Increment is the only transform the backend writes.
+                if type(value).__name__ == "Increment":
+                    doc[field] = doc.get(field, 0) + value.value
+                else:
+                    doc[field] = value
+            self.docs[path] = doc
+
+
+class FakePublisher:
+    """Accepts Pub/Sub publishes immediately and keeps a count per topic."""
+
+    def __init__(self) -> None:
+        self.published: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def topic_path(self, project: str, topic: str) -> str:
+        return f"projects/{project}/topics/{topic}"
+
+    def publish(self, topic_path: str, data: bytes, **attributes: Any) -> Future:
+        with self._lock:
+            self.published[topic_path] = self.published.get(topic_path, 0) + 1
+        future: Future = Future()
+        future.set_result(str(sum(self.published.values())))
+        return future
+
+    def stop(self) -> None:
+        pass
+
+
+class FakeEmailClient:
+    """Accepts every ``EmailClient`` send method after a fixed latency."""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        if not name.startswith("send_"):
+            raise AttributeError(name)
+
+        def send(*args: Any, **kwargs: Any) -> None:
+            if self.latency_seconds:
+                time.sleep(self.latency_seconds)
+            with self._lock:
+                self.sent += 1
+
+        return send
+
+
+class FakePlaid:
+    """
+    Deterministic Plaid accounts and ``/transactions/sync`` pages.
+
+    Every access token owns ``accounts_per_item`` accounts with
+    ``transactions_per_account`` transactions each. The cursor is the offset
+    into that history, so a sync from an empty cursor pages through all of it
+    and a later sync from the returned cursor sees no changes.
+    """
+
+    def __init__(
+        self,
+        *,
+        accounts_per_item: int = 2,
+        transactions_per_account: int = 200,
+        page_size: int = 500,
+        history_days: int = 365,
+        latency_seconds: float = 0.0,
+        seed: int = 0,
+    ):
+        self.accounts_per_item = accounts_per_item
+        self.transactions_per_account = transactions_per_account
+        self.page_size = page_size
+        self.history_days = history_days
+        self.latency_seconds = latency_seconds
+        self.seed = seed
+        self._histories: dict[str, list[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def account_ids(self, access_token: str) -> list[str]:
+        return [f"{access_token}-acct-{n}" for n in range(self.accounts_per_item)]
+
+    def fetch_accounts(self, access_token: str) -> list[dict[str, object]]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return [
+            {
+                "account_id": account_id,
+                "name": f"Checking {n + 1}",
+                "official_name": f"Fake Bank Checking {n + 1}",
+                "mask": f"{1000 + n}",
+                "type": "depository",
+                "subtype": "checking",
+                "balance_available": 2_500.0,
+                "balance_current": 2_500.0,
+                "currency": "USD",
+            }
+            for n, account_id in enumerate(self.account_ids(access_token))
+        ]
+
+    def fetch_transactions_sync_page(
+        self, access_token: str, cursor: str | None, **kwargs: Any
+    ) -> dict[str, object]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        history = self._history(access_token)
+        offset = int(cursor) if cursor else 0
+        page = history[offset : offset + self.page_size]
+        next_offset = offset + len(page)
+        return {
+            "added": page,
+            "modified": [],
+            "removed": [],
+            "has_more": next_offset < len(history),
+            "next_cursor": str(next_offset),
+        }
+
+    def _history(self, access_token: str) -> list[dict[str, Any]]:
+        with self._lock:
+            if access_token not in self._histories:
+                self._histories[access_token] = self._generate(access_token)
+            return self._histories[access_token]
+
+    def _generate(self, access_token: str) -> list[dict[str, Any]]:
+        from backend.dev_tools.perf_data import MERCHANTS
+
+        rng = random.Random(f"{self.seed}:{access_token}")
+        today = datetime.now(UTC).date()
+        rows = []
+        for account_id in self.account_ids(access_token):
+            for n in range(self.transactions_per_account):
+                merchant, category, amount = MERCHANTS[rng.randrange(len(MERCHANTS))]
+                transaction_id = f"{account_id}-tx-{n}"
+                rows.append(
+                    {
+                        "transaction_id": transaction_id,
+                        "account_id": account_id,
+                        "name": merchant.upper(),
+                        "merchant_name": merchant,
+                        # Plaid reports spending as positive amounts.
+                        "amount": Decimal(str(round(-amount * rng.uniform(0.5, 1.5), 2))),
+                        "date": today - timedelta(days=rng.randrange(self.history_days)),
+                        "category": [category],
+                        "currency": "USD",
+                        "pending": False,
+                        "raw": {"transaction_id": transaction_id},
+                    }
+                )
+        return rows
+
+
+class FakeTatum:
+    """Deterministic EVM wallet history, paged like ``fetch_tatum_history``."""
+
+    def __init__(
+        self,
+        *,
+        transactions_per_address: int = 200,
+        latency_seconds: float = 0.0,
+        seed: int = 0,
+    ):
+        self.transactions_per_address = transactions_per_address
+        self.latency_seconds = latency_seconds
+        self.seed = seed
+
+    def fetch_tatum_history(self, address: str, chain: str, cursor: str | None):
+        from backend.services.connectors import normalize_transaction
+        from backend.services.tatum_history import EVM_PAGE_SIZE, Web3HistoryResult
+
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        offset = int(cursor) if cursor else 0
+        end = min(offset + EVM_PAGE_SIZE, self.transactions_per_address)
+        now = datetime.now(UTC)
+        transactions = []
+        for n in range(offset, end):
+            rng = random.Random(f"{self.seed}:{address}:{n}")
+            units = Decimal(str(round(rng.uniform(0.001, 2.0), 6)))
+            transactions.append(
+                normalize_transaction(
+                    {
+                        "tx_id": f"0x{rng.getrandbits(256):064x}:native:native:{n}",
+                        "account_id": address,
+                        "amount": units,
+                        "currency_code": "ETH",
+                        "timestamp": now - timedelta(hours=6 * n),
+                        "counterparty": f"0x{rng.getrandbits(160):040x}",
+                        "type": "transfer",
+                        "direction": "outflow" if n % 3 else "inflow",
+                        "on_chain_units": units,
+                        "on_chain_symbol": "ETH",
+                    }
+                )
+            )
+        return Web3HistoryResult(
+            transactions=transactions,
+            next_cursor=str(end) if end < self.transactions_per_address else None,
+            update_cursor=True,
+        )
+
+
+class FakeEmbeddingProvider:
+    """Stands in for Vertex embeddings: local hashing vectors after a fixed latency."""
+
+    name = "fake"
+
+    def __init__(self, latency_seconds: float = 0.0):
+        from backend.services.embeddings import LocalHashingEmbeddingProvider
+
+        self.latency_seconds = latency_seconds
+        self._local = LocalHashingEmbeddingProvider()
+        self.dimension = self._local.dimension
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self._local.embed_texts(texts)
+
+
+def install_fake_providers(
+    latency_seconds: float = 0.0,
+    *,
+    patch: Callable[[Any, str, Any], None] = setattr,
+) -> dict[str, Any]:
+    """
+    Route external providers through the fakes above and return them.
+
+    ``patch`` does the attribute swaps; pass ``monkeypatch.setattr`` to have a
+    test undo them afterwards.
+    """
+    from backend.api import accounts as accounts_api
+    from backend.api import plaid as plaid_api
+    from backend.core import events
+    from backend.services import email_outbox, embeddings, plaid_sync
+    from backend.utils import firestore
+
+    fakes = {
+        "firestore": FakeFirestore(latency_seconds),
+        "publisher": FakePublisher(),
+        "email": FakeEmailClient(latency_seconds),
+        "plaid": FakePlaid(latency_seconds=latency_seconds),
+        "tatum": FakeTatum(latency_seconds=latency_seconds),
+        "embeddings": FakeEmbeddingProvider(latency_seconds),
+    }
+    patch(firestore, "_firestore_client", fakes["firestore"])
+    patch(events, "publisher", fakes["publisher"])
+    patch(email_outbox, "get_email_client", lambda: fakes["email"])
+    # Plaid access tokens are the secret refs themselves.
+    patch(plaid_sync, "get_secret", lambda ref, *, uid=None: ref)
+    patch(plaid_sync, "fetch_accounts", fakes["plaid"].fetch_accounts)
+    patch(plaid_sync, "fetch_transactions_sync_page", fakes["plaid"].fetch_transactions_sync_page)
+    patch(plaid_api, "fetch_accounts", fakes["plaid"].fetch_accounts)
+    patch(accounts_api, "fetch_tatum_history", fakes["tatum"].fetch_tatum_history)
+    patch(embeddings, "_provider", fakes["embeddings"])
+    return fakes
+
+
+__all__ = [
+    "FakeEmailClient",
+    "FakeEmbeddingProvider",
+    "FakeFirestore",
+    "FakePlaid",
+    "FakePublisher",
+    "FakeTatum",
+    "install_fake_providers",
+]
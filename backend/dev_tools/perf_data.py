@@ -0,0 +1,226 @@
+"""
+Deterministic synthetic dataset for load tests and benchmarks.
+
+``seed_perf_dataset`` creates ``users`` active Pro users named
+``<prefix>_<n>``, each with manual accounts and a history of transactions
+drawn from a fixed merchant/category mix, plus one support agent
+(``<prefix>_agent``) and a developer with approved marketplace widgets. The
+same arguments always produce the same rows, and users that already exist are
+skipped, so a run can be repeated against the same database. Rows are written
+with bulk inserts in chunks of ``chunk_size``.
+"""
+
+from __future__ import annotations
+
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from backend.core.constants import UserStatus
+from backend.models import (
+    Account,
+    Developer,
+    Subscription,
+    SupportTicket,
+    Transaction,
+    User,
+    Widget,
+)
+
+# (merchant, category, typical amount); amounts are spending unless positive.
+MERCHANTS: tuple[tuple[str, str, float], ...] = (
+    ("Whole Foods", "Groceries", -86.0),
+    ("Trader Joe's", "Groceries", -54.0),
+    ("Shell", "Transportation", -42.0),
+    ("Uber", "Transportation", -23.0),
+    ("Netflix", "Entertainment", -15.49),
+    ("Spotify", "Entertainment", -10.99),
+    ("Starbucks", "Dining", -6.75),
+    ("Chipotle", "Dining", -14.2),
+    ("Amazon", "Shopping", -48.0),
+    ("Target", "Shopping", -67.0),
+    ("PG&E", "Utilities", -120.0),
+    ("Comcast", "Utilities", -79.99),
+    ("Landlord LLC", "Rent", -1850.0),
+    ("Acme Corp Payroll", "Income", 3200.0),
+)
+# Monthly bills recur on a fixed day so recurring detection has real series.
+_RECURRING = {"Netflix", "Spotify", "PG&E", "Comcast", "Landlord LLC", "Acme Corp Payroll"}
+
+
+@dataclass(frozen=True)
+class PerfDataset:
+    user_uids: list[str]
+    agent_uid: str
+    developer_uid: str
+    accounts: int
+    transactions: int
+
+
+def _user_uid(prefix: str, n: int) -> str:
+    return f"{prefix}_{n:05d}"
+
+
+def _transactions_for_account(
+    rng: random.Random,
+    *,
+    uid: str,
+    account_id: uuid.UUID,
+    count: int,
+    now: datetime,
+    history_days: int,
+) -> list[dict[str, Any]]:
+    rows = []
+    for n in range(count):
+        merchant, category, amount = MERCHANTS[rng.randrange(len(MERCHANTS))]
+        if merchant in _RECURRING:
+            months_back = n % max(history_days // 30, 1)
+            ts = (now - timedelta(days=30 * months_back)).replace(day=5, hour=9)
+            value = amount
+        else:
+            ts = now - timedelta(seconds=rng.randrange(history_days * 86_400))
+            value = round(amount * rng.uniform(0.5, 1.5), 2)
+        rows.append(
+            {
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "uid": uid,
+                "account_id": account_id,
+                "ts": ts,
+                "amount": Decimal(str(value)),
+                "currency": "USD",
+                "category": category,
+                "merchant_name": merchant,
+                "description": f"{merchant.upper()} #{rng.randrange(1000, 9999)}",
+                "is_manual": True,
+            }
+        )
+    return rows
+
+
+def _bulk_insert(db: Session, model: type, rows: list[dict[str, Any]], chunk_size: int) -> None:
+    for start in range(0, len(rows), chunk_size):
+        db.execute(insert(model), rows[start : start + chunk_size])
+
+
+def seed_perf_dataset(
+    db: Session,
+    *,
+    users: int = 50,
+    accounts_per_user: int = 3,
+    transactions_per_account: int = 400,
+    history_days: int = 365,
+    prefix: str = "load_user",
+    seed: int = 1234,
+    now: datetime | None = None,
+    chunk_size: int = 5_000,
+) -> PerfDataset:
+    """Create (or top up) the synthetic dataset and commit it."""
+    rng = random.Random(seed)
+    now = (now or datetime.now(UTC)).replace(microsecond=0)
+    user_uids = [_user_uid(prefix, n) for n in range(users)]
+    agent_uid = f"{prefix}_agent"
+    developer_uid = f"{prefix}_developer"
+
+    existing = set(
+        db.scalars(
+            select(User.uid).where(User.uid.in_([*user_uids, agent_uid, developer_uid]))
+        ).all()
+    )
+    accounts_created = transactions_created = 0
+
+    for uid in user_uids:
+        # Draw from the generator even for existing users so the rows created
+        # for later users don't depend on which earlier ones already exist.
+        user_rng = random.Random(rng.getrandbits(64))
+        if uid in existing:
+            continue
+        db.add(User(uid=uid, email=f"{uid}@example.com", role="user", status=UserStatus.ACTIVE))
+        db.add(Subscription(uid=uid, plan="pro", status="active"))
+        db.flush()
+
+        account_rows = [
+            {
+                "id": uuid.UUID(int=user_rng.getrandbits(128)),
+                "uid": uid,
+                "account_type": "manual",
+                "provider": "manual",
+                "account_name": f"Account {a + 1}",
+                "balance": Decimal(str(round(user_rng.uniform(100, 25_000), 2))),
+                "currency": "USD",
+            }
+            for a in range(accounts_per_user)
+        ]
+        _bulk_insert(db, Account, account_rows, chunk_size)
+        transaction_rows: list[dict[str, Any]] = []
+        for account in account_rows:
+            transaction_rows.extend(
+                _transactions_for_account(
+                    user_rng,
+                    uid=uid,
+                    account_id=account["id"],
+                    count=transactions_per_account,
+                    now=now,
+                    history_days=history_days,
+                )
+            )
+        _bulk_insert(db, Transaction, transaction_rows, chunk_size)
+        accounts_created += len(account_rows)
+        transactions_created += len(transaction_rows)
+        db.commit()
+
+    if agent_uid not in existing:
+        db.add(User(uid=agent_uid, email=f"{agent_uid}@example.com", role="support_agent", status=UserStatus.ACTIVE))
+        db.flush()
+        tickets = [
+            {
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "user_id": user_uids[n % len(user_uids)],
+                "subject": f"Question {n}",
+                "description": "Synthetic support ticket.",
+                "category": "account",
+                "status": "open" if n % 4 else "resolved",
+                "queue_status": "queued" if n % 4 else "resolved",
+                "created_at": now - timedelta(minutes=n),
+            }
+            for n in range(users * 4 if user_uids else 0)
+        ]
+        _bulk_insert(db, SupportTicket, tickets, chunk_size)
+        db.commit()
+
+    if developer_uid not in existing:
+        db.add(User(uid=developer_uid, email=f"{developer_uid}@example.com", role="user", status=UserStatus.ACTIVE))
+        db.add(Subscription(uid=developer_uid, plan="pro", status="active"))
+        db.flush()
+        db.add(Developer(uid=developer_uid))
+        db.flush()
+        widgets = [
+            {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "developer_uid": developer_uid,
+                "name": f"Widget {n}",
+                "category": "budgeting",
+                "status": "approved",
+                "scopes": [],
+                "preview_data": {},
+            }
+            for n in range(20)
+        ]
+        _bulk_insert(db, Widget, widgets, chunk_size)
+        db.commit()
+
+    return PerfDataset(
+        user_uids=user_uids,
+        agent_uid=agent_uid,
+        developer_uid=developer_uid,
+        accounts=accounts_created,
+        transactions=transactions_created,
+    )
+
+
+__all__ = ["MERCHANTS", "PerfDataset", "seed_perf_dataset"]
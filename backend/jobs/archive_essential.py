@@ -1,22 +1,50 @@
 # Last Modified: 2026-01-18 03:16 CST
 """
 Archive Essential tier ledger rows older than one full year, then prune hot storage.
+
+Rows are archived per partition (one user's rows for one calendar month) as a
+gzip-compressed JSONL object. Partitions are uploaded concurrently and each one
+is tracked by a ``LedgerArchiveCheckpoint`` row, so a crashed run resumes the
+unfinished partitions without re-uploading the finished ones. Pruning deletes
+exactly the ids in the uploaded object, read back from storage when resuming, in
+bounded batches with a commit per batch instead of one long-running DELETE.
 """
 
 from __future__ import annotations
 
+import gzip
+import io
 import json
 import logging
 import os
-from datetime import UTC, datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import UTC, date, datetime, time
 from typing import Any
 
 from google.cloud import storage
+from sqlalchemy import delete, func, select
 
-from backend.models import LedgerHotEssential, SessionLocal
+from backend.models import LedgerArchiveCheckpoint, LedgerHotEssential, SessionLocal
 
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_PENDING = "pending"
+CHECKPOINT_UPLOADED = "uploaded"
+CHECKPOINT_PRUNED = "pruned"
+
+_ROW_COLUMNS = (
+    LedgerHotEssential.id,
+    LedgerHotEssential.uid,
+    LedgerHotEssential.account_id,
+    LedgerHotEssential.ts,
+    LedgerHotEssential.amount,
+    LedgerHotEssential.currency,
+    LedgerHotEssential.category,
+    LedgerHotEssential.raw_json,
+    LedgerHotEssential.created_at,
+)
+
 
 def _one_year_ago(now: datetime) -> datetime:
     """Return the same calendar day/time one year earlier, handling leap years."""
@@ -26,16 +54,38 @@ def _one_year_ago(now: datetime) -> datetime:
         return now.replace(year=now.year - 1, day=28)
 
 
-def _archive_prefix(row: LedgerHotEssential) -> str:
-    ts = row.ts
+def _as_utc(ts: datetime) -> datetime:
     if ts.tzinfo is None:
-        ts = ts.replace(tzinfo=UTC)
-    else:
-        ts = ts.astimezone(UTC)
-    return f"essential/{row.uid}/{ts.year}/{ts.month:02d}"
+        return ts.replace(tzinfo=UTC)
+    return ts.astimezone(UTC)
+
+
+def _month_floor(ts: datetime) -> date:
+    return _as_utc(ts).date().replace(day=1)
+
+
+def _next_month(period_start: date) -> date:
+    if period_start.month == 12:
+        return period_start.replace(year=period_start.year + 1, month=1)
+    return period_start.replace(month=period_start.month + 1)
+
+
+def _periods_between(first_ts: datetime, cutoff: datetime) -> list[date]:
+    """Month starts from the month of ``first_ts`` up to the month containing ``cutoff``."""
+    periods = []
+    period = _month_floor(first_ts)
+    last = _month_floor(cutoff)
+    while period <= last:
+        periods.append(period)
+        period = _next_month(period)
+    return periods
 
 
-def _serialize_row(row: LedgerHotEssential) -> str:
+def _archive_prefix(uid: str, period_start: date) -> str:
+    return f"essential/{uid}/{period_start.year}/{period_start.month:02d}"
+
+
+def _serialize_row(row: Any) -> str:
     payload: dict[str, Any] = {
         "id": str(row.id),
         "uid": row.uid,
@@ -50,89 +100,275 @@ def _serialize_row(row: LedgerHotEssential) -> str:
     return json.dumps(payload, separators=(",", ":")) + "\n"
 
 
+def _partition_criteria(checkpoint: LedgerArchiveCheckpoint) -> tuple[Any, ...]:
+    lower = datetime.combine(checkpoint.period_start, time.min, tzinfo=UTC)
+    return (
+        LedgerHotEssential.uid == checkpoint.uid,
+        LedgerHotEssential.ts >= lower,
+        LedgerHotEssential.ts < checkpoint.upper_bound,
+        LedgerHotEssential.created_at <= checkpoint.created_at,
+    )
+
+
 def _upload_partition(
+    session,
+    bucket: storage.Bucket,
+    checkpoint: LedgerArchiveCheckpoint,
+    batch_size: int,
+) -> tuple[list[uuid.UUID], int]:
+    """Stream the partition into a gzip JSONL object and upload it; returns (ids, bytes)."""
+    buffer = io.BytesIO()
+    ids: list[uuid.UUID] = []
+    stmt = (
+        select(*_ROW_COLUMNS)
+        .where(*_partition_criteria(checkpoint))
+        .order_by(LedgerHotEssential.ts, LedgerHotEssential.id)
+        .execution_options(yield_per=batch_size)
+    )
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as compressed:
+        for row in session.execute(stmt):
+            compressed.write(_serialize_row(row).encode("utf-8"))
+            ids.append(row.id)
+
+    data = buffer.getvalue()
+    blob = bucket.blob(checkpoint.blob_name)
+    blob.content_encoding = "gzip"
+    blob.upload_from_string(data, content_type="application/jsonl")
+    return ids, len(data)
+
+
+def _archived_ids(bucket: storage.Bucket, checkpoint: LedgerArchiveCheckpoint) -> list[uuid.UUID]:
+    """Ids of the rows in an uploaded partition object."""
+    # raw_download skips GCS decompressive transcoding; the object is gzip either way.
+    data = bucket.blob(checkpoint.blob_name).download_as_bytes(raw_download=True)
+    return [
+        uuid.UUID(json.loads(line)["id"])
+        for line in gzip.decompress(data).splitlines()
+        if line
+    ]
+
+
+def _prune_partition(
+    session,
+    checkpoint: LedgerArchiveCheckpoint,
+    ids: list[uuid.UUID],
+    prune_batch_size: int,
+) -> int:
+    """
+    Delete the archived rows in batches, committing after each one.
+
+    Only ``ids`` (the rows that are in the uploaded object) are deleted, never
+    whatever currently matches the partition: a row that committed after the
+    export read it would match too, and would be lost.
+    """
+    pruned = 0
+    for start in range(0, len(ids), prune_batch_size):
+        result = session.execute(
+            delete(LedgerHotEssential)
+            .where(
+                LedgerHotEssential.uid == checkpoint.uid,
+                LedgerHotEssential.id.in_(ids[start : start + prune_batch_size]),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        pruned += result.rowcount
+    return pruned
+
+
+def _process_checkpoint(
+    checkpoint_id,
     bucket: storage.Bucket,
-    prefix: str,
+    batch_size: int,
+    prune_batch_size: int,
+) -> int:
+    """Finish one checkpoint from whatever state it is in; returns rows pruned."""
+    session = SessionLocal()
+    try:
+        checkpoint = session.get(LedgerArchiveCheckpoint, checkpoint_id)
+        ids = None
+        if checkpoint.status == CHECKPOINT_PENDING:
+            ids, size = _upload_partition(session, bucket, checkpoint, batch_size)
+            checkpoint.row_count = len(ids)
+            checkpoint.compressed_bytes = size
+            checkpoint.status = CHECKPOINT_UPLOADED
+            session.commit()
+
+        if checkpoint.status == CHECKPOINT_UPLOADED:
+            if ids is None:
+                ids = _archived_ids(bucket, checkpoint)
+            checkpoint.pruned_rows = _prune_partition(
+                session, checkpoint, ids, prune_batch_size
+            )
+            checkpoint.status = CHECKPOINT_PRUNED
+            session.commit()
+            if checkpoint.pruned_rows != checkpoint.row_count:
+                logger.warning(
+                    "Ledger archive %s uploaded %d rows but pruned %d.",
+                    checkpoint.blob_name,
+                    checkpoint.row_count,
+                    checkpoint.pruned_rows,
+                )
+        return checkpoint.pruned_rows
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _archive_partition(
+    uid: str,
+    period_start: date,
+    cutoff: datetime,
     run_id: str,
-    part_index: int,
-    rows: list[str],
-) -> None:
-    blob_name = f"{prefix}/ledger_hot_essential_{run_id}_part{part_index:05d}.jsonl"
-    bucket.blob(blob_name).upload_from_string(
-        "".join(rows), content_type="application/jsonl"
+    bucket: storage.Bucket,
+    batch_size: int,
+    prune_batch_size: int,
+) -> int:
+    """Checkpoint a partition that has rows to archive, then upload and prune it."""
+    upper_bound = min(
+        datetime.combine(_next_month(period_start), time.min, tzinfo=UTC), cutoff
     )
+    session = SessionLocal()
+    try:
+        has_rows = session.execute(
+            select(LedgerHotEssential.id)
+            .where(
+                LedgerHotEssential.uid == uid,
+                LedgerHotEssential.ts
+                >= datetime.combine(period_start, time.min, tzinfo=UTC),
+                LedgerHotEssential.ts < upper_bound,
+            )
+            .limit(1)
+        ).first()
+        if has_rows is None:
+            return 0
+
+        checkpoint = LedgerArchiveCheckpoint(
+            run_id=run_id,
+            uid=uid,
+            period_start=period_start,
+            upper_bound=upper_bound,
+            blob_name=(
+                f"{_archive_prefix(uid, period_start)}/"
+                f"ledger_hot_essential_{run_id}.jsonl.gz"
+            ),
+            status=CHECKPOINT_PENDING,
+        )
+        session.add(checkpoint)
+        session.commit()
+        checkpoint_id = checkpoint.id
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    return _process_checkpoint(checkpoint_id, bucket, batch_size, prune_batch_size)
+
 
+def _run_concurrently(tasks: list[tuple], max_workers: int) -> tuple[int, int]:
+    """Run ``(func, *args)`` tasks on a thread pool; returns (rows pruned, failures)."""
+    pruned = 0
+    failures = 0
+    if not tasks:
+        return pruned, failures
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="ledger-archive"
+    ) as pool:
+        futures = [pool.submit(func, *args) for func, *args in tasks]
+        for future in as_completed(futures):
+            try:
+                pruned += future.result()
+            except Exception:
+                failures += 1
+                logger.exception("Essential ledger archive partition failed.")
+    return pruned, failures
 
-def archive_essential_ledger(batch_size: int = 1000) -> int:
+
+def archive_essential_ledger(
+    batch_size: int = 1000,
+    *,
+    max_workers: int = 4,
+    prune_batch_size: int = 5000,
+    bucket: storage.Bucket | None = None,
+) -> int:
     bucket_name = os.getenv("LEDGER_ARCHIVE_BUCKET", "jualuma-ledger-archive")
-    session = SessionLocal()
     now = datetime.now(UTC)
     cutoff = _one_year_ago(now)
     run_id = now.strftime("%Y%m%d%H%M%S")
 
+    if bucket is None:
+        bucket = storage.Client().bucket(bucket_name)
+
+    session = SessionLocal()
     try:
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
+        unfinished = session.scalars(
+            select(LedgerArchiveCheckpoint.id).where(
+                LedgerArchiveCheckpoint.status != CHECKPOINT_PRUNED
+            )
+        ).all()
+    finally:
+        session.close()
 
-        query = (
-            session.query(LedgerHotEssential)
-            .filter(LedgerHotEssential.ts < cutoff)
-            .order_by(LedgerHotEssential.uid, LedgerHotEssential.ts)
+    # Unfinished checkpoints go first: their rows are still in hot storage and
+    # would otherwise be picked up again by a new partition.
+    if unfinished:
+        logger.info("Resuming %d unfinished ledger archive partitions.", len(unfinished))
+    pruned_rows, failures = _run_concurrently(
+        [
+            (_process_checkpoint, checkpoint_id, bucket, batch_size, prune_batch_size)
+            for checkpoint_id in unfinished
+        ],
+        max_workers,
+    )
+    if failures:
+        raise RuntimeError(
+            f"{failures} resumed ledger archive partitions failed; rerun to resume."
         )
 
-        current_prefix: str | None = None
-        part_index = 0
-        buffer: list[str] = []
-        archived_rows = 0
-
-        for row in query.yield_per(batch_size):
-            prefix = _archive_prefix(row)
-            if current_prefix and prefix != current_prefix:
-                if buffer:
-                    part_index += 1
-                    _upload_partition(
-                        bucket, current_prefix, run_id, part_index, buffer
-                    )
-                buffer = []
-                part_index = 0
-
-            current_prefix = prefix
-            buffer.append(_serialize_row(row))
-            archived_rows += 1
-
-            if len(buffer) >= batch_size:
-                part_index += 1
-                _upload_partition(bucket, current_prefix, run_id, part_index, buffer)
-                buffer = []
-
-        if buffer and current_prefix:
-            part_index += 1
-            _upload_partition(bucket, current_prefix, run_id, part_index, buffer)
-
-        if archived_rows == 0:
-            logger.info("No Essential ledger rows older than %s to archive.", cutoff)
-            return 0
+    session = SessionLocal()
+    try:
+        first_rows = session.execute(
+            select(LedgerHotEssential.uid, func.min(LedgerHotEssential.ts))
+            .where(LedgerHotEssential.ts < cutoff)
+            .group_by(LedgerHotEssential.uid)
+        ).all()
+    finally:
+        session.close()
 
-        deleted_rows = (
-            session.query(LedgerHotEssential)
-            .filter(LedgerHotEssential.ts < cutoff)
-            .delete(synchronize_session=False)
+    tasks = [
+        (
+            _archive_partition,
+            uid,
+            period_start,
+            cutoff,
+            run_id,
+            bucket,
+            batch_size,
+            prune_batch_size,
         )
-        session.commit()
+        for uid, first_ts in first_rows
+        for period_start in _periods_between(first_ts, cutoff)
+    ]
+    if not tasks and not unfinished:
+        logger.info("No Essential ledger rows older than %s to archive.", cutoff)
+        return 0
 
-        logger.info(
-            "Archived %d Essential ledger rows and pruned %d rows older than %s.",
-            archived_rows,
-            deleted_rows,
-            cutoff,
+    new_pruned, failures = _run_concurrently(tasks, max_workers)
+    pruned_rows += new_pruned
+    if failures:
+        raise RuntimeError(
+            f"{failures} ledger archive partitions failed; rerun to resume."
         )
-        return deleted_rows
-    except Exception:
-        session.rollback()
-        logger.exception("Essential ledger archiver failed.")
-        raise
-    finally:
-        session.close()
+
+    logger.info(
+        "Archived and pruned %d Essential ledger rows older than %s.",
+        pruned_rows,
+        cutoff,
+    )
+    return pruned_rows
 
 
 if __name__ == "__main__":
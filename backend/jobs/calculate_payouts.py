@@ -5,10 +5,11 @@ Run monthly.
 
 # 2025-12-11 17:23 CST - derive payouts from widget run events with KYC guard and audit trail
 import logging
-from collections import defaultdict
 from datetime import UTC, date, datetime
 from decimal import Decimal
 
+from sqlalchemy import func, select
+
 from backend.models import AuditLog, Developer, DeveloperPayout, SessionLocal, Widget
 
 logging.basicConfig(level=logging.INFO)
@@ -19,55 +20,62 @@ RATE_PER_RUN = Decimal("0.05")
 
 
 def _aggregate_widget_run_revenue(session):
-    """Aggregate widget run events into revenue per developer for the current month."""
+    """
+    Aggregate widget run events into revenue per developer for the current month.
+
+    Runs are counted in a single grouped query: the developer falls back to the
+    widget's owner when the event did not capture it, and the KYC status is read
+    from the developer's payout_method in the same statement. Memory use is one
+    row per developer regardless of the number of runs.
+
+    Returns ``(start_of_month, {dev_uid: {"amount", "runs", "kyc_status"}})``.
+    """
     start_of_month = date.today().replace(day=1)
     month_floor = datetime.combine(start_of_month, datetime.min.time(), tzinfo=UTC)
 
-    revenue_map: dict[str, dict[str, Decimal | int]] = defaultdict(
-        lambda: {"amount": Decimal(0), "runs": 0}
+    event_dev_uid = func.nullif(AuditLog.metadata_json["developer_uid"].as_string(), "")
+    dev_uid = func.coalesce(event_dev_uid, Widget.developer_uid)
+    kyc_status = func.coalesce(
+        Developer.payout_method["kyc_status"].as_string(), "unverified"
     )
 
-    run_events = (
-        session.query(AuditLog)
-        .filter(
+    rows = session.execute(
+        select(
+            dev_uid.label("dev_uid"),
+            kyc_status.label("kyc_status"),
+            func.count().label("runs"),
+        )
+        .select_from(AuditLog)
+        .outerjoin(
+            Widget,
+            (event_dev_uid.is_(None))
+            & (Widget.id == AuditLog.metadata_json["widget_id"].as_string()),
+        )
+        .outerjoin(Developer, Developer.uid == dev_uid)
+        .where(
             AuditLog.action == "widget_run",
             AuditLog.archived.is_(False),
             AuditLog.ts >= month_floor,
         )
-        .all()
-    )
-
-    for event in run_events:
-        metadata = event.metadata_json or {}
-        widget_id = metadata.get("widget_id")
-        dev_uid = metadata.get("developer_uid")
-
-        # Fallback to DB lookup if developer id was not captured in the event
-        if not dev_uid and widget_id:
-            widget = session.query(Widget).filter(Widget.id == widget_id).first()
-            dev_uid = widget.developer_uid if widget else None
+        .group_by(dev_uid, kyc_status)
+    ).all()
 
-        if not dev_uid:
+    revenue_map: dict[str, dict[str, Decimal | int | str]] = {}
+    for row in rows:
+        if not row.dev_uid:
             logger.warning(
-                "Skipping widget_run event with no developer context: %s", metadata
+                "Skipping %d widget_run events with no developer context.", row.runs
             )
             continue
-
-        revenue_map[dev_uid]["amount"] += RATE_PER_RUN
-        revenue_map[dev_uid]["runs"] += 1
+        revenue_map[row.dev_uid] = {
+            "amount": RATE_PER_RUN * row.runs,
+            "runs": row.runs,
+            "kyc_status": row.kyc_status,
+        }
 
     return start_of_month, revenue_map
 
 
-def _developer_kyc_status(session, dev_uid: str) -> str:
-    """Retrieve developer KYC status from payout_method metadata (default unverified)."""
-    developer = session.query(Developer).filter(Developer.uid == dev_uid).first()
-    payout_method = developer.payout_method if developer else {}
-    if isinstance(payout_method, dict):
-        return payout_method.get("kyc_status", "unverified")
-    return "unverified"
-
-
 def calculate_payouts():
     session = SessionLocal()
     try:
@@ -76,8 +84,15 @@ def calculate_payouts():
         current_month, revenue_map = _aggregate_widget_run_revenue(session)
         logger.info("Found %d developers with run revenue.", len(revenue_map))
 
+        existing_payouts = {
+            payout.dev_uid: payout
+            for payout in session.query(DeveloperPayout).filter(
+                DeveloperPayout.month == current_month
+            )
+        }
+
         for dev_uid, stats in revenue_map.items():
-            kyc_status = _developer_kyc_status(session, dev_uid)
+            kyc_status = stats["kyc_status"]
             if kyc_status != "verified":
                 logger.info(
                     "Skipping payout for %s due to KYC status: %s", dev_uid, kyc_status
@@ -98,16 +113,7 @@ def calculate_payouts():
                 )
                 continue
 
-            # Check if payout already exists for this month
-            existing = (
-                session.query(DeveloperPayout)
-                .filter(
-                    DeveloperPayout.month == current_month,
-                    DeveloperPayout.dev_uid == dev_uid,
-                )
-                .first()
-            )
-
+            existing = existing_payouts.get(dev_uid)
             if existing:
                 logger.info(
                     "Updating payout for %s in %s to %s",
@@ -3,7 +3,9 @@ import asyncio
 import contextlib
 import logging
 import typing as _t
+from collections.abc import Callable
 from contextlib import asynccontextmanager
+from functools import partial
 
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
@@ -20,6 +22,7 @@ from backend.api.billing import router as billing_router
 from backend.api.budgets import router as budgets_router
 from backend.api.developers import router as developers_router
 from backend.api.digests import router as digests_router
+from backend.api.documents import fail_stale_processing_documents
 from backend.api.documents import router as documents_router
 from backend.api.household import router as household_router
 from backend.api.jobs import router as jobs_router
@@ -36,7 +39,9 @@ from backend.api.users import router as users_router
 from backend.api.webhooks import router as webhooks_router
 from backend.api.widgets import router as widgets_router
 from backend.core import configure_logging, settings
-from backend.core.events import initialize_events
+from backend.core.events import initialize_events, shutdown_events
+from backend.core.executors import shutdown_executors
+from backend.core.query_metrics import install_query_instrumentation
 
 # MCP Imports (optional in non-dev runtime images)
 try:
@@ -44,6 +49,8 @@ try:
 except ModuleNotFoundError:
     mcp = None
 from backend.middleware import (
+    AccessLogMiddleware,
+    EventLoopBlockingMiddleware,
     RateLimitMiddleware,
     RequestContextMiddleware,
     SecurityHeadersMiddleware,
@@ -51,9 +58,19 @@ from backend.middleware import (
 from backend.models import SessionLocal
 from backend.models.base import engine
 from backend.services.pending_signup_cleanup import cleanup_stale_pending_signups
+from backend.services.support_audit import (
+    flush_support_actions,
+    shutdown_support_audit,
+)
+from backend.services.widget_engagement import (
+    flush_widget_engagement,
+    shutdown_widget_engagement,
+)
 from backend.utils import get_db  # noqa: F401 - imported for dependency wiring
+from backend.utils.rate_limit import get_rate_limit_backend
 
 configure_logging(service_name=settings.service_name)
+install_query_instrumentation()
 logger = logging.getLogger(__name__)
 
 
@@ -74,12 +91,44 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize event bus: {e}")
 
     cleanup_task = asyncio.create_task(_pending_signup_cleanup_loop())
+    flush_tasks = [
+        asyncio.create_task(
+            _periodic_flush_loop(
+                "widget engagement",
+                flush_widget_engagement,
+                settings.widget_engagement_flush_seconds,
+            )
+        ),
+        asyncio.create_task(
+            _periodic_flush_loop(
+                "support audit",
+                partial(flush_support_actions, engine),
+                settings.support_audit_flush_seconds,
+            )
+        ),
+        asyncio.create_task(
+            _periodic_flush_loop(
+                "stale document",
+                # Marks HEIC conversions that died with their worker as failed.
+                partial(fail_stale_processing_documents, engine),
+                5 * 60,
+            )
+        ),
+    ]
 
     yield
 
-    cleanup_task.cancel()
-    with contextlib.suppress(asyncio.CancelledError):
-        await cleanup_task
+    for task in (cleanup_task, *flush_tasks):
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    await asyncio.to_thread(shutdown_widget_engagement)
+    await asyncio.to_thread(shutdown_support_audit, engine)
+
+    # Flush queued Pub/Sub batches before the executors go away.
+    await asyncio.to_thread(shutdown_events)
+    await asyncio.to_thread(shutdown_executors)
 
 
 async def _pending_signup_cleanup_loop() -> None:
@@ -102,6 +151,15 @@ async def _pending_signup_cleanup_loop() -> None:
         await asyncio.sleep(interval_hours * 3600)
 
 
+async def _periodic_flush_loop(name: str, flush: Callable[[], object], interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(flush)
+        except Exception as exc:
+            logger.error(f"Periodic {name} flush failed: {exc}")
+
+
 app = FastAPI(
     title="jualuma API",
     description="Financial aggregation and AI-powered planning platform",
@@ -110,6 +168,16 @@ app = FastAPI(
 )
 
 # Observability and protection middleware
+# Innermost: times only the route itself, with the request id already set.
+app.add_middleware(
+    EventLoopBlockingMiddleware,
+    warn_threshold_ms=settings.event_loop_block_warn_ms,
+)
+# Access log with per-request SQL statement counts; needs the request id too.
+app.add_middleware(
+    AccessLogMiddleware,
+    enforce_budgets=settings.query_budget_enforce,
+)
 app.add_middleware(RequestContextMiddleware)
 
 # Disable rate limiting for automated tests to avoid spurious 429s.
@@ -120,6 +188,8 @@ if settings.app_env.lower() != "test":
         window_seconds=settings.rate_limit_window_seconds,
         # Limit API calls only (not static/proxy paths). "/api" includes "/api/auth" and "/api/health".
         path_prefixes=("/api",),
+        # Per-process by default: the shared backend costs a DB upsert per request.
+        backend=get_rate_limit_backend(settings.api_rate_limit_backend),
         # Signup has a dedicated limiter in backend/api/auth.py to avoid starvation
         # from unrelated API traffic sharing the same client IP bucket.
         exclude_paths=(
@@ -137,6 +207,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
@@ -1,10 +1,14 @@
 from .security import (
+    AccessLogMiddleware,
+    EventLoopBlockingMiddleware,
     RateLimitMiddleware,
     RequestContextMiddleware,
     SecurityHeadersMiddleware,
 )
 
 __all__ = [
+    "AccessLogMiddleware",
+    "EventLoopBlockingMiddleware",
     "RateLimitMiddleware",
     "RequestContextMiddleware",
     "SecurityHeadersMiddleware",
@@ -1,15 +1,14 @@
 # Updated 2025-12-08 17:53 CST by ChatGPT
-from collections import deque
-from threading import Lock
 from typing import Annotated
 
 from fastapi import Depends, Header, HTTPException, Request, status
 from sqlalchemy import func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload
 
 from backend.models import Subscription, User, UserSession
 from backend.services.auth import verify_token
 from backend.utils import get_db
+from backend.utils.database import track_user_session
 from backend.utils.rls import set_db_user_context
 
 _plan_rank = {"free": 0, "essential": 1, "pro": 2, "ultimate": 3}
@@ -72,7 +71,9 @@ async def get_current_user(
     # Set RLS context for the session
     set_db_user_context(db, uid)
 
-    user = db.query(User).filter(User.uid == uid).first()
+    # User's relationships are all selectin-loaded by default; routes that need
+    # one load it on access instead of every request paying for all of them.
+    user = db.query(User).options(lazyload("*")).filter(User.uid == uid).first()
     if not user:
         logger.warning(
             f"Auth Middleware: User {uid} not found in DB. Checking for email match..."
@@ -150,6 +151,7 @@ async def get_current_user(
         else:
             # Update last active
             session_rec.last_active = func.now()
+        track_user_session(db, session_rec)
 
         if user.mfa_enabled:
             path = str(request.url.path or "")
@@ -254,7 +256,7 @@ async def get_current_identity_with_user_guard(
         )
 
     existing_user = (
-        db.query(User)
+        db.query(User.uid)
         .filter(or_(User.uid == uid, User.email == email) if email else User.uid == uid)
         .first()
     )
@@ -329,35 +331,6 @@ async def require_tier(
     return subscription
 
 
-LOGIN_RATE_LIMIT: dict[str, deque[float]] = {}
-LOGIN_LOCK = Lock()
-LOGIN_WINDOW_SECONDS = 60
-LOGIN_MAX_ATTEMPTS = 10
-
-
-def register_login_attempt(request: Request) -> None:
-    """Track login attempts per client IP to enforce rate limiting."""
-    client_ip = request.client.host if request.client else "unknown"
-    now = request.state.timestamp if hasattr(request.state, "timestamp") else None
-
-    # Fallback if middleware did not add timestamp
-    import time
-
-    current_ts = now or time.time()
-
-    with LOGIN_LOCK:
-        attempts = LOGIN_RATE_LIMIT.setdefault(client_ip, deque())
-        while attempts and attempts[0] <= current_ts - LOGIN_WINDOW_SECONDS:
-            attempts.popleft()
-        attempts.append(current_ts)
-
-        if len(attempts) > LOGIN_MAX_ATTEMPTS:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many login attempts have been made. Please wait a moment and try again.",
-            )
-
-
 __all__ = [
     "get_current_identity",
     "get_current_identity_with_user_guard",
@@ -367,5 +340,4 @@ __all__ = [
     "require_support_agent",
     "require_support_manager",
     "require_tier",
-    "register_login_attempt",
 ]
@@ -2,19 +2,51 @@
 
 from __future__ import annotations
 
+import logging
+import math
 import time
 import uuid
-from collections import deque
-from collections.abc import Iterable
+from collections.abc import Coroutine, Iterable
 from threading import Lock
+from typing import Any
 
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from backend.core.logging import get_request_id, set_request_id
+from backend.core.query_metrics import (
+    QueryBudgetExceeded,
+    get_query_budget,
+    track_queries,
+)
+from backend.utils.rate_limit import RateLimitBackend, TokenBucketLimiter
+
+logger = logging.getLogger(__name__)
 
 ACTIVE_RATE_LIMITER: RateLimitMiddleware | None = None
+EVENT_LOOP_BLOCKING_STATS: dict[str, dict[str, float]] = {}
+_EVENT_LOOP_STATS_LOCK = Lock()
+_ROUTE_LABELS: dict[Any, str] = {}
+# Label for requests that matched no route; the raw path is client-controlled,
+# so keying per-route stats by it would let the dicts grow without bound.
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _route_label(scope: Scope) -> str:
+    """``METHOD /path/{template}`` for the matched route, else ``UNMATCHED_ROUTE``."""
+    endpoint = scope.get("endpoint")
+    label = _ROUTE_LABELS.get(endpoint) if endpoint else None
+    if label is None:
+        label = UNMATCHED_ROUTE
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", []):
+            if endpoint is not None and getattr(route, "endpoint", None) is endpoint:
+                label = route.path
+                _ROUTE_LABELS[endpoint] = label
+                break
+    return f"{scope.get('method', '')} {label}"
 
 
 class RequestContextMiddleware(BaseHTTPMiddleware):
@@ -55,9 +87,11 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
-    Simple in-memory sliding window rate limiter keyed by client IP.
+    Token-bucket rate limiter keyed by client IP.
 
-    This is intentionally lightweight to avoid new runtime dependencies.
+    Allows bursts of ``max_requests`` and refills at ``max_requests`` per
+    ``window_seconds``. Bucket state lives in the shared rate limit backend
+    (see ``backend.utils.rate_limit``), so the limit holds across workers.
     """
 
     def __init__(
@@ -68,14 +102,16 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         window_seconds: int = 60,
         path_prefixes: Iterable[str] = ("/api/auth", "/", "/health", "/api/health"),
         exclude_paths: Iterable[str] = (),
+        backend: RateLimitBackend | None = None,
     ):
         super().__init__(app)
         self.max_requests = max_requests
         self.window_seconds = window_seconds
         self.path_prefixes = tuple(path_prefixes)
         self.exclude_paths = tuple(exclude_paths)
-        self._attempts: dict[str, deque[float]] = {}
-        self._lock = Lock()
+        self.limiter = TokenBucketLimiter.per_window(
+            "api", max_requests, window_seconds, backend=backend
+        )
         # Expose the limiter for tests/administration
         global ACTIVE_RATE_LIMITER
         ACTIVE_RATE_LIMITER = self
@@ -83,7 +119,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         path = request.url.path or ""
         if self._should_limit(path):
-            limited = self._check_limit(request)
+            limited = await self._check_limit(request)
             if limited:
                 return limited
 
@@ -94,40 +130,237 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return False
         return any(path.startswith(prefix) for prefix in self.path_prefixes)
 
-    def _check_limit(self, request: Request) -> JSONResponse | None:
-        now = time.time()
+    async def _check_limit(self, request: Request) -> JSONResponse | None:
         forwarded_for = request.headers.get("x-forwarded-for")
         if forwarded_for:
             client_ip = forwarded_for.split(",")[0].strip()
         else:
             client_ip = request.client.host if request.client else "unknown"
 
-        with self._lock:
-            window = self._attempts.setdefault(client_ip, deque())
-            while window and window[0] <= now - self.window_seconds:
-                window.popleft()
-            if len(window) >= self.max_requests:
-                return self._too_many(request)
-
-            window.append(now)
+        decision = await self.limiter.hit_async(client_ip)
+        if not decision.allowed:
+            return self._too_many(request, retry_after=decision.retry_after)
         return None
 
-    def _too_many(self, request: Request) -> JSONResponse:
+    def _too_many(self, request: Request, retry_after: float | None = None) -> JSONResponse:
         request_id = getattr(request.state, "request_id", None) or get_request_id()
         payload = {
             "error": "too_many_requests",
             "message": "Rate limit exceeded. Please try again later.",
             "request_id": request_id,
         }
-        return JSONResponse(status_code=429, content=payload)
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after else None
+        return JSONResponse(status_code=429, content=payload, headers=headers)
 
     def reset(self) -> None:
         """Clear rate limit counters (primarily for testing)."""
-        with self._lock:
-            self._attempts.clear()
+        self.limiter.reset()
+
+
+class _LoopTimedCoroutine:
+    """
+    Drive a coroutine one step at a time, timing each step.
+
+    Every ``send``/``throw`` is a slice of time during which the coroutine holds
+    the event loop, so the sum is the request's loop-blocking time. Time spent
+    awaiting (I/O, executor threads) is not counted.
+    """
+
+    __slots__ = ("_coro", "busy", "max_step")
+
+    def __init__(self, coro: Coroutine[Any, Any, Any]):
+        self._coro = coro
+        self.busy = 0.0
+        self.max_step = 0.0
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.busy += elapsed
+            if elapsed > self.max_step:
+                self.max_step = elapsed
+
+    def send(self, value):
+        return self._timed(self._coro.send, value)
+
+    def throw(self, *exc_info):
+        return self._timed(self._coro.throw, *exc_info)
+
+    def close(self):
+        self._coro.close()
+
+
+class EventLoopBlockingMiddleware:
+    """
+    Report how long each route holds the event loop.
+
+    Sync DB or provider work inside an ``async def`` handler shows up here as
+    large blocking time. Install innermost so the request id is available.
+    """
+
+    def __init__(self, app: ASGIApp, *, warn_threshold_ms: float = 100.0):
+        self.app = app
+        self.warn_threshold_ms = warn_threshold_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timed = _LoopTimedCoroutine(self.app(scope, receive, send))
+        try:
+            await timed
+        finally:
+            self._record(scope, timed)
+
+    def _record(self, scope: Scope, timed: _LoopTimedCoroutine) -> None:
+        route = _route_label(scope)
+        blocked_ms = timed.busy * 1000
+        max_step_ms = timed.max_step * 1000
+
+        with _EVENT_LOOP_STATS_LOCK:
+            stats = EVENT_LOOP_BLOCKING_STATS.setdefault(
+                route, {"requests": 0, "total_ms": 0.0, "max_ms": 0.0, "max_step_ms": 0.0}
+            )
+            stats["requests"] += 1
+            stats["total_ms"] += blocked_ms
+            stats["max_ms"] = max(stats["max_ms"], blocked_ms)
+            stats["max_step_ms"] = max(stats["max_step_ms"], max_step_ms)
+
+        if blocked_ms >= self.warn_threshold_ms:
+            logger.warning(
+                "Event loop blocked by %s for %.1fms (longest step %.1fms).",
+                route,
+                blocked_ms,
+                max_step_ms,
+                extra={
+                    "event_type": "event_loop_blocking",
+                    "route": route,
+                    "blocked_ms": round(blocked_ms, 2),
+                    "max_step_ms": round(max_step_ms, 2),
+                },
+            )
+
+
+class AccessLogMiddleware:
+    """
+    One structured access log line per request, including the SQL statements
+    it issued and their total time.
+
+    Statements are counted until the response has been sent, so background
+    tasks are not charged to the route. Routes declaring ``@query_budget``
+    that go over it are logged; with ``enforce_budgets`` (tests) the request
+    fails with ``QueryBudgetExceeded`` instead of responding.
+    """
+
+    def __init__(self, app: ASGIApp, *, enforce_budgets: bool = False):
+        self.app = app
+        self.enforce_budgets = enforce_budgets
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        outcome: dict[str, Any] = {"status": 500}
+
+        with track_queries() as stats:
+
+            async def send_and_measure(message) -> None:
+                if message["type"] == "http.response.start":
+                    outcome["status"] = message["status"]
+                    self._check_budget(scope, stats.count)
+                elif message["type"] == "http.response.body" and not message.get("more_body"):
+                    outcome["db"] = stats.snapshot()
+                    outcome["duration_ms"] = (time.perf_counter() - start) * 1000
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_and_measure)
+            finally:
+                self._log(scope, outcome, stats, start)
+
+    def _check_budget(self, scope: Scope, count: int) -> None:
+        budget = get_query_budget(scope.get("endpoint"))
+        if budget is None or count <= budget:
+            return
+        route = _route_label(scope)
+        if self.enforce_budgets:
+            raise QueryBudgetExceeded(
+                f"{route} issued {count} SQL statements (budget {budget})."
+            )
+        logger.warning(
+            "%s issued %d SQL statements, over its budget of %d.",
+            route,
+            count,
+            budget,
+            extra={
+                "event_type": "query_budget_exceeded",
+                "route": route,
+                "db_queries": count,
+                "query_budget": budget,
+            },
+        )
+
+    def _log(self, scope: Scope, outcome: dict[str, Any], stats, start: float) -> None:
+        route = _route_label(scope)
+        db = outcome.get("db") or stats.snapshot()
+        duration_ms = outcome.get("duration_ms") or (time.perf_counter() - start) * 1000
+        logger.info(
+            "%s %d %.1fms db=%d/%.1fms",
+            route,
+            outcome["status"],
+            duration_ms,
+            db["db_queries"],
+            db["db_time_ms"],
+            extra={
+                "event_type": "access",
+                "route": route,
+                "path": scope.get("path", ""),
+                "status": outcome["status"],
+                "duration_ms": round(duration_ms, 2),
+                "query_budget": get_query_budget(scope.get("endpoint")),
+                **db,
+            },
+        )
+
+
+def get_event_loop_blocking_stats() -> dict[str, dict[str, float]]:
+    """Snapshot of per-route loop-blocking time (requests, total/avg/max ms)."""
+    with _EVENT_LOOP_STATS_LOCK:
+        snapshot = {route: dict(stats) for route, stats in EVENT_LOOP_BLOCKING_STATS.items()}
+    for stats in snapshot.values():
+        requests = stats["requests"] or 1
+        stats["avg_ms"] = round(stats["total_ms"] / requests, 2)
+        stats["total_ms"] = round(stats["total_ms"], 2)
+        stats["max_ms"] = round(stats["max_ms"], 2)
+        stats["max_step_ms"] = round(stats["max_step_ms"], 2)
+    return snapshot
+
+
+def reset_event_loop_blocking_stats() -> None:
+    with _EVENT_LOOP_STATS_LOCK:
+        EVENT_LOOP_BLOCKING_STATS.clear()
 
 
 __all__ = [
+    "AccessLogMiddleware",
+    "EventLoopBlockingMiddleware",
+    "get_event_loop_blocking_stats",
+    "reset_event_loop_blocking_stats",
     "RateLimitMiddleware",
     "RequestContextMiddleware",
     "SecurityHeadersMiddleware",
@@ -5,22 +5,26 @@
 from .account import Account
 from .ai_settings import AISettings
 from .audit import AuditLog, FeaturePreview, LLMLog, SupportPortalAction
-from .base import Base, SessionLocal, engine, get_session
+from .base import Base, SessionLocal, engine, get_session, read_engine
 from .budget import Budget
 from .category_rule import CategoryRule
+from .data_export import DataExportJob
 from .developer import Developer
 from .digest import DigestMessage, DigestSettings
+from .email_outbox import EmailOutbox
 from .household import Household, HouseholdInvite, HouseholdMember
-from .ledger import LedgerHotEssential, LedgerHotFree
+from .ledger import LedgerArchiveCheckpoint, LedgerHotEssential, LedgerHotFree
 from .legal import LegalAgreementAcceptance
 from .manual_asset import ManualAsset
 from .notification import LocalNotification, NotificationDedupe, NotificationPreference
 from .notification_device import NotificationDevice
 from .notification_settings import NotificationSettings
-from .payment import Payment
+from .payment import Payment, StripeWebhookEvent
 from .payout import DeveloperPayout
 from .pending_signup import PendingSignup
 from .plaid import PlaidItem, PlaidItemAccount, PlaidWebhookEvent
+from .rate_limit import RateLimitBucket
+from .recurring import RecurringSeries, RecurringSeriesState
 from .session import UserSession
 from .subscription import Subscription
 from .subscription_tier import SubscriptionTier
@@ -31,7 +35,7 @@ from .support import (
     SupportTicketRating,
 )
 from .trial_redemption import TrialRedemption
-from .transaction import Transaction
+from .transaction import Transaction, TransactionExternalId
 from .user import User
 from .user_document import UserDocument
 from .widget import Widget
@@ -40,17 +44,21 @@ from .widget_rating import WidgetRating
 __all__ = [
     "Base",
     "engine",
+    "read_engine",
     "SessionLocal",
     "get_session",
     "User",
     "Developer",
     "DigestSettings",
     "DigestMessage",
+    "EmailOutbox",
     "Subscription",
     "SubscriptionTier",
     "Account",
     "Transaction",
+    "TransactionExternalId",
     "Payment",
+    "StripeWebhookEvent",
     "PlaidItem",
     "PlaidItemAccount",
     "PlaidWebhookEvent",
@@ -75,9 +83,14 @@ __all__ = [
     "LegalAgreementAcceptance",
     "LedgerHotFree",
     "LedgerHotEssential",
+    "LedgerArchiveCheckpoint",
     "Widget",
     "WidgetRating",
     "CategoryRule",
+    "DataExportJob",
+    "RecurringSeries",
+    "RecurringSeriesState",
+    "RateLimitBucket",
     "Budget",
     "SubscriptionTier",
     "Household",
@@ -5,7 +5,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, CheckConstraint, DateTime, String, func
+from sqlalchemy import Boolean, CheckConstraint, DateTime, Index, String, func, text
 from sqlalchemy.dialects.postgresql import BYTEA, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -19,6 +19,11 @@ class AuditLog(Base):
             "source IN ('frontend', 'backend', 'workflow')",
             name="ck_audit_log_source",
         ),
+        Index(
+            "ix_audit_log_widget_run_ts",
+            "ts",
+            postgresql_where=text("action = 'widget_run' AND NOT archived"),
+        ),
         {"schema": "audit"},
     )
 
@@ -39,6 +39,18 @@ if DATABASE_URL.startswith("sqlite"):
 
 engine = create_engine(DATABASE_URL, **engine_kwargs)
 
+# Read-only traffic (analytics, reports, exports) goes here when a replica is
+# configured; otherwise it is the primary engine. Routing and the
+# read-your-writes fallback live in backend.utils.database.
+REPLICA_DATABASE_URL = settings.database_replica_url
+if REPLICA_DATABASE_URL:
+    replica_kwargs = dict(engine_kwargs)
+    if REPLICA_DATABASE_URL.startswith("postgresql"):
+        replica_kwargs["execution_options"] = {"postgresql_readonly": True}
+    read_engine = create_engine(REPLICA_DATABASE_URL, **replica_kwargs)
+else:
+    read_engine = engine
+
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
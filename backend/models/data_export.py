@@ -0,0 +1,65 @@
+"""DataExportJob model definition."""
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class DataExportJob(Base):
+    """Background CCPA export whose artifact is downloaded once it completes."""
+
+    __tablename__ = "data_export_jobs"
+    __table_args__ = (
+        Index("ix_data_export_jobs_uid_created_at", "uid", "created_at"),
+        Index("ix_data_export_jobs_status", "status"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    uid: Mapped[str] = mapped_column(
+        String(128), ForeignKey("users.uid", ondelete="CASCADE"), nullable=False
+    )
+    # pending -> running -> completed | failed; completed -> expired once the
+    # artifact is deleted.
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    # Object name of the artifact in DATA_EXPORT_BUCKET.
+    file_path: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    def __repr__(self) -> str:
+        return f"DataExportJob(id={self.id!r}, uid={self.uid!r}, status={self.status!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": str(self.id),
+            "status": self.status,
+            "size_bytes": self.size_bytes,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+        }
+
+
+__all__ = ["DataExportJob"]
@@ -0,0 +1,67 @@
+"""EmailOutbox model definition."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class EmailOutbox(Base):
+    """
+    Transactional outbox for user-facing email.
+
+    Request handlers add a row in the same transaction as the change that
+    triggers the email and return without talking to the mail provider; the
+    outbox worker (``backend.services.email_outbox``) sends pending rows
+    afterwards with retries. ``message_key`` names the logical message, so
+    enqueueing the same message twice sends it once.
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index(
+            "ix_email_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    message_key: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    # EmailClient method that sends it, e.g. "send_otp".
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    to_email: Mapped[str] = mapped_column(String(320), nullable=False)
+    # Keyword arguments for ``kind`` other than the recipient.
+    payload_json: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    # pending -> sent; failed once attempts run out, expired if not sent in time.
+    status: Mapped[str] = mapped_column(
+        String(16), nullable=False, default="pending", server_default="pending"
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Earliest next send; claiming a row pushes it out by the lease.
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    # Messages that are useless once stale (one-time codes) are not sent after this.
+    expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"EmailOutbox(message_key={self.message_key!r}, status={self.status!r})"
+
+
+__all__ = ["EmailOutbox"]
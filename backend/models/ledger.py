@@ -3,11 +3,22 @@
 # Updated 2025-12-08 17:45 CST by ChatGPT
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Index, Numeric, String, desc, func
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    desc,
+    func,
+)
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -96,4 +107,49 @@ class LedgerHotEssential(Base):
         )
 
 
-__all__ = ["LedgerHotFree", "LedgerHotEssential"]
+class LedgerArchiveCheckpoint(Base):
+    """
+    One archived ledger partition (a user's rows for one month, up to ``upper_bound``).
+
+    Status moves pending -> uploaded -> pruned; a crashed archiver run resumes
+    unfinished checkpoints instead of re-reading and re-uploading finished ones.
+    ``created_at`` is the snapshot point: only rows created at or before it are
+    uploaded, so rows back-filled mid-run are left for the next run. Pruning
+    deletes only the ids in the uploaded object.
+    """
+
+    __tablename__ = "ledger_archive_checkpoints"
+    __table_args__ = (
+        Index("ix_ledger_archive_checkpoints_status", "status"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    run_id: Mapped[str] = mapped_column(String(32), nullable=False)
+    uid: Mapped[str] = mapped_column(String(128), nullable=False)
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    upper_bound: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    blob_name: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    compressed_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    pruned_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"LedgerArchiveCheckpoint(uid={self.uid!r}, period_start={self.period_start!r}, "
+            f"status={self.status!r})"
+        )
+
+
+__all__ = ["LedgerHotFree", "LedgerHotEssential", "LedgerArchiveCheckpoint"]
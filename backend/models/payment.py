@@ -6,8 +6,18 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import DateTime, ForeignKey, String, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -58,4 +68,52 @@ class Payment(Base):
         }
 
 
-__all__ = ["Payment"]
+class StripeWebhookEvent(Base):
+    """
+    Idempotency ledger for Stripe webhooks.
+
+    The webhook only inserts a row keyed by the Stripe event id and returns;
+    redeliveries hit the primary key and are acknowledged without work. The
+    billing worker applies pending rows per customer in ``stripe_created``
+    order.
+    """
+
+    __tablename__ = "stripe_webhook_events"
+    __table_args__ = (
+        Index(
+            "ix_stripe_webhook_events_pending",
+            "customer_id",
+            "stripe_created",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    event_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(128), nullable=False)
+    customer_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    # Stripe's event ``created`` (epoch seconds); the per-customer apply order.
+    stripe_created: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    payload_json: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    # pending -> processed, or failed once attempts run out.
+    status: Mapped[str] = mapped_column(
+        String(16), nullable=False, default="pending", server_default="pending"
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    processed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"StripeWebhookEvent(event_id={self.event_id!r}, "
+            f"event_type={self.event_type!r}, status={self.status!r})"
+        )
+
+
+__all__ = ["Payment", "StripeWebhookEvent"]
@@ -0,0 +1,32 @@
+"""RateLimitBucket model definition."""
+
+from sqlalchemy import Boolean, Float, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class RateLimitBucket(Base):
+    """
+    Token bucket state shared by every worker (one row per limiter key).
+
+    Times are epoch seconds so the refill arithmetic runs inside the upsert.
+    ``full_at`` is when the bucket will have refilled completely; rows past it
+    carry no state and are swept.
+    """
+
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = (Index("ix_rate_limit_buckets_full_at", "full_at"),)
+
+    key: Mapped[str] = mapped_column(String(256), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    last_refill: Mapped[float] = mapped_column(Float, nullable=False)
+    full_at: Mapped[float] = mapped_column(Float, nullable=False)
+    # Outcome of the most recent acquire, returned by the same statement.
+    allowed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+
+    def __repr__(self) -> str:
+        return f"RateLimitBucket(key={self.key!r}, tokens={self.tokens!r})"
+
+
+__all__ = ["RateLimitBucket"]
@@ -0,0 +1,107 @@
+"""RecurringSeries and RecurringSeriesState model definitions."""
+
+import uuid
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class RecurringSeries(Base):
+    """
+    Per-user merchant series maintained incrementally from transactions.
+
+    ``occurrences`` holds ``[transaction_id, ts_iso, amount]`` entries inside
+    the lookback window; the cadence/amount fields are derived from them.
+    """
+
+    __tablename__ = "recurring_series"
+    __table_args__ = (
+        UniqueConstraint("uid", "series_key", name="uq_recurring_series_uid_key"),
+        Index(
+            "ix_recurring_series_uid_next_date",
+            "uid",
+            "next_date",
+            postgresql_where=text("is_recurring"),
+        ),
+        Index("ix_recurring_series_uid_window_start", "uid", "window_start"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    uid: Mapped[str] = mapped_column(
+        String(128), ForeignKey("users.uid", ondelete="CASCADE"), nullable=False
+    )
+    series_key: Mapped[str] = mapped_column(String(160), nullable=False)
+    merchant: Mapped[str] = mapped_column(String(80), nullable=False)
+    category: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    occurrences: Mapped[list[Any]] = mapped_column(JSONB, nullable=False, default=list)
+    # Earliest occurrence; once it falls out of the lookback window the series is re-derived.
+    window_start: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    is_recurring: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    cadence: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    cadence_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    average_amount: Mapped[float | None] = mapped_column(Float, nullable=True)
+    last_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    next_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    occurrence_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    confidence: Mapped[float | None] = mapped_column(Float, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"RecurringSeries(uid={self.uid!r}, series_key={self.series_key!r}, "
+            f"is_recurring={self.is_recurring!r})"
+        )
+
+
+class RecurringSeriesState(Base):
+    """Per-user watermark for incremental recurring-series maintenance."""
+
+    __tablename__ = "recurring_series_state"
+
+    uid: Mapped[str] = mapped_column(
+        String(128), ForeignKey("users.uid", ondelete="CASCADE"), primary_key=True
+    )
+    # Highest Transaction.updated_at already folded into the series.
+    watermark: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Set when transactions are hard-deleted; forces a full rebuild.
+    rebuild_needed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    rebuilt_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"RecurringSeriesState(uid={self.uid!r}, watermark={self.watermark!r}, "
+            f"rebuild_needed={self.rebuild_needed!r})"
+        )
+
+
+__all__ = ["RecurringSeries", "RecurringSeriesState"]
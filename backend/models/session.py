@@ -35,6 +35,11 @@ class UserSession(Base):
     mfa_method_verified: Mapped[str | None] = mapped_column(String(16), nullable=True)
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # Last commit that wrote the user's data; replica reads go to the primary
+    # for REPLICA_READ_YOUR_WRITES_SECONDS after it (see backend/utils/database.py).
+    last_write_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
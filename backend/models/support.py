@@ -11,6 +11,7 @@ from sqlalchemy import (
     CheckConstraint,
     DateTime,
     ForeignKey,
+    Index,
     String,
     Text,
     UniqueConstraint,
@@ -109,6 +110,20 @@ class SupportTicketRating(Base):
 
 class SupportTicket(Base):
     __tablename__ = "support_tickets"
+    # The agent queue pages newest-first on (created_at, id) under each filter.
+    __table_args__ = (
+        Index("ix_support_tickets_created_id", "created_at", "id"),
+        Index("ix_support_tickets_status_created_id", "status", "created_at", "id"),
+        Index(
+            "ix_support_tickets_queue_status_created_id", "queue_status", "created_at", "id"
+        ),
+        Index(
+            "ix_support_tickets_assignee_created_id",
+            "assigned_agent_uid",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
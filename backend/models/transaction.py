@@ -16,8 +16,10 @@ from sqlalchemy import (
     Numeric,
     String,
     Text,
+    UniqueConstraint,
     desc,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -35,15 +37,30 @@ class Transaction(Base):
         Index("idx_transactions_uid_ts_desc", "uid", desc("ts")),
         Index("idx_transactions_uid_category", "uid", "category"),
         Index("idx_transactions_account_id", "account_id"),
+        # Incremental consumers (recurring series) read rows changed since a watermark.
+        Index("idx_transactions_uid_updated_at", "uid", "updated_at"),
         Index("idx_transactions_merchant_description", "merchant_name", "description"),
+        # The table is partitioned by month on ts, where this index cannot be
+        # unique; TransactionExternalId (kept by a trigger) enforces it and
+        # raises under this name.
+        Index("idx_transactions_external_id_account", "account_id", "external_id"),
+        # Approximate nearest-neighbour index for cosine-distance RAG queries.
         Index(
-            "idx_transactions_external_id_account",
-            "account_id",
-            "external_id",
-            unique=True,
+            "idx_transactions_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        Index(
+            "idx_transactions_embedding_needed_at",
+            "embedding_needed_at",
+            postgresql_where=text("embedding_needed_at IS NOT NULL"),
         ),
     )
 
+    # The Postgres primary key is (id, ts) because ts is the partition key;
+    # ids are random UUIDs, so id alone remains the ORM identity.
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
@@ -66,6 +83,10 @@ class Transaction(Base):
     archived: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     raw_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     embedding: Mapped[Vector | None] = mapped_column(Vector(768), nullable=True)
+    # Set on insert and whenever embedded fields change; cleared once embedded.
+    embedding_needed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -110,4 +131,26 @@ class Transaction(Base):
         }
 
 
-__all__ = ["Transaction"]
+class TransactionExternalId(Base):
+    """
+    Provider id key table for the partitioned ``transactions`` table.
+
+    Maintained only by the ``transactions_external_id_guard`` trigger; it
+    carries the (account_id, external_id) and (uid, external_id) uniqueness
+    that partitioned indexes cannot. Never written by application code.
+    """
+
+    __tablename__ = "transaction_external_ids"
+    __table_args__ = (
+        UniqueConstraint("uid", "external_id", name="uq_transaction_external_ids_uid"),
+        Index("ix_transaction_external_ids_ts", "ts"),
+    )
+
+    account_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    external_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    uid: Mapped[str] = mapped_column(String(128), nullable=False)
+    transaction_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+__all__ = ["Transaction", "TransactionExternalId"]
@@ -28,6 +28,11 @@ class UserDocument(Base):
     file_type: Mapped[str] = mapped_column(String(16), nullable=False)  # pdf, csv, txt, json
     file_path: Mapped[str] = mapped_column(String(512), nullable=False)
     size_bytes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # ready, processing (background conversion pending), failed
+    processing_status: Mapped[str] = mapped_column(
+        String(16), nullable=False, default="ready", server_default="ready"
+    )
+    processing_error: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -55,7 +60,9 @@ class UserDocument(Base):
             "fileType": self.file_type,
             "date": self.created_at.isoformat(),
             "size": self._format_size(self.size_bytes),
-            "size_bytes": self.size_bytes
+            "size_bytes": self.size_bytes,
+            "status": self.processing_status,
+            "processingError": self.processing_error,
         }
 
     def _format_size(self, size: int) -> str:
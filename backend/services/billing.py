@@ -1,29 +1,36 @@
 # CORE PURPOSE: Service for handling Stripe billing, customer creation, checkout sessions, and webhooks.
 # LAST MODIFIED: 2026-01-25 CST
+import json
 import logging
 import os
-from datetime import datetime, timedelta
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
 from typing import Any
 from urllib.parse import urlparse, urlunparse
 
 import stripe
-from fastapi import HTTPException
-from sqlalchemy import or_
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import func, or_, select
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from backend.core import settings
 from backend.core.constants import UserStatus
+from backend.core.executors import run_db
 from backend.models import (
     AISettings,
     Payment,
     PendingSignup,
+    StripeWebhookEvent,
     Subscription,
     TrialRedemption,
     User,
 )
 from backend.schemas.legal import AgreementAcceptancePayload
-from backend.services.email import get_email_client
+from backend.services.email_outbox import deliver_pending_emails, enqueue_email
+from backend.services.financial_context import invalidate_financial_context_cache
 from backend.services.legal import record_agreement_acceptances
 from backend.services.notifications import NotificationService
 
@@ -84,6 +91,12 @@ TRIAL_PERIOD_DAYS = {
 
 GRACE_PERIOD_DAYS = 3
 
+STRIPE_EVENT_PENDING = "pending"
+STRIPE_EVENT_PROCESSED = "processed"
+STRIPE_EVENT_FAILED = "failed"
+# A webhook event that keeps failing stops blocking its customer after this.
+STRIPE_EVENT_MAX_ATTEMPTS = 5
+
 # Official Stripe test card numbers (last4 values) are excluded from anti-gaming checks.
 STRIPE_TEST_CARD_LAST4_EXEMPTIONS = {
     "4242",
@@ -477,18 +490,21 @@ def _send_payment_failed_email(
     to_email = _get_user_email(db, uid)
     if not to_email:
         return
+    dedupe_key = f"subscription_payment_failed:{uid}:{grace_end_date.date().isoformat()}"
     _notify_subscription_update(
         db,
         uid,
         "Payment failed",
         f"Payment failed for your {plan_name} plan. Update your payment method by {_format_date_for_email(grace_end_date)}.",
-        f"subscription_payment_failed:{uid}:{grace_end_date.date().isoformat()}",
+        dedupe_key,
     )
-    client = get_email_client()
-    client.send_subscription_payment_failed(
+    enqueue_email(
+        db,
+        "send_subscription_payment_failed",
         to_email,
-        plan_name,
-        _format_date_for_email(grace_end_date),
+        message_key=dedupe_key,
+        plan_name=plan_name,
+        grace_end_date=_format_date_for_email(grace_end_date),
     )
 
 
@@ -496,15 +512,11 @@ def _send_downgrade_email(db: Session, uid: str, reason: str) -> None:
     to_email = _get_user_email(db, uid)
     if not to_email:
         return
-    _notify_subscription_update(
-        db,
-        uid,
-        "Subscription downgraded",
-        reason,
-        f"subscription_downgraded:{uid}:{datetime.utcnow().date().isoformat()}",
+    dedupe_key = f"subscription_downgraded:{uid}:{datetime.utcnow().date().isoformat()}"
+    _notify_subscription_update(db, uid, "Subscription downgraded", reason, dedupe_key)
+    enqueue_email(
+        db, "send_subscription_downgraded", to_email, message_key=dedupe_key, reason=reason
     )
-    client = get_email_client()
-    client.send_subscription_downgraded(to_email, reason)
 
 
 def _resolve_uid_for_customer(db: Session, customer_id: str | None) -> str | None:
@@ -995,6 +1007,7 @@ def update_user_tier(
             sub.renew_at = end_date
 
     db.commit()
+    invalidate_financial_context_cache(uid)
     db.refresh(sub)
 
     # Ensure user status is active if they have a valid plan
@@ -1059,16 +1072,28 @@ def cancel_user_subscription(db: Session, uid: str) -> bool:
         return False
 
 
-async def handle_stripe_webhook(payload: bytes, sig_header: str, db: Session):
+async def handle_stripe_webhook(
+    payload: bytes,
+    sig_header: str,
+    db: Session,
+    background_tasks: BackgroundTasks | None = None,
+):
     """
     Handles incoming Stripe webhooks.
+
+    The verified event is recorded in ``stripe_webhook_events`` and
+    acknowledged straight away; redeliveries of an already recorded event id
+    are acknowledged without doing anything. The handlers run afterwards in
+    ``process_stripe_webhook_events`` (scheduled here for the event's
+    customer, or for the event alone when it has none, and drained by the
+    jobs endpoint as a safety net).
     """
     if not settings.stripe_webhook_secret:
         # Use configured secret or fallback to None which will fail validation if not set
         raise HTTPException(status_code=500, detail="Webhook secret not configured.")
 
     try:
-        event = stripe.Webhook.construct_event(
+        stripe.Webhook.construct_event(
             payload, sig_header, settings.stripe_webhook_secret
         )
     except ValueError as e:
@@ -1078,26 +1103,205 @@ async def handle_stripe_webhook(payload: bytes, sig_header: str, db: Session):
         logger.error(f"Webhook error: Invalid signature: {e}")
         raise HTTPException(status_code=400, detail="Invalid signature") from e
 
-    event_type = event["type"]
-    data_object = event["data"]["object"]
+    # The signature covers the raw body; keep the plain JSON for the ledger.
+    event = json.loads(payload)
+    logger.info(f"Received Stripe webhook: {event['type']} ({event['id']})")
+
+    recorded = await run_db(record_stripe_webhook_event, db, event)
+    if not recorded:
+        return {"status": "duplicate"}
+
+    if background_tasks is not None:
+        background_tasks.add_task(
+            run_db,
+            process_stripe_webhook_events,
+            db.get_bind(),
+            customer_id=_stripe_event_customer(event),
+            event_id=event["id"],
+        )
+        # Handlers queue their emails in the event's transaction; send them next.
+        background_tasks.add_task(run_db, deliver_pending_emails, db.get_bind())
+    return {"status": "success"}
+
+
+def _stripe_event_customer(event: dict[str, Any]) -> str | None:
+    data_object = event.get("data", {}).get("object", {})
+    customer = data_object.get("customer")
+    if isinstance(customer, dict):
+        customer = customer.get("id")
+    if not customer and data_object.get("object") == "customer":
+        customer = data_object.get("id")
+    return customer or None
+
+
+def record_stripe_webhook_event(db: Session, event: dict[str, Any]) -> bool:
+    """Insert the event into the idempotency ledger; False if it was already recorded."""
+    db.add(
+        StripeWebhookEvent(
+            event_id=event["id"],
+            event_type=event["type"],
+            customer_id=_stripe_event_customer(event),
+            stripe_created=int(event.get("created") or 0),
+            payload_json=event.get("data", {}).get("object", {}),
+            status=STRIPE_EVENT_PENDING,
+        )
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.info("Ignoring duplicate Stripe webhook event %s", event["id"])
+        return False
+    return True
+
+
+@contextmanager
+def _stripe_customer_session(bind: Engine, ordering_key: str) -> Iterator[Session | None]:
+    """
+    Session for applying one customer's events, or None if another worker
+    holds that customer.
+
+    On Postgres a session-level advisory lock is held on a dedicated
+    connection, so it survives the handlers' own commits.
+    """
+    if bind.dialect.name != "postgresql":
+        with Session(bind=bind) as session:
+            yield session
+        return
+
+    lock_id = func.hashtextextended(ordering_key, 0)
+    with bind.connect() as conn:
+        locked = conn.execute(select(func.pg_try_advisory_lock(lock_id))).scalar()
+        conn.commit()
+        if not locked:
+            yield None
+            return
+        try:
+            with Session(bind=conn) as session:
+                yield session
+        finally:
+            conn.rollback()
+            conn.execute(select(func.pg_advisory_unlock(lock_id)))
+            conn.commit()
+
+
+def _apply_stripe_events_for_customer(
+    bind: Engine, ordering_key: str, customer_id: str | None, limit: int
+) -> dict[str, int]:
+    counts = {"processed": 0, "failed": 0, "deferred": 0}
+    with _stripe_customer_session(bind, ordering_key) as session:
+        if session is None:
+            counts["deferred"] += 1
+            return counts
+
+        if customer_id is None:
+            criteria = [StripeWebhookEvent.event_id == ordering_key]
+        else:
+            criteria = [StripeWebhookEvent.customer_id == customer_id]
+        events = session.scalars(
+            select(StripeWebhookEvent)
+            .where(*criteria, StripeWebhookEvent.status == STRIPE_EVENT_PENDING)
+            .order_by(
+                StripeWebhookEvent.stripe_created,
+                StripeWebhookEvent.received_at,
+                StripeWebhookEvent.event_id,
+            )
+            .limit(limit)
+        ).all()
+
+        for event in events:
+            event_id = event.event_id
+            try:
+                _dispatch_stripe_event(event.event_type, event.payload_json, session)
+            except Exception as exc:
+                session.rollback()
+                event = session.get(StripeWebhookEvent, event_id)
+                event.attempts += 1
+                event.last_error = str(exc)[:1000]
+                exhausted = event.attempts >= STRIPE_EVENT_MAX_ATTEMPTS
+                if exhausted:
+                    event.status = STRIPE_EVENT_FAILED
+                session.commit()
+                logger.exception(
+                    "Stripe webhook event %s failed (attempt %d).", event_id, event.attempts
+                )
+                if not exhausted:
+                    # Later events for this customer wait so they apply in order.
+                    counts["deferred"] += 1
+                    return counts
+                counts["failed"] += 1
+                continue
+
+            # Handlers may have rolled back their own work; re-read before marking.
+            event = session.get(StripeWebhookEvent, event_id)
+            event.status = STRIPE_EVENT_PROCESSED
+            event.processed_at = datetime.now(UTC)
+            event.last_error = None
+            session.commit()
+            counts["processed"] += 1
+    return counts
+
+
+def process_stripe_webhook_events(
+    bind: Engine,
+    *,
+    customer_id: str | None = None,
+    event_id: str | None = None,
+    max_customers: int = 500,
+    events_per_customer: int = 1000,
+) -> dict[str, int]:
+    """
+    Apply pending Stripe webhook events, oldest first within each customer.
+
+    ``customer_id`` limits the run to that customer's events. Without it,
+    ``event_id`` limits it to that one event (for events that name no
+    customer); with neither, every customer with pending events is drained.
+    Each customer's events are applied by one worker at a time; customers
+    held by another worker are skipped and picked up on a later run. A failed
+    event blocks that customer's later events until it succeeds or runs out
+    of attempts.
+    """
+    with Session(bind=bind) as session:
+        if customer_id is not None:
+            groups = [(customer_id, customer_id)]
+        elif event_id is not None:
+            groups = [(event_id, None)]
+        else:
+            ordering_key = func.coalesce(
+                StripeWebhookEvent.customer_id, StripeWebhookEvent.event_id
+            )
+            groups = session.execute(
+                select(ordering_key, StripeWebhookEvent.customer_id)
+                .where(StripeWebhookEvent.status == STRIPE_EVENT_PENDING)
+                .group_by(ordering_key, StripeWebhookEvent.customer_id)
+                .order_by(func.min(StripeWebhookEvent.stripe_created))
+                .limit(max_customers)
+            ).all()
+
+    totals = {"processed": 0, "failed": 0, "deferred": 0}
+    for key, group_customer in groups:
+        counts = _apply_stripe_events_for_customer(
+            bind, key, group_customer, events_per_customer
+        )
+        for name, value in counts.items():
+            totals[name] += value
+    return totals
 
-    logger.info(f"Received Stripe webhook: {event_type}")
 
+def _dispatch_stripe_event(event_type: str, data_object: Any, db: Session) -> None:
     if event_type == "invoice.payment_succeeded":
-        await _handle_invoice_paid(data_object, db)
+        _handle_invoice_paid(data_object, db)
     elif event_type == "invoice.payment_failed":
-        await _handle_invoice_payment_failed(data_object, db)
+        _handle_invoice_payment_failed(data_object, db)
     elif event_type == "customer.subscription.updated":
-        await _handle_subscription_updated(data_object, db)
+        _handle_subscription_updated(data_object, db)
     elif event_type == "customer.subscription.deleted":
-        await _handle_subscription_deleted(data_object, db)
+        _handle_subscription_deleted(data_object, db)
     elif event_type == "checkout.session.completed":
-        await _handle_checkout_session_completed(data_object, db)
-
-    return {"status": "success"}
+        _handle_checkout_session_completed(data_object, db)
 
 
-async def _handle_invoice_paid(invoice: dict[str, Any], db: Session):
+def _handle_invoice_paid(invoice: dict[str, Any], db: Session):
     customer_id = invoice.get("customer")
     # Find user by customer_id (Need to query Payment table)
     # Since Payment table is new, we need to ensure we have it hooked up.
@@ -1114,7 +1318,7 @@ async def _handle_invoice_paid(invoice: dict[str, Any], db: Session):
     logger.info(f"Invoice paid for user {uid}")
 
 
-async def _handle_invoice_payment_failed(invoice: dict[str, Any], db: Session):
+def _handle_invoice_payment_failed(invoice: dict[str, Any], db: Session):
     customer_id = invoice.get("customer")
     uid = _resolve_uid_for_customer(db, customer_id)
     if not uid:
@@ -1183,7 +1387,7 @@ async def _handle_invoice_payment_failed(invoice: dict[str, Any], db: Session):
         logger.info(f"Webhook: Grace expired. Downgraded {uid} to free.")
 
 
-async def _handle_subscription_updated(subscription: dict[str, Any], db: Session):
+def _handle_subscription_updated(subscription: dict[str, Any], db: Session):
     customer_id = subscription.get("customer")
     status = subscription.get("status")
     current_period_end = subscription.get("current_period_end")
@@ -1284,7 +1488,7 @@ async def _handle_subscription_updated(subscription: dict[str, Any], db: Session
         )
 
 
-async def _handle_subscription_deleted(subscription: dict[str, Any], db: Session):
+def _handle_subscription_deleted(subscription: dict[str, Any], db: Session):
     customer_id = subscription.get("customer")
     uid = _resolve_uid_for_customer(db, customer_id)
     if not uid:
@@ -1305,7 +1509,7 @@ async def _handle_subscription_deleted(subscription: dict[str, Any], db: Session
     )
 
 
-async def _handle_checkout_session_completed(session: dict[str, Any], db: Session):
+def _handle_checkout_session_completed(session: dict[str, Any], db: Session):
     """
     Handles successful checkout session.
     Transitions user from PENDING_PLAN_SELECTION (or Free) to the paid plan.
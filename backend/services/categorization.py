@@ -3,7 +3,10 @@
 Handles 'machine learning' logic for transaction categorization logic.
 """
 
-from sqlalchemy import func
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 
 from backend.models.category_rule import CategoryRule
@@ -83,34 +86,49 @@ def predict_category(db: Session, uid: str, merchant_name: str) -> str | None:
     return None
 
 
-def apply_rule_to_history(db: Session, uid: str, merchant_name: str, category: str):
+def apply_rule_to_history(
+    db: Session,
+    uid: str,
+    merchant_name: str,
+    category: str,
+    *,
+    retention_cutoff: datetime | None = None,
+) -> list[uuid.UUID]:
     """
     Apply a newly learned rule to all past transactions that are uncategorized
     or have a different category (optional, maybe too aggressive).
 
-    For now, let's only update uncategorized ones to be safe.
+    For now, let's only update uncategorized ones to be safe. Archived rows
+    and rows older than ``retention_cutoff`` are left alone. Runs as one
+    UPDATE and returns the ids of the rows it changed.
     """
     normalized_name = normalize_merchant_name(merchant_name)
     normalized_category = normalize_category(category)
     if not normalized_name or not normalized_category:
-        return
+        return []
 
     merchant_key = normalize_merchant_key(normalized_name)
     if not merchant_key:
-        return
-
-    txns = (
-        db.query(Transaction)
-        .filter(
-            Transaction.uid == uid,
-            func.lower(Transaction.merchant_name) == merchant_key,
-            Transaction.category.is_(None),  # Only uncategorized
+        return []
+
+    criteria = [
+        Transaction.uid == uid,
+        func.lower(Transaction.merchant_name) == merchant_key,
+        Transaction.category.is_(None),  # Only uncategorized
+        Transaction.archived.is_(False),
+    ]
+    if retention_cutoff is not None:
+        criteria.append(Transaction.ts >= retention_cutoff)
+
+    # Category is an embedded field, so the rows are queued for re-embedding.
+    updated_ids = list(
+        db.scalars(
+            update(Transaction)
+            .where(*criteria)
+            .values(category=normalized_category, embedding_needed_at=datetime.now(UTC))
+            .returning(Transaction.id)
+            .execution_options(synchronize_session=False)
         )
-        .all()
     )
-
-    for txn in txns:
-        txn.category = normalized_category
-        db.add(txn)
-
     db.commit()
+    return updated_ids
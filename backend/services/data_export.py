@@ -0,0 +1,415 @@
+"""Core Purpose: Streaming CCPA data export with bounded memory."""
+
+# Last Updated: 2026-10-19 00:00 CST
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import uuid
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+from google.api_core.exceptions import NotFound
+from google.cloud import storage
+from sqlalchemy import ColumnElement, and_, or_, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, lazyload, selectinload
+
+from backend.core import settings
+from backend.models import (
+    Account,
+    DataExportJob,
+    Household,
+    Transaction,
+    User,
+    Widget,
+    WidgetRating,
+)
+from backend.models.budget import Budget
+from backend.models.category_rule import CategoryRule
+from backend.utils.rls import set_db_user_context
+
+logger = logging.getLogger(__name__)
+
+# Object name prefix for artifacts in DATA_EXPORT_BUCKET.
+EXPORT_PREFIX = "exports"
+# Rows fetched per round trip from the server-side cursor.
+EXPORT_BATCH_SIZE = 1000
+# Minimum bytes handed to the response per chunk; avoids one ASGI send per row.
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_ARTIFACT_TTL = timedelta(days=7)
+# A job left "running" longer than this is assumed orphaned by a dead worker
+# and may be claimed again; must exceed the slowest real export.
+EXPORT_JOB_LEASE = timedelta(hours=1)
+# Upload/download buffer per artifact; a multiple of GCS's 256 KiB chunk unit.
+EXPORT_STORAGE_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def _dump(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+def _iter_json_array(items: Iterable[Any]) -> Iterator[str]:
+    yield "["
+    for index, item in enumerate(items):
+        if index:
+            yield ","
+        yield _dump(item)
+    yield "]"
+
+
+def _iter_account_transactions(
+    db: Session, account_id: uuid.UUID, batch_size: int
+) -> Iterator[dict[str, Any]]:
+    query = (
+        db.query(Transaction)
+        .options(lazyload("*"))
+        .filter(Transaction.account_id == account_id)
+        .order_by(Transaction.ts, Transaction.id)
+        .execution_options(stream_results=True)
+        .yield_per(batch_size)
+    )
+    for txn in query:
+        yield txn.to_dict()
+
+
+def _iter_accounts(db: Session, uid: str, batch_size: int) -> Iterator[str]:
+    accounts = (
+        db.query(Account)
+        .options(lazyload("*"))
+        .filter(Account.uid == uid)
+        .order_by(Account.created_at, Account.id)
+        .all()
+    )
+    yield "["
+    for index, account in enumerate(accounts):
+        acc_data = _dump(account.to_dict())
+        # Splice the streamed transactions array into the account object.
+        yield ("," if index else "") + acc_data[:-1] + ',"transactions":'
+        yield from _iter_json_array(
+            _iter_account_transactions(db, account.id, batch_size)
+        )
+        yield "}"
+        db.expunge(account)
+    yield "]"
+
+
+def _export_sections(
+    db: Session, user: User, batch_size: int
+) -> Iterator[tuple[str, Iterable[str]]]:
+    """Yield (key, json fragments) in the same order as the legacy export payload."""
+    uid = user.uid
+
+    def value(obj: Any) -> list[str]:
+        return [_dump(obj)]
+
+    def rows(objs: Iterable[Any]) -> Iterator[str]:
+        return _iter_json_array(o.to_dict() for o in objs)
+
+    yield "profile", value(user.to_dict())
+    yield "exported_at", value(datetime.now(UTC).isoformat())
+    yield "ai_settings", value(user.ai_settings.to_dict() if user.ai_settings else None)
+    yield "subscriptions", rows(user.subscriptions)
+    yield "notification_preferences", rows(user.notification_preferences)
+
+    # Financials
+    yield "accounts", _iter_accounts(db, uid, batch_size)
+    yield "manual_assets", rows(user.manual_assets)
+    yield "payments", rows(user.payments)
+    yield "developer_payouts", rows(user.developer_payouts)
+    yield "budgets", rows(db.query(Budget).filter(Budget.uid == uid).all())
+    yield "category_rules", rows(
+        db.query(CategoryRule).filter(CategoryRule.uid == uid).all()
+    )
+
+    # Support & Legal
+    yield "support_tickets", rows(user.support_tickets)
+    yield "legal_acceptances", rows(user.legal_acceptances)
+    yield "documents", rows(user.documents)
+
+    # Household
+    membership = user.household_member
+    household_data = None
+    if membership:
+        hh = (
+            db.query(Household)
+            .options(selectinload(Household.members), selectinload(Household.invites))
+            .filter(Household.id == membership.household_id)
+            .first()
+        )
+        if hh:
+            household_data = hh.to_dict()
+    yield "household_membership", value(membership.to_dict() if membership else None)
+    yield "household", value(household_data)
+
+    # Widgets
+    developed_widgets: list[Widget] = []
+    if user.developer:
+        developed_widgets = db.query(Widget).filter(Widget.developer_uid == uid).all()
+    yield "developed_widgets", rows(developed_widgets)
+    yield "widget_ratings", rows(
+        db.query(WidgetRating).filter(WidgetRating.user_uid == uid).all()
+    )
+    if user.developer:
+        yield "developer_profile", value(user.developer.to_dict())
+
+
+def iter_user_export(
+    db: Session, uid: str, *, batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    Yield the user's export as JSON text fragments, one section at a time.
+
+    Only one batch of transactions is materialized at once; the caller owns
+    the session and any RLS context set on it.
+    """
+    # lazyload("*") keeps User's selectin relationships (notably every
+    # transaction) from being pulled in eagerly with the profile row.
+    user = db.query(User).options(lazyload("*")).filter(User.uid == uid).first()
+    if not user:
+        raise LookupError(f"User {uid} not found")
+
+    yield "{"
+    for index, (key, fragments) in enumerate(_export_sections(db, user, batch_size)):
+        yield ("," if index else "") + _dump(key) + ":"
+        yield from fragments
+    yield "}"
+
+
+def _coalesce(fragments: Iterable[str], min_bytes: int) -> Iterator[bytes]:
+    buffer: list[str] = []
+    size = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        size += len(fragment)
+        if size >= min_bytes:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def stream_user_export(
+    bind: Engine | Connection,
+    uid: str,
+    *,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    chunk_bytes: int = EXPORT_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """
+    Stream the export as UTF-8 byte chunks for a StreamingResponse.
+
+    Opens a dedicated session because request-scoped sessions are closed
+    before the response body is sent.
+    """
+    db = Session(bind=bind, autoflush=False)
+    try:
+        set_db_user_context(db, uid)
+        yield from _coalesce(iter_user_export(db, uid, batch_size=batch_size), chunk_bytes)
+    finally:
+        db.close()
+
+
+def create_export_job(db: Session, uid: str) -> DataExportJob:
+    job = DataExportJob(uid=uid, status="pending")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+@lru_cache(maxsize=1)
+def _export_bucket() -> storage.Bucket:
+    return storage.Client().bucket(settings.data_export_bucket)
+
+
+def _artifact_name(job: DataExportJob) -> str:
+    return f"{EXPORT_PREFIX}/{job.uid}/{job.id}.json.gz"
+
+
+def _claimable(now: datetime) -> ColumnElement[bool]:
+    return or_(
+        DataExportJob.status == "pending",
+        and_(
+            DataExportJob.status == "running",
+            DataExportJob.started_at < now - EXPORT_JOB_LEASE,
+        ),
+    )
+
+
+def run_export_job(
+    bind: Engine | Connection,
+    job_id: uuid.UUID,
+    *,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    bucket: storage.Bucket | None = None,
+) -> DataExportJob | None:
+    """
+    Produce the gzip-compressed export artifact for a pending job.
+
+    The job is claimed with a conditional pending -> running update, so when
+    the request's background task and the jobs endpoint race for it only one
+    of them runs it. A job whose ``EXPORT_JOB_LEASE`` ran out while still
+    running is claimed the same way. The artifact is streamed to GCS as a resumable upload
+    that is only finalized once the export is complete, so a crashed run
+    never leaves a truncated download behind.
+    """
+    db = Session(bind=bind, autoflush=False, expire_on_commit=False)
+    try:
+        now = datetime.now(UTC)
+        claimed = db.execute(
+            update(DataExportJob)
+            .where(DataExportJob.id == job_id, _claimable(now))
+            .values(status="running", started_at=now, error=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        job = db.get(DataExportJob, job_id)
+        if claimed != 1 or job is None:
+            return job
+
+        blob = (bucket or _export_bucket()).blob(
+            _artifact_name(job), chunk_size=EXPORT_STORAGE_CHUNK_BYTES
+        )
+        try:
+            set_db_user_context(db, job.uid)
+            # Leaving the block with an exception cancels the upload.
+            with blob.open("wb", content_type="application/gzip", ignore_flush=True) as raw:
+                with gzip.GzipFile(fileobj=raw, mode="wb") as fh:
+                    for chunk in _coalesce(
+                        iter_user_export(db, job.uid, batch_size=batch_size),
+                        EXPORT_CHUNK_BYTES,
+                    ):
+                        fh.write(chunk)
+                size_bytes = raw.tell()
+        except Exception as exc:
+            db.rollback()
+            logger.exception("CCPA export job %s failed.", job_id)
+            job.status = "failed"
+            job.error = str(exc)[:1000]
+            job.completed_at = datetime.now(UTC)
+            db.commit()
+            return job
+
+        completed_at = datetime.now(UTC)
+        job.status = "completed"
+        job.file_path = blob.name
+        job.size_bytes = size_bytes
+        job.completed_at = completed_at
+        job.expires_at = completed_at + EXPORT_ARTIFACT_TTL
+        db.commit()
+        logger.info(
+            "CCPA export job %s completed (%d bytes compressed).", job_id, job.size_bytes
+        )
+        return job
+    finally:
+        db.close()
+
+
+def open_export_artifact(
+    job: DataExportJob, *, bucket: storage.Bucket | None = None
+) -> Iterator[bytes] | None:
+    """Stream a completed job's artifact from GCS; None if the object is gone."""
+    blob = (bucket or _export_bucket()).blob(job.file_path)
+    reader = blob.open("rb", chunk_size=EXPORT_STORAGE_CHUNK_BYTES)
+    try:
+        first = reader.read(EXPORT_STORAGE_CHUNK_BYTES)
+    except NotFound:
+        reader.close()
+        return None
+
+    def chunks() -> Iterator[bytes]:
+        try:
+            chunk = first
+            while chunk:
+                yield chunk
+                chunk = reader.read(EXPORT_STORAGE_CHUNK_BYTES)
+        finally:
+            reader.close()
+
+    return chunks()
+
+
+def purge_expired_export_artifacts(
+    bind: Engine | Connection,
+    *,
+    now: datetime | None = None,
+    limit: int = 500,
+    bucket: storage.Bucket | None = None,
+) -> int:
+    """Delete the artifacts of completed jobs past ``expires_at`` and mark them expired."""
+    now = now or datetime.now(UTC)
+    bucket = bucket or _export_bucket()
+    purged = 0
+    with Session(bind=bind) as db:
+        jobs = (
+            db.query(DataExportJob)
+            .filter(DataExportJob.status == "completed", DataExportJob.expires_at < now)
+            .order_by(DataExportJob.expires_at)
+            .limit(limit)
+            .all()
+        )
+        for job in jobs:
+            if job.file_path:
+                try:
+                    bucket.blob(job.file_path).delete()
+                except NotFound:
+                    pass
+                except Exception:
+                    logger.exception("Could not delete export artifact %s.", job.file_path)
+                    continue
+            job.status = "expired"
+            job.file_path = None
+            purged += 1
+        db.commit()
+    if purged:
+        logger.info("Deleted %d expired CCPA export artifacts.", purged)
+    return purged
+
+
+def process_pending_export_jobs(
+    bind: Engine | Connection, *, limit: int = 10
+) -> dict[str, int]:
+    """
+    Pick up pending jobs that were not started in-process, and running jobs
+    whose lease expired because their worker died mid-export.
+    """
+    db = Session(bind=bind)
+    try:
+        job_ids = [
+            job_id
+            for (job_id,) in db.query(DataExportJob.id)
+            .filter(_claimable(datetime.now(UTC)))
+            .order_by(DataExportJob.created_at)
+            .limit(limit)
+            .all()
+        ]
+    finally:
+        db.close()
+
+    results = {"processed": 0, "completed": 0, "failed": 0}
+    for job_id in job_ids:
+        job = run_export_job(bind, job_id)
+        results["processed"] += 1
+        if job is not None and job.status == "completed":
+            results["completed"] += 1
+        elif job is not None and job.status == "failed":
+            results["failed"] += 1
+    return results
+
+
+__all__ = [
+    "EXPORT_BATCH_SIZE",
+    "create_export_job",
+    "iter_user_export",
+    "open_export_artifact",
+    "process_pending_export_jobs",
+    "purge_expired_export_artifacts",
+    "run_export_job",
+    "stream_user_export",
+]
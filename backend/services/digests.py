@@ -4,24 +4,34 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import deque
+from dataclasses import dataclass
 from datetime import UTC, date, datetime, time, timedelta
 from decimal import Decimal
 from zoneinfo import ZoneInfo
 
 from fastapi import HTTPException
 from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload, sessionmaker
 
+from backend.core.config import settings as app_settings
+from backend.core.executors import run_io
 from backend.models import DigestMessage, DigestSettings, Transaction, User
 from backend.services.ai import SAFETY_SETTINGS_LOCAL, get_ai_client
 from backend.services.email import get_email_client
+from backend.utils.database import read_session
 from backend.utils.encryption import encrypt_prompt
 
 logger = logging.getLogger(__name__)
 
 SUPPORTED_CADENCES = {"weekly", "monthly", "quarterly", "annually"}
 
+# User and DigestSettings eagerly select every relationship; the runner reads
+# only scalar columns, so skip that fan-out on its per-digest lookups.
+_NO_EAGER = lazyload("*")
+
 def _parse_hhmm(value: str) -> time:
     parts = value.strip().split(":")
     if len(parts) != 2:
@@ -166,7 +176,12 @@ def _compute_time_range_utc(*, now_utc: datetime, user_tz: ZoneInfo, cadence: st
 
 
 def ensure_digest_settings(db: Session, user: User) -> DigestSettings:
-    settings = db.query(DigestSettings).filter(DigestSettings.uid == user.uid).first()
+    settings = (
+        db.query(DigestSettings)
+        .options(_NO_EAGER)
+        .filter(DigestSettings.uid == user.uid)
+        .first()
+    )
     if settings:
         return settings
 
@@ -352,109 +367,272 @@ def _default_digest_prompt(*, timeframe_label: str, snapshot: dict[str, object])
     )
 
 
-def run_due_digests(db: Session, *, now_utc: datetime | None = None) -> int:
-    now = now_utc or datetime.now(UTC)
+@dataclass(frozen=True)
+class _PreparedDigest:
+    """Everything the AI call and the final write need, detached from any session."""
 
-    # Lock due rows to make the runner safe under parallel schedulers.
+    uid: str
+    period_key: str
+    prompt: str
+
+
+def _claim_due_digests(db: Session, *, now_utc: datetime, limit: int, lease_seconds: int) -> list[str]:
+    """
+    Lease up to ``limit`` due schedules and release their row locks right away.
+
+    The lease pushes ``next_send_at_utc`` past ``now`` so parallel runners skip the
+    rows; finishing a digest replaces it with the real next send time, and a runner
+    that dies mid-lease leaves the rows due again once the lease expires.
+    """
     due = (
         db.query(DigestSettings)
+        .options(_NO_EAGER)
         .filter(
             DigestSettings.enabled.is_(True),
             DigestSettings.next_send_at_utc.isnot(None),
-            DigestSettings.next_send_at_utc <= now,
+            DigestSettings.next_send_at_utc <= now_utc,
         )
+        .order_by(DigestSettings.next_send_at_utc)
+        .limit(limit)
         .with_for_update(skip_locked=True)
         .all()
     )
-
-    sent = 0
+    lease_until = now_utc + timedelta(seconds=lease_seconds)
     for settings in due:
+        settings.next_send_at_utc = lease_until
+    uids = [settings.uid for settings in due]
+    db.commit()
+    return uids
+
+
+def _reschedule_after_failure(db: Session, uid: str, *, now_utc: datetime) -> None:
+    """Best-effort: move schedule forward to avoid tight retry loops."""
+    settings = (
+        db.query(DigestSettings).options(_NO_EAGER).filter(DigestSettings.uid == uid).first()
+    )
+    if not settings:
+        return
+    user = db.query(User).options(_NO_EAGER).filter(User.uid == uid).first()
+    tz = _get_user_tz(user) if user else ZoneInfo("UTC")
+    settings.next_send_at_utc = compute_next_send_at_utc(
+        now_utc=now_utc + timedelta(minutes=10),
+        user_tz=tz,
+        cadence=settings.cadence,
+        send_time_local=settings.send_time_local,
+        weekly_day_of_week=getattr(settings, "weekly_day_of_week", 0),
+        day_of_month=getattr(settings, "day_of_month", 1),
+    )
+    db.add(settings)
+
+
+async def _generate_digest_text(client, prompt: str) -> str:
+    response_obj = await client.generate_content(
+        prompt,
+        safety_settings=SAFETY_SETTINGS_LOCAL if client.client_type == "local" else None,
+    )
+    response_text = ""
+    if getattr(response_obj, "candidates", None):
+        try:
+            response_text = response_obj.text
+        except Exception:
+            parts = [part.text for part in response_obj.candidates[0].content.parts]
+            response_text = "".join(parts)
+    return response_text
+
+
+async def _run_claimed_digest(
+    session_factory: sessionmaker,
+    uid: str,
+    *,
+    now_utc: datetime,
+    client,
+) -> int:
+    # Each transaction below runs to commit without awaiting, so transactions
+    # never interleave on the loop thread; only the AI call, encryption and the
+    # email send overlap with other digests.
+    db = session_factory()
+    try:
+        prepared = _prepare_digest(db, uid, now_utc=now_utc)
+        db.commit()
+        if prepared is None:
+            return 0
+
+        response_text = await _generate_digest_text(client, prepared.prompt)
+        # KMS round trips (or local key derivation) must not stall the other digests.
+        encrypted = await run_io(_encrypt_digest, prepared, response_text)
+
+        email_to = _finish_digest(db, prepared, encrypted, now_utc=now_utc)
+        db.commit()
+    except Exception:
+        logger.exception("Digest runner failed for uid=%s", uid)
+        db.rollback()
         try:
-            if _run_single_digest(db, settings.uid, now_utc=now) > 0:
-                sent += 1
+            _reschedule_after_failure(db, uid, now_utc=now_utc)
+            db.commit()
         except Exception:
-            logger.exception("Digest runner failed for uid=%s", settings.uid)
-            # Best-effort: move schedule forward to avoid tight retry loops.
-            user = db.query(User).filter(User.uid == settings.uid).first()
-            tz = _get_user_tz(user) if user else ZoneInfo("UTC")
-            settings.next_send_at_utc = compute_next_send_at_utc(
-                now_utc=now + timedelta(minutes=10),
-                user_tz=tz,
-                cadence=settings.cadence,
-                send_time_local=settings.send_time_local,
-                weekly_day_of_week=getattr(settings, "weekly_day_of_week", 0),
-                day_of_month=getattr(settings, "day_of_month", 1),
+            db.rollback()
+            logger.exception("Could not reschedule digest for uid=%s", uid)
+        return 0
+    finally:
+        db.close()
+
+    if email_to:
+        await _send_digest_email(email_to, response_text)
+    return 1
+
+
+async def _send_digest_email(email_to: str, response_text: str) -> None:
+    subject = "Your JuaLuma financial digest"
+    try:
+        await run_io(get_email_client().send_financial_digest, email_to, subject, response_text)
+    except Exception:
+        # The digest is already saved in-app; a failed email must not resend it.
+        logger.exception("Digest email delivery failed.")
+
+
+async def _run_due_digests_async(
+    session_factory: sessionmaker,
+    *,
+    now_utc: datetime,
+    lease_size: int,
+    lease_seconds: int,
+    ai_concurrency: int,
+) -> int:
+    client = None
+    claimed: deque[str] = deque()
+    claim_lock = asyncio.Lock()
+
+    async def next_uid() -> str | None:
+        nonlocal client
+        async with claim_lock:
+            if not claimed:
+                claim_db = session_factory()
+                try:
+                    claimed.extend(
+                        _claim_due_digests(
+                            claim_db,
+                            now_utc=now_utc,
+                            limit=lease_size,
+                            lease_seconds=lease_seconds,
+                        )
+                    )
+                finally:
+                    claim_db.close()
+            if not claimed:
+                return None
+            if client is None:
+                client = get_ai_client()
+            return claimed.popleft()
+
+    async def worker() -> int:
+        sent = 0
+        while (uid := await next_uid()) is not None:
+            sent += await _run_claimed_digest(
+                session_factory, uid, now_utc=now_utc, client=client
             )
-            db.add(settings)
+        return sent
 
-    db.commit()
-    return sent
+    # One AI call per worker at a time; workers refill from the next lease as
+    # soon as they are free instead of waiting for the whole lease to finish.
+    return sum(await asyncio.gather(*(worker() for _ in range(ai_concurrency))))
 
 
-def _run_single_digest(db: Session, uid: str, *, now_utc: datetime) -> int:
+def run_due_digests(
+    db: Session,
+    *,
+    now_utc: datetime | None = None,
+    lease_size: int | None = None,
+    ai_concurrency: int | None = None,
+) -> int:
     """
-    Generate + persist a digest if we haven't already sent one for the current cadence period.
-    Returns 1 if sent, 0 if skipped.
+    Generate every due digest, ``ai_concurrency`` AI calls at a time.
+
+    Schedules are claimed in leases of ``lease_size`` rows (see
+    ``_claim_due_digests``) and each digest commits on its own, so a slow model
+    call holds no row locks and a crash loses at most the digests in flight.
+    ``db`` only supplies the bind; every claim and digest uses its own session.
+    """
+    session_factory = sessionmaker(bind=db.get_bind(), autoflush=False)
+    return asyncio.run(
+        _run_due_digests_async(
+            session_factory,
+            now_utc=now_utc or datetime.now(UTC),
+            lease_size=lease_size or app_settings.digest_lease_size,
+            lease_seconds=app_settings.digest_lease_seconds,
+            ai_concurrency=ai_concurrency or app_settings.digest_ai_concurrency,
+        )
+    )
+
+
+def _prepare_digest(db: Session, uid: str, *, now_utc: datetime) -> _PreparedDigest | None:
     """
-    user = db.query(User).filter(User.uid == uid).first()
+    Build the prompt for a digest that is due for the current cadence period.
+    Returns None (after scheduling forward if needed) when nothing should be sent.
+    """
+    user = db.query(User).options(_NO_EAGER).filter(User.uid == uid).first()
     if not user:
-        return 0
+        return None
 
-    settings = ensure_digest_settings(db, user)
-    if not settings.enabled:
-        return 0
+    digest_settings = ensure_digest_settings(db, user)
+    if not digest_settings.enabled:
+        return None
 
     tz = _get_user_tz(user)
     local_now = now_utc.astimezone(tz)
-    period_key = _compute_period_key(local_now, settings.cadence)
+    period_key = _compute_period_key(local_now, digest_settings.cadence)
 
-    if settings.last_period_key == period_key:
+    if digest_settings.last_period_key == period_key:
         # Already ran for this period; just schedule forward.
-        settings.next_send_at_utc = compute_next_send_at_utc(
+        digest_settings.next_send_at_utc = compute_next_send_at_utc(
             now_utc=now_utc + timedelta(seconds=1),
             user_tz=tz,
-            cadence=settings.cadence,
-            send_time_local=settings.send_time_local,
-            weekly_day_of_week=settings.weekly_day_of_week,
-            day_of_month=settings.day_of_month,
+            cadence=digest_settings.cadence,
+            send_time_local=digest_settings.send_time_local,
+            weekly_day_of_week=digest_settings.weekly_day_of_week,
+            day_of_month=digest_settings.day_of_month,
         )
-        db.add(settings)
-        return 0
+        db.add(digest_settings)
+        return None
 
     start_utc, end_utc, tf_label = _compute_time_range_utc(
         now_utc=now_utc,
         user_tz=tz,
-        cadence=settings.cadence,
+        cadence=digest_settings.cadence,
     )
-    snapshot = _build_snapshot(db, uid, start_utc, end_utc)
+    with read_session(db, uid) as read_db:
+        snapshot = _build_snapshot(read_db, uid, start_utc, end_utc)
     prompt = _default_digest_prompt(timeframe_label=tf_label, snapshot=snapshot)
+    return _PreparedDigest(uid=uid, period_key=period_key, prompt=prompt)
 
-    client = get_ai_client()
-    # The AIClient wrapper is async; schedule runner is sync. Run in a small event loop.
-    import asyncio
 
-    response_obj = asyncio.run(
-        client.generate_content(
-            prompt,
-            safety_settings=SAFETY_SETTINGS_LOCAL if client.client_type == "local" else None,
-        )
+def _encrypt_digest(prepared: _PreparedDigest, response_text: str) -> tuple[bytes, bytes]:
+    uid = prepared.uid
+    return (
+        encrypt_prompt(prepared.prompt, user_dek_ref=uid).encode("utf-8"),
+        encrypt_prompt(response_text, user_dek_ref=uid).encode("utf-8"),
     )
 
-    response_text = ""
-    if getattr(response_obj, "candidates", None):
-        try:
-            response_text = response_obj.text
-        except Exception:
-            parts = [part.text for part in response_obj.candidates[0].content.parts]
-            response_text = "".join(parts)
 
-    encrypted_prompt = encrypt_prompt(prompt, user_dek_ref=uid).encode("utf-8")
-    encrypted_response = encrypt_prompt(response_text, user_dek_ref=uid).encode("utf-8")
+def _finish_digest(
+    db: Session,
+    prepared: _PreparedDigest,
+    encrypted: tuple[bytes, bytes],
+    *,
+    now_utc: datetime,
+) -> str | None:
+    """Persist the digest and advance the schedule; returns the address to email, if any."""
+    uid = prepared.uid
+    user = db.query(User).options(_NO_EAGER).filter(User.uid == uid).first()
+    digest_settings = (
+        db.query(DigestSettings).options(_NO_EAGER).filter(DigestSettings.uid == uid).one()
+    )
+    tz = _get_user_tz(user)
+    encrypted_prompt, encrypted_response = encrypted
 
     message = DigestMessage(
         uid=uid,
-        thread_id=settings.thread_id,
-        period_key=period_key,
+        thread_id=digest_settings.thread_id,
+        period_key=prepared.period_key,
         model="gemini",
         tokens=0,
         user_dek_ref=uid,
@@ -463,28 +641,47 @@ def _run_single_digest(db: Session, uid: str, *, now_utc: datetime) -> int:
     )
     db.add(message)
 
-    if settings.delivery_email and user.email:
-        subject = "Your JuaLuma financial digest"
-        get_email_client().send_financial_digest(user.email, subject, response_text)
-
-    settings.last_period_key = period_key
-    settings.last_sent_at_utc = now_utc
-    settings.next_send_at_utc = compute_next_send_at_utc(
+    digest_settings.last_period_key = prepared.period_key
+    digest_settings.last_sent_at_utc = now_utc
+    digest_settings.next_send_at_utc = compute_next_send_at_utc(
         now_utc=now_utc + timedelta(seconds=1),
         user_tz=tz,
-        cadence=settings.cadence,
-        send_time_local=settings.send_time_local,
-        weekly_day_of_week=settings.weekly_day_of_week,
-        day_of_month=settings.day_of_month,
+        cadence=digest_settings.cadence,
+        send_time_local=digest_settings.send_time_local,
+        weekly_day_of_week=digest_settings.weekly_day_of_week,
+        day_of_month=digest_settings.day_of_month,
     )
-    db.add(settings)
+    db.add(digest_settings)
+    if digest_settings.delivery_email and user.email:
+        return user.email
+    return None
+
+
+def _run_single_digest(db: Session, uid: str, *, now_utc: datetime) -> int:
+    """
+    Generate + persist a digest if we haven't already sent one for the current cadence period.
+    Returns 1 if sent, 0 if skipped. Does not commit.
+    """
+    prepared = _prepare_digest(db, uid, now_utc=now_utc)
+    if prepared is None:
+        return 0
+
+    # The AIClient wrapper is async; this path is sync. Run in a small event loop.
+    response_text = asyncio.run(_generate_digest_text(get_ai_client(), prepared.prompt))
+    email_to = _finish_digest(
+        db, prepared, _encrypt_digest(prepared, response_text), now_utc=now_utc
+    )
+    if email_to:
+        get_email_client().send_financial_digest(
+            email_to, "Your JuaLuma financial digest", response_text
+        )
     return 1
 
 
 def run_digest_now(db: Session, uid: str, *, now_utc: datetime | None = None) -> int:
     """Developer helper to generate a digest immediately (still idempotent per period)."""
     sent = _run_single_digest(db, uid, now_utc=now_utc or datetime.now(UTC))
-    # _run_single_digest intentionally doesn't commit so batch runners can control transactions.
+    # _run_single_digest intentionally doesn't commit so callers control the transaction.
     # For dev run-now, we want an immediate durable write.
     db.commit()
     return sent
@@ -1,5 +1,6 @@
 import base64
 import logging
+import threading
 import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -7,6 +8,7 @@ from typing import Any
 from typing import Protocol
 
 from backend.core import settings
+from backend.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +19,20 @@ SUPPORT_FROM_NAME = "JuaLuma Support"
 OTP_FROM_EMAIL = "noreply@jualuma.com"
 OTP_FROM_NAME = "JuaLuma Security"
 
+# Re-mint a static delegated token this long before it expires.
+GMAIL_TOKEN_REFRESH_SKEW_SECONDS = 300
+
+# Shared by every GmailApiEmailClient in the process: get_email_client() builds
+# a new client per call, so per-instance caches would never be hit.
+_gmail_credentials: TTLCache[tuple[Any, float | None]] = TTLCache(
+    "gmail_delegated_credentials", ttl_seconds=3600, max_entries=64
+)
+# (mailbox, alias) pairs already confirmed as the default send-as identity.
+_gmail_send_as_ready: TTLCache[bool] = TTLCache(
+    "gmail_send_as_ready", ttl_seconds=3600, max_entries=64
+)
+_thread_services = threading.local()
+
 
 class EmailClient(Protocol):
     def send_generic_alert(self, to_email: str, title: str) -> None:
@@ -358,7 +374,6 @@ class GmailApiEmailClient:
         self.otp_from_name = OTP_FROM_NAME
         self.otp_from_email = OTP_FROM_EMAIL
         self.otp_reply_to = self.otp_from_email
-        self._services: dict[tuple[str, bool], Any] = {}
 
     def _resolve_sender_user(self, impersonate_user: str | None = None) -> str:
         """Resolve effective delegated mailbox for Gmail API calls."""
@@ -370,10 +385,50 @@ class GmailApiEmailClient:
         impersonate_user: str | None = None,
         include_settings_scopes: bool = False,
     ):
+        """
+        Gmail API service for the delegated mailbox, reused across sends.
+
+        Credentials are shared process-wide (see ``_get_credentials``); the
+        discovery-built service wraps a non-thread-safe httplib2 client, so it is
+        cached per thread and rebuilt only when the credentials change.
+        """
+        from googleapiclient.discovery import build
+
         sender_user = self._resolve_sender_user(impersonate_user)
         cache_key = (sender_user, include_settings_scopes)
-        if cache_key in self._services:
-            return self._services[cache_key]
+        creds = self._get_credentials(sender_user, include_settings_scopes)
+        services = getattr(_thread_services, "services", None)
+        if services is None:
+            services = _thread_services.services = {}
+        cached = services.get(cache_key)
+        if cached is not None and cached[0] is creds:
+            return cached[1]
+        service = build("gmail", "v1", credentials=creds, cache_discovery=False)
+        services[cache_key] = (creds, service)
+        return service
+
+    def _get_credentials(self, sender_user: str, include_settings_scopes: bool):
+        """Delegated credentials, minted once and reused until shortly before expiry."""
+        cache_key = (sender_user, include_settings_scopes)
+        for _ in range(2):
+            creds, expires_at = _gmail_credentials.get_or_load(
+                cache_key,
+                lambda: self._mint_credentials(sender_user, include_settings_scopes),
+            )
+            if expires_at is None or expires_at - time.time() > GMAIL_TOKEN_REFRESH_SKEW_SECONDS:
+                return creds
+            _gmail_credentials.invalidate(cache_key)
+        return creds
+
+    def _mint_credentials(
+        self, sender_user: str, include_settings_scopes: bool
+    ) -> tuple[Any, float | None]:
+        """
+        Build delegated credentials for ``sender_user``.
+
+        Returns ``(credentials, expires_at)``; ``expires_at`` is set for the static
+        keyless token and None for credentials that refresh themselves.
+        """
         import json
         import os
 
@@ -382,7 +437,6 @@ class GmailApiEmailClient:
         from google.auth.transport.requests import Request
         from google.oauth2 import credentials as oauth2_credentials
         from google.oauth2 import service_account
-        from googleapiclient.discovery import build
         import requests
 
         sa_value = settings.google_application_credentials or os.environ.get(
@@ -409,89 +463,85 @@ class GmailApiEmailClient:
                 scopes=scopes,
                 subject=sender_user,
             )
-        else:
-            if normalized.endswith(".gserviceaccount.com") and "@" in normalized:
-                # Keyless path: mint a domain-wide delegated access token with explicit subject.
-                # This avoids provider-side sender fallback when the subject is not bound correctly.
-                env_backup = os.environ.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
-                try:
-                    source_creds, _ = google.auth.default(
-                        scopes=["https://www.googleapis.com/auth/cloud-platform"]
-                    )
-                finally:
-                    if env_backup is not None:
-                        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = env_backup
+            return creds, None
+        if not (normalized.endswith(".gserviceaccount.com") and "@" in normalized):
+            creds = service_account.Credentials.from_service_account_file(
+                normalized,
+                scopes=scopes,
+                subject=sender_user,
+            )
+            return creds, None
 
-                try:
-                    if not source_creds.valid:
-                        source_creds.refresh(Request())
-
-                    now = int(time.time())
-                    jwt_payload = {
-                        "iss": normalized,
-                        "scope": " ".join(scopes),
-                        "aud": "https://oauth2.googleapis.com/token",
-                        "exp": now + 3600,
-                        "iat": now,
-                        "sub": sender_user,
-                    }
-                    sign_resp = requests.post(
-                        f"https://iamcredentials.googleapis.com/v1/projects/-/serviceAccounts/{normalized}:signJwt",
-                        headers={
-                            "Authorization": f"Bearer {source_creds.token}",
-                            "Content-Type": "application/json",
-                        },
-                        json={"payload": json.dumps(jwt_payload)},
-                        timeout=20,
-                    )
-                    sign_resp.raise_for_status()
-                    signed_jwt = sign_resp.json().get("signedJwt")
-                    if not signed_jwt:
-                        raise RuntimeError("IAM signJwt response missing signedJwt.")
-
-                    token_resp = requests.post(
-                        "https://oauth2.googleapis.com/token",
-                        data={
-                            "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
-                            "assertion": signed_jwt,
-                        },
-                        timeout=20,
-                    )
-                    token_resp.raise_for_status()
-                    access_token = token_resp.json().get("access_token")
-                    if not access_token:
-                        raise RuntimeError("OAuth token exchange missing access_token.")
-
-                    creds = oauth2_credentials.Credentials(token=access_token)
-                    # Token is static; do not cache this service across sends.
-                    return build("gmail", "v1", credentials=creds, cache_discovery=False)
-                except Exception as token_exc:
-                    logger.warning(
-                        "Keyless delegated token exchange failed for sender_user=%s; "
-                        "falling back to impersonated_credentials subject flow: %s",
-                        sender_user,
-                        token_exc,
-                    )
-                    creds = impersonated_credentials.Credentials(
-                        source_credentials=source_creds,
-                        target_principal=normalized,
-                        target_scopes=scopes,
-                        subject=sender_user,
-                        lifetime=3600,
-                    )
-            else:
-                creds = service_account.Credentials.from_service_account_file(
-                    normalized,
-                    scopes=scopes,
-                    subject=sender_user,
-                )
-        self._services[cache_key] = build(
-            "gmail",
-            "v1",
-            credentials=creds,
-            cache_discovery=False,
-        )
-        return self._services[cache_key]
+        # Keyless path: mint a domain-wide delegated access token with explicit subject.
+        # This avoids provider-side sender fallback when the subject is not bound correctly.
+        env_backup = os.environ.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
+        try:
+            source_creds, _ = google.auth.default(
+                scopes=["https://www.googleapis.com/auth/cloud-platform"]
+            )
+        finally:
+            if env_backup is not None:
+                os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = env_backup
+
+        try:
+            if not source_creds.valid:
+                source_creds.refresh(Request())
+
+            now = int(time.time())
+            jwt_payload = {
+                "iss": normalized,
+                "scope": " ".join(scopes),
+                "aud": "https://oauth2.googleapis.com/token",
+                "exp": now + 3600,
+                "iat": now,
+                "sub": sender_user,
+            }
+            sign_resp = requests.post(
+                f"https://iamcredentials.googleapis.com/v1/projects/-/serviceAccounts/{normalized}:signJwt",
+                headers={
+                    "Authorization": f"Bearer {source_creds.token}",
+                    "Content-Type": "application/json",
+                },
+                json={"payload": json.dumps(jwt_payload)},
+                timeout=20,
+            )
+            sign_resp.raise_for_status()
+            signed_jwt = sign_resp.json().get("signedJwt")
+            if not signed_jwt:
+                raise RuntimeError("IAM signJwt response missing signedJwt.")
+
+            token_resp = requests.post(
+                "https://oauth2.googleapis.com/token",
+                data={
+                    "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
+                    "assertion": signed_jwt,
+                },
+                timeout=20,
+            )
+            token_resp.raise_for_status()
+            token_payload = token_resp.json()
+            access_token = token_payload.get("access_token")
+            if not access_token:
+                raise RuntimeError("OAuth token exchange missing access_token.")
+
+            # The token is static (no refresh); it is re-minted once close to expiry.
+            expires_at = now + int(token_payload.get("expires_in") or 3600)
+            return oauth2_credentials.Credentials(token=access_token), float(expires_at)
+        except Exception as token_exc:
+            logger.warning(
+                "Keyless delegated token exchange failed for sender_user=%s; "
+                "falling back to impersonated_credentials subject flow: %s",
+                sender_user,
+                token_exc,
+            )
+            creds = impersonated_credentials.Credentials(
+                source_credentials=source_creds,
+                target_principal=normalized,
+                target_scopes=scopes,
+                subject=sender_user,
+                lifetime=3600,
+            )
+            return creds, None
 
     def _build_message(
         self,
@@ -533,17 +583,19 @@ class GmailApiEmailClient:
         try:
             sender_user = self._resolve_sender_user(impersonate_user)
             service = self._get_service(sender_user, include_settings_scopes=False)
-            if preferred_from_email:
+            send_as_key = (sender_user, (preferred_from_email or "").strip().lower())
+            if preferred_from_email and not _gmail_send_as_ready.get(send_as_key):
                 try:
                     settings_service = self._get_service(
                         sender_user,
                         include_settings_scopes=True,
                     )
-                    self._ensure_send_as_default(
+                    if self._ensure_send_as_default(
                         service=settings_service,
                         sender_user=sender_user,
                         preferred_from_email=preferred_from_email,
-                    )
+                    ):
+                        _gmail_send_as_ready.set(send_as_key, True)
                 except Exception as exc:
                     logger.warning(
                         "GMAIL_SENDAS_SERVICE_UNAVAILABLE sender_user=%s preferred=%s error=%s",
@@ -566,8 +618,11 @@ class GmailApiEmailClient:
         service: Any,
         sender_user: str,
         preferred_from_email: str,
-    ) -> None:
-        """Ensure Gmail sends from the preferred alias when available."""
+    ) -> bool:
+        """
+        Ensure Gmail sends from the preferred alias when available.
+        Returns True once the alias is the mailbox default.
+        """
         target = preferred_from_email.strip().lower()
         try:
             send_as_entries = (
@@ -585,7 +640,7 @@ class GmailApiEmailClient:
                 target,
                 exc,
             )
-            return
+            return False
 
         preferred = next(
             (
@@ -640,9 +695,9 @@ class GmailApiEmailClient:
                     [entry.get("sendAsEmail") for entry in send_as_entries],
                     exc,
                 )
-                return
+                return False
         if preferred.get("isDefault"):
-            return
+            return True
 
         try:
             service.users().settings().sendAs().patch(
@@ -662,6 +717,8 @@ class GmailApiEmailClient:
                 target,
                 exc,
             )
+            return False
+        return True
 
     def send_generic_alert(self, to_email: str, title: str) -> None:
         body = (
@@ -0,0 +1,319 @@
+"""
+Transactional email outbox.
+
+``enqueue_email`` adds a message to ``email_outbox`` inside the caller's
+transaction, so an email exists exactly when the change that triggered it
+commits and the request never waits on the mail provider. Enqueueing a
+``message_key`` that is already in the outbox does nothing.
+
+``deliver_pending_emails`` claims due rows under a short lease, sends them
+concurrently and reschedules failures with exponential backoff. It runs as a
+background task after the request that enqueued (``schedule_email_delivery``)
+and from the jobs endpoint, which picks up retries and rows left behind by a
+worker that died mid-lease. Delivery is at-least-once: a worker that dies
+after the provider accepted a message but before marking it sent will send it
+again once the lease expires.
+
+``purge_finished_emails`` deletes sent, failed and expired rows once they are
+older than ``EMAIL_OUTBOX_RETENTION_DAYS``; the jobs endpoint runs it after
+each delivery pass so the table only holds recent history.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from fastapi import BackgroundTasks
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.executors import get_io_executor, run_db
+from backend.models import EmailOutbox
+from backend.services.email import EmailClient, get_email_client
+
+logger = logging.getLogger(__name__)
+
+EMAIL_PENDING = "pending"
+EMAIL_SENT = "sent"
+EMAIL_FAILED = "failed"
+EMAIL_EXPIRED = "expired"
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+PURGE_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class _ClaimedEmail:
+    id: uuid.UUID
+    kind: str
+    to_email: str
+    payload: dict[str, Any]
+    attempts: int
+
+
+def enqueue_email(
+    db: Session,
+    kind: str,
+    to_email: str,
+    *,
+    message_key: str,
+    expires_at: datetime | None = None,
+    **kwargs: Any,
+) -> None:
+    """
+    Add ``EmailClient.<kind>(to_email, **kwargs)`` to the outbox in ``db``'s
+    current transaction. The caller commits; nothing is sent before that.
+    """
+    if not callable(getattr(EmailClient, kind, None)):
+        raise ValueError(f"Unknown email kind: {kind}")
+
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    db.execute(
+        insert(EmailOutbox)
+        .values(
+            id=uuid.uuid4(),
+            message_key=message_key,
+            kind=kind,
+            to_email=to_email,
+            payload_json=kwargs,
+            status=EMAIL_PENDING,
+            attempts=0,
+            next_attempt_at=datetime.now(UTC),
+            expires_at=expires_at,
+        )
+        .on_conflict_do_nothing(index_elements=[EmailOutbox.message_key])
+    )
+
+
+def schedule_email_delivery(background_tasks: BackgroundTasks | None, db: Session) -> None:
+    """Drain the outbox once the response has been sent."""
+    if background_tasks is not None:
+        background_tasks.add_task(run_db, deliver_pending_emails, db.get_bind())
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def _claim_due_emails(
+    db: Session, *, now: datetime, limit: int, lease_seconds: int
+) -> list[_ClaimedEmail]:
+    """
+    Lease up to ``limit`` due rows and release their row locks right away.
+
+    The lease pushes ``next_attempt_at`` past ``now`` so parallel workers skip
+    the rows; stale one-time messages are expired instead of claimed.
+    """
+    due = db.scalars(
+        select(EmailOutbox)
+        .where(EmailOutbox.status == EMAIL_PENDING, EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    lease_until = now + timedelta(seconds=lease_seconds)
+    claimed: list[_ClaimedEmail] = []
+    for row in due:
+        expires_at = row.expires_at
+        if expires_at is not None and _as_utc(expires_at) <= now:
+            row.status = EMAIL_EXPIRED
+            continue
+        row.attempts += 1
+        row.next_attempt_at = lease_until
+        claimed.append(
+            _ClaimedEmail(
+                id=row.id,
+                kind=row.kind,
+                to_email=row.to_email,
+                payload=dict(row.payload_json or {}),
+                attempts=row.attempts,
+            )
+        )
+    db.commit()
+    return claimed
+
+
+def _as_utc(ts: datetime) -> datetime:
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=UTC)
+    return ts.astimezone(UTC)
+
+
+def _send(email: _ClaimedEmail) -> str | None:
+    """Send one message; the error text on failure."""
+    try:
+        getattr(get_email_client(), email.kind)(email.to_email, **email.payload)
+    except Exception as exc:
+        logger.warning(
+            "Outbox email %s (%s) failed on attempt %d: %s",
+            email.id,
+            email.kind,
+            email.attempts,
+            exc,
+        )
+        return str(exc)[:1000] or exc.__class__.__name__
+    return None
+
+
+def _send_all(claimed: list[_ClaimedEmail], concurrency: int) -> list[str | None]:
+    """
+    Send on the shared IO pool, at most ``concurrency`` at a time.
+
+    The pool's threads outlive the drain, so each keeps its cached provider
+    client (see ``backend.services.email``) across drains.
+    """
+    slots = threading.BoundedSemaphore(concurrency)
+    futures = []
+    for email in claimed:
+        slots.acquire()
+        future = get_io_executor().submit(_send, email)
+        future.add_done_callback(lambda _: slots.release())
+        futures.append(future)
+    return [future.result() for future in futures]
+
+
+def _record_outcomes(
+    db: Session,
+    outcomes: list[tuple[_ClaimedEmail, str | None]],
+    *,
+    now: datetime,
+    max_attempts: int,
+    counts: dict[str, int],
+) -> None:
+    for email, error in outcomes:
+        row = db.get(EmailOutbox, email.id)
+        if row is None:
+            continue
+        if error is None:
+            row.status = EMAIL_SENT
+            row.sent_at = now
+            row.last_error = None
+            counts["sent"] += 1
+        elif email.attempts >= max_attempts:
+            row.status = EMAIL_FAILED
+            row.last_error = error
+            counts["failed"] += 1
+            logger.error("Outbox email %s (%s) gave up after %d attempts.", email.id, email.kind, email.attempts)
+        else:
+            row.next_attempt_at = now + _retry_delay(email.attempts)
+            row.last_error = error
+            counts["retried"] += 1
+    db.commit()
+
+
+def deliver_pending_emails(
+    bind: Engine,
+    *,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+    max_attempts: int | None = None,
+    max_batches: int = 1,
+) -> dict[str, int]:
+    """
+    Send due outbox rows, ``concurrency`` provider calls at a time.
+
+    Failed sends are retried with exponential backoff until ``max_attempts``,
+    then marked failed. Runs up to ``max_batches`` claims, stopping early once
+    a claim comes back short.
+    """
+    batch_size = batch_size or settings.email_outbox_batch_size
+    concurrency = concurrency or settings.email_outbox_concurrency
+    max_attempts = max_attempts or settings.email_outbox_max_attempts
+    lease_seconds = settings.email_outbox_lease_seconds
+
+    counts = {"sent": 0, "retried": 0, "failed": 0}
+    for _ in range(max_batches):
+        claimed_at = now or datetime.now(UTC)
+        with Session(bind=bind) as db:
+            claimed = _claim_due_emails(
+                db, now=claimed_at, limit=batch_size, lease_seconds=lease_seconds
+            )
+        if not claimed:
+            break
+
+        errors = _send_all(claimed, concurrency)
+
+        with Session(bind=bind) as db:
+            _record_outcomes(
+                db,
+                list(zip(claimed, errors, strict=True)),
+                now=now or datetime.now(UTC),
+                max_attempts=max_attempts,
+                counts=counts,
+            )
+        if len(claimed) < batch_size:
+            break
+
+    if any(counts.values()):
+        logger.info(
+            "Delivered outbox emails (sent=%d retried=%d failed=%d).",
+            counts["sent"],
+            counts["retried"],
+            counts["failed"],
+        )
+    return counts
+
+
+def purge_finished_emails(
+    bind: Engine,
+    *,
+    now: datetime | None = None,
+    retention_days: int | None = None,
+    batch_size: int = PURGE_BATCH_SIZE,
+) -> int:
+    """
+    Delete sent, failed and expired rows created more than ``retention_days`` ago.
+
+    Deletes in batches with a commit per batch; returns the rows deleted.
+    Pending rows are never touched, however old.
+    """
+    retention_days = retention_days or settings.email_outbox_retention_days
+    cutoff = (now or datetime.now(UTC)) - timedelta(days=retention_days)
+    purged = 0
+    while True:
+        batch_ids = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.status.in_((EMAIL_SENT, EMAIL_FAILED, EMAIL_EXPIRED)),
+                EmailOutbox.created_at < cutoff,
+            )
+            .limit(batch_size)
+        )
+        with Session(bind=bind) as db:
+            deleted = db.execute(
+                delete(EmailOutbox)
+                .where(EmailOutbox.id.in_(batch_ids))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        purged += deleted
+        if deleted < batch_size:
+            break
+
+    if purged:
+        logger.info("Purged %d finished outbox emails older than %s.", purged, cutoff)
+    return purged
+
+
+__all__ = [
+    "EMAIL_EXPIRED",
+    "EMAIL_FAILED",
+    "EMAIL_PENDING",
+    "EMAIL_SENT",
+    "deliver_pending_emails",
+    "enqueue_email",
+    "purge_finished_emails",
+    "schedule_email_delivery",
+]
@@ -0,0 +1,348 @@
+"""Core Purpose: Batch embedding pipeline for Transaction.embedding (RAG vector search)."""
+
+# Last Updated: 2026-10-19 00:00 CST
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import re
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Any, Protocol
+
+from sqlalchemy import bindparam, func, inspect, select, update
+from sqlalchemy.orm import InstanceState, Session
+
+from backend.core import settings
+from backend.models import Transaction
+from backend.utils.gcp_credentials import get_adc_credentials
+
+logger = logging.getLogger(__name__)
+
+try:
+    import vertexai
+    from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
+except ImportError:  # pragma: no cover - optional dependency
+    vertexai = None  # type: ignore[assignment]
+    TextEmbeddingInput = None  # type: ignore[assignment,misc]
+    TextEmbeddingModel = None  # type: ignore[assignment,misc]
+
+EMBEDDING_DIMENSION = 768
+# Changing any of these changes the embedded text, so the row is re-queued.
+EMBEDDED_FIELDS = ("ts", "amount", "currency", "category", "merchant_name", "description")
+BACKFILL_FLAG_CHUNK_SIZE = 5000
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class EmbeddingProvider(Protocol):
+    name: str
+    dimension: int
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Return one vector per input text, in order."""
+        ...
+
+
+class LocalHashingEmbeddingProvider:
+    """
+    Deterministic feature-hashing embeddings for tests and local development.
+
+    Vectors are not comparable with Cloud SQL ``embedding()`` query vectors,
+    so semantic ranking is only meaningful against other local vectors.
+    """
+
+    name = "local"
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION):
+        self.dimension = dimension
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimension
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "big") % self.dimension
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector))
+        if not norm:
+            return vector
+        return [value / norm for value in vector]
+
+
+class VertexEmbeddingProvider:
+    """Vertex AI text embeddings; matches the model Cloud SQL uses for queries."""
+
+    name = "vertex"
+
+    def __init__(self, model_name: str, dimension: int = EMBEDDING_DIMENSION):
+        if vertexai is None or TextEmbeddingModel is None:
+            raise ImportError("google.cloud.aiplatform package is missing.")
+        credentials, detected_project = get_adc_credentials(
+            scopes=["https://www.googleapis.com/auth/cloud-platform"]
+        )
+        vertexai.init(
+            project=settings.resolved_gcp_project_id or detected_project,
+            location=settings.gcp_location,
+            credentials=credentials,
+        )
+        self.dimension = dimension
+        self._model = TextEmbeddingModel.from_pretrained(model_name)
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        inputs: list[str | TextEmbeddingInput] = [
+            TextEmbeddingInput(text, "RETRIEVAL_DOCUMENT") for text in texts
+        ]
+        return [list(result.values) for result in self._model.get_embeddings(inputs)]
+
+
+_provider: EmbeddingProvider | None = None
+
+
+def get_embedding_provider() -> EmbeddingProvider:
+    global _provider
+    if _provider is None:
+        provider_name = (settings.embedding_provider or "vertex").lower()
+        if provider_name == "local":
+            _provider = LocalHashingEmbeddingProvider()
+        elif provider_name == "vertex":
+            _provider = VertexEmbeddingProvider(settings.embedding_model)
+        else:
+            raise ValueError(f"Unsupported EMBEDDING_PROVIDER: {provider_name}")
+        logger.info("Initialized %s embedding provider.", _provider.name)
+    return _provider
+
+
+def transaction_embedding_text(txn: Any) -> str:
+    """Text embedded for a transaction row (ORM object or selected row)."""
+    merchant = txn.merchant_name or ""
+    description = txn.description or ""
+    parts = [merchant or description or "Transaction"]
+    if description and description != merchant:
+        parts.append(description)
+    if txn.category:
+        parts.append(f"Category: {txn.category}")
+    if txn.amount is not None:
+        direction = "expense" if txn.amount < 0 else "income"
+        parts.append(f"Amount: {abs(float(txn.amount)):.2f} {txn.currency} {direction}")
+    if txn.ts is not None:
+        parts.append(f"Date: {txn.ts.strftime('%Y-%m-%d')}")
+    return " | ".join(parts)
+
+
+def mark_embedding_needed(txn: Transaction) -> bool:
+    """
+    Queue an existing transaction for re-embedding if an embedded field changed.
+
+    Sync paths call this instead of embedding inline; new rows are queued by
+    the column's server default.
+    """
+    state: InstanceState[Transaction] = inspect(txn)
+    if not state.persistent:
+        return False
+    if any(state.attrs[field].history.has_changes() for field in EMBEDDED_FIELDS):
+        txn.embedding_needed_at = datetime.now(UTC)
+        return True
+    return False
+
+
+def _embed_isolating(
+    provider: EmbeddingProvider, rows: list[Any], progress: dict[str, bool]
+) -> list[tuple[Any, list[float] | None]]:
+    """
+    Embed ``rows``, bisecting a batch the provider rejects so that a row it
+    rejects on its own comes back with ``None`` instead of failing its
+    neighbours.
+
+    Once both halves of a split have failed without any call in the batch
+    succeeding, the provider is treated as down and the error is re-raised.
+    """
+    try:
+        vectors = provider.embed_texts([transaction_embedding_text(row) for row in rows])
+        if len(vectors) != len(rows):
+            raise ValueError(
+                f"Embedding provider returned {len(vectors)} vectors for {len(rows)} rows."
+            )
+    except Exception as exc:
+        if len(rows) == 1:
+            logger.warning("Embedding provider rejected transaction %s: %s", rows[0].id, exc)
+            return [(rows[0], None)]
+        middle = len(rows) // 2
+        results = _embed_isolating(provider, rows[:middle], progress)
+        results += _embed_isolating(provider, rows[middle:], progress)
+        if not progress["succeeded"]:
+            raise
+        return results
+    progress["succeeded"] = True
+    return list(zip(rows, vectors, strict=True))
+
+
+def process_transaction_embeddings(
+    db: Session,
+    *,
+    provider: EmbeddingProvider | None = None,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+) -> dict[str, Any]:
+    """
+    Embed queued transactions in batches, oldest request first.
+
+    Each batch is claimed with ``FOR UPDATE SKIP LOCKED`` so concurrent
+    workers do not embed the same rows, and is committed on its own. A row the
+    provider rejects is isolated by bisecting its batch and pushed back by
+    ``EMBEDDING_RETRY_DELAY_SECONDS`` so it does not block the queue; a
+    provider outage stops the run and leaves the batch queued.
+    """
+    provider = provider or get_embedding_provider()
+    effective_batch_size = batch_size or settings.embedding_batch_size
+    table = Transaction.__table__
+
+    metrics: dict[str, Any] = {
+        "provider": provider.name,
+        "batches": 0,
+        "embedded": 0,
+        "failed": 0,
+        "provider_seconds": 0.0,
+    }
+    started = time.perf_counter()
+
+    while max_batches is None or metrics["batches"] < max_batches:
+        now = datetime.now(UTC)
+        rows = db.execute(
+            select(
+                Transaction.id,
+                Transaction.embedding_needed_at,
+                Transaction.ts,
+                Transaction.amount,
+                Transaction.currency,
+                Transaction.category,
+                Transaction.merchant_name,
+                Transaction.description,
+            )
+            .where(Transaction.embedding_needed_at <= now)
+            .order_by(Transaction.embedding_needed_at)
+            .limit(effective_batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            break
+
+        provider_started = time.perf_counter()
+        try:
+            results = _embed_isolating(provider, list(rows), {"succeeded": False})
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Transaction embedding batch failed (%d rows).", len(rows))
+            metrics["failed"] += len(rows)
+            metrics["error"] = str(exc)
+            break
+        metrics["provider_seconds"] += time.perf_counter() - provider_started
+
+        # Only touch a row that was not re-queued while we embedded it;
+        # updated_at is pinned so embedding does not look like a user edit.
+        embedded = [
+            {"b_id": row.id, "b_needed_at": row.embedding_needed_at, "b_embedding": vector}
+            for row, vector in results
+            if vector is not None
+        ]
+        rejected = [
+            {"b_id": row.id, "b_needed_at": row.embedding_needed_at}
+            for row, vector in results
+            if vector is None
+        ]
+        embedded_count = deferred_count = 0
+        if embedded:
+            embedded_count = db.execute(
+                update(table)
+                .where(
+                    table.c.id == bindparam("b_id"),
+                    table.c.embedding_needed_at <= bindparam("b_needed_at"),
+                )
+                .values(
+                    embedding=bindparam("b_embedding"),
+                    embedding_needed_at=None,
+                    updated_at=table.c.updated_at,
+                ),
+                embedded,
+            ).rowcount
+        if rejected:
+            retry_at = now + timedelta(seconds=settings.embedding_retry_delay_seconds)
+            deferred_count = db.execute(
+                update(table)
+                .where(
+                    table.c.id == bindparam("b_id"),
+                    table.c.embedding_needed_at <= bindparam("b_needed_at"),
+                )
+                .values(embedding_needed_at=retry_at, updated_at=table.c.updated_at),
+                rejected,
+            ).rowcount
+        db.commit()
+        metrics["batches"] += 1
+        metrics["embedded"] += embedded_count
+        metrics["failed"] += len(rejected)
+        if embedded_count + deferred_count <= 0:
+            break
+
+    elapsed = time.perf_counter() - started
+    metrics["elapsed_seconds"] = round(elapsed, 3)
+    metrics["provider_seconds"] = round(metrics["provider_seconds"], 3)
+    metrics["rows_per_second"] = round(metrics["embedded"] / elapsed, 2) if elapsed else 0.0
+    if metrics["batches"] or metrics["failed"]:
+        logger.info(
+            "Transaction embeddings: embedded=%d failed=%d batches=%d rows_per_second=%.1f",
+            metrics["embedded"],
+            metrics["failed"],
+            metrics["batches"],
+            metrics["rows_per_second"],
+        )
+    return metrics
+
+
+def backfill_transaction_embeddings(
+    db: Session,
+    *,
+    provider: EmbeddingProvider | None = None,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+    flag_chunk_size: int = BACKFILL_FLAG_CHUNK_SIZE,
+) -> dict[str, Any]:
+    """Queue every transaction without an embedding, then drain the queue."""
+    table = Transaction.__table__
+    flagged = 0
+    while True:
+        pending_ids = (
+            select(table.c.id)
+            .where(table.c.embedding.is_(None), table.c.embedding_needed_at.is_(None))
+            .limit(flag_chunk_size)
+        )
+        result = db.execute(
+            update(table)
+            .where(table.c.id.in_(pending_ids))
+            .values(embedding_needed_at=func.now(), updated_at=table.c.updated_at)
+        )
+        db.commit()
+        flagged += max(result.rowcount, 0)
+        if result.rowcount < flag_chunk_size:
+            break
+
+    metrics = process_transaction_embeddings(
+        db, provider=provider, batch_size=batch_size, max_batches=max_batches
+    )
+    metrics["flagged"] = flagged
+    return metrics
+
+
+__all__ = [
+    "EmbeddingProvider",
+    "LocalHashingEmbeddingProvider",
+    "VertexEmbeddingProvider",
+    "backfill_transaction_embeddings",
+    "get_embedding_provider",
+    "mark_embedding_needed",
+    "process_transaction_embeddings",
+    "transaction_embedding_text",
+]
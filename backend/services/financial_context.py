@@ -6,7 +6,10 @@ Uses pgvector cosine similarity search with Cloud SQL embedding() function,
 enforces RLS for user-data isolation, and formats structured context for prompts.
 """
 
+import asyncio
 import logging
+import time
+from collections.abc import Callable
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 from pathlib import Path
@@ -14,9 +17,12 @@ from typing import Any
 from uuid import UUID
 from xml.etree import ElementTree
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session
 
+from backend.core import settings
+from backend.core.executors import run_db
 from backend.models import (
     Account,
     ManualAsset,
@@ -24,8 +30,10 @@ from backend.models import (
     SupportTicket,
     Transaction,
     UserDocument,
+    engine,
     get_session,
 )
+from backend.utils.cache import TTLCache
 from backend.utils.rls import set_db_user_context
 
 logger = logging.getLogger(__name__)
@@ -42,6 +50,32 @@ UPLOAD_CONTEXT_MAX_CHARS_PER_DOC = 1800
 UPLOAD_CONTEXT_QUERY_TOKEN_MIN_LEN = 3
 
 
+_MISSING = object()
+# Transaction-scoped, like the RLS setting it follows.
+_SECTION_STATEMENT_TIMEOUT = text("SELECT set_config('statement_timeout', :timeout, true)")
+# Accounts, subscription and support change rarely relative to chat turns.
+# Their write paths (account link/edit/delete, plan changes, ticket status)
+# invalidate the user's entry; changes those paths don't cover, such as
+# balances refreshed by a sync or a write served by another instance, show up
+# once the TTL lapses.
+_SECTION_CACHE: TTLCache[dict[str, Any]] = TTLCache(
+    "ai_context_sections", ttl_seconds=settings.ai_context_cache_ttl_seconds, max_entries=4096
+)
+# Excerpts are keyed by file mtime/size, so a longer TTL is safe.
+_EXCERPT_CACHE: TTLCache[tuple[str | None, str | None]] = TTLCache(
+    "ai_context_document_excerpts", ttl_seconds=600, max_entries=2048
+)
+
+
+def invalidate_financial_context_cache(user_id: str | None = None) -> None:
+    """Drop cached context sections for one user (or everyone)."""
+    for cache in (_SECTION_CACHE, _EXCERPT_CACHE):
+        if user_id is None:
+            cache.clear()
+        else:
+            cache.invalidate_where(lambda key: key[0] == user_id)
+
+
 async def get_financial_context(
     user_id: str,
     query: str,
@@ -54,10 +88,15 @@ async def get_financial_context(
     Retrieves relevant financial context for AI prompt injection.
     Combines vector similarity search with spending summary for richer context.
 
+    Sections are independent, so each runs concurrently on its own session
+    with a per-section timeout; a slow or failing section is left out rather
+    than delaying the whole prompt. Account, subscription and support
+    summaries are cached per user for a short TTL.
+
     Args:
         user_id: Unified User ID for RLS enforcement.
         query: User's natural language query.
-        db: Optional SQLAlchemy session (creates one if None).
+        db: Optional SQLAlchemy session; only its bind is used.
         top_k: Number of similar transactions to retrieve.
         days: Lookback window in days.
 
@@ -67,44 +106,42 @@ async def get_financial_context(
     if not query:
         return ""
 
-    local_session = False
-    try:
-        if db is None:
-            session_gen = get_session()
-            db = next(session_gen)
-            local_session = True
-
-        # Enforce RLS
-        set_db_user_context(db, user_id)
-
-        cutoff = datetime.now(UTC) - timedelta(days=days)
-
-        # 1. Vector similarity search — server-side embedding via Cloud SQL
-        similar_txns = _vector_search(db, user_id, query, cutoff, top_k)
-
-        # 2. Spending summary by category
-        spending_summary = _spending_summary(db, user_id, cutoff)
-
-        # 3. Account + net worth + subscription + support context
-        account_summary = _account_summary(db, user_id)
-        support_summary = _support_summary(db, user_id)
-        subscription_summary = _subscription_summary(db, user_id)
-        uploaded_file_context, upload_audit = _uploaded_documents_context(
-            db,
+    bind = db.get_bind() if db is not None else engine
+    cutoff = datetime.now(UTC) - timedelta(days=days)
+
+    (
+        similar_txns,
+        spending_summary,
+        account_summary,
+        support_summary,
+        subscription_summary,
+        uploaded,
+    ) = await asyncio.gather(
+        _context_section(bind, user_id, "transactions", _vector_search, query, cutoff, top_k),
+        _context_section(bind, user_id, "spending", _spending_summary, cutoff),
+        _context_section(bind, user_id, "accounts", _account_summary, cache=True),
+        _context_section(bind, user_id, "support", _support_summary, cache=True),
+        _context_section(bind, user_id, "subscription", _subscription_summary, cache=True),
+        _context_section(
+            bind,
             user_id,
+            "documents",
+            _uploaded_documents_context,
             attachment_ids=attachment_ids,
             query=query,
-        )
+        ),
+    )
 
-        # 4. Format combined context
-        context_str = _format_context(
-            transactions=similar_txns,
-            spending_summary=spending_summary,
-            account_summary=account_summary,
-            support_summary=support_summary,
-            subscription_summary=subscription_summary,
-            uploaded_file_context=uploaded_file_context,
-        )
+    uploaded_file_context, upload_audit = uploaded or ("", None)
+    context_str = _format_context(
+        transactions=similar_txns or [],
+        spending_summary=spending_summary or [],
+        account_summary=account_summary,
+        support_summary=support_summary,
+        subscription_summary=subscription_summary,
+        uploaded_file_context=uploaded_file_context,
+    )
+    if upload_audit is not None:
         logger.info(
             "AI_UPLOAD_CONTEXT_ASSEMBLY uid=%s docs_considered=%s docs_included=%s skip_reasons=%s",
             user_id,
@@ -112,19 +149,77 @@ async def get_financial_context(
             upload_audit["included"],
             upload_audit["skip_reasons"],
         )
-        return context_str
+    return context_str
 
-    except Exception as e:
-        logger.error(f"Financial context retrieval failed: {e}", exc_info=True)
-        if db is not None:
-            try:
-                db.rollback()
-            except Exception:
-                pass
-        return ""
+
+async def _context_section(
+    bind: Engine | Connection,
+    user_id: str,
+    name: str,
+    builder: Callable[..., Any],
+    *args: Any,
+    cache: bool = False,
+    **kwargs: Any,
+) -> Any:
+    """Run one context section on the DB executor; None if it fails or times out."""
+    key = (user_id, name)
+    if cache:
+        cached = _SECTION_CACHE.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(
+            run_db(_run_section, bind, user_id, builder, *args, **kwargs),
+            timeout=settings.ai_context_section_timeout_seconds,
+        )
+    except TimeoutError:
+        logger.warning(
+            "AI_CONTEXT_SECTION_TIMEOUT uid=%s section=%s timeout_s=%s",
+            user_id,
+            name,
+            settings.ai_context_section_timeout_seconds,
+        )
+        return None
+    except Exception as exc:
+        logger.error(
+            "Financial context section %s failed: %s", name, exc, exc_info=True
+        )
+        return None
+
+    logger.debug(
+        "AI_CONTEXT_SECTION uid=%s section=%s elapsed_ms=%.1f",
+        user_id,
+        name,
+        (time.perf_counter() - started) * 1000,
+    )
+    if cache:
+        _SECTION_CACHE.set(key, result)
+    return result
+
+
+def _run_section(
+    bind: Engine | Connection,
+    user_id: str,
+    builder: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+) -> Any:
+    db = Session(bind=bind, autoflush=False)
+    try:
+        # Enforce RLS
+        set_db_user_context(db, user_id)
+        if bind.dialect.name == "postgresql":
+            # wait_for only stops waiting; this cancels the query itself so a
+            # timed-out section frees its executor thread and connection.
+            db.execute(
+                _SECTION_STATEMENT_TIMEOUT,
+                {"timeout": f"{int(settings.ai_context_section_timeout_seconds * 1000)}ms"},
+            )
+        return builder(db, user_id, *args, **kwargs)
     finally:
-        if local_session and db is not None:
-            db.close()
+        db.close()
 
 
 async def get_uploaded_documents_context(
@@ -136,6 +231,25 @@ async def get_uploaded_documents_context(
     query: str | None = None,
 ) -> str:
     """Fetch only uploaded-file context for prompt injection."""
+    return await run_db(
+        _build_uploaded_documents_context,
+        user_id,
+        db,
+        max_docs=max_docs,
+        max_chars_per_doc=max_chars_per_doc,
+        attachment_ids=attachment_ids,
+        query=query,
+    )
+
+
+def _build_uploaded_documents_context(
+    user_id: str,
+    db: Session | None,
+    max_docs: int,
+    max_chars_per_doc: int,
+    attachment_ids: list[str] | None,
+    query: str | None,
+) -> str:
     local_session = False
     try:
         if db is None:
@@ -420,9 +534,27 @@ def _document_excerpt_for_context(
     doc: UserDocument, max_chars: int
 ) -> tuple[str | None, str | None]:
     path = Path(doc.file_path)
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except OSError:
         return None, "DOC_FILE_MISSING"
 
+    # Re-reading every upload on each chat turn dominated context latency;
+    # the stat-based key picks up replaced files without explicit invalidation.
+    key = (doc.uid, doc.id, stat.st_mtime_ns, stat.st_size, max_chars)
+    cached = _EXCERPT_CACHE.get(key, _MISSING)
+    if cached is not _MISSING:
+        return cached
+
+    result = _read_document_excerpt(doc, path, max_chars)
+    if result[1] != "DOC_READ_ERROR":
+        _EXCERPT_CACHE.set(key, result)
+    return result
+
+
+def _read_document_excerpt(
+    doc: UserDocument, path: Path, max_chars: int
+) -> tuple[str | None, str | None]:
     file_type = (doc.file_type or "").lower()
     if file_type == "svg":
         return _svg_excerpt_for_context(doc, path, max_chars)
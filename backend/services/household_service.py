@@ -7,6 +7,7 @@ import uuid
 from datetime import UTC, datetime, timedelta
 
 from fastapi import HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from backend.core import settings
@@ -20,11 +21,16 @@ from backend.models import (
     User,
 )
 from backend.services.billing import update_user_tier
-from backend.services.email import get_email_client
+from backend.services.email_outbox import enqueue_email
 
 logger = logging.getLogger(__name__)
 MAX_HOUSEHOLD_MEMBERS = 4
 
+# Household scope is resolved several times per dashboard load, so it is
+# memoized on the request's session. It is deliberately not cached across
+# requests: a removed member must lose household scope on every worker at once.
+_MEMBER_UIDS_MEMO_KEY = "household_member_uids"
+
 
 def _enforce_household_capacity(db: Session, household_id: uuid.UUID, include_pending_invites: bool) -> None:
     member_count = (
@@ -52,7 +58,7 @@ def _enforce_household_capacity(db: Session, household_id: uuid.UUID, include_pe
 # Send a household welcome email to a new member after verification.
 def send_household_welcome_email(db: Session, to_email: str, household_id: uuid.UUID) -> None:
     """
-    Dispatch the household welcome email.
+    Queue the household welcome email in the caller's transaction.
     """
     try:
         household = db.query(Household).filter(Household.id == household_id).first()
@@ -72,15 +78,17 @@ def send_household_welcome_email(db: Session, to_email: str, household_id: uuid.
         if owner_member and owner_member.user:
             owner_name = owner_member.user.email
 
-        email_client = get_email_client()
-        email_client.send_household_welcome_member(
-            to_email=to_email,
+        enqueue_email(
+            db,
+            "send_household_welcome_member",
+            to_email,
+            message_key=f"household_welcome:{household_id}:{to_email.lower()}",
             household_name=household.name,
             owner_name=owner_name,
         )
-        logger.info(f"Sent household welcome email to {to_email} for household {household_id}.")
+        logger.info(f"Queued household welcome email to {to_email} for household {household_id}.")
     except Exception as e:
-        logger.error(f"Failed to send household welcome email: {e}")
+        logger.error(f"Failed to queue household welcome email: {e}")
 
 
 def _clear_household_account_assignments(
@@ -156,6 +164,7 @@ def create_household(db: Session, owner_uid: str, name: str) -> Household:
     )
     db.add(member)
     db.commit()
+    invalidate_household_member_uids(db, owner_uid)
     db.refresh(household)
     logger.info(f"Created household {household.id} for owner {owner_uid}")
     return household
@@ -211,19 +220,21 @@ def invite_member(
         expires_at=expires_at,
     )
     db.add(invite)
-    db.commit()
+    db.flush()
 
-    # 4. Send Email
+    # 4. Queue Email in the invite's transaction
     link = f"{settings.frontend_url}/household/accept-invite?token={token}"
-    email_client = get_email_client()
-    try:
-        # Need inviter name, verify user object loaded
-        # Fallback to email if name not avail
-        inviter_name = member.user.email if member.user else "A family member"
-        email_client.send_household_invite(email, link, inviter_name)
-    except Exception as e:
-        logger.error(f"Failed to send invite email: {e}")
-        # Non-blocking, return invite
+    # Fallback to email if name not avail
+    inviter_name = member.user.email if member.user else "A family member"
+    enqueue_email(
+        db,
+        "send_household_invite",
+        email,
+        message_key=f"household_invite:{invite.id}",
+        link=link,
+        inviter_name=inviter_name,
+    )
+    db.commit()
 
     return invite
 
@@ -328,18 +339,21 @@ def accept_invite(db: Session, user_uid: str, token: str):
 
     invite.status = "accepted"
     db.add(new_member)
-    db.commit()
 
-    logger.info(f"User {user_uid} joined household {invite.household_id} via invite.")
-    logger.info(f"User {user_uid} joined household {invite.household_id} via invite.")
-
-    # 4. Send Household Welcome Email (defer until OTP verification if needed).
+    # 4. Queue Household Welcome Email with the membership (defer until OTP
+    # verification if needed).
     user = db.query(User).filter(User.uid == user_uid).first()
     if user and user.status != UserStatus.PENDING_VERIFICATION:
         send_household_welcome_email(db, invite.email, invite.household_id)
     else:
         logger.info(f"Deferring household welcome email for {invite.email} until verification completes.")
 
+    db.commit()
+    _invalidate_household(db, invite.household_id, user_uid)
+
+    logger.info(f"User {user_uid} joined household {invite.household_id} via invite.")
+    logger.info(f"User {user_uid} joined household {invite.household_id} via invite.")
+
     return new_member
 
 
@@ -388,6 +402,7 @@ def leave_household(db: Session, user_uid: str):
     logger.info(f"BREAKUP PROTOCOL: User {user_uid} left household {household_id}. Data retained. Downgraded to Free.")
 
     db.commit()
+    invalidate_household_member_uids(db, *member_uids)
     return {"status": "success", "detail": "Left household."}
 
 
@@ -442,6 +457,7 @@ def remove_member(db: Session, admin_uid: str, member_uid: str) -> dict:
     db.delete(target_member)
     update_user_tier(db, member_uid, "free", status="active")
     db.commit()
+    invalidate_household_member_uids(db, *member_uids, member_uid)
 
     logger.info(
         f"Household admin {admin_uid} removed member {member_uid} from household {admin_member.household_id}."
@@ -491,18 +507,43 @@ def cancel_invite(db: Session, admin_uid: str, invite_id: str) -> dict:
     return {"status": "success", "detail": "Invite cancelled."}
 
 
+def _load_household_member_uids(db: Session, user_uid: str) -> tuple[str, ...]:
+    household_id = (
+        select(HouseholdMember.household_id)
+        .where(HouseholdMember.uid == user_uid)
+        .scalar_subquery()
+    )
+    uids = db.scalars(
+        select(HouseholdMember.uid).where(HouseholdMember.household_id == household_id)
+    ).all()
+    return tuple(uids) or (user_uid,)
+
+
 def get_household_member_uids(db: Session, user_uid: str) -> list[str]:
     """
     Returns a list of UIDs for all members in the user's household.
     If user is not in a household, returns just [user_uid].
+
+    Memoized on the session for the rest of the request; the membership
+    changes in this module drop the entries they affect.
     """
-    member = db.query(HouseholdMember).filter(HouseholdMember.uid == user_uid).first()
-    if not member:
-        return [user_uid]
+    memo = db.info.setdefault(_MEMBER_UIDS_MEMO_KEY, {})
+    uids = memo.get(user_uid)
+    if uids is None:
+        uids = memo[user_uid] = _load_household_member_uids(db, user_uid)
+    return list(uids)
 
-    # Get all members of this household
-    all_members = db.query(HouseholdMember.uid).filter(
-        HouseholdMember.household_id == member.household_id
-    ).all()
 
-    return [m.uid for m in all_members]
+def invalidate_household_member_uids(db: Session, *uids: str) -> None:
+    """Drop the session's memoized membership for ``uids``."""
+    memo = db.info.get(_MEMBER_UIDS_MEMO_KEY, {})
+    for uid in uids:
+        memo.pop(uid, None)
+
+
+def _invalidate_household(db: Session, household_id: uuid.UUID, *extra_uids: str) -> None:
+    """Invalidate every current member of ``household_id`` plus ``extra_uids``."""
+    members = db.scalars(
+        select(HouseholdMember.uid).where(HouseholdMember.household_id == household_id)
+    ).all()
+    invalidate_household_member_uids(db, *members, *extra_uids)
@@ -11,7 +11,7 @@ from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session, selectinload
 
 from backend.core.config import settings
-from backend.core.constants import SubscriptionPlans
+from backend.core.constants import ESSENTIAL_RETENTION_DAYS, SubscriptionPlans
 from backend.models import (
     Account,
     AuditLog,
@@ -21,6 +21,7 @@ from backend.models import (
     Subscription,
     Transaction,
 )
+from backend.services.embeddings import mark_embedding_needed
 from backend.services.plaid import (
     PlaidItemLoginRequired,
     PlaidSyncMutationDuringPagination,
@@ -28,6 +29,10 @@ from backend.services.plaid import (
     fetch_transactions_sync_page,
     remove_item,
 )
+from backend.services.recurring import (
+    mark_recurring_series_stale,
+    refresh_recurring_series,
+)
 from backend.utils.normalization import normalize_category, normalize_merchant_name
 from backend.utils.secret_manager import get_secret
 
@@ -64,7 +69,7 @@ def _get_active_plan(db: Session, uid: str) -> str:
 def _retention_min_date_for_plan(plan_code: str) -> date | None:
     base_tier = SubscriptionPlans.get_base_tier(plan_code)
     if base_tier == SubscriptionPlans.ESSENTIAL:
-        return date.today() - timedelta(days=365)
+        return date.today() - timedelta(days=ESSENTIAL_RETENTION_DAYS)
     return None
 
 
@@ -236,6 +241,7 @@ def _upsert_plaid_transaction(
         existing.description = description
         existing.archived = False
         existing.raw_json = _build_plaid_raw(item, str(payload.get("account_id") or ""), payload)
+        mark_embedding_needed(existing)
         db.add(existing)
         return False
 
@@ -316,6 +322,8 @@ def _apply_retention_policy(
         )
         .delete(synchronize_session=False)
     )
+    if deleted_count:
+        mark_recurring_series_stale(db, uid)
     return int(deleted_count or 0)
 
 
@@ -462,6 +470,12 @@ def sync_plaid_item(
         )
         db.commit()
 
+        try:
+            refresh_recurring_series(db, item.uid)
+        except Exception:
+            db.rollback()
+            logger.exception("Recurring series refresh failed for %s", item.uid)
+
         return {
             "item_id": item.item_id,
             "status": PLAID_SYNC_STATUS_ACTIVE,
@@ -2,8 +2,9 @@
 # Created: 2026-02-14 — Updated for Vertex AI Prompt Management
 
 import logging
-import time
-from typing import Any
+
+from backend.core.executors import run_io
+from backend.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -41,8 +42,11 @@ Tone: concise, clear, and practical.
 
 class PromptManager:
     _instance = None
-    _cache: dict[str, Any] = {}
-    _cache_ttl: int = 300  # 5 minutes in seconds
+    # Misses (template not found / SDK error) are cached too, so the default is
+    # served without re-querying Vertex on every request.
+    _cache: TTLCache[str | None] = TTLCache(
+        "prompt_templates", ttl_seconds=300, negative_ttl_seconds=60, max_entries=64
+    )
 
     def __new__(cls):
         if cls._instance is None:
@@ -105,41 +109,38 @@ class PromptManager:
         """
         Internal: Fetch template string by ID with caching.
         """
-        # 1. Check Cache
-        cached = self._cache.get(prompt_id)
-        if cached:
-            timestamp, content = cached
-            if time.time() - timestamp < self._cache_ttl:
-                return content
-
-        # 2. Try Fetch from Vertex AI
-        if self.vertext_prompts_available:
-            try:
-                # We fetch using get_prompt() which usually returns an object.
-                # Since SDK details vary, we wrap this broadly.
-                # In a real deployed app, ensure 'google-cloud-aiplatform>=1.46.0'
-                prompt = self.prompts_lib.get_prompt(prompt_name=prompt_id)
-
-                # Extract content. API might return structured object with 'prompt_data' or similar.
-                # For this implementation, we assume we want the raw text template.
-                # Strategy: inspect available attributes or convert to string.
-                content = None
-                if hasattr(prompt, "prompt_data"):
-                    content = prompt.prompt_data
-                elif hasattr(prompt, "text"):
-                    content = prompt.text
-                elif isinstance(prompt, str):
-                    content = prompt
-
-                if content:
-                    self._cache[prompt_id] = (time.time(), content)
-                    return content
-            except Exception:
-                # 404 Not Found, PermissionDenied, or SDK mismatch
-                # Fail silently to default to keep app running
-                pass
-
-        return default
+        if not self.vertext_prompts_available:
+            return default
+
+        # Cached, or fetched from Vertex AI off the event loop; concurrent misses
+        # share one call.
+        cached = await run_io(
+            self._cache.get_or_load, prompt_id, lambda: self._fetch_template(prompt_id)
+        )
+        return cached or default
+
+    def _fetch_template(self, prompt_id: str) -> str | None:
+        try:
+            # We fetch using get_prompt() which usually returns an object.
+            # Since SDK details vary, we wrap this broadly.
+            # In a real deployed app, ensure 'google-cloud-aiplatform>=1.46.0'
+            prompt = self.prompts_lib.get_prompt(prompt_name=prompt_id)
+        except Exception as exc:
+            # 404 Not Found, PermissionDenied, or SDK mismatch
+            # Fall back to the default to keep the app running
+            logger.debug("Prompt %s unavailable from Vertex AI: %s", prompt_id, exc)
+            return None
+
+        # Extract content. API might return structured object with 'prompt_data' or similar.
+        # For this implementation, we assume we want the raw text template.
+        # Strategy: inspect available attributes or convert to string.
+        if hasattr(prompt, "prompt_data"):
+            return prompt.prompt_data or None
+        if hasattr(prompt, "text"):
+            return prompt.text or None
+        if isinstance(prompt, str):
+            return prompt or None
+        return None
 
 
 # Global Instance
@@ -10,14 +10,25 @@ import re
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, timedelta
 from statistics import median
+from typing import Any
 
+from sqlalchemy import func, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from backend.models import Transaction, User
+from backend.models import RecurringSeries, RecurringSeriesState, Transaction, User
 from backend.services.notifications import NotificationService
+from backend.utils.rls import set_db_user_context
 
 logger = logging.getLogger(__name__)
 
+RECURRING_LOOKBACK_DAYS = 180
+RECURRING_MIN_OCCURRENCES = 3
+RECURRING_TOLERANCE_DAYS = 3
+# Rows changed shortly before the watermark are re-applied (idempotently) so a
+# transaction that commits after a newer one was folded in is not missed.
+RECURRING_WATERMARK_OVERLAP = timedelta(minutes=5)
+
 
 @dataclass
 class RecurringForecastItem:
@@ -76,95 +87,345 @@ def _dedupe_key(label: str, next_date: date) -> str:
     return f"recurring_bill:{slug}:{digest}:{next_date.isoformat()}"
 
 
+def _series_key(label_source: str | None, category: str | None) -> tuple[str, str]:
+    normalized = _normalize_label(label_source)
+    return normalized, f"{normalized}::{category or ''}"
+
+
+def _evaluate_series(
+    key: str,
+    points: list[tuple[datetime, float]],
+    *,
+    min_occurrences: int,
+    tolerance_days: int,
+) -> RecurringForecastItem | None:
+    """Apply the cadence/amount heuristics to one series of (ts, amount) points."""
+    if len(points) < min_occurrences:
+        return None
+
+    points_sorted = sorted(points, key=lambda point: point[0])
+    dates = [ts.date() for ts, _ in points_sorted]
+    intervals = [
+        (dates[idx] - dates[idx - 1]).days for idx in range(1, len(dates))
+    ]
+    if len(intervals) < 2:
+        return None
+
+    median_interval = int(median(intervals))
+    cadence_match = _match_cadence(median_interval)
+    if not cadence_match:
+        return None
+    cadence_label, cadence_days = cadence_match
+
+    matches = sum(
+        1 for interval in intervals if _within_tolerance(interval, cadence_days, tolerance_days)
+    )
+    if matches < max(2, len(intervals) // 2):
+        return None
+
+    amounts = [abs(float(amount)) for _, amount in points_sorted]
+    median_amount = median(amounts)
+    if median_amount <= 0:
+        return None
+    consistent = sum(
+        1
+        for amount in amounts
+        if abs(amount - median_amount) / median_amount <= 0.3
+    )
+    if consistent < max(2, int(len(amounts) * 0.6)):
+        return None
+
+    last_date = dates[-1]
+    next_date = last_date + timedelta(days=cadence_days)
+    confidence = min(1.0, (matches / max(1, len(intervals))))
+    normalized_label, category = key.split("::", 1)
+
+    return RecurringForecastItem(
+        merchant=normalized_label.title(),
+        category=category or None,
+        average_amount=float(median_amount),
+        cadence=cadence_label,
+        cadence_days=cadence_days,
+        next_date=next_date,
+        last_date=last_date,
+        occurrence_count=len(points_sorted),
+        confidence=confidence,
+    )
+
+
 def detect_recurring_transactions(
     db: Session,
     uid: str,
     *,
-    lookback_days: int = 180,
-    min_occurrences: int = 3,
-    tolerance_days: int = 3,
+    lookback_days: int = RECURRING_LOOKBACK_DAYS,
+    min_occurrences: int = RECURRING_MIN_OCCURRENCES,
+    tolerance_days: int = RECURRING_TOLERANCE_DAYS,
 ) -> list[RecurringForecastItem]:
-    """Detect recurring transactions using simple cadence/amount heuristics."""
+    """
+    Detect recurring transactions by scanning the full lookback window.
+
+    This is the reference implementation; the default forecast path reads
+    the incrementally maintained ``recurring_series`` table instead.
+    """
     cutoff = datetime.now(UTC) - timedelta(days=lookback_days)
-    txns = (
-        db.query(Transaction)
-        .filter(
+    rows = db.execute(
+        select(
+            Transaction.ts,
+            Transaction.amount,
+            Transaction.merchant_name,
+            Transaction.description,
+            Transaction.category,
+        )
+        .where(
             Transaction.uid == uid,
             Transaction.archived.is_(False),
             Transaction.amount < 0,
             Transaction.ts >= cutoff,
         )
         .order_by(Transaction.ts.asc())
-        .all()
-    )
+    ).all()
 
-    grouped: dict[str, list[Transaction]] = {}
-    for txn in txns:
-        label = txn.merchant_name or txn.description or "Unknown"
-        normalized = _normalize_label(label)
-        key = f"{normalized}::{txn.category or ''}"
-        grouped.setdefault(key, []).append(txn)
+    grouped: dict[str, list[tuple[datetime, float]]] = {}
+    for row in rows:
+        _, key = _series_key(row.merchant_name or row.description or "Unknown", row.category)
+        grouped.setdefault(key, []).append((row.ts, row.amount))
 
     results: list[RecurringForecastItem] = []
+    for key, points in grouped.items():
+        item = _evaluate_series(
+            key, points, min_occurrences=min_occurrences, tolerance_days=tolerance_days
+        )
+        if item:
+            results.append(item)
+    return results
 
-    for key, items in grouped.items():
-        if len(items) < min_occurrences:
-            continue
 
-        items_sorted = sorted(items, key=lambda t: t.ts)
-        dates = [t.ts.date() for t in items_sorted]
-        intervals = [
-            (dates[idx] - dates[idx - 1]).days for idx in range(1, len(dates))
-        ]
-        if len(intervals) < 2:
-            continue
+def _parse_ts(value: str) -> datetime:
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo else ts.replace(tzinfo=UTC)
 
-        median_interval = int(median(intervals))
-        cadence_match = _match_cadence(median_interval)
-        if not cadence_match:
-            continue
-        cadence_label, cadence_days = cadence_match
 
-        matches = sum(
-            1 for interval in intervals if _within_tolerance(interval, cadence_days, tolerance_days)
-        )
-        if matches < max(2, len(intervals) // 2):
-            continue
+def _as_aware(ts: datetime) -> datetime:
+    return ts if ts.tzinfo else ts.replace(tzinfo=UTC)
 
-        amounts = [abs(float(t.amount)) for t in items_sorted]
-        median_amount = median(amounts)
-        if median_amount <= 0:
-            continue
-        consistent = sum(
-            1
-            for amount in amounts
-            if abs(amount - median_amount) / median_amount <= 0.3
+
+def _recompute_series(series: RecurringSeries, cutoff: datetime) -> None:
+    """Drop occurrences older than the window and re-derive the cadence fields."""
+    kept = sorted(
+        (occ for occ in series.occurrences if _parse_ts(occ[1]) >= cutoff),
+        key=lambda occ: _parse_ts(occ[1]),
+    )
+    if kept != series.occurrences:
+        series.occurrences = kept
+    series.occurrence_count = len(kept)
+    series.window_start = _parse_ts(kept[0][1]) if kept else None
+
+    item = _evaluate_series(
+        series.series_key,
+        [(_parse_ts(occ[1]), occ[2]) for occ in kept],
+        min_occurrences=RECURRING_MIN_OCCURRENCES,
+        tolerance_days=RECURRING_TOLERANCE_DAYS,
+    )
+    series.is_recurring = item is not None
+    series.cadence = item.cadence if item else None
+    series.cadence_days = item.cadence_days if item else None
+    series.average_amount = item.average_amount if item else None
+    series.last_date = item.last_date if item else None
+    series.next_date = item.next_date if item else None
+    series.confidence = item.confidence if item else None
+
+
+def _new_series(uid: str, label: str, key: str, category: str | None) -> RecurringSeries:
+    return RecurringSeries(
+        uid=uid,
+        series_key=key,
+        merchant=label,
+        category=category or None,
+        occurrences=[],
+        occurrence_count=0,
+        is_recurring=False,
+    )
+
+
+def _add_occurrence(series: RecurringSeries, txn_id: str, ts: datetime, amount: Any) -> None:
+    # Reassign rather than mutate so the JSON column is flagged dirty.
+    series.occurrences = [
+        *(occ for occ in series.occurrences if occ[0] != txn_id),
+        [txn_id, _as_aware(ts).isoformat(), float(amount)],
+    ]
+
+
+def _transaction_columns() -> tuple[Any, ...]:
+    return (
+        Transaction.id,
+        Transaction.ts,
+        Transaction.amount,
+        Transaction.merchant_name,
+        Transaction.description,
+        Transaction.category,
+        Transaction.archived,
+        Transaction.created_at,
+        Transaction.updated_at,
+    )
+
+
+def _rebuild_series(db: Session, uid: str, state: RecurringSeriesState, cutoff: datetime) -> None:
+    # Take the watermark before scanning so rows changed mid-scan are re-applied later.
+    state.watermark = db.execute(
+        select(func.max(Transaction.updated_at)).where(Transaction.uid == uid)
+    ).scalar()
+    db.query(RecurringSeries).filter(RecurringSeries.uid == uid).delete(
+        synchronize_session=False
+    )
+
+    rows = db.execute(
+        select(*_transaction_columns())
+        .where(
+            Transaction.uid == uid,
+            Transaction.archived.is_(False),
+            Transaction.amount < 0,
+            Transaction.ts >= cutoff,
         )
-        if consistent < max(2, int(len(amounts) * 0.6)):
+        .order_by(Transaction.ts.asc())
+    ).all()
+
+    by_key: dict[str, RecurringSeries] = {}
+    for row in rows:
+        label, key = _series_key(row.merchant_name or row.description or "Unknown", row.category)
+        series = by_key.get(key)
+        if series is None:
+            series = by_key[key] = _new_series(uid, label, key, row.category)
+        series.occurrences.append([str(row.id), _as_aware(row.ts).isoformat(), float(row.amount)])
+
+    for series in by_key.values():
+        _recompute_series(series, cutoff)
+        db.add(series)
+
+    state.rebuild_needed = False
+    state.rebuilt_at = datetime.now(UTC)
+
+
+def _apply_transaction_changes(
+    db: Session, uid: str, state: RecurringSeriesState, cutoff: datetime
+) -> int:
+    since = state.watermark - RECURRING_WATERMARK_OVERLAP
+    changed = db.execute(
+        select(*_transaction_columns())
+        .where(Transaction.uid == uid, Transaction.updated_at > since)
+        .order_by(Transaction.updated_at.asc())
+    ).all()
+
+    # Series whose oldest occurrence has aged out of the window.
+    touched: dict[str, RecurringSeries] = {
+        series.series_key: series
+        for series in db.query(RecurringSeries)
+        .filter(RecurringSeries.uid == uid, RecurringSeries.window_start < cutoff)
+        .all()
+    }
+    if not changed:
+        for series in touched.values():
+            _recompute_series(series, cutoff)
+        return 0
+
+    # Fresh inserts cannot belong to another series yet, so only their own series
+    # are loaded; edited rows may have moved and need the user's full series set.
+    has_edits = any(
+        _as_aware(row.created_at) <= _as_aware(since) or row.updated_at != row.created_at
+        for row in changed
+    )
+    keyed = {
+        _series_key(row.merchant_name or row.description or "Unknown", row.category)[1]: row
+        for row in changed
+    }
+    series_query = db.query(RecurringSeries).filter(RecurringSeries.uid == uid)
+    if not has_edits:
+        series_query = series_query.filter(RecurringSeries.series_key.in_(list(keyed)))
+    by_key = {series.series_key: series for series in series_query.all()}
+    by_key.update(touched)
+    owner: dict[str, RecurringSeries] = {}
+    if has_edits:
+        owner = {occ[0]: series for series in by_key.values() for occ in series.occurrences}
+
+    for row in changed:
+        txn_id = str(row.id)
+        previous = owner.pop(txn_id, None)
+        if previous is not None:
+            previous.occurrences = [occ for occ in previous.occurrences if occ[0] != txn_id]
+            touched[previous.series_key] = previous
+        if row.archived or row.amount >= 0 or _as_aware(row.ts) < cutoff:
             continue
 
-        last_date = dates[-1]
-        next_date = last_date + timedelta(days=cadence_days)
-        confidence = min(1.0, (matches / max(1, len(intervals))))
-        normalized_label, category = key.split("::", 1)
-        merchant_label = normalized_label.title()
-        category_label = category or None
-
-        results.append(
-            RecurringForecastItem(
-                merchant=merchant_label,
-                category=category_label,
-                average_amount=float(median_amount),
-                cadence=cadence_label,
-                cadence_days=cadence_days,
-                next_date=next_date,
-                last_date=last_date,
-                occurrence_count=len(items_sorted),
-                confidence=confidence,
-            )
-        )
+        label, key = _series_key(row.merchant_name or row.description or "Unknown", row.category)
+        series = by_key.get(key)
+        if series is None:
+            series = by_key[key] = _new_series(uid, label, key, row.category)
+            db.add(series)
+        _add_occurrence(series, txn_id, row.ts, row.amount)
+        owner[txn_id] = series
+        touched[key] = series
+
+    for series in touched.values():
+        _recompute_series(series, cutoff)
+        if not series.occurrences:
+            if inspect(series).persistent:
+                db.delete(series)
+            else:
+                db.expunge(series)
+
+    state.watermark = max(
+        _as_aware(state.watermark), max(_as_aware(row.updated_at) for row in changed)
+    )
+    return len(changed)
+
+
+def refresh_recurring_series(db: Session, uid: str, *, now: datetime | None = None) -> int:
+    """
+    Fold transactions changed since the user's watermark into their series.
+
+    Cost scales with the number of changed transactions (plus any series
+    whose oldest occurrence aged out), not with the length of the history.
+    Falls back to a full rebuild the first time, or after hard deletes.
+    Commits its own work; returns the number of transactions applied.
+    """
+    cutoff = (now or datetime.now(UTC)) - timedelta(days=RECURRING_LOOKBACK_DAYS)
+    state = (
+        db.query(RecurringSeriesState)
+        .filter(RecurringSeriesState.uid == uid)
+        .with_for_update()
+        .first()
+    )
+    if state is None:
+        state = RecurringSeriesState(uid=uid, rebuild_needed=True)
+        db.add(state)
+
+    applied = 0
+    if state.rebuild_needed or state.watermark is None:
+        _rebuild_series(db, uid, state, cutoff)
+    else:
+        applied = _apply_transaction_changes(db, uid, state, cutoff)
+    db.commit()
+    return applied
+
+
+def mark_recurring_series_stale(db: Session, uid: str) -> None:
+    """Force a rebuild on next refresh; call after hard-deleting transactions."""
+    db.query(RecurringSeriesState).filter(RecurringSeriesState.uid == uid).update(
+        {RecurringSeriesState.rebuild_needed: True}, synchronize_session=False
+    )
 
-    return results
+
+def _forecast_item(series: RecurringSeries) -> RecurringForecastItem:
+    return RecurringForecastItem(
+        merchant=series.merchant.title(),
+        category=series.category,
+        average_amount=series.average_amount,
+        cadence=series.cadence,
+        cadence_days=series.cadence_days,
+        next_date=series.next_date,
+        last_date=series.last_date,
+        occurrence_count=series.occurrence_count,
+        confidence=series.confidence,
+    )
 
 
 def get_recurring_forecast(
@@ -172,11 +433,35 @@ def get_recurring_forecast(
     uid: str,
     *,
     lookahead_days: int = 30,
-    lookback_days: int = 180,
+    lookback_days: int = RECURRING_LOOKBACK_DAYS,
 ) -> list[RecurringForecastItem]:
     """Return forecast items within the lookahead window."""
     today = datetime.now(UTC).date()
     horizon = today + timedelta(days=lookahead_days)
+
+    if lookback_days == RECURRING_LOOKBACK_DAYS:
+        try:
+            # The refresh commits, so it gets its own session rather than
+            # committing (or, on failure, rolling back) the caller's work.
+            with Session(bind=db.get_bind(), autoflush=False) as refresh_db:
+                if refresh_db.get_bind().dialect.name == "postgresql":
+                    set_db_user_context(refresh_db, uid)
+                refresh_recurring_series(refresh_db, uid)
+                series = (
+                    refresh_db.query(RecurringSeries)
+                    .filter(
+                        RecurringSeries.uid == uid,
+                        RecurringSeries.is_recurring.is_(True),
+                        RecurringSeries.next_date >= today,
+                        RecurringSeries.next_date <= horizon,
+                    )
+                    .order_by(RecurringSeries.next_date, RecurringSeries.window_start)
+                    .all()
+                )
+                return [_forecast_item(item) for item in series]
+        except SQLAlchemyError:
+            logger.exception("Recurring series refresh failed for %s; rescanning.", uid)
+
     candidates = detect_recurring_transactions(db, uid, lookback_days=lookback_days)
     forecast = [
         item
@@ -0,0 +1,117 @@
+"""
+Batched support portal audit trail.
+
+Agent actions are queued in memory by ``queue_support_action`` and written to
+``audit.support_portal_actions`` in bulk by ``flush_support_actions``, so the
+agent's request never waits on the audit insert. A flush is started on the DB
+executor once ``SUPPORT_AUDIT_BATCH_SIZE`` actions are waiting; the app
+lifespan flushes the rest on an interval and at shutdown. Each action keeps
+the timestamp it was queued at, and a failed flush puts its rows back at the
+front of the queue. Actions that go with a write are held on the request's
+session by ``queue_support_action_on_commit`` and only queued once that
+session commits, so a rolled-back change never shows up in the trail.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import deque
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from backend.core.config import settings
+from backend.core.executors import get_db_executor
+from backend.models.audit import SupportPortalAction
+
+logger = logging.getLogger(__name__)
+
+_pending: deque[dict[str, Any]] = deque()
+_pending_lock = threading.Lock()
+# One flush at a time keeps re-queued rows ahead of newer ones.
+_flush_lock = threading.Lock()
+_SESSION_PENDING_KEY = "pending_support_actions"
+
+
+def _enqueue(bind: Engine, rows: list[dict[str, Any]]) -> None:
+    with _pending_lock:
+        _pending.extend(rows)
+        full = len(_pending) >= settings.support_audit_batch_size
+    if full:
+        get_db_executor().submit(flush_support_actions, bind)
+
+
+def _action_row(fields: dict[str, Any]) -> dict[str, Any]:
+    return {"id": uuid.uuid4(), "ts": datetime.now(UTC), **fields}
+
+
+def queue_support_action(bind: Engine, **fields: Any) -> None:
+    """Queue one ``SupportPortalAction``; ``bind`` is used if this fills a batch."""
+    _enqueue(bind, [_action_row(fields)])
+
+
+def queue_support_action_on_commit(db: Session, **fields: Any) -> None:
+    """Queue one ``SupportPortalAction`` once ``db`` commits; dropped on rollback."""
+    db.info.setdefault(_SESSION_PENDING_KEY, []).append(_action_row(fields))
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed_actions(session: Session) -> None:
+    rows = session.info.pop(_SESSION_PENDING_KEY, None)
+    if rows:
+        _enqueue(session.get_bind(), rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_actions(session: Session) -> None:
+    session.info.pop(_SESSION_PENDING_KEY, None)
+
+
+def pending_support_actions() -> int:
+    with _pending_lock:
+        return len(_pending)
+
+
+def flush_support_actions(bind: Engine) -> int:
+    """Insert queued actions in batches; returns the number written."""
+    batch_size = settings.support_audit_batch_size
+    written = 0
+    with _flush_lock:
+        while True:
+            with _pending_lock:
+                rows = [_pending.popleft() for _ in range(min(batch_size, len(_pending)))]
+            if not rows:
+                break
+            try:
+                with Session(bind=bind) as db:
+                    db.execute(insert(SupportPortalAction), rows)
+                    db.commit()
+            except Exception as exc:
+                logger.error("Failed to write %d support portal actions: %s", len(rows), exc)
+                with _pending_lock:
+                    _pending.extendleft(reversed(rows))
+                break
+            written += len(rows)
+    return written
+
+
+def shutdown_support_audit(bind: Engine) -> None:
+    """Write whatever is still queued (called from the app lifespan)."""
+    flush_support_actions(bind)
+    remaining = pending_support_actions()
+    if remaining:
+        logger.warning("%d support portal actions were not written at shutdown.", remaining)
+
+
+__all__ = [
+    "flush_support_actions",
+    "pending_support_actions",
+    "queue_support_action",
+    "queue_support_action_on_commit",
+    "shutdown_support_audit",
+]
@@ -0,0 +1,242 @@
+"""
+Monthly partition maintenance for the ``transactions`` table.
+
+On Postgres ``transactions`` is range-partitioned on ``ts`` by UTC calendar
+month (``transactions_pYYYYMM``), with ``transactions_default`` catching rows
+outside the created months. This job keeps partitions created a few months
+ahead and retires months that have fallen out of the Essential retention
+window: a month whose rows all belong to active Essential subscribers is
+detached and dropped as a whole; a month that other plans still keep gets one
+partition-local delete of the expired users' rows instead of per-user deletes
+across the whole table.
+
+Other dialects (the sqlite test database) have a plain table; the job is a
+no-op there.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from backend.core.constants import ESSENTIAL_RETENTION_DAYS, SubscriptionPlans
+from backend.models import Subscription
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MONTHS_AHEAD = 3
+
+_PARTITION_NAME = re.compile(r"^transactions_p(\d{4})(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"transactions_p{month:%Y%m}"
+
+
+def partition_month(name: str) -> date | None:
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    """UTC ``[lower, upper)`` timestamps covered by the month's partition."""
+    lower = datetime(month.year, month.month, 1, tzinfo=UTC)
+    upper_month = add_months(month, 1)
+    return lower, datetime(upper_month.year, upper_month.month, 1, tzinfo=UTC)
+
+
+def expired_months(months: list[date], today: date) -> list[date]:
+    """Months that end on or before the Essential retention horizon."""
+    horizon = today - timedelta(days=ESSENTIAL_RETENTION_DAYS)
+    return sorted(m for m in months if add_months(m, 1) <= horizon)
+
+
+def _is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass('transactions'))"
+            )
+        ).scalar()
+    )
+
+
+def _partition_months(conn: Connection) -> list[date]:
+    names = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'transactions'::regclass"
+        )
+    ).scalars()
+    return sorted(m for m in map(partition_month, names) if m is not None)
+
+
+def _essential_uids(conn: Connection, uids: list[str]) -> set[str]:
+    """Uids whose active subscription is on the Essential tier."""
+    if not uids:
+        return set()
+    rows = conn.execute(
+        select(Subscription.uid, Subscription.plan).where(
+            Subscription.uid.in_(uids), Subscription.status == "active"
+        )
+    )
+    return {
+        uid
+        for uid, plan in rows
+        if SubscriptionPlans.get_base_tier(plan) == SubscriptionPlans.ESSENTIAL
+    }
+
+
+def ensure_transaction_partitions(
+    bind: Engine,
+    *,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    today: date | None = None,
+) -> list[str]:
+    """Create any missing partitions from this month through ``months_ahead``."""
+    current = month_start(today or datetime.now(UTC).date())
+    created: list[str] = []
+    with bind.connect() as conn:
+        if not _is_partitioned(conn):
+            return created
+        existing = set(_partition_months(conn))
+        conn.commit()
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            lower, upper = month_bounds(month)
+            try:
+                # Attaching scans the default partition, so it must not hold
+                # rows for this month already.
+                conn.execute(
+                    text(
+                        f"CREATE TABLE {partition_name(month)} PARTITION OF transactions "
+                        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+                    )
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                logger.exception(
+                    "Could not create transactions partition %s.", partition_name(month)
+                )
+                continue
+            created.append(partition_name(month))
+    if created:
+        logger.info("Created transactions partitions: %s", ", ".join(created))
+    return created
+
+
+def _retire_month(conn: Connection, month: date, lock_timeout_ms: int) -> dict[str, Any]:
+    name = partition_name(month)
+    lower, upper = month_bounds(month)
+    uids = list(conn.execute(text(f"SELECT DISTINCT uid FROM {name}")).scalars())
+    expired = _essential_uids(conn, uids)
+
+    if len(expired) == len(uids):
+        # Detaching needs a short exclusive lock on the parent; give up rather
+        # than queue behind long readers and retry on the next run.
+        conn.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+        conn.execute(text(f"ALTER TABLE transactions DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+        # Dropping a partition skips the row trigger that maintains the keys.
+        conn.execute(
+            text(
+                "DELETE FROM transaction_external_ids WHERE ts >= :lower AND ts < :upper"
+            ),
+            {"lower": lower, "upper": upper},
+        )
+        return {"detached": True, "pruned_rows": 0}
+
+    if not expired:
+        return {"detached": False, "pruned_rows": 0}
+
+    result = conn.execute(
+        text(f"DELETE FROM {name} WHERE uid IN :uids").bindparams(
+            bindparam("uids", expanding=True)
+        ),
+        {"uids": sorted(expired)},
+    )
+    return {"detached": False, "pruned_rows": int(result.rowcount or 0)}
+
+
+def retire_expired_transaction_partitions(
+    bind: Engine,
+    *,
+    today: date | None = None,
+    lock_timeout_ms: int = 5000,
+) -> dict[str, Any]:
+    """Detach (or prune) month partitions past the Essential retention horizon."""
+    today = today or datetime.now(UTC).date()
+    detached: list[str] = []
+    pruned_rows = 0
+    failed = 0
+    with bind.connect() as conn:
+        if not _is_partitioned(conn):
+            return {"detached": detached, "pruned_rows": pruned_rows, "failed": failed}
+        months = _partition_months(conn)
+        conn.commit()
+        # Retired months are far outside the recurring-series scan window, so
+        # unlike the per-sync retention deletes they leave the series valid.
+        for month in expired_months(months, today):
+            try:
+                outcome = _retire_month(conn, month, lock_timeout_ms)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                failed += 1
+                logger.exception(
+                    "Could not retire transactions partition %s.", partition_name(month)
+                )
+                continue
+            if outcome["detached"]:
+                detached.append(partition_name(month))
+            pruned_rows += outcome["pruned_rows"]
+
+    logger.info(
+        "Retired transactions partitions (detached=%d pruned_rows=%d failed=%d).",
+        len(detached),
+        pruned_rows,
+        failed,
+    )
+    return {"detached": detached, "pruned_rows": pruned_rows, "failed": failed}
+
+
+def maintain_transaction_partitions(
+    bind: Engine, *, today: date | None = None
+) -> dict[str, Any]:
+    """Scheduled entry point: create upcoming months, then retire expired ones."""
+    created = ensure_transaction_partitions(bind, today=today)
+    return {"created": created, **retire_expired_transaction_partitions(bind, today=today)}
+
+
+__all__ = [
+    "PARTITION_MONTHS_AHEAD",
+    "ensure_transaction_partitions",
+    "expired_months",
+    "maintain_transaction_partitions",
+    "month_bounds",
+    "partition_name",
+    "retire_expired_transaction_partitions",
+]
@@ -8,8 +8,19 @@ from typing import Any
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
+from backend.utils.cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# Empty results (no hits or a failed request) are retried sooner than hits.
+_search_cache: TTLCache[list[dict[str, str]]] = TTLCache(
+    "web_search",
+    ttl_seconds=900,
+    negative_ttl_seconds=60,
+    max_entries=512,
+    is_negative=lambda results: not results,
+)
+
 
 def _flatten_related(topics: list[dict[str, Any]]) -> list[dict[str, Any]]:
     flattened: list[dict[str, Any]] = []
@@ -26,12 +37,25 @@ def _flatten_related(topics: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return flattened
 
 
+def _normalize_query(query: str | None) -> str:
+    return " ".join((query or "").lower().split())
+
+
 def search_web(query: str, *, max_results: int = 5) -> list[dict[str, str]]:
-    """Return a compact list of web references for a query."""
+    """Return a compact list of web references for a query (cached per normalized query)."""
     clean_query = (query or "").strip()
     if not clean_query:
         return []
 
+    results = _search_cache.get_or_load(
+        (_normalize_query(clean_query), max_results),
+        lambda: _fetch_web_results(clean_query, max_results),
+    )
+    # Callers may annotate the dicts; never hand out the cached objects.
+    return [dict(item) for item in results]
+
+
+def _fetch_web_results(clean_query: str, max_results: int) -> list[dict[str, str]]:
     params = urlencode(
         {
             "q": clean_query,
@@ -0,0 +1,119 @@
+"""
+Buffered widget engagement counters.
+
+Downloads are counted in process memory by ``record_widget_download`` and
+written to ``widget_engagement/{widget_id}/daily/{date}`` by
+``flush_widget_engagement``, one merged ``Increment`` per widget and day no
+matter how many downloads it covers. ``set(..., merge=True)`` creates the day
+document on first write, so there is no read before the increment and no race
+when two workers open the same day.
+
+The app lifespan flushes on an interval and once more at shutdown. A flush
+that fails puts its counts back into the buffer for the next attempt; counts
+are lost only if the process dies without shutting down.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import Counter
+from datetime import UTC, datetime
+
+from google.cloud import firestore
+
+from backend.utils.firestore import get_firestore_client
+
+logger = logging.getLogger(__name__)
+
+ENGAGEMENT_COLLECTION = "widget_engagement"
+# Firestore rejects write batches with more than 500 operations.
+_MAX_BATCH_WRITES = 500
+
+_pending: Counter[tuple[str, str]] = Counter()
+_pending_lock = threading.Lock()
+# Serializes flushes so a failed batch is re-queued before the next one runs.
+_flush_lock = threading.Lock()
+
+
+def record_widget_download(widget_id: str, *, now: datetime | None = None) -> None:
+    """Count one download towards today's engagement document."""
+    day = (now or datetime.now(UTC)).strftime("%Y-%m-%d")
+    with _pending_lock:
+        _pending[(widget_id, day)] += 1
+
+
+def pending_widget_engagement() -> dict[tuple[str, str], int]:
+    """Counts recorded but not yet flushed, keyed by (widget_id, date)."""
+    with _pending_lock:
+        return dict(_pending)
+
+
+def _requeue(counts: dict[tuple[str, str], int]) -> None:
+    with _pending_lock:
+        _pending.update(counts)
+
+
+def flush_widget_engagement(client: firestore.Client | None = None) -> int:
+    """
+    Write buffered counts as merged atomic increments; returns the number of
+    downloads written. Counts from a batch that fails are kept for the next
+    flush.
+    """
+    with _flush_lock:
+        with _pending_lock:
+            if not _pending:
+                return 0
+            drained = dict(_pending)
+            _pending.clear()
+
+        try:
+            client = client or get_firestore_client()
+        except Exception as exc:
+            logger.error("Widget engagement flush skipped; Firestore unavailable: %s", exc)
+            _requeue(drained)
+            return 0
+
+        items = list(drained.items())
+        written = 0
+        for start in range(0, len(items), _MAX_BATCH_WRITES):
+            chunk = items[start : start + _MAX_BATCH_WRITES]
+            batch = client.batch()
+            for (widget_id, day), count in chunk:
+                doc_ref = (
+                    client.collection(ENGAGEMENT_COLLECTION)
+                    .document(widget_id)
+                    .collection("daily")
+                    .document(day)
+                )
+                batch.set(
+                    doc_ref,
+                    {"date": day, "downloads": firestore.Increment(count)},
+                    merge=True,
+                )
+            try:
+                batch.commit()
+            except Exception as exc:
+                logger.error("Failed to flush widget engagement stats: %s", exc)
+                _requeue(dict(items[start:]))
+                break
+            written += sum(count for _, count in chunk)
+        return written
+
+
+def shutdown_widget_engagement() -> None:
+    """Flush whatever is still buffered (called from the app lifespan)."""
+    written = flush_widget_engagement()
+    remaining = sum(pending_widget_engagement().values())
+    if remaining:
+        logger.warning("%d widget downloads were not flushed at shutdown.", remaining)
+    elif written:
+        logger.info("Flushed %d widget downloads at shutdown.", written)
+
+
+__all__ = [
+    "flush_widget_engagement",
+    "pending_widget_engagement",
+    "record_widget_download",
+    "shutdown_widget_engagement",
+]
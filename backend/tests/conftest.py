@@ -20,6 +20,8 @@ os.environ.setdefault("PLAID_SECRET", "test-secret")
 os.environ.setdefault("FRONTEND_URL", "http://localhost:5175")
 os.environ.setdefault("RATE_LIMIT_MAX_REQUESTS", "100")
 os.environ.setdefault("RATE_LIMIT_WINDOW_SECONDS", "60")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "local")
+os.environ.setdefault("QUERY_BUDGET_ENFORCE", "true")
 
 # Monkeypatch httpx.Client to ignore 'app' argument passed by older starlette versions
 _orig_client_init = httpx.Client.__init__
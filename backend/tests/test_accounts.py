@@ -15,6 +15,7 @@ from backend.models import (
     Transaction,
     User,
 )
+from backend.services.household_service import invalidate_household_member_uids
 
 # Tests for backend/api/accounts.py
 
@@ -365,6 +366,8 @@ def test_list_accounts_requires_household_membership_for_assignments(
 
     test_db.delete(member)
     test_db.commit()
+    # Deleted directly rather than through remove_member, so drop the cached scope.
+    invalidate_household_member_uids(test_db, mock_auth.uid)
 
     response = test_client.get("/api/accounts")
     assert response.status_code == 200
@@ -0,0 +1,155 @@
+import gzip
+import json
+import uuid
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from backend.jobs import archive_essential as job
+from backend.models import LedgerArchiveCheckpoint, LedgerHotEssential
+
+
+class _FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_encoding = None
+
+    def upload_from_string(self, data, content_type=None):
+        if self.bucket.fail_prefix and self.name.startswith(self.bucket.fail_prefix):
+            raise ConnectionError("upload interrupted")
+        self.bucket.uploads.append(self.name)
+        self.bucket.objects[self.name] = (data, content_type, self.content_encoding)
+
+    def download_as_bytes(self, raw_download=False):
+        assert raw_download
+        return self.bucket.objects[self.name][0]
+
+
+class _FakeBucket:
+    """Local stand-in for a GCS bucket."""
+
+    def __init__(self, fail_prefix=None):
+        self.fail_prefix = fail_prefix
+        self.objects = {}
+        self.uploads = []
+
+    def blob(self, name):
+        return _FakeBlob(self, name)
+
+    def rows(self):
+        out = []
+        for data, _, _ in self.objects.values():
+            out.extend(json.loads(line) for line in gzip.decompress(data).splitlines())
+        return out
+
+
+@pytest.fixture
+def sessions(test_db, monkeypatch):
+    monkeypatch.setattr(job, "SessionLocal", sessionmaker(bind=test_db.get_bind()))
+    return test_db
+
+
+def _ledger_row(uid, ts):
+    return LedgerHotEssential(
+        id=uuid.uuid4(),
+        uid=uid,
+        account_id=uuid.uuid4(),
+        ts=ts,
+        amount=Decimal("12.50"),
+        currency="USD",
+        category="Food",
+        raw_json={"k": "v"},
+    )
+
+
+def _seed(test_db):
+    now = datetime.now(UTC)
+    old = now - timedelta(days=430)
+    rows = [_ledger_row("user_a", old + timedelta(days=i)) for i in range(5)]
+    rows += [_ledger_row("user_b", old + timedelta(days=40 + i)) for i in range(3)]
+    rows += [_ledger_row("user_a", now - timedelta(days=30))]
+    test_db.add_all(rows)
+    test_db.commit()
+    return rows
+
+
+def test_archiver_uploads_compressed_partitions_and_prunes_in_batches(sessions):
+    _seed(sessions)
+    bucket = _FakeBucket()
+    deletes = []
+
+    def _count_deletes(_conn, _cursor, statement, *_args):
+        if statement.lstrip().upper().startswith("DELETE"):
+            deletes.append(statement)
+
+    event.listen(sessions.get_bind(), "before_cursor_execute", _count_deletes)
+    try:
+        pruned = job.archive_essential_ledger(
+            batch_size=2, max_workers=1, prune_batch_size=2, bucket=bucket
+        )
+    finally:
+        event.remove(sessions.get_bind(), "before_cursor_execute", _count_deletes)
+
+    assert pruned == 8
+    assert len(bucket.rows()) == 8
+    assert all(name.endswith(".jsonl.gz") for name in bucket.objects)
+    assert all(enc == "gzip" for _, _, enc in bucket.objects.values())
+    assert len(deletes) > len(bucket.objects)
+    assert sessions.query(LedgerHotEssential).count() == 1
+    checkpoints = sessions.query(LedgerArchiveCheckpoint).all()
+    assert {c.status for c in checkpoints} == {job.CHECKPOINT_PRUNED}
+    assert sum(c.row_count for c in checkpoints) == 8
+
+
+def test_crashed_run_resumes_without_reuploading_finished_partitions(sessions):
+    _seed(sessions)
+    failing = _FakeBucket(fail_prefix="essential/user_b/")
+
+    with pytest.raises(RuntimeError):
+        job.archive_essential_ledger(max_workers=1, bucket=failing)
+
+    assert sessions.query(LedgerHotEssential).filter_by(uid="user_b").count() == 3
+    pending = sessions.query(LedgerArchiveCheckpoint).filter_by(status=job.CHECKPOINT_PENDING)
+    assert [c.uid for c in pending] == ["user_b"]
+
+    healthy = _FakeBucket()
+    pruned = job.archive_essential_ledger(max_workers=1, bucket=healthy)
+
+    assert pruned == 3
+    assert all(name.startswith("essential/user_b/") for name in healthy.uploads)
+    assert len(failing.rows()) + len(healthy.rows()) == 8
+    assert sessions.query(LedgerHotEssential).count() == 1
+
+
+def test_prune_deletes_only_the_uploaded_rows(sessions, monkeypatch):
+    _seed(sessions)
+    prune = job._prune_partition
+
+    def _crash(*_args, **_kwargs):
+        raise ConnectionError("database went away")
+
+    monkeypatch.setattr(job, "_prune_partition", _crash)
+    bucket = _FakeBucket()
+    with pytest.raises(RuntimeError):
+        job.archive_essential_ledger(max_workers=1, bucket=bucket)
+
+    # A row that commits after the export, but inside an uploaded partition and
+    # its snapshot, must survive the resumed prune.
+    checkpoint = sessions.query(LedgerArchiveCheckpoint).filter_by(uid="user_b").one()
+    assert checkpoint.status == job.CHECKPOINT_UPLOADED
+    late = _ledger_row("user_b", checkpoint.upper_bound - timedelta(days=1))
+    late.created_at = checkpoint.created_at - timedelta(minutes=1)
+    sessions.add(late)
+    sessions.commit()
+
+    monkeypatch.setattr(job, "_prune_partition", prune)
+    pruned = job._process_checkpoint(checkpoint.id, bucket, 1000, 2)
+
+    assert pruned == checkpoint.row_count == 3
+    sessions.expire_all()
+    remaining = sessions.query(LedgerHotEssential).filter_by(uid="user_b").all()
+    assert [row.id for row in remaining] == [late.id]
@@ -1,3 +1,4 @@
+import logging
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
@@ -8,7 +9,8 @@ from backend.middleware.auth import (
     get_current_identity,
     get_current_identity_with_user_guard,
 )
-from backend.models import PendingSignup, Subscription, User
+from backend.models import EmailOutbox, PendingSignup, Subscription, User
+from backend.utils.rate_limit import TokenBucketLimiter
 
 # Tests for backend/api/auth.py
 
@@ -28,7 +30,7 @@ def test_signup_pending_success(test_client: TestClient, test_db):
         ],
     }
 
-    with patch("backend.api.auth.get_email_client") as mock_client:
+    with patch("backend.services.email_outbox.get_email_client") as mock_client:
         mock_client.return_value.send_otp = lambda *_args, **_kwargs: None
         response = test_client.post("/api/auth/signup/pending", json=payload)
 
@@ -65,7 +67,7 @@ def test_signup_pending_duplicate_email(test_client: TestClient, test_db):
             {"agreement_key": "privacy_policy"},
         ],
     }
-    with patch("backend.api.auth.get_email_client") as mock_client:
+    with patch("backend.services.email_outbox.get_email_client") as mock_client:
         mock_client.return_value.send_otp = lambda *_args, **_kwargs: None
         response = test_client.post("/api/auth/signup/pending", json=payload)
 
@@ -88,7 +90,7 @@ def test_signup_pending_missing_agreements(test_client: TestClient):
             {"agreement_key": "terms_of_service"},
         ],
     }
-    with patch("backend.api.auth.get_email_client") as mock_client:
+    with patch("backend.services.email_outbox.get_email_client") as mock_client:
         mock_client.return_value.send_otp = lambda *_args, **_kwargs: None
         response = test_client.post("/api/auth/signup/pending", json=payload)
 
@@ -98,7 +100,7 @@ def test_signup_pending_missing_agreements(test_client: TestClient):
     assert "missing required legal agreements" in response.json()["detail"].lower()
 
 
-def test_signup_pending_otp_send_failure_returns_503(test_client: TestClient):
+def test_signup_pending_queues_otp_when_provider_is_down(test_client: TestClient, test_db):
     def override_identity():
         return {"uid": "pending_user_otp_fail", "email": "otp-fail@testmail.app"}
 
@@ -113,14 +115,19 @@ def test_signup_pending_otp_send_failure_returns_503(test_client: TestClient):
         ],
     }
 
-    with patch("backend.api.auth.get_email_client") as mock_client:
+    with patch("backend.services.email_outbox.get_email_client") as mock_client:
         mock_client.return_value.send_otp.side_effect = RuntimeError("smtp offline")
         response = test_client.post("/api/auth/signup/pending", json=payload)
 
     app.dependency_overrides.pop(get_current_identity, None)
 
-    assert response.status_code == 503
-    assert "verification code" in response.json()["detail"].lower()
+    # The code is committed with its outbox row and retried later.
+    assert response.status_code == 201
+    queued = test_db.query(EmailOutbox).filter_by(to_email="otp-fail@testmail.app").one()
+    assert queued.kind == "send_otp"
+    assert queued.status == "pending"
+    assert queued.attempts == 1
+    assert queued.last_error == "smtp offline"
 
 
 def test_signup_pending_rate_limit_returns_429(test_client: TestClient):
@@ -128,7 +135,7 @@ def test_signup_pending_rate_limit_returns_429(test_client: TestClient):
         return {"uid": "pending_user_429", "email": "pending-429@testmail.app"}
 
     app.dependency_overrides[get_current_identity] = override_identity
-    auth_api._signup_attempts.clear()
+    auth_api._signup_limiter.reset()
 
     payload = {
         "first_name": "Rate",
@@ -140,36 +147,39 @@ def test_signup_pending_rate_limit_returns_429(test_client: TestClient):
     }
 
     with (
-        patch("backend.api.auth._signup_max_attempts", 1),
-        patch("backend.api.auth._signup_window_seconds", 60),
-        patch("backend.api.auth.get_email_client") as mock_client,
+        patch.object(
+            auth_api, "_signup_limiter", TokenBucketLimiter.per_window("signup", 1, 60)
+        ),
+        patch("backend.services.email_outbox.get_email_client") as mock_client,
     ):
         mock_client.return_value.send_otp = lambda *_args, **_kwargs: None
         first = test_client.post("/api/auth/signup/pending", json=payload)
         second = test_client.post("/api/auth/signup/pending", json=payload)
 
     app.dependency_overrides.pop(get_current_identity, None)
-    auth_api._signup_attempts.clear()
+    auth_api._signup_limiter.reset()
 
     assert first.status_code == 201
     assert second.status_code == 429
     assert "rate limit exceeded" in second.json()["detail"].lower()
 
 
-def test_request_email_code_otp_send_failure_returns_503(test_client: TestClient, test_db):
+def test_request_email_code_queues_otp_when_provider_is_down(test_client: TestClient, test_db):
     user = User(uid="email_code_user", email="email-code-fail@testmail.app", role="user")
     test_db.add(user)
     test_db.commit()
 
-    with patch("backend.api.auth.get_email_client") as mock_client:
+    with patch("backend.services.email_outbox.get_email_client") as mock_client:
         mock_client.return_value.send_otp.side_effect = RuntimeError("smtp offline")
         response = test_client.post(
             "/api/auth/mfa/email/request-code",
             json={"email": "email-code-fail@testmail.app"},
         )
 
-    assert response.status_code == 503
-    assert "verification code" in response.json()["detail"].lower()
+    assert response.status_code == 200
+    queued = test_db.query(EmailOutbox).filter_by(to_email="email-code-fail@testmail.app").one()
+    assert queued.payload_json == {"code": test_db.get(User, "email_code_user").email_otp}
+    assert queued.status == "pending"
 
 
 def test_login_success(test_client: TestClient, test_db, mock_auth):
@@ -283,3 +293,63 @@ def test_logout(test_client: TestClient, mock_auth):
 
     assert response.status_code == 200
     mock_revoke.assert_called_once_with(mock_auth.uid)
+
+
+def _access_record(caplog, route):
+    return [
+        r
+        for r in caplog.records
+        if getattr(r, "event_type", None) == "access" and r.route == route
+    ][-1]
+
+
+def test_login_profile_is_one_select_plus_session_writes(
+    test_client: TestClient, test_db, mock_auth, caplog
+):
+    caplog.set_level(logging.INFO, logger="backend.middleware.security")
+    test_db.add(
+        Subscription(
+            uid=mock_auth.uid,
+            plan="pro_monthly",
+            status="active",
+            ai_quota_used=0,
+            welcome_email_sent=True,
+        )
+    )
+    test_db.commit()
+    claims = {"uid": mock_auth.uid, "email": mock_auth.email, "iat": 1700000000}
+
+    with patch("backend.api.auth.verify_token", return_value=claims):
+        response = test_client.post("/api/auth/login", json={"token": "valid_token"})
+
+    assert response.status_code == 200
+    user = response.json()["user"]
+    assert user["plan"] == "pro_monthly"
+    assert user["subscription_status"] == "active"
+    assert user["is_developer"] is False
+    # User SELECT, session SELECT + INSERT, and the reload after commit.
+    assert _access_record(caplog, "POST /api/auth/login").db_queries == 4
+
+
+def test_profile_is_a_single_select(test_client: TestClient, test_db, mock_auth, caplog):
+    caplog.set_level(logging.INFO, logger="backend.middleware.security")
+    test_db.add(
+        Subscription(uid=mock_auth.uid, plan="essential_monthly", status="active", ai_quota_used=0)
+    )
+    test_db.commit()
+
+    app.dependency_overrides[get_current_identity_with_user_guard] = lambda: {
+        "uid": "test_user_123",
+        "email": "test@testmail.app",
+    }
+    response = test_client.get("/api/auth/profile")
+    app.dependency_overrides.pop(get_current_identity_with_user_guard, None)
+
+    assert response.status_code == 200
+    user = response.json()["user"]
+    assert [sub["plan"] for sub in user["subscriptions"]] == ["essential_monthly"]
+    assert user["plan"] == "essential_monthly"
+    assert user["ai_settings"] is None
+    assert user["household_member"] is None
+    assert user["is_developer"] is False
+    assert _access_record(caplog, "GET /api/auth/profile").db_queries == 1
@@ -0,0 +1,62 @@
+from sqlalchemy import func, select
+
+from backend.dev_tools.benchmarks import (
+    BENCHMARKS,
+    compare_to_baseline,
+    prepare_benchmarks,
+    run_benchmarks,
+)
+from backend.dev_tools.fakes import install_fake_providers
+from backend.models import PlaidItemAccount, Transaction
+
+
+def test_benchmark_suite_runs_on_seeded_data(test_db, monkeypatch):
+    fakes = install_fake_providers(patch=monkeypatch.setattr)
+    monkeypatch.setattr("backend.services.financial_context.set_db_user_context", lambda *_: None)
+    fakes["plaid"].transactions_per_account = 30
+    ctx = prepare_benchmarks(
+        test_db, fakes, users=2, accounts_per_user=1, transactions_per_account=40
+    )
+
+    results = {entry["name"]: entry for entry in run_benchmarks(ctx, rounds=2, warmup=1)}
+
+    assert set(results) == {benchmark.name for benchmark in BENCHMARKS}
+    assert results["analytics.get_cash_flow"] == {
+        "name": "analytics.get_cash_flow",
+        "skipped": "needs PostgreSQL",
+    }
+    ran = [entry for entry in results.values() if "skipped" not in entry]
+    assert len(ran) == 5
+    assert all(entry["queries"] > 0 and entry["min_ms"] <= entry["median_ms"] for entry in ran)
+
+    # Each sync round starts from an empty cursor and imports the full fake history.
+    linked = select(PlaidItemAccount.account_id).where(
+        PlaidItemAccount.plaid_item_id == ctx.plaid_item.id
+    )
+    synced = test_db.scalar(
+        select(func.count()).select_from(Transaction).where(Transaction.account_id.in_(linked))
+    )
+    assert synced == 2 * 30
+
+
+def test_compare_to_baseline_flags_slowdowns_and_extra_queries():
+    baseline = [
+        {"name": "a", "median_ms": 10.0, "queries": 3},
+        {"name": "b", "median_ms": 10.0, "queries": 3},
+        {"name": "c", "median_ms": 1.0, "queries": 3},
+        {"name": "d", "skipped": "needs PostgreSQL"},
+    ]
+    results = [
+        {"name": "a", "median_ms": 12.0, "queries": 3},  # within threshold
+        {"name": "b", "median_ms": 15.0, "queries": 4},
+        {"name": "c", "median_ms": 2.5, "queries": 3},  # below the noise floor
+        {"name": "d", "median_ms": 50.0, "queries": 9},
+        {"name": "e", "median_ms": 50.0, "queries": 9},
+    ]
+
+    regressions = compare_to_baseline(results, baseline, threshold=0.25, min_delta_ms=2.0)
+
+    assert regressions == [
+        "b: median 10.0ms -> 15.0ms (+50%)",
+        "b: SQL statements 3 -> 4",
+    ]
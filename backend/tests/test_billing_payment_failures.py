@@ -2,11 +2,9 @@
 import time
 from types import SimpleNamespace
 
-import pytest
-
 from backend.core import settings
 from backend.models import Subscription, User
-from backend.services import billing
+from backend.services import billing, email_outbox
 
 
 class _EmailCapture:
@@ -44,8 +42,7 @@ class _EmailCapture:
         pass
 
 
-@pytest.mark.asyncio
-async def test_trial_end_payment_failure_downgrades_immediately(
+def test_trial_end_payment_failure_downgrades_immediately(
     test_db, monkeypatch
 ):
     settings.stripe_secret_key = "sk_test"
@@ -56,7 +53,7 @@ async def test_trial_end_payment_failure_downgrades_immediately(
     test_db.commit()
 
     email_capture = _EmailCapture()
-    monkeypatch.setattr(billing, "get_email_client", lambda: email_capture)
+    monkeypatch.setattr(email_outbox, "get_email_client", lambda: email_capture)
 
     past_trial_end = int(time.time()) - 10
     subscription_obj = SimpleNamespace(
@@ -74,15 +71,16 @@ async def test_trial_end_payment_failure_downgrades_immediately(
     invoice = {"customer": "cus_test", "subscription": "sub_test"}
     monkeypatch.setattr(billing, "_resolve_uid_for_customer", lambda *_: "trial_user")
 
-    await billing._handle_invoice_payment_failed(invoice, test_db)
+    billing._handle_invoice_payment_failed(invoice, test_db)
+    test_db.commit()
+    email_outbox.deliver_pending_emails(test_db.get_bind())
 
     updated = test_db.query(Subscription).filter(Subscription.uid == "trial_user").first()
     assert updated.plan == "free"
     assert email_capture.downgraded
 
 
-@pytest.mark.asyncio
-async def test_paid_plan_payment_failure_starts_grace_period(
+def test_paid_plan_payment_failure_starts_grace_period(
     test_db, monkeypatch
 ):
     settings.stripe_secret_key = "sk_test"
@@ -93,7 +91,7 @@ async def test_paid_plan_payment_failure_starts_grace_period(
     test_db.commit()
 
     email_capture = _EmailCapture()
-    monkeypatch.setattr(billing, "get_email_client", lambda: email_capture)
+    monkeypatch.setattr(email_outbox, "get_email_client", lambda: email_capture)
 
     subscription_obj = SimpleNamespace(
         trial_end=None,
@@ -110,7 +108,9 @@ async def test_paid_plan_payment_failure_starts_grace_period(
     invoice = {"customer": "cus_test", "subscription": "sub_test"}
     monkeypatch.setattr(billing, "_resolve_uid_for_customer", lambda *_: "paid_user")
 
-    await billing._handle_invoice_payment_failed(invoice, test_db)
+    billing._handle_invoice_payment_failed(invoice, test_db)
+    test_db.commit()
+    email_outbox.deliver_pending_emails(test_db.get_bind())
 
     updated = test_db.query(Subscription).filter(Subscription.uid == "paid_user").first()
     assert updated.status == "past_due"
@@ -0,0 +1,167 @@
+import threading
+import time
+
+import pytest
+
+from backend.services import web_search
+from backend.services.prompts import DEFAULT_SYSTEM_INSTRUCTION, PromptManager
+from backend.utils.cache import TTLCache, get_cache_stats
+
+
+def test_concurrent_misses_share_a_single_load():
+    cache = TTLCache("test_single_flight", ttl_seconds=60)
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(timeout=2)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["loads"] == 1
+    assert stats["coalesced"] == 4
+
+
+def test_invalidating_a_key_mid_load_keeps_the_stale_result_out():
+    cache = TTLCache("test_invalidate_in_flight", ttl_seconds=60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(timeout=2)
+        return "before"
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(cache.get_or_load("k", slow_loader)))
+    thread.start()
+    started.wait(timeout=2)
+    cache.invalidate("k")
+    # A miss after the invalidation loads afresh instead of joining the old load.
+    assert cache.get_or_load("k", lambda: "after") == "after"
+    release.set()
+    thread.join()
+
+    assert results == ["before"]
+    assert cache.get("k") == "after"
+
+
+def test_waiters_give_up_on_a_hung_load():
+    cache = TTLCache("test_wait_timeout", ttl_seconds=60, load_wait_timeout_seconds=0.05)
+    started = threading.Event()
+    release = threading.Event()
+
+    def hung_loader():
+        started.set()
+        release.wait(timeout=2)
+        return "late"
+
+    thread = threading.Thread(target=cache.get_or_load, args=("k", hung_loader))
+    thread.start()
+    started.wait(timeout=2)
+    with pytest.raises(TimeoutError):
+        cache.get_or_load("k", hung_loader)
+    release.set()
+    thread.join()
+
+    assert cache.stats()["wait_timeouts"] == 1
+    assert cache.get("k") == "late"
+
+
+def test_negative_results_use_negative_ttl_and_errors_are_not_cached():
+    cache = TTLCache("test_negative", ttl_seconds=60, negative_ttl_seconds=0.05)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_load("missing", loader) is None
+    assert cache.get_or_load("missing", loader) is None
+    assert len(calls) == 1
+    assert cache.stats()["negative_hits"] == 1
+
+    time.sleep(0.06)
+    cache.get_or_load("missing", loader)
+    assert len(calls) == 2
+
+    def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("err", failing)
+    assert cache.get("err", "absent") == "absent"
+    assert cache.stats()["load_errors"] == 1
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = TTLCache("test_eviction", ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+    assert "test_eviction" in get_cache_stats()
+
+
+@pytest.mark.asyncio
+async def test_prompt_manager_caches_default_when_sdk_errors(monkeypatch):
+    manager = PromptManager()
+    manager._cache.clear()
+    calls = []
+
+    class BrokenPrompts:
+        def get_prompt(self, prompt_name):
+            calls.append(prompt_name)
+            raise RuntimeError("permission denied")
+
+    monkeypatch.setattr(manager, "vertext_prompts_available", True)
+    monkeypatch.setattr(manager, "prompts_lib", BrokenPrompts(), raising=False)
+
+    first = await manager.get_system_instruction()
+    second = await manager.get_system_instruction()
+
+    assert first == second == manager._sanitize_prompt_content(DEFAULT_SYSTEM_INSTRUCTION)
+    assert calls == ["jualuma-system-v1"]
+    # Each lookup is counted once: one miss, then one negative hit.
+    stats = manager._cache.stats()
+    assert (stats["misses"], stats["negative_hits"]) == (1, 1)
+    manager._cache.clear()
+
+
+def test_search_web_caches_by_normalized_query(monkeypatch):
+    web_search._search_cache.clear()
+    calls = []
+
+    def fake_fetch(clean_query, max_results):
+        calls.append(clean_query)
+        return [{"title": "Inflation", "url": "https://example.com", "snippet": "CPI"}]
+
+    monkeypatch.setattr(web_search, "_fetch_web_results", fake_fetch)
+
+    first = web_search.search_web("What is  Inflation?", max_results=3)
+    second = web_search.search_web("what is inflation?", max_results=3)
+    first[0]["title"] = "mutated"
+
+    assert len(calls) == 1
+    assert second[0]["title"] == "Inflation"
+    assert web_search.search_web("what is inflation?", max_results=3)[0]["title"] == "Inflation"
+    web_search._search_cache.clear()
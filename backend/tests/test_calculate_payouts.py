@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from backend.jobs import calculate_payouts as job
+from backend.models import AuditLog, Developer, DeveloperPayout, Widget
+
+
+def _run_event(widget_id, developer_uid=None, archived=False):
+    metadata = {"widget_id": widget_id, "runner_uid": "runner"}
+    if developer_uid is not None:
+        metadata["developer_uid"] = developer_uid
+    return AuditLog(
+        actor_uid="runner",
+        target_uid=developer_uid,
+        action="widget_run",
+        source="backend",
+        metadata_json=metadata,
+        archived=archived,
+    )
+
+
+def _seed(test_db):
+    test_db.add_all(
+        [
+            Developer(uid="dev_verified", payout_method={"kyc_status": "verified"}),
+            Developer(uid="dev_pending", payout_method={"kyc_status": "pending"}),
+            Developer(uid="dev_no_method", payout_method=None),
+            Widget(id="w-verified", developer_uid="dev_verified", name="A"),
+            Widget(id="w-pending", developer_uid="dev_pending", name="B"),
+        ]
+    )
+    events = [_run_event("w-verified", "dev_verified") for _ in range(3)]
+    # Missing or empty developer_uid falls back to the widget owner.
+    events += [_run_event("w-verified"), _run_event("w-verified", "")]
+    events += [_run_event("w-pending", "dev_pending") for _ in range(2)]
+    events += [_run_event("w-x", "dev_no_method")]
+    # Unresolvable and archived events are ignored.
+    events += [_run_event("w-missing"), _run_event("w-verified", "dev_verified", archived=True)]
+    test_db.add_all(events)
+    test_db.commit()
+
+
+def test_aggregation_resolves_developer_and_kyc_in_one_query(test_db):
+    _seed(test_db)
+    statements = []
+
+    def _count(*_args):
+        statements.append(1)
+
+    event.listen(test_db.get_bind(), "before_cursor_execute", _count)
+    try:
+        _, revenue = job._aggregate_widget_run_revenue(test_db)
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", _count)
+
+    assert len(statements) == 1
+    assert revenue == {
+        "dev_verified": {"amount": Decimal("0.25"), "runs": 5, "kyc_status": "verified"},
+        "dev_pending": {"amount": Decimal("0.10"), "runs": 2, "kyc_status": "pending"},
+        "dev_no_method": {"amount": Decimal("0.05"), "runs": 1, "kyc_status": "unverified"},
+    }
+
+
+def test_calculate_payouts_upserts_verified_and_audits_skips(test_db, monkeypatch):
+    _seed(test_db)
+    month, _ = job._aggregate_widget_run_revenue(test_db)
+    test_db.add(
+        DeveloperPayout(month=month, dev_uid="dev_verified", gross_revenue=Decimal("0.01"))
+    )
+    test_db.commit()
+    monkeypatch.setattr(job, "SessionLocal", lambda: test_db)
+
+    job.calculate_payouts()
+
+    payouts = test_db.query(DeveloperPayout).all()
+    assert [(p.dev_uid, p.gross_revenue) for p in payouts] == [
+        ("dev_verified", Decimal("0.25"))
+    ]
+    skipped = {
+        log.target_uid
+        for log in test_db.query(AuditLog).filter(AuditLog.action == "payout_skipped_kyc")
+    }
+    assert skipped == {"dev_pending", "dev_no_method"}
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from backend.models import DigestMessage, DigestSettings, User
+from backend.services import digests
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.candidates = [object()]
+
+
+class _FakeAIClient:
+    """Stands in for the Vertex client with a fixed per-call latency."""
+
+    client_type = "fake"
+
+    def __init__(self, latency=0.05, fail_calls=()):
+        self.latency = latency
+        self.fail_calls = set(fail_calls)
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def generate_content(self, prompt, safety_settings=None):
+        self.calls += 1
+        call = self.calls
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if call in self.fail_calls:
+                raise RuntimeError("model overloaded")
+            return _FakeResponse("Spending looks steady.")
+        finally:
+            self.in_flight -= 1
+
+
+class _RecordingEmail:
+    def __init__(self):
+        self.sent = []
+
+    def send_financial_digest(self, to_email, subject, body):
+        self.sent.append(to_email)
+
+
+@pytest.fixture
+def email(monkeypatch):
+    client = _RecordingEmail()
+    monkeypatch.setattr(digests, "get_email_client", lambda: client)
+    return client
+
+
+def _seed_due(test_db, count):
+    uids = [f"digest_user_{n:03d}" for n in range(count)]
+    for uid in uids:
+        test_db.add(User(uid=uid, email=f"{uid}@testmail.app", role="user"))
+        test_db.add(
+            DigestSettings(
+                uid=uid,
+                enabled=True,
+                cadence="weekly",
+                delivery_email=True,
+                next_send_at_utc=NOW - timedelta(minutes=5),
+            )
+        )
+    test_db.commit()
+    return uids
+
+
+def test_due_digests_run_concurrently_under_the_ai_cap(test_db, email, monkeypatch):
+    uids = _seed_due(test_db, 40)
+    ai = _FakeAIClient(latency=0.05)
+    monkeypatch.setattr(digests, "get_ai_client", lambda: ai)
+    # Measure the runner, not local key derivation.
+    monkeypatch.setattr(digests, "encrypt_prompt", lambda text, user_dek_ref: text)
+
+    sent = digests.run_due_digests(test_db, now_utc=NOW, lease_size=10, ai_concurrency=8)
+
+    assert sent == 40
+    assert ai.calls == 40
+    # Overlapping calls show concurrency without depending on wall-clock time.
+    assert 1 < ai.peak <= 8
+    assert sorted(email.sent) == sorted(f"{uid}@testmail.app" for uid in uids)
+
+    test_db.expire_all()
+    assert test_db.query(DigestMessage).count() == 40
+    for row in test_db.query(DigestSettings).all():
+        assert row.last_period_key is not None
+        assert row.next_send_at_utc.replace(tzinfo=UTC) > NOW
+
+    # Everything is scheduled forward, so a second run finds nothing due.
+    assert digests.run_due_digests(test_db, now_utc=NOW) == 0
+
+
+def test_failed_digest_is_rescheduled_without_losing_the_others(
+    test_db, email, monkeypatch
+):
+    uids = _seed_due(test_db, 6)
+    ai = _FakeAIClient(latency=0.01, fail_calls={3})
+    monkeypatch.setattr(digests, "get_ai_client", lambda: ai)
+
+    sent = digests.run_due_digests(test_db, now_utc=NOW, lease_size=4, ai_concurrency=2)
+
+    assert sent == 5
+    test_db.expire_all()
+    delivered = {m.uid for m in test_db.query(DigestMessage).all()}
+    [failed_uid] = set(uids) - delivered
+    failed = test_db.get(DigestSettings, failed_uid)
+    assert failed.last_period_key is None
+    assert failed.next_send_at_utc.replace(tzinfo=UTC) >= NOW + timedelta(minutes=10)
+    assert sorted(email.sent) == sorted(f"{uid}@testmail.app" for uid in delivered)
+
+
+def test_claim_leases_rows_so_other_runners_skip_them(test_db):
+    _seed_due(test_db, 5)
+
+    first = digests._claim_due_digests(test_db, now_utc=NOW, limit=3, lease_seconds=600)
+    second = digests._claim_due_digests(test_db, now_utc=NOW, limit=3, lease_seconds=600)
+
+    assert len(first) == 3
+    assert len(second) == 2
+    assert not set(first) & set(second)
+    assert digests._claim_due_digests(test_db, now_utc=NOW, limit=3, lease_seconds=600) == []
+    # An abandoned lease makes the rows due again once it expires.
+    later = NOW + timedelta(seconds=601)
+    assert len(digests._claim_due_digests(test_db, now_utc=later, limit=10, lease_seconds=600)) == 5
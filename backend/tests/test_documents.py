@@ -1,4 +1,8 @@
+from datetime import UTC, datetime, timedelta
 from io import BytesIO
+from pathlib import Path
+
+import pytest
 
 from backend.models import UserDocument
 
@@ -102,10 +106,11 @@ def test_upload_document_rejects_disallowed_content_type(
     assert "Unsupported file content type" in response.json()["detail"]
 
 
-def test_upload_document_normalizes_heic_to_jpg(
+def test_upload_document_normalizes_heic_to_jpg_in_background(
     test_client, test_db, mock_auth, monkeypatch, tmp_path
 ):
     monkeypatch.setattr("backend.api.documents.UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr("backend.api.documents.HEIC_DECODER_AVAILABLE", True)
     monkeypatch.setattr(
         "backend.api.documents._normalize_heic_bytes",
         lambda _: b"normalized-jpeg-content",
@@ -121,16 +126,24 @@ def test_upload_document_normalizes_heic_to_jpg(
     assert response.status_code == 200
     payload = response.json()
     assert payload["name"] == "photo.heic"
-    assert payload["fileType"] == "jpg"
+    assert payload["fileType"] == "heic"
+    assert payload["status"] == "processing"
 
+    # The background task has run by the time TestClient returns.
+    test_db.expire_all()
     stored_doc = test_db.query(UserDocument).filter(UserDocument.uid == mock_auth.uid).one()
     assert stored_doc.file_type == "jpg"
+    assert stored_doc.processing_status == "ready"
+    assert stored_doc.size_bytes == len(b"normalized-jpeg-content")
+    assert Path(stored_doc.file_path).read_bytes() == b"normalized-jpeg-content"
+    assert [p.suffix for p in tmp_path.iterdir()] == [".jpg"]
 
 
-def test_upload_document_returns_explicit_heic_failure_reason_and_skips_persist(
+def test_upload_document_records_heic_failure_reason_on_document(
     test_client, test_db, mock_auth, monkeypatch, tmp_path
 ):
     monkeypatch.setattr("backend.api.documents.UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr("backend.api.documents.HEIC_DECODER_AVAILABLE", True)
     tmp_path.mkdir(parents=True, exist_ok=True)
 
     from backend.api.documents import HeicNormalizationError
@@ -146,6 +159,85 @@ def test_upload_document_returns_explicit_heic_failure_reason_and_skips_persist(
         data={"type": "uploaded"},
     )
 
+    assert response.status_code == 200
+    test_db.expire_all()
+    stored_doc = test_db.query(UserDocument).filter(UserDocument.uid == mock_auth.uid).one()
+    assert stored_doc.processing_status == "failed"
+    assert stored_doc.processing_error == "HEIC_DECODE_FAILED"
+    assert stored_doc.file_type == "heic"
+
+
+def test_stale_processing_documents_are_marked_failed(test_db, mock_auth):
+    from backend.api.documents import fail_stale_processing_documents
+
+    now = datetime.now(UTC)
+    docs = {
+        name: UserDocument(
+            uid=mock_auth.uid,
+            name=f"{name}.heic",
+            file_type="heic",
+            file_path=f"/tmp/{name}.heic",
+            processing_status=status,
+            updated_at=now - age,
+        )
+        for name, status, age in [
+            ("abandoned", "processing", timedelta(hours=1)),
+            ("converting", "processing", timedelta(minutes=1)),
+            ("done", "ready", timedelta(hours=1)),
+        ]
+    }
+    test_db.add_all(docs.values())
+    test_db.commit()
+
+    assert fail_stale_processing_documents(test_db.get_bind(), now=now) == 1
+
+    test_db.expire_all()
+    assert docs["abandoned"].processing_status == "failed"
+    assert docs["abandoned"].processing_error == "HEIC_NORMALIZATION_ABANDONED"
+    assert docs["converting"].processing_status == "processing"
+    assert docs["done"].processing_status == "ready"
+
+
+def test_upload_document_rejects_heic_when_decoder_unavailable(
+    test_client, test_db, mock_auth, monkeypatch, tmp_path
+):
+    monkeypatch.setattr("backend.api.documents.UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr("backend.api.documents.HEIC_DECODER_AVAILABLE", False)
+    tmp_path.mkdir(parents=True, exist_ok=True)
+
+    response = test_client.post(
+        "/api/documents/upload",
+        files={"file": ("photo.heic", BytesIO(b"heic-bytes"), "image/heic")},
+        data={"type": "uploaded"},
+    )
+
     assert response.status_code == 400
-    assert "couldn't process that HEIC image" in response.json()["detail"]
+    assert "HEIC upload is currently unavailable" in response.json()["detail"]
     assert test_db.query(UserDocument).filter(UserDocument.uid == mock_auth.uid).count() == 0
+
+
+def test_upload_document_streams_in_chunks_and_stops_at_limit(
+    test_client, test_db, mock_auth, monkeypatch, tmp_path
+):
+    monkeypatch.setattr("backend.api.documents.UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr("backend.api.documents.UPLOAD_CHUNK_BYTES", 4)
+    monkeypatch.setattr("backend.api.documents.MAX_UPLOAD_BYTES", 10)
+    tmp_path.mkdir(parents=True, exist_ok=True)
+
+    from backend.api import documents
+
+    assert documents._copy_upload(BytesIO(b"0123456789"), tmp_path / "ok.txt", 10) == 10
+    assert (tmp_path / "ok.txt").read_bytes() == b"0123456789"
+
+    reads = []
+
+    class CountingSource(BytesIO):
+        def read(self, size=-1):
+            reads.append(size)
+            return super().read(size)
+
+    with pytest.raises(documents.UploadTooLargeError):
+        documents._copy_upload(CountingSource(b"x" * 100), tmp_path / "big.txt", 10)
+    assert set(reads) == {4}
+    assert len(reads) == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["ok.txt"]
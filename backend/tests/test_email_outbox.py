@@ -0,0 +1,191 @@
+import threading
+import time
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+
+from backend.api import auth as auth_api
+from backend.models import EmailOutbox, User
+from backend.services import email_outbox
+from backend.services.email_outbox import (
+    deliver_pending_emails,
+    enqueue_email,
+    purge_finished_emails,
+)
+
+
+class _SlowEmailClient:
+    """Stands in for the mail provider with a fixed per-send latency."""
+
+    def __init__(self, latency=0.05, fail=False):
+        self.latency = latency
+        self.fail = fail
+        self.sent = []
+        self.in_flight = 0
+        self.peak = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def _deliver(self, to_email, **fields):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.threads.add(threading.current_thread().name)
+        try:
+            time.sleep(self.latency)
+            if self.fail:
+                raise RuntimeError("provider unavailable")
+            with self._lock:
+                self.sent.append((to_email, fields))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def send_otp(self, to_email, code):
+        self._deliver(to_email, code=code)
+
+    def send_generic_alert(self, to_email, title):
+        self._deliver(to_email, title=title)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    client = _SlowEmailClient()
+    monkeypatch.setattr(email_outbox, "get_email_client", lambda: client)
+    return client
+
+
+def _enqueue(test_db, count, **kwargs):
+    for n in range(count):
+        enqueue_email(
+            test_db,
+            "send_generic_alert",
+            f"user{n}@testmail.app",
+            message_key=f"alert:{n}",
+            title="Heads up",
+            **kwargs,
+        )
+    test_db.commit()
+
+
+def test_otp_request_does_not_wait_for_the_provider(test_db, provider):
+    provider.latency = 0.5
+    user = User(uid="otp_outbox_user", email="otp-outbox@testmail.app", role="user")
+    test_db.add(user)
+    test_db.commit()
+
+    started = time.perf_counter()
+    auth_api._generate_and_send_otp(user, test_db)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < provider.latency / 2
+    assert provider.sent == []
+    queued = test_db.query(EmailOutbox).one()
+    assert queued.status == "pending"
+
+    assert deliver_pending_emails(test_db.get_bind())["sent"] == 1
+    assert provider.sent == [("otp-outbox@testmail.app", {"code": user.email_otp})]
+
+
+def test_pending_emails_are_sent_concurrently(test_db, provider):
+    _enqueue(test_db, 20)
+
+    started = time.perf_counter()
+    counts = deliver_pending_emails(test_db.get_bind(), batch_size=50, concurrency=8)
+    elapsed = time.perf_counter() - started
+
+    assert counts == {"sent": 20, "retried": 0, "failed": 0}
+    assert 1 < provider.peak <= 8
+    # Long-lived pool threads, so per-thread provider clients survive the drain.
+    assert all(name.startswith("io-worker") for name in provider.threads)
+    # Sequential sends would take 20 * 50ms.
+    assert elapsed < 20 * provider.latency / 2
+    test_db.expire_all()
+    assert {row.status for row in test_db.query(EmailOutbox).all()} == {"sent"}
+    assert deliver_pending_emails(test_db.get_bind()) == {"sent": 0, "retried": 0, "failed": 0}
+
+
+def test_message_key_dedupes_enqueues(test_db, provider):
+    _enqueue(test_db, 1)
+    _enqueue(test_db, 1)
+
+    assert test_db.query(EmailOutbox).count() == 1
+    deliver_pending_emails(test_db.get_bind())
+    assert len(provider.sent) == 1
+
+
+def test_failed_sends_back_off_then_give_up(test_db, provider):
+    provider.fail = True
+    provider.latency = 0
+    _enqueue(test_db, 1)
+    bind = test_db.get_bind()
+    now = datetime.now(UTC) + timedelta(minutes=1)
+
+    first = deliver_pending_emails(bind, now=now, max_attempts=2)
+    assert first == {"sent": 0, "retried": 1, "failed": 0}
+    row = test_db.query(EmailOutbox).one()
+    assert row.last_error == "provider unavailable"
+    assert row.next_attempt_at.replace(tzinfo=UTC) == now + timedelta(seconds=30)
+
+    # Not due again until the backoff passes.
+    assert deliver_pending_emails(bind, now=now, max_attempts=2)["retried"] == 0
+    last = deliver_pending_emails(bind, now=now + timedelta(minutes=1), max_attempts=2)
+    assert last == {"sent": 0, "retried": 0, "failed": 1}
+    test_db.expire_all()
+    assert test_db.query(EmailOutbox).one().status == "failed"
+
+
+def test_stale_one_time_messages_expire_unsent(test_db, provider):
+    now = datetime.now(UTC) + timedelta(minutes=1)
+    _enqueue(test_db, 1, expires_at=now - timedelta(seconds=1))
+
+    deliver_pending_emails(test_db.get_bind(), now=now)
+
+    assert provider.sent == []
+    test_db.expire_all()
+    assert test_db.query(EmailOutbox).one().status == "expired"
+
+
+def test_expiry_converts_aware_times_to_utc():
+    now = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+    # Postgres hands back aware values in the session time zone: one hour
+    # ahead of ``now`` here, though the wall-clock reading is behind it.
+    expires_at = (now + timedelta(hours=1)).astimezone(timezone(timedelta(hours=-5)))
+
+    assert email_outbox._as_utc(expires_at) == now + timedelta(hours=1)
+    # sqlite returns naive UTC values.
+    assert email_outbox._as_utc(datetime(2026, 3, 2, 13, 0)) == now + timedelta(hours=1)
+
+
+def test_purge_deletes_only_old_finished_rows(test_db):
+    now = datetime.now(UTC)
+    old = now - timedelta(days=31)
+    for key, status, created_at in [
+        ("old-sent", "sent", old),
+        ("old-failed", "failed", old),
+        ("old-expired", "expired", old),
+        ("old-pending", "pending", old),
+        ("new-sent", "sent", now - timedelta(days=1)),
+    ]:
+        test_db.add(
+            EmailOutbox(
+                message_key=key,
+                kind="send_generic_alert",
+                to_email="user@testmail.app",
+                payload_json={},
+                status=status,
+                created_at=created_at,
+            )
+        )
+    test_db.commit()
+
+    purged = purge_finished_emails(
+        test_db.get_bind(), now=now, retention_days=30, batch_size=2
+    )
+
+    assert purged == 3
+    test_db.expire_all()
+    assert sorted(row.message_key for row in test_db.query(EmailOutbox)) == [
+        "new-sent",
+        "old-pending",
+    ]
@@ -1,7 +1,10 @@
 import base64
+import time
 from email.parser import BytesParser
 from email.policy import default
 
+import pytest
+
 from backend.services.email import GmailApiEmailClient
 
 
@@ -195,3 +198,99 @@ def test_ensure_send_as_default_creates_missing_alias_and_sets_default():
     assert captured["patch_sendAsEmail"] == "noreply@jualuma.com"
     assert captured["patch_body"] == {"isDefault": True}
     assert captured["patch_executed"] is True
+
+
+class _CountingGmail:
+    """Fake discovery-built service that counts Gmail API round trips."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def settings(self):
+        return self
+
+    def sendAs(self):
+        return self
+
+    def send(self, userId: str, body: dict):
+        self.calls.append("send")
+        return self._request({"id": "msg"})
+
+    def list(self, userId: str):
+        self.calls.append("sendAs.list")
+        return self._request({"sendAs": [{"sendAsEmail": "noreply@jualuma.com", "isDefault": True}]})
+
+    @staticmethod
+    def _request(result):
+        class _Request:
+            def execute(self):
+                return result
+
+        return _Request()
+
+
+@pytest.fixture
+def gmail_caches():
+    from backend.services import email as email_service
+
+    def clear():
+        email_service._gmail_credentials.clear()
+        email_service._gmail_send_as_ready.clear()
+        email_service._thread_services.__dict__.clear()
+
+    clear()
+    yield email_service
+    clear()
+
+
+def test_otp_burst_reuses_token_service_and_send_as_state(monkeypatch, gmail_caches):
+    calls: list[str] = []
+    mints: list[tuple[str, bool]] = []
+    builds: list[object] = []
+
+    def fake_mint(self, sender_user, include_settings_scopes):
+        mints.append((sender_user, include_settings_scopes))
+        return object(), time.time() + 3600
+
+    def fake_build(api, version, credentials, cache_discovery):
+        builds.append(credentials)
+        return _CountingGmail(calls)
+
+    monkeypatch.setattr(GmailApiEmailClient, "_mint_credentials", fake_mint)
+    monkeypatch.setattr("googleapiclient.discovery.build", fake_build)
+
+    for n in range(5):
+        # get_email_client() hands out a fresh client for every email.
+        GmailApiEmailClient().send_otp(f"user{n}@example.com", "123456")
+
+    assert calls == ["sendAs.list"] + ["send"] * 5
+    assert sorted(mints) == [("hello@jualuma.com", False), ("hello@jualuma.com", True)]
+    assert len(builds) == 2
+
+
+def test_static_token_is_reminted_shortly_before_expiry(monkeypatch, gmail_caches):
+    expiries = iter([time.time() + 3600, time.time() + 120, time.time() + 3600])
+    mints: list[float] = []
+
+    def fake_mint(self, sender_user, include_settings_scopes):
+        expires_at = next(expiries)
+        mints.append(expires_at)
+        return object(), expires_at
+
+    monkeypatch.setattr(GmailApiEmailClient, "_mint_credentials", fake_mint)
+    client = GmailApiEmailClient()
+
+    first = client._get_credentials("hello@jualuma.com", False)
+    assert client._get_credentials("hello@jualuma.com", False) is first
+
+    gmail_caches._gmail_credentials.clear()
+    # A token inside the refresh skew is dropped and minted again.
+    fresh = client._get_credentials("hello@jualuma.com", False)
+    assert len(mints) == 3
+    assert fresh is not first
@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from backend.core import events
+
+
+class InMemoryPublisher:
+    """Stand-in for PublisherClient: futures resolve when their batch is sent."""
+
+    def __init__(self, batch_size=3, fail_topics=()):
+        self.batch_size = batch_size
+        self.fail_topics = set(fail_topics)
+        self.sent = []
+        self.resumed = []
+        self.stopped = False
+        self._batch = []
+        self._lock = threading.Lock()
+        # One sender thread: batches go out in the order they were cut.
+        self._sender = ThreadPoolExecutor(max_workers=1)
+
+    def topic_path(self, project, topic):
+        return f"projects/{project}/topics/{topic}"
+
+    def publish(self, topic, data, ordering_key="", **attrs):
+        if self.stopped:
+            raise RuntimeError("publisher stopped")
+        future = Future()
+        with self._lock:
+            self._batch.append((topic, ordering_key, data, future))
+            batch = self._take() if len(self._batch) >= self.batch_size else None
+        if batch:
+            self._send_later(batch)
+        return future
+
+    def stop(self):
+        self.stopped = True
+        with self._lock:
+            batch = self._take()
+        self._send_later(batch)
+
+    def resume_publish(self, topic, ordering_key):
+        self.resumed.append((topic, ordering_key))
+
+    def _take(self):
+        batch, self._batch = self._batch, []
+        return batch
+
+    def _send_later(self, batch):
+        def send():
+            time.sleep(0.01)
+            for topic, key, data, future in batch:
+                if topic.rsplit("/", 1)[-1] in self.fail_topics:
+                    future.set_exception(ConnectionError("unavailable"))
+                    continue
+                self.sent.append((topic.rsplit("/", 1)[-1], key, json.loads(data)))
+                future.set_result(str(len(self.sent)))
+
+        self._sender.submit(send)
+
+
+@pytest.fixture
+def fake_publisher(monkeypatch):
+    publisher = InMemoryPublisher()
+    monkeypatch.setattr(events, "publisher", publisher)
+    monkeypatch.setattr(events, "_in_flight", set())
+    monkeypatch.setattr(events, "_stats", {"published": 0, "failed": 0, "rejected": 0})
+    monkeypatch.setattr(events, "_failure_callbacks", [])
+    return publisher
+
+
+def test_publish_does_not_wait_and_shutdown_flushes_in_order(fake_publisher):
+    futures = [
+        events.publish_event("ticket_events", {"seq": i}, ordering_key="ticket-1")
+        for i in range(7)
+    ]
+
+    # The last partial batch is only sent on shutdown.
+    assert not futures[-1].done()
+
+    events.shutdown_events(timeout=2)
+
+    assert all(f.done() for f in futures)
+    assert [data["seq"] for _, _, data in fake_publisher.sent] == list(range(7))
+    assert {key for _, key, _ in fake_publisher.sent} == {"ticket-1"}
+    assert events.get_event_publish_stats() == {
+        "published": 7,
+        "failed": 0,
+        "rejected": 0,
+        "in_flight": 0,
+    }
+    assert events.publisher is None
+
+
+def test_failed_publish_runs_callbacks_and_resumes_ordering_key(fake_publisher):
+    fake_publisher.fail_topics = {"broken"}
+    failures = []
+    events.add_publish_failure_callback(lambda topic, data, exc: failures.append((topic, data)))
+
+    events.publish_event("broken", {"id": 1}, ordering_key="k")
+    events.shutdown_events(timeout=2)
+
+    assert failures == [("broken", {"id": 1})]
+    assert [key for _, key in fake_publisher.resumed] == ["k"]
+    assert events.get_event_publish_stats()["failed"] == 1
+
+
+def test_backpressure_rejects_when_too_many_in_flight(fake_publisher, monkeypatch):
+    fake_publisher.batch_size = 100
+    monkeypatch.setattr(events, "_in_flight_slots", threading.BoundedSemaphore(2))
+    monkeypatch.setattr(events.settings, "pubsub_backpressure_timeout_seconds", 0)
+
+    events.publish_event("ticket_events", {"n": 1})
+    events.publish_event("ticket_events", {"n": 2})
+    with pytest.raises(events.EventBackpressureError):
+        events.publish_event("ticket_events", {"n": 3})
+
+    events.shutdown_events(timeout=2)
+    assert [data["n"] for _, _, data in fake_publisher.sent] == [1, 2]
+    assert events.get_event_publish_stats()["rejected"] == 1
@@ -1,3 +1,5 @@
+import os
+import time
 from pathlib import Path
 
 import pytest
@@ -6,9 +8,17 @@ from backend.models import UserDocument
 from backend.services.financial_context import (
     _uploaded_documents_context,
     get_financial_context,
+    invalidate_financial_context_cache,
 )
 
 
+@pytest.fixture(autouse=True)
+def _clear_context_cache():
+    invalidate_financial_context_cache()
+    yield
+    invalidate_financial_context_cache()
+
+
 def _create_user_document(
     *,
     test_db,
@@ -194,3 +204,93 @@ def test_uploaded_documents_context_uses_query_relevance_across_user_corpus(
     assert "important.txt (txt): Cross-thread marker ZEPHYR-CONTEXT-7781" in section
     assert audit["considered"] == 6
     assert audit["included"] == 5
+
+
+@pytest.mark.asyncio
+async def test_get_financial_context_returns_partial_context_when_section_times_out(
+    test_db, mock_auth, monkeypatch, caplog
+):
+    account_calls = []
+
+    def slow_vector_search(*_, **__):
+        time.sleep(0.5)
+        return []
+
+    def account_summary(*_, **__):
+        account_calls.append(1)
+        return {
+            "net_worth": 100.0,
+            "connected_accounts": 1,
+            "manual_assets": 0,
+            "accounts_by_type": {"checking": 1},
+        }
+
+    monkeypatch.setattr("backend.services.financial_context.set_db_user_context", lambda *_: None)
+    monkeypatch.setattr(
+        "backend.services.financial_context.settings.ai_context_section_timeout_seconds", 0.1
+    )
+    monkeypatch.setattr("backend.services.financial_context._vector_search", slow_vector_search)
+    monkeypatch.setattr("backend.services.financial_context._spending_summary", lambda *_, **__: [])
+    monkeypatch.setattr("backend.services.financial_context._account_summary", account_summary)
+
+    caplog.set_level("INFO")
+    context = await get_financial_context(mock_auth.uid, "How am I doing?", db=test_db)
+    assert "## Account Overview" in context
+    assert "## Subscription" in context
+    assert "## Relevant Transactions" not in context
+    assert "AI_CONTEXT_SECTION_TIMEOUT" in caplog.text
+    assert "section=transactions" in caplog.text
+
+    # Account summary is served from the per-user cache on the next turn.
+    await get_financial_context(mock_auth.uid, "And now?", db=test_db)
+    assert len(account_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_new_support_ticket_refreshes_cached_context(
+    test_client, test_db, mock_auth, monkeypatch
+):
+    monkeypatch.setattr("backend.services.financial_context.set_db_user_context", lambda *_: None)
+    monkeypatch.setattr("backend.services.financial_context._vector_search", lambda *_, **__: [])
+    monkeypatch.setattr("backend.services.financial_context._spending_summary", lambda *_, **__: [])
+
+    before = await get_financial_context(mock_auth.uid, "Any open tickets?", db=test_db)
+    assert "Card was declined" not in before
+
+    response = test_client.post(
+        "/api/support/tickets",
+        json={
+            "subject": "Card was declined",
+            "description": "My card was declined at checkout.",
+            "category": "billing",
+        },
+    )
+    assert response.status_code == 201
+
+    after = await get_financial_context(mock_auth.uid, "Any open tickets?", db=test_db)
+    assert "Card was declined" in after
+
+
+def test_uploaded_documents_context_rereads_file_after_modification(
+    test_db, mock_auth, tmp_path
+):
+    notes_path = tmp_path / "notes.txt"
+    notes_path.write_text("Original contents.", encoding="utf-8")
+    _create_user_document(
+        test_db=test_db,
+        uid=mock_auth.uid,
+        name="notes.txt",
+        file_type="txt",
+        file_path=notes_path,
+        size_bytes=notes_path.stat().st_size,
+    )
+
+    section, _ = _uploaded_documents_context(test_db, mock_auth.uid)
+    assert "Original contents." in section
+
+    notes_path.write_text("Replaced contents here.", encoding="utf-8")
+    stat = notes_path.stat()
+    os.utime(notes_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    section, _ = _uploaded_documents_context(test_db, mock_auth.uid)
+    assert "Replaced contents here." in section
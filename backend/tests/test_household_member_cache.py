@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.models import HouseholdInvite, User
+from backend.services.household_service import (
+    accept_invite,
+    create_household,
+    get_household_member_uids,
+    leave_household,
+    remove_member,
+)
+
+
+@contextmanager
+def _count_queries(bind):
+    statements = []
+
+    def record(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+
+def _users(test_db, *uids):
+    test_db.add_all(User(uid=uid, email=f"{uid}@testmail.app", role="user") for uid in uids)
+    test_db.commit()
+
+
+def _join(test_db, household, uid):
+    invite = HouseholdInvite(
+        household_id=household.id,
+        email=f"{uid}@testmail.app",
+        token=f"token-{uid}",
+        expires_at=datetime.now(UTC) + timedelta(days=1),
+    )
+    test_db.add(invite)
+    test_db.flush()
+    accept_invite(test_db, uid, invite.token)
+
+
+def test_household_scope_resolves_once_per_request(test_db):
+    _users(test_db, "hh_owner", "hh_member")
+    household = create_household(test_db, "hh_owner", "Home")
+    _join(test_db, household, "hh_member")
+    bind = test_db.get_bind()
+
+    with _count_queries(bind) as statements:
+        first = get_household_member_uids(test_db, "hh_owner")
+        for _ in range(5):
+            assert get_household_member_uids(test_db, "hh_owner") == first
+    assert sorted(first) == ["hh_member", "hh_owner"]
+    assert len(statements) == 1
+
+    # A later request (new session) reads membership again, so a removal made
+    # by another worker is never served from a stale cache.
+    with Session(bind=bind) as other, _count_queries(bind) as statements:
+        assert sorted(get_household_member_uids(other, "hh_owner")) == sorted(first)
+    assert len(statements) == 1
+
+
+def test_membership_changes_take_effect_immediately(test_db):
+    _users(test_db, "hh_owner", "hh_member", "hh_other")
+    assert get_household_member_uids(test_db, "hh_owner") == ["hh_owner"]
+
+    household = create_household(test_db, "hh_owner", "Home")
+    assert get_household_member_uids(test_db, "hh_owner") == ["hh_owner"]
+
+    _join(test_db, household, "hh_member")
+    _join(test_db, household, "hh_other")
+    assert sorted(get_household_member_uids(test_db, "hh_owner")) == [
+        "hh_member",
+        "hh_other",
+        "hh_owner",
+    ]
+
+    leave_household(test_db, "hh_member")
+    assert get_household_member_uids(test_db, "hh_member") == ["hh_member"]
+    assert sorted(get_household_member_uids(test_db, "hh_owner")) == ["hh_other", "hh_owner"]
+
+    remove_member(test_db, "hh_owner", "hh_other")
+    assert get_household_member_uids(test_db, "hh_other") == ["hh_other"]
+    assert get_household_member_uids(test_db, "hh_owner") == ["hh_owner"]
+
+    # Another session sees the same, fresh scope.
+    with Session(bind=test_db.get_bind()) as other:
+        assert get_household_member_uids(other, "hh_owner") == ["hh_owner"]
@@ -0,0 +1,128 @@
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from backend.dev_tools.fakes import FakeFirestore
+from backend.dev_tools.perf_data import seed_perf_dataset
+from backend.main import app
+from backend.middleware import auth as auth_middleware
+from backend.models import Account, Subscription, Transaction, User
+from backend.utils import firestore as firestore_utils
+from backend.utils import get_db
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "scripts"
+
+
+def _load_runner():
+    spec = importlib.util.spec_from_file_location(
+        "run_load_perf_tests", SCRIPTS / "run_load_perf_tests.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+runner = _load_runner()
+# Steps that need Postgres: full-text search, date_trunc, and timestamptz
+# values coming back timezone-aware.
+POSTGRES_ONLY = {"search", "cash_flow", "net_worth"}
+
+
+def test_latency_histogram_percentiles_are_within_bucket_error():
+    histogram = runner.LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.record(float(ms))
+
+    assert histogram.count == 1000
+    assert histogram.percentile(0.50) == pytest.approx(500, rel=0.02)
+    assert histogram.percentile(0.99) == pytest.approx(990, rel=0.02)
+    assert histogram.percentile(1.0) == 1000
+
+
+def test_perf_dataset_is_deterministic_and_idempotent(test_db):
+    first = seed_perf_dataset(test_db, users=3, accounts_per_user=2, transactions_per_account=25)
+    assert first.transactions == 3 * 2 * 25
+    ids = set(test_db.scalars(select(Transaction.id)).all())
+
+    again = seed_perf_dataset(test_db, users=3, accounts_per_user=2, transactions_per_account=25)
+    assert again.transactions == 0
+    assert test_db.scalar(select(func.count()).select_from(Transaction)) == 150
+
+    # A fresh database seeded with the same arguments gets the same rows.
+    for model in (Transaction, Account, Subscription):
+        test_db.query(model).filter(model.uid.in_(first.user_uids)).delete()
+    test_db.query(User).filter(User.uid.in_(first.user_uids)).delete()
+    test_db.commit()
+    seed_perf_dataset(test_db, users=3, accounts_per_user=2, transactions_per_account=25)
+    assert set(test_db.scalars(select(Transaction.id)).all()) == ids
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    ["dashboard.json", "transactions.json", "marketplace.json", "support_queue.json"],
+)
+def test_scenarios_run_against_the_app(test_db, monkeypatch, scenario):
+    seed_perf_dataset(test_db, users=2, accounts_per_user=1, transactions_per_account=20)
+    monkeypatch.setattr(firestore_utils, "_firestore_client", FakeFirestore())
+    # The real magic-token auth path runs; only the Postgres RLS setting is skipped.
+    monkeypatch.setattr(
+        auth_middleware, "set_db_user_context", lambda db, uid: db.info.update(rls_user_id=uid)
+    )
+
+    def override_get_db():
+        yield test_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    loaded = runner.load_scenario(SCRIPTS / "load_scenarios" / scenario)
+    loaded.users = loaded.users[:2]
+    loaded.requests = [spec for spec in loaded.requests if spec.name not in POSTGRES_ONLY]
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            load = runner.LoadRun(loaded, client=client, seed=7)
+            elapsed = await load.run_closed(concurrency=1, warmup=0, duration=None, requests=40)
+            return load.report(elapsed)
+
+    try:
+        report = asyncio.run(run())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert report["requests"] == 40
+    failures = [e for e in report["endpoints"] if e["failed"]]
+    assert failures == []
+    assert all(e["latency_ms"]["p99"] >= e["latency_ms"]["p50"] for e in report["endpoints"])
+
+
+def test_open_loop_counts_arrivals_it_cannot_start():
+    scenario = runner.Scenario(
+        name="slow", requests=[runner.RequestSpec(name="slow", method="GET", path="/slow")]
+    )
+
+    async def slow(request):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200)
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(slow), base_url="http://load"
+        ) as client:
+            load = runner.LoadRun(scenario, client=client, seed=1)
+            elapsed = await load.run_open(
+                rate=100, poisson=False, max_in_flight=5, warmup=0, duration=None, requests=20
+            )
+            return load, load.report(elapsed)
+
+    load, report = asyncio.run(run())
+
+    assert load.dropped == 15
+    assert report["requests"] == 5
+    # Latency includes time from the scheduled arrival, not just service time.
+    assert report["latency_ms"]["p50"] >= 190
@@ -12,7 +12,7 @@ from backend.models import User
 
 @patch("backend.middleware.auth.verify_token")
 @patch("backend.api.auth.verify_token")
-@patch("backend.api.auth.get_email_client")
+@patch("backend.services.email_outbox.get_email_client")
 @pytest.mark.skipif(
     "sqlite" in os.environ.get("DATABASE_URL", ""),
     reason="RLS SET LOCAL is Postgres-only; test uses SQLite in CI",
@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend.core.executors import run_db
+from backend.core.query_metrics import QueryBudgetExceeded, query_budget, track_queries
+from backend.middleware import AccessLogMiddleware, RequestContextMiddleware
+from backend.models import Account, Transaction
+
+
+def _access_records(caplog):
+    return [r for r in caplog.records if getattr(r, "event_type", None) == "access"]
+
+
+def _budget_app(engine, *, enforce):
+    app = FastAPI()
+    app.add_middleware(AccessLogMiddleware, enforce_budgets=enforce)
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/chatty")
+    @query_budget(2)
+    async def chatty():
+        def work():
+            with engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("SELECT 1"))
+
+        await run_db(work)
+        return {"ok": True}
+
+    return app
+
+
+def test_track_queries_counts_statements_in_block(test_db):
+    test_db.execute(text("SELECT 1"))
+    with track_queries() as stats:
+        test_db.execute(text("SELECT 1"))
+        test_db.execute(text("SELECT 2"))
+    test_db.execute(text("SELECT 3"))
+
+    assert stats.count == 2
+    assert stats.total_ms >= stats.max_ms > 0
+
+
+def test_access_log_attributes_queries_to_request_id(test_db, caplog):
+    caplog.set_level(logging.INFO, logger="backend.middleware.security")
+    client = TestClient(_budget_app(test_db.get_bind(), enforce=False))
+
+    response = client.get("/chatty")
+
+    assert response.status_code == 200
+    [record] = _access_records(caplog)
+    assert record.request_id == response.headers["X-Request-ID"]
+    assert record.route == "GET /chatty"
+    assert record.status == 200
+    # Statements issued on the DB executor still belong to the request.
+    assert record.db_queries == 3
+    assert record.db_time_ms > 0
+    assert any(
+        getattr(r, "event_type", None) == "query_budget_exceeded" for r in caplog.records
+    )
+
+
+def test_route_over_budget_fails_when_enforced(test_db):
+    client = TestClient(_budget_app(test_db.get_bind(), enforce=True))
+
+    with pytest.raises(QueryBudgetExceeded, match="issued 3 SQL statements"):
+        client.get("/chatty")
+
+
+def test_list_transactions_query_count_is_independent_of_page_size(
+    test_client, test_db, mock_auth, caplog
+):
+    caplog.set_level(logging.INFO, logger="backend.middleware.security")
+    account = Account(
+        uid=mock_auth.uid,
+        account_type="manual",
+        provider="manual",
+        account_name="Checking",
+        balance=Decimal("0"),
+        currency="USD",
+    )
+    test_db.add(account)
+    test_db.commit()
+
+    counts = []
+    for batch in (2, 40):
+        test_db.add_all(
+            Transaction(
+                uid=mock_auth.uid,
+                account_id=account.id,
+                ts=datetime(2023, 1, 1 + i % 28),
+                amount=Decimal("-1.00"),
+                currency="USD",
+            )
+            for i in range(batch)
+        )
+        test_db.commit()
+        response = test_client.get("/api/transactions?page_size=200")
+        assert response.status_code == 200
+        counts.append(_access_records(caplog)[-1].db_queries)
+
+    assert counts[0] == counts[1]
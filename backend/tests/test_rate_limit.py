@@ -0,0 +1,100 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.middleware.security import RateLimitMiddleware
+from backend.models import RateLimitBucket
+from backend.utils.rate_limit import (
+    DatabaseRateLimitBackend,
+    LocalRateLimitBackend,
+    TokenBucketLimiter,
+)
+
+
+def _acquire(backend, key, now, capacity=3, rate=1.0):
+    return backend.acquire(key, capacity=capacity, refill_per_second=rate, now=now)
+
+
+def test_local_bucket_bursts_then_refills():
+    backend = LocalRateLimitBackend()
+
+    assert [_acquire(backend, "ip", 0.0).allowed for _ in range(4)] == [True, True, True, False]
+    denied = _acquire(backend, "ip", 0.0)
+    assert denied.retry_after == pytest.approx(1.0)
+
+    assert _acquire(backend, "ip", 1.0).allowed is True
+    assert _acquire(backend, "ip", 1.0).allowed is False
+
+
+def test_local_backend_evicts_refilled_and_excess_keys():
+    backend = LocalRateLimitBackend(max_keys=4, stripes=1)
+
+    for i in range(4):
+        _acquire(backend, f"idle-{i}", 0.0)
+    # Every idle bucket has refilled by t=10, so it carries no state.
+    _acquire(backend, "fresh", 10.0)
+    assert backend.stats() == {"keys": 1, "evictions": 0}
+
+    for i in range(10):
+        _acquire(backend, f"flood-{i}", 11.0)
+    assert backend.stats()["keys"] == 4
+    assert backend.stats()["evictions"] == 6
+
+
+def test_database_backend_shares_limit_across_workers(test_db):
+    engine = test_db.get_bind()
+    worker_a = DatabaseRateLimitBackend(engine, sweep_interval_seconds=3600)
+    worker_b = DatabaseRateLimitBackend(engine, sweep_interval_seconds=3600)
+
+    outcomes = [
+        _acquire(backend, "api:1.2.3.4", 100.0).allowed
+        for backend in (worker_a, worker_b, worker_a, worker_b)
+    ]
+    assert outcomes == [True, True, True, False]
+    assert _acquire(worker_b, "api:1.2.3.4", 102.0).allowed is True
+
+    row = test_db.get(RateLimitBucket, "api:1.2.3.4")
+    assert row.tokens == pytest.approx(1.0)
+    assert row.full_at == pytest.approx(104.0)
+
+    worker_a.reset("api:")
+    assert test_db.query(RateLimitBucket).count() == 0
+
+
+def test_database_backend_sweeps_refilled_rows(test_db):
+    backend = DatabaseRateLimitBackend(test_db.get_bind(), sweep_interval_seconds=0)
+    _acquire(backend, "login:a", 0.0)
+    _acquire(backend, "login:b", 50.0)
+
+    assert [row.key for row in test_db.query(RateLimitBucket)] == ["login:b"]
+
+
+def test_limiter_fails_open_when_backend_errors():
+    class BrokenBackend(LocalRateLimitBackend):
+        def acquire(self, *args, **kwargs):
+            raise RuntimeError("store offline")
+
+    limiter = TokenBucketLimiter("api", capacity=1, refill_per_second=1, backend=BrokenBackend())
+
+    assert limiter.hit("ip").allowed is True
+
+
+def test_middleware_returns_429_with_retry_after():
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        max_requests=2,
+        window_seconds=60,
+        path_prefixes=("/api",),
+        backend=LocalRateLimitBackend(),
+    )
+
+    @app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    client = TestClient(app)
+    statuses = [client.get("/api/ping").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    assert client.get("/api/ping").headers["Retry-After"] == "30"
@@ -0,0 +1,114 @@
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from backend.models import Account, Base, UserSession
+from backend.utils import database
+from backend.utils.database import get_read_db, read_bind_for, track_user_session
+
+
+@pytest.fixture
+def replica(monkeypatch, test_db):
+    """A second, empty database standing in for a lagging replica."""
+    replica_engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(replica_engine, "connect")
+    def attach_audit(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("ATTACH DATABASE ':memory:' AS audit")
+        cursor.close()
+
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(database, "read_engine", replica_engine)
+    # Fixture setup commits (e.g. mock_auth's user) count as writes.
+    test_db.info.pop(database._WROTE_AT_KEY, None)
+    yield replica_engine
+    test_db.info.pop(database._WROTE_AT_KEY, None)
+    test_db.info.pop(database._USER_SESSION_KEY, None)
+    replica_engine.dispose()
+
+
+def _as_authenticated(test_db, uid):
+    # What set_db_user_context records for the request session.
+    test_db.info["rls_user_id"] = uid
+
+
+def test_read_db_is_the_request_session_without_replica(test_db):
+    dependency = get_read_db(test_db)
+    assert next(dependency) is test_db
+    assert read_bind_for(test_db) is test_db.get_bind()
+
+
+def test_budget_history_reads_replica_until_the_user_writes(
+    test_client, test_db, mock_auth, replica
+):
+    _as_authenticated(test_db, mock_auth.uid)
+
+    created = test_client.post(
+        "/api/budgets/", json={"category": "Food", "amount": 300.0, "period": "monthly"}
+    )
+    assert created.status_code == 200
+
+    # Just wrote: history must see the new budget, so it reads the primary.
+    fresh = test_client.get("/api/budgets/history")
+    assert fresh.status_code == 200
+    assert fresh.json()["buckets"]
+
+    # Outside the read-your-writes window it reads the (empty) replica.
+    test_db.info.pop(database._WROTE_AT_KEY)
+    lagging = test_client.get("/api/budgets/history")
+    assert lagging.status_code == 200
+    assert lagging.json()["buckets"] == []
+
+
+def test_session_bookkeeping_writes_keep_reads_on_replica(test_db, mock_auth, replica):
+    _as_authenticated(test_db, mock_auth.uid)
+
+    record = UserSession(uid=mock_auth.uid, iat=1, is_active=True)
+    test_db.add(record)
+    test_db.commit()
+    track_user_session(test_db, record)
+    record.last_active = datetime.now(UTC)
+    test_db.commit()
+
+    assert record.last_write_at is None
+    assert read_bind_for(test_db) is replica
+
+
+def test_write_marker_is_visible_to_other_instances(test_db, mock_auth, replica):
+    _as_authenticated(test_db, mock_auth.uid)
+    primary = test_db.get_bind()
+    record = UserSession(uid=mock_auth.uid, iat=1, is_active=True)
+    test_db.add(record)
+    test_db.commit()
+    track_user_session(test_db, record)
+
+    test_db.add(
+        Account(
+            uid=mock_auth.uid,
+            account_type="manual",
+            provider="manual",
+            account_name="Checking",
+            balance=Decimal("10.00"),
+            currency="USD",
+        )
+    )
+    test_db.commit()
+    assert record.last_write_at is not None
+
+    # The next request lands on another instance and loads the same row.
+    with Session(bind=primary) as other:
+        other_record = other.get(UserSession, record.id)
+        track_user_session(other, other_record)
+        assert read_bind_for(other) is primary
+
+        other_record.last_write_at = datetime.now(UTC) - timedelta(minutes=1)
+        assert read_bind_for(other) is replica
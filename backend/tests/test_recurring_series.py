@@ -0,0 +1,164 @@
+import random
+from dataclasses import asdict
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from backend.models import Account, RecurringSeries, RecurringSeriesState, Transaction
+from backend.services.recurring import (
+    detect_recurring_transactions,
+    get_recurring_forecast,
+    mark_recurring_series_stale,
+    refresh_recurring_series,
+)
+
+
+@pytest.fixture
+def account(test_db, mock_auth):
+    acct = Account(
+        uid=mock_auth.uid,
+        account_type="manual",
+        provider="manual",
+        account_name="Checking",
+        balance=Decimal("0"),
+        currency="USD",
+    )
+    test_db.add(acct)
+    test_db.commit()
+    return acct
+
+
+def _txn(account, ts, amount, merchant, category):
+    return Transaction(
+        uid=account.uid,
+        account_id=account.id,
+        ts=ts,
+        amount=Decimal(str(amount)).quantize(Decimal("0.01")),
+        currency="USD",
+        category=category,
+        merchant_name=merchant,
+        description=merchant,
+    )
+
+
+def _seed(test_db, account, rng, *, start_days_ago, end_days_ago):
+    now = datetime.now(UTC)
+    series = [
+        ("Netflix #1234", "Entertainment", 30, 15.99),
+        ("Spotify", "Entertainment", 30, 9.99),
+        ("City Gym", "Health", 7, 12.00),
+        ("Daycare Co", "Childcare", 14, 410.00),
+        ("Car Insurance", "Insurance", 91, 320.00),
+    ]
+    txns = []
+    for merchant, category, cadence, amount in series:
+        day = start_days_ago - rng.randint(0, cadence - 1)
+        while day >= end_days_ago:
+            jitter = rng.choice([-1, 0, 0, 1])
+            scale = 1 + rng.uniform(-0.1, 0.1)
+            txns.append(
+                _txn(account, now - timedelta(days=day + jitter), -amount * scale, merchant, category)
+            )
+            day -= cadence
+    for _ in range(40):
+        day = rng.randint(end_days_ago, start_days_ago)
+        merchant = rng.choice(["Corner Cafe", "Gas Station 88", "Bookstore"])
+        amount = rng.uniform(-80, 40)
+        txns.append(_txn(account, now - timedelta(days=day), amount or -1, merchant, "Shopping"))
+    test_db.add_all(txns)
+    test_db.commit()
+    return txns
+
+
+def _series_items(test_db, uid):
+    today = datetime.now(UTC).date()
+    # lookahead far enough to cover every detected series' next date.
+    forecast = get_recurring_forecast(test_db, uid, lookahead_days=400)
+    legacy = [
+        item
+        for item in detect_recurring_transactions(test_db, uid)
+        if today <= item.next_date <= today + timedelta(days=400)
+    ]
+    legacy.sort(key=lambda item: item.next_date)
+    return forecast, legacy
+
+
+def _normalized(items):
+    return sorted(
+        (
+            {**asdict(item), "average_amount": round(item.average_amount, 6)}
+            for item in items
+        ),
+        key=lambda item: (item["merchant"], item["category"] or ""),
+    )
+
+
+def test_series_match_full_scan_heuristics_on_seeded_dataset(test_db, account, mock_auth):
+    rng = random.Random(1234)
+    _seed(test_db, account, rng, start_days_ago=220, end_days_ago=0)
+
+    forecast, legacy = _series_items(test_db, mock_auth.uid)
+
+    assert legacy, "seeded dataset should contain recurring series"
+    assert _normalized(forecast) == _normalized(legacy)
+    assert [i.next_date for i in forecast] == [i.next_date for i in legacy]
+
+
+def test_incremental_inserts_edits_and_archives_match_full_scan(test_db, account, mock_auth):
+    rng = random.Random(99)
+    _seed(test_db, account, rng, start_days_ago=220, end_days_ago=40)
+    refresh_recurring_series(test_db, mock_auth.uid)
+
+    # New transactions only touch their own series.
+    new_txns = _seed(test_db, account, rng, start_days_ago=39, end_days_ago=0)
+    applied = refresh_recurring_series(test_db, mock_auth.uid)
+    assert applied >= len(new_txns)
+    forecast, legacy = _series_items(test_db, mock_auth.uid)
+    assert _normalized(forecast) == _normalized(legacy)
+
+    # Edits move a transaction between series; archives drop it.
+    later = datetime.now(UTC) + timedelta(seconds=5)
+    moved = next(t for t in new_txns if t.merchant_name == "Daycare Co")
+    archived = next(t for t in new_txns if t.merchant_name == "City Gym")
+    moved.category = "Music"
+    moved.updated_at = later
+    archived.archived = True
+    archived.updated_at = later
+    test_db.commit()
+
+    forecast, legacy = _series_items(test_db, mock_auth.uid)
+    assert _normalized(forecast) == _normalized(legacy)
+    state = test_db.get(RecurringSeriesState, mock_auth.uid)
+    assert state.rebuild_needed is False
+
+
+def test_hard_delete_marks_series_for_rebuild(test_db, account, mock_auth):
+    rng = random.Random(7)
+    txns = _seed(test_db, account, rng, start_days_ago=200, end_days_ago=0)
+    refresh_recurring_series(test_db, mock_auth.uid)
+
+    for txn in [t for t in txns if t.merchant_name == "City Gym"]:
+        test_db.delete(txn)
+    mark_recurring_series_stale(test_db, mock_auth.uid)
+    test_db.commit()
+
+    forecast, legacy = _series_items(test_db, mock_auth.uid)
+    assert _normalized(forecast) == _normalized(legacy)
+    assert not (
+        test_db.query(RecurringSeries)
+        .filter(RecurringSeries.uid == mock_auth.uid, RecurringSeries.series_key.like("city gym%"))
+        .count()
+    )
+
+
+def test_forecast_leaves_the_callers_transaction_alone(test_db, account, mock_auth):
+    _seed(test_db, account, random.Random(7), start_days_ago=220, end_days_ago=0)
+    uncommitted = _txn(account, datetime.now(UTC), -5, "Pending Cafe", "Food")
+    test_db.add(uncommitted)
+
+    assert get_recurring_forecast(test_db, mock_auth.uid, lookahead_days=400)
+    assert test_db.query(RecurringSeriesState).filter_by(uid=mock_auth.uid).one()
+
+    test_db.rollback()
+    assert test_db.query(Transaction).filter_by(merchant_name="Pending Cafe").count() == 0
@@ -1,7 +1,17 @@
+import threading
+import time
+
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from starlette.requests import Request
 
-from backend.middleware.security import ACTIVE_RATE_LIMITER
+from backend.core.executors import run_db
+from backend.middleware.security import (
+    ACTIVE_RATE_LIMITER,
+    EventLoopBlockingMiddleware,
+    get_event_loop_blocking_stats,
+    reset_event_loop_blocking_stats,
+)
 
 
 def test_request_id_and_security_headers(test_client: TestClient):
@@ -51,3 +61,39 @@ def test_signup_routes_are_excluded_from_global_rate_limiter(test_client: TestCl
     assert ACTIVE_RATE_LIMITER._should_limit("/api/auth/signup") is False
     assert ACTIVE_RATE_LIMITER._should_limit("/api/auth/signup/pending") is False
     assert ACTIVE_RATE_LIMITER._should_limit("/api/auth/profile") is True
+
+
+def test_event_loop_blocking_middleware_attributes_time_to_route():
+    app = FastAPI()
+    app.add_middleware(EventLoopBlockingMiddleware, warn_threshold_ms=1000)
+
+    @app.get("/blocking/{item_id}")
+    async def blocking(item_id: int):
+        time.sleep(0.05)
+        return {"item_id": item_id}
+
+    def sleep_and_name_thread() -> str:
+        time.sleep(0.05)
+        return threading.current_thread().name
+
+    @app.get("/offloaded/{item_id}")
+    async def offloaded(item_id: int):
+        thread = await run_db(sleep_and_name_thread)
+        return {"thread": thread}
+
+    reset_event_loop_blocking_stats()
+    with TestClient(app) as client:
+        assert client.get("/blocking/1").status_code == 200
+        response = client.get("/offloaded/2")
+        for n in range(3):
+            assert client.get(f"/no-such-route/{n}").status_code == 404
+    assert response.json()["thread"].startswith("db-worker")
+
+    stats = get_event_loop_blocking_stats()
+    assert stats["GET /blocking/{item_id}"]["requests"] == 1
+    assert stats["GET /blocking/{item_id}"]["max_ms"] >= 40
+    assert stats["GET /offloaded/{item_id}"]["max_ms"] < 40
+    # Unknown paths share one bucket instead of adding a key each.
+    assert stats["GET <unmatched>"]["requests"] == 3
+    assert len(stats) == 3
+    reset_event_loop_blocking_stats()
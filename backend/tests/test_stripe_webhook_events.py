@@ -0,0 +1,148 @@
+import json
+import random
+from collections import defaultdict
+
+import pytest
+
+from backend.core import settings
+from backend.models import StripeWebhookEvent
+from backend.services import billing
+from backend.tests.test_webhooks import sign_payload
+
+
+def _event(event_id, customer, created, event_type="invoice.payment_succeeded"):
+    return {
+        "id": event_id,
+        "object": "event",
+        "type": event_type,
+        "created": created,
+        "data": {"object": {"id": f"in_{event_id}", "customer": customer}},
+    }
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    calls = []
+
+    def record(event_type, data_object, db):
+        calls.append((data_object["customer"], data_object["id"]))
+
+    monkeypatch.setattr(billing, "_dispatch_stripe_event", record)
+    return calls
+
+
+def _post(test_client, event):
+    payload = json.dumps(event)
+    return test_client.post(
+        "/webhook",
+        content=payload,
+        headers={
+            "Stripe-Signature": sign_payload(payload, "whsec_test"),
+            "Content-Type": "application/json",
+        },
+    )
+
+
+def test_redelivered_webhook_is_acknowledged_without_reprocessing(
+    test_client, test_db, applied
+):
+    settings.stripe_webhook_secret = "whsec_test"
+    event = _event("evt_dupe", "cus_1", 100)
+
+    first = _post(test_client, event)
+    second = _post(test_client, event)
+
+    assert first.status_code == 200 and first.json() == {"status": "success"}
+    assert second.status_code == 200 and second.json() == {"status": "duplicate"}
+    assert applied == [("cus_1", "in_evt_dupe")]
+    row = test_db.get(StripeWebhookEvent, "evt_dupe")
+    test_db.refresh(row)
+    assert row.status == billing.STRIPE_EVENT_PROCESSED
+    assert row.processed_at is not None
+
+
+def test_webhook_without_a_customer_applies_only_that_event(test_client, test_db, applied):
+    settings.stripe_webhook_secret = "whsec_test"
+    billing.record_stripe_webhook_event(test_db, _event("evt_other", "cus_9", 50))
+
+    response = _post(test_client, _event("evt_solo", None, 100))
+
+    assert response.status_code == 200
+    assert applied == [(None, "in_evt_solo")]
+    other = test_db.get(StripeWebhookEvent, "evt_other")
+    test_db.refresh(other)
+    assert other.status == billing.STRIPE_EVENT_PENDING
+
+
+def test_events_apply_per_customer_in_created_order(test_db, applied):
+    for event in [
+        _event("evt_c", "cus_1", 300),
+        _event("evt_a", "cus_1", 100),
+        _event("evt_x", "cus_2", 50),
+        _event("evt_b", "cus_1", 200),
+    ]:
+        assert billing.record_stripe_webhook_event(test_db, event)
+
+    result = billing.process_stripe_webhook_events(test_db.get_bind())
+
+    assert result == {"processed": 4, "failed": 0, "deferred": 0}
+    assert [i for c, i in applied if c == "cus_1"] == ["in_evt_a", "in_evt_b", "in_evt_c"]
+
+
+def test_failing_event_holds_back_later_events_for_its_customer(test_db, monkeypatch):
+    calls = []
+
+    def flaky(event_type, data_object, db):
+        if data_object["id"] == "in_evt_bad":
+            raise RuntimeError("stripe is down")
+        calls.append(data_object["id"])
+
+    monkeypatch.setattr(billing, "_dispatch_stripe_event", flaky)
+    for event in [
+        _event("evt_bad", "cus_1", 100),
+        _event("evt_next", "cus_1", 200),
+        _event("evt_other", "cus_2", 150),
+    ]:
+        billing.record_stripe_webhook_event(test_db, event)
+
+    bind = test_db.get_bind()
+    assert billing.process_stripe_webhook_events(bind)["deferred"] == 1
+    assert calls == ["in_evt_other"]
+
+    for _ in range(billing.STRIPE_EVENT_MAX_ATTEMPTS - 1):
+        billing.process_stripe_webhook_events(bind)
+
+    assert calls == ["in_evt_other", "in_evt_next"]
+    bad = test_db.get(StripeWebhookEvent, "evt_bad")
+    test_db.refresh(bad)
+    assert bad.status == billing.STRIPE_EVENT_FAILED
+    assert bad.attempts == billing.STRIPE_EVENT_MAX_ATTEMPTS
+    assert "stripe is down" in bad.last_error
+
+
+def test_replay_of_recorded_events_is_processed_exactly_once(test_db, applied):
+    rng = random.Random(37)
+    events = [
+        _event(f"evt_{n:05d}", f"cus_{rng.randint(0, 199)}", rng.randint(0, 10**6))
+        for n in range(10_000)
+    ]
+    # Stripe redelivers some events, and the whole stream is replayed out of order.
+    deliveries = events + rng.sample(events, 2_000)
+    rng.shuffle(deliveries)
+
+    recorded = sum(billing.record_stripe_webhook_event(test_db, e) for e in deliveries)
+    assert recorded == len(events)
+
+    bind = test_db.get_bind()
+    result = billing.process_stripe_webhook_events(bind, max_customers=1000)
+    assert result["processed"] == len(events)
+    assert billing.process_stripe_webhook_events(bind)["processed"] == 0
+
+    assert sorted(i for _, i in applied) == sorted(f"in_{e['id']}" for e in events)
+    expected = defaultdict(list)
+    for e in sorted(events, key=lambda e: (e["created"], e["id"])):
+        expected[e["data"]["object"]["customer"]].append(f"in_{e['id']}")
+    seen = defaultdict(list)
+    for customer, invoice in applied:
+        seen[customer].append(invoice)
+    assert seen == expected
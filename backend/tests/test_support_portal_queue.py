@@ -0,0 +1,116 @@
+from collections import deque
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from backend.core.config import settings
+from backend.main import app
+from backend.middleware.auth import require_support_agent
+from backend.models import SupportTicket, User
+from backend.models.audit import SupportPortalAction
+from backend.services import support_audit
+
+BASE = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+
+
+@pytest.fixture
+def agent(test_db, monkeypatch):
+    monkeypatch.setattr(support_audit, "_pending", deque())
+    user = User(uid="agent_queue_001", email="agent@testmail.app", role="support_agent")
+    customer = User(uid="customer_queue_001", email="customer@testmail.app", role="user")
+    test_db.add_all([user, customer])
+    test_db.commit()
+    app.dependency_overrides[require_support_agent] = lambda: user
+    yield user
+    app.dependency_overrides.pop(require_support_agent, None)
+
+
+def _seed_tickets(test_db, count):
+    tickets = []
+    for n in range(count):
+        ticket = SupportTicket(
+            user_id="customer_queue_001",
+            subject=f"Ticket {n}",
+            description="Help",
+            category="account",
+            status="resolved" if n % 3 == 0 else "open",
+            # Pairs share a timestamp so the id tie-break is exercised.
+            created_at=BASE + timedelta(minutes=n // 2),
+        )
+        test_db.add(ticket)
+        tickets.append(ticket)
+    test_db.commit()
+    return sorted(tickets, key=lambda t: (t.created_at, str(t.id)), reverse=True)
+
+
+def _pages(test_client, **params):
+    seen, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = test_client.get("/api/support-portal/tickets", params=query)
+        assert response.status_code == 200
+        seen.append([row["id"] for row in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+
+def test_ticket_queue_pages_through_every_ticket(test_client, test_db, agent):
+    tickets = _seed_tickets(test_db, 25)
+
+    pages = _pages(test_client, limit=10)
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [ticket_id for page in pages for ticket_id in page] == [str(t.id) for t in tickets]
+
+
+def test_ticket_queue_cursor_respects_filters(test_client, test_db, agent):
+    tickets = _seed_tickets(test_db, 25)
+
+    pages = _pages(test_client, status="open", limit=4)
+
+    expected = [str(t.id) for t in tickets if t.status == "open"]
+    assert [ticket_id for page in pages for ticket_id in page] == expected
+
+    response = test_client.get("/api/support-portal/tickets", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_agent_actions_are_written_in_batches(test_client, test_db, agent, monkeypatch):
+    monkeypatch.setattr(settings, "support_audit_batch_size", 1000)
+    tickets = _seed_tickets(test_db, 5)
+
+    for ticket in tickets:
+        assert test_client.get(f"/api/support-portal/tickets/{ticket.id}").status_code == 200
+
+    # Nothing was inserted inside the agent's requests.
+    assert test_db.query(SupportPortalAction).count() == 0
+    assert support_audit.pending_support_actions() == 5
+
+    monkeypatch.setattr(settings, "support_audit_batch_size", 2)
+    assert support_audit.flush_support_actions(test_db.get_bind()) == 5
+
+    actions = test_db.query(SupportPortalAction).order_by(SupportPortalAction.ts).all()
+    assert [a.ticket_id for a in actions] == [str(t.id) for t in tickets]
+    assert {a.action_type for a in actions} == {"VIEW_TICKET"}
+    assert support_audit.pending_support_actions() == 0
+
+
+def test_agent_write_actions_are_queued_only_after_commit(
+    test_client, test_db, agent, monkeypatch
+):
+    ticket = _seed_tickets(test_db, 1)[0]
+    url = f"/api/support-portal/tickets/{ticket.id}/status"
+
+    def failing_commit():
+        raise RuntimeError("commit failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(test_db, "commit", failing_commit)
+        with pytest.raises(RuntimeError):
+            test_client.post(url, json={"status": "closed"})
+    test_db.rollback()
+    assert support_audit.pending_support_actions() == 0
+
+    assert test_client.post(url, json={"status": "closed"}).status_code == 200
+    assert support_audit.pending_support_actions() == 1
@@ -0,0 +1,150 @@
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+
+from backend.models import Account, Transaction
+from backend.services.embeddings import (
+    LocalHashingEmbeddingProvider,
+    backfill_transaction_embeddings,
+    mark_embedding_needed,
+    process_transaction_embeddings,
+)
+
+
+@pytest.fixture
+def account(test_db, mock_auth):
+    acct = Account(
+        uid=mock_auth.uid,
+        account_type="manual",
+        provider="manual",
+        account_name="Checking",
+        balance=Decimal("0"),
+        currency="USD",
+    )
+    test_db.add(acct)
+    test_db.commit()
+    return acct
+
+
+def _add_transactions(test_db, account, count: int) -> list[Transaction]:
+    txns = [
+        Transaction(
+            uid=account.uid,
+            account_id=account.id,
+            ts=datetime(2024, 3, i + 1, tzinfo=UTC),
+            amount=Decimal("-20.00"),
+            currency="USD",
+            category="Food",
+            merchant_name=f"Cafe {i}",
+            description=f"Coffee {i}",
+        )
+        for i in range(count)
+    ]
+    test_db.add_all(txns)
+    test_db.commit()
+    return txns
+
+
+def test_local_provider_is_deterministic_and_normalized():
+    provider = LocalHashingEmbeddingProvider()
+    first, second = provider.embed_texts(["Cafe | Coffee", "Cafe | Coffee"])
+
+    assert first == second
+    assert len(first) == 768
+    assert sum(v * v for v in first) == pytest.approx(1.0)
+
+
+def test_new_transactions_are_queued_and_embedded_in_batches(test_db, account):
+    txns = _add_transactions(test_db, account, 5)
+    assert all(t.embedding_needed_at is not None for t in txns)
+    updated_before = {t.id: t.updated_at for t in txns}
+
+    metrics = process_transaction_embeddings(
+        test_db, provider=LocalHashingEmbeddingProvider(), batch_size=2
+    )
+
+    assert metrics["embedded"] == 5
+    assert metrics["batches"] == 3
+    assert metrics["failed"] == 0
+    test_db.expire_all()
+    for txn in test_db.query(Transaction).all():
+        assert txn.embedding_needed_at is None
+        assert len(txn.embedding) == 768
+        assert txn.updated_at == updated_before[txn.id]
+
+
+def test_mark_embedding_needed_only_flags_embedded_field_changes(test_db, account):
+    (txn,) = _add_transactions(test_db, account, 1)
+    process_transaction_embeddings(test_db, provider=LocalHashingEmbeddingProvider())
+    test_db.refresh(txn)
+
+    txn.raw_json = {"note": "not embedded"}
+    txn.category = txn.category
+    assert mark_embedding_needed(txn) is False
+
+    txn.category = "Travel"
+    assert mark_embedding_needed(txn) is True
+    test_db.commit()
+
+    assert process_transaction_embeddings(
+        test_db, provider=LocalHashingEmbeddingProvider()
+    )["embedded"] == 1
+
+
+def test_backfill_queues_rows_without_embeddings(test_db, account):
+    _add_transactions(test_db, account, 3)
+    test_db.query(Transaction).update({Transaction.embedding_needed_at: None})
+    test_db.commit()
+
+    metrics = backfill_transaction_embeddings(
+        test_db, provider=LocalHashingEmbeddingProvider(), batch_size=2, flag_chunk_size=2
+    )
+
+    assert metrics["flagged"] == 3
+    assert metrics["embedded"] == 3
+    assert metrics["rows_per_second"] >= 0
+    assert test_db.query(Transaction).filter(Transaction.embedding.is_(None)).count() == 0
+
+
+def test_provider_failure_leaves_rows_queued(test_db, account):
+    _add_transactions(test_db, account, 2)
+
+    class FailingProvider(LocalHashingEmbeddingProvider):
+        def embed_texts(self, texts):
+            raise RuntimeError("quota exceeded")
+
+    metrics = process_transaction_embeddings(test_db, provider=FailingProvider())
+
+    assert metrics["embedded"] == 0
+    assert metrics["failed"] == 2
+    assert metrics["error"] == "quota exceeded"
+    assert (
+        test_db.query(Transaction).filter(Transaction.embedding_needed_at.is_not(None)).count()
+        == 2
+    )
+
+
+def test_a_rejected_row_is_deferred_without_blocking_the_queue(test_db, account):
+    txns = _add_transactions(test_db, account, 5)
+
+    class PickyProvider(LocalHashingEmbeddingProvider):
+        calls = 0
+
+        def embed_texts(self, texts):
+            self.calls += 1
+            if any("Coffee 2" in text for text in texts):
+                raise ValueError("invalid input")
+            return super().embed_texts(texts)
+
+    provider = PickyProvider()
+    metrics = process_transaction_embeddings(test_db, provider=provider, batch_size=5)
+
+    assert metrics["embedded"] == 4
+    assert metrics["failed"] == 1
+    assert provider.calls < 2 * len(txns)
+    test_db.expire_all()
+    bad = test_db.get(Transaction, txns[2].id)
+    assert bad.embedding is None
+    assert bad.embedding_needed_at.replace(tzinfo=UTC) > datetime.now(UTC)
+    assert test_db.query(Transaction).filter(Transaction.embedding.is_(None)).count() == 1
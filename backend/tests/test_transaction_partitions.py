@@ -0,0 +1,81 @@
+import importlib.util
+from datetime import UTC, date, datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from backend.services.transaction_partitions import (
+    expired_months,
+    maintain_transaction_partitions,
+    month_bounds,
+    partition_month,
+    partition_name,
+)
+
+
+def test_partition_names_round_trip():
+    assert partition_name(date(2025, 3, 1)) == "transactions_p202503"
+    assert partition_month("transactions_p202503") == date(2025, 3, 1)
+    assert partition_month("transactions_default") is None
+
+
+def test_month_bounds_cover_the_utc_month():
+    assert month_bounds(date(2025, 12, 1)) == (
+        datetime(2025, 12, 1, tzinfo=UTC),
+        datetime(2026, 1, 1, tzinfo=UTC),
+    )
+
+
+def test_only_months_wholly_past_the_horizon_expire():
+    months = [date(2024, m, 1) for m in range(9, 13)] + [date(2025, 1, 1)]
+
+    # 365 days before 2025-11-15 is 2024-11-15: November still has live rows.
+    assert expired_months(months, date(2025, 11, 15)) == [
+        date(2024, 9, 1),
+        date(2024, 10, 1),
+    ]
+
+
+def test_maintenance_is_a_noop_without_partitioning(test_db):
+    result = maintain_transaction_partitions(test_db.get_bind())
+
+    assert result == {"created": [], "detached": [], "pruned_rows": 0, "failed": 0}
+
+
+def test_partition_migration_reapplies_row_security_and_grants(monkeypatch):
+    path = (
+        Path(__file__).resolve().parents[2]
+        / "alembic"
+        / "versions"
+        / "d4f6a8c0e2b5_partition_transactions_by_ts.py"
+    )
+    spec = importlib.util.spec_from_file_location("partition_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    executed = []
+    monkeypatch.setattr(migration, "op", SimpleNamespace(execute=executed.append))
+
+    policy = SimpleNamespace(
+        name="transaction_isolation",
+        permissive=True,
+        command="*",
+        roles=["PUBLIC"],
+        using_expr="((uid)::text = current_setting('app.current_user_id'::text, true))",
+        check_expr=None,
+    )
+    grant = SimpleNamespace(grantee="app_user", privilege_type="SELECT", is_grantable=False)
+    migration._apply_table_security(
+        "transactions",
+        {
+            "row_security": True,
+            "force_row_security": False,
+            "policies": [policy],
+            "grants": [grant],
+        },
+    )
+
+    assert executed == [
+        "ALTER TABLE transactions ENABLE ROW LEVEL SECURITY",
+        "CREATE POLICY transaction_isolation ON transactions AS PERMISSIVE FOR ALL "
+        "TO PUBLIC USING (((uid)::text = current_setting('app.current_user_id'::text, true)))",
+        "GRANT SELECT ON transactions TO app_user",
+    ]
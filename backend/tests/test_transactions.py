@@ -5,6 +5,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from backend.models import Account, Transaction
+from backend.services.categorization import apply_rule_to_history
 
 # Tests for backend/api/transactions.py
 
@@ -102,6 +103,74 @@ def test_bulk_update(test_client: TestClient, test_db, sample_data):
     assert t2.category == "Expense"
 
 
+def test_bulk_update_only_requeues_rows_that_change(test_client: TestClient, test_db, sample_data):
+    acct, t1, t2 = sample_data
+    t1.embedding_needed_at = None
+    t2.embedding_needed_at = None
+    test_db.commit()
+
+    payload = {
+        "transaction_ids": [str(t1.id), str(t2.id)],
+        "updates": {"category": "Food"},
+    }
+    response = test_client.patch("/api/transactions/bulk", json=payload)
+    assert response.status_code == 200
+    assert response.json()["updated_count"] == 2
+
+    test_db.refresh(t1)
+    test_db.refresh(t2)
+    assert t2.category == "Food"
+    assert t1.embedding_needed_at is None
+    assert t2.embedding_needed_at is not None
+
+
+def test_bulk_update_is_all_or_nothing_with_archived_rows(
+    test_client: TestClient, test_db, sample_data
+):
+    acct, t1, t2 = sample_data
+    t2.archived = True
+    test_db.commit()
+
+    payload = {
+        "transaction_ids": [str(t1.id), str(t2.id)],
+        "updates": {"category": "Expense"},
+    }
+    response = test_client.patch("/api/transactions/bulk", json=payload)
+    assert response.status_code == 403
+
+    test_db.refresh(t1)
+    assert t1.category == "Food"
+
+
+def test_apply_rule_to_history_updates_uncategorized_live_rows(test_db, sample_data):
+    acct, t1, t2 = sample_data
+    live, archived = (
+        Transaction(
+            uid=acct.uid,
+            account_id=acct.id,
+            ts=datetime(2023, 1, 3, 10, 0, 0),
+            amount=Decimal("-12.00"),
+            currency="USD",
+            merchant_name="Pizza Place",
+            is_manual=True,
+            archived=is_archived,
+        )
+        for is_archived in (False, True)
+    )
+    test_db.add_all([live, archived])
+    test_db.commit()
+
+    updated = apply_rule_to_history(test_db, acct.uid, "pizza place", "Dining")
+
+    assert updated == [live.id]
+    test_db.refresh(live)
+    test_db.refresh(archived)
+    test_db.refresh(t1)
+    assert live.category == "Dining"
+    assert archived.category is None
+    assert t1.category == "Food"
+
+
 def test_delete_transaction(test_client: TestClient, test_db, sample_data):
     acct, t1, t2 = sample_data
     # t1 is manual, can be deleted
@@ -0,0 +1,259 @@
+import gzip
+import io
+import json
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+from backend.models import Account, DataExportJob, Transaction
+from backend.services.data_export import (
+    EXPORT_JOB_LEASE,
+    iter_user_export,
+    process_pending_export_jobs,
+    purge_expired_export_artifacts,
+    run_export_job,
+)
+
+# Tests for the streaming CCPA export in backend/api/users.py
+
+
+class _FakeWriter(io.BytesIO):
+    def __init__(self, bucket, name):
+        super().__init__()
+        self._bucket = bucket
+        self._name = name
+
+    def __exit__(self, exc_type, *exc):
+        # Like BlobWriter, an exception abandons the upload.
+        if exc_type is None:
+            self._bucket.objects[self._name] = self.getvalue()
+        return super().__exit__(exc_type, *exc)
+
+
+class _FakeReader(io.BytesIO):
+    def __init__(self, bucket, name):
+        super().__init__(bucket.objects.get(name, b""))
+        self._missing = name not in bucket.objects
+        self._name = name
+
+    def read(self, size=-1):
+        # Like BlobReader, a missing object only surfaces on the first read.
+        if self._missing:
+            raise NotFound(self._name)
+        return super().read(size)
+
+
+class _FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+
+    def open(self, mode, **_kwargs):
+        if mode == "wb":
+            return _FakeWriter(self.bucket, self.name)
+        return _FakeReader(self.bucket, self.name)
+
+    def delete(self):
+        if self.bucket.objects.pop(self.name, None) is None:
+            raise NotFound(self.name)
+
+
+class _FakeBucket:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+
+    def blob(self, name, **_kwargs):
+        return _FakeBlob(self, name)
+
+
+@pytest.fixture
+def export_bucket(monkeypatch):
+    bucket = _FakeBucket()
+    monkeypatch.setattr("backend.services.data_export._export_bucket", lambda: bucket)
+    return bucket
+
+
+@pytest.fixture
+def export_data(test_db, mock_auth, monkeypatch):
+    monkeypatch.setattr("backend.services.data_export.set_db_user_context", lambda *_: None)
+
+    acct = Account(
+        uid=mock_auth.uid,
+        account_type="manual",
+        provider="manual",
+        account_name="Checking",
+        balance=Decimal("1000.00"),
+        currency="USD",
+    )
+    test_db.add(acct)
+    test_db.commit()
+
+    start = datetime(2024, 1, 1, 10, 0, 0)
+    test_db.add_all(
+        [
+            Transaction(
+                uid=mock_auth.uid,
+                account_id=acct.id,
+                ts=start + timedelta(days=i),
+                amount=Decimal("-12.50"),
+                currency="USD",
+                category="Food",
+                merchant_name=f"Cafe {i}",
+                is_manual=True,
+            )
+            for i in range(25)
+        ]
+    )
+    test_db.commit()
+    return acct
+
+
+def test_export_streams_complete_json(test_client, export_data):
+    response = test_client.post("/api/users/export")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["profile"]["uid"] == "test_user_123"
+    assert len(payload["accounts"]) == 1
+    account = payload["accounts"][0]
+    assert account["account_name"] == "Checking"
+    assert len(account["transactions"]) == 25
+    assert [t["merchant_name"] for t in account["transactions"]][:2] == [
+        "Cafe 0",
+        "Cafe 1",
+    ]
+    assert payload["budgets"] == []
+    assert payload["household"] is None
+    assert "developer_profile" not in payload
+
+
+def test_iter_user_export_batches_transactions(test_db, export_data, mock_auth):
+    fragments = list(iter_user_export(test_db, mock_auth.uid, batch_size=4))
+
+    payload = json.loads("".join(fragments))
+    assert len(payload["accounts"][0]["transactions"]) == 25
+    assert list(payload)[:6] == [
+        "profile",
+        "exported_at",
+        "ai_settings",
+        "subscriptions",
+        "notification_preferences",
+        "accounts",
+    ]
+
+
+def test_export_job_produces_compressed_artifact(
+    test_client, test_db, export_data, export_bucket
+):
+    created = test_client.post("/api/users/export/jobs")
+    assert created.status_code == 202
+    job_id = created.json()["id"]
+
+    # TestClient runs background tasks before returning.
+    status_response = test_client.get(f"/api/users/export/jobs/{job_id}")
+    assert status_response.status_code == 200
+    assert status_response.json()["status"] == "completed"
+
+    download = test_client.get(f"/api/users/export/jobs/{job_id}/download")
+    assert download.status_code == 200
+    payload = json.loads(gzip.decompress(download.content))
+    assert len(payload["accounts"][0]["transactions"]) == 25
+
+    # The artifact lives in the shared bucket, not on the serving instance.
+    export_bucket.objects.clear()
+    missing = test_client.get(f"/api/users/export/jobs/{job_id}/download")
+    assert missing.status_code == 410
+
+
+def test_export_job_download_rejects_pending_and_foreign_jobs(
+    test_client, test_db, mock_auth
+):
+    pending = DataExportJob(uid=mock_auth.uid, status="pending")
+    test_db.add(pending)
+    test_db.commit()
+
+    response = test_client.get(f"/api/users/export/jobs/{pending.id}/download")
+    assert response.status_code == 409
+
+    other = DataExportJob(uid="someone_else", status="completed", file_path="exports/x")
+    test_db.add(other)
+    test_db.commit()
+
+    response = test_client.get(f"/api/users/export/jobs/{other.id}")
+    assert response.status_code == 404
+
+
+def test_export_job_runs_only_for_the_worker_that_claims_it(
+    test_db, export_data, mock_auth, export_bucket
+):
+    job = DataExportJob(uid=mock_auth.uid, status="pending")
+    test_db.add(job)
+    test_db.commit()
+
+    first = run_export_job(test_db.get_bind(), job.id)
+    assert first.status == "completed"
+    completed_at = first.completed_at
+
+    # A second pickup of the same job (e.g. the jobs endpoint) finds it taken.
+    second = run_export_job(test_db.get_bind(), job.id)
+    assert second.status == "completed"
+    assert second.completed_at.replace(tzinfo=None) == completed_at.replace(tzinfo=None)
+    assert len(export_bucket.objects) == 1
+
+
+def test_export_jobs_orphaned_while_running_are_reclaimed(
+    test_db, export_data, mock_auth, export_bucket
+):
+    now = datetime.now(UTC)
+    stale = DataExportJob(
+        uid=mock_auth.uid,
+        status="running",
+        started_at=now - EXPORT_JOB_LEASE - timedelta(minutes=1),
+    )
+    active = DataExportJob(
+        uid=mock_auth.uid, status="running", started_at=now - timedelta(minutes=1)
+    )
+    test_db.add_all([stale, active])
+    test_db.commit()
+
+    result = process_pending_export_jobs(test_db.get_bind())
+    assert result == {"processed": 1, "completed": 1, "failed": 0}
+
+    test_db.refresh(stale)
+    test_db.refresh(active)
+    assert stale.status == "completed"
+    assert active.status == "running"
+    assert list(export_bucket.objects) == [f"exports/{mock_auth.uid}/{stale.id}.json.gz"]
+
+
+def test_purge_deletes_expired_export_artifacts(
+    test_client, test_db, mock_auth, export_bucket
+):
+    now = datetime.now(UTC)
+    expired = DataExportJob(
+        uid=mock_auth.uid,
+        status="completed",
+        file_path="exports/old.json.gz",
+        expires_at=now - timedelta(hours=1),
+    )
+    fresh = DataExportJob(
+        uid=mock_auth.uid,
+        status="completed",
+        file_path="exports/new.json.gz",
+        expires_at=now + timedelta(days=1),
+    )
+    test_db.add_all([expired, fresh])
+    test_db.commit()
+    export_bucket.objects.update({expired.file_path: b"old", fresh.file_path: b"new"})
+
+    assert purge_expired_export_artifacts(test_db.get_bind(), now=now) == 1
+
+    test_db.refresh(expired)
+    assert expired.status == "expired"
+    assert expired.file_path is None
+    assert list(export_bucket.objects) == ["exports/new.json.gz"]
+
+    response = test_client.get(f"/api/users/export/jobs/{expired.id}/download")
+    assert response.status_code == 410
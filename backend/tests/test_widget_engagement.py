@@ -0,0 +1,167 @@
+import threading
+from collections import Counter
+from datetime import UTC, datetime
+
+import pytest
+
+from backend.models import Developer, Widget
+from backend.services import widget_engagement
+from backend.services.widget_engagement import (
+    flush_widget_engagement,
+    pending_widget_engagement,
+    record_widget_download,
+    shutdown_widget_engagement,
+)
+
+DAY = datetime(2026, 3, 2, 12, 0, tzinfo=UTC)
+
+
+class _FakeDoc:
+    def __init__(self, path):
+        self.path = path
+
+    def collection(self, name):
+        return _FakeCollection(f"{self.path}/{name}")
+
+
+class _FakeCollection:
+    def __init__(self, path):
+        self.path = path
+
+    def document(self, name):
+        return _FakeDoc(f"{self.path}/{name}")
+
+
+class _FakeBatch:
+    def __init__(self, store):
+        self.store = store
+        self.writes = []
+
+    def set(self, doc_ref, data, merge=False):
+        assert merge, "engagement writes must merge so first-of-day needs no read"
+        self.writes.append((doc_ref.path, data))
+
+    def commit(self):
+        self.store.commit(self.writes)
+
+
+class _FakeFirestore:
+    """Applies merged ``Increment`` writes the way the emulator does."""
+
+    def __init__(self, fail_commits=0):
+        self.docs = {}
+        self.commits = 0
+        self.fail_commits = fail_commits
+        self._lock = threading.Lock()
+
+    def collection(self, name):
+        return _FakeCollection(name)
+
+    def batch(self):
+        return _FakeBatch(self)
+
+    def commit(self, writes):
+        with self._lock:
+            if self.fail_commits:
+                self.fail_commits -= 1
+                raise RuntimeError("deadline exceeded")
+            self.commits += 1
+            for path, data in writes:
+                doc = self.docs.setdefault(path, {})
+                for field, value in data.items():
+                    if hasattr(value, "value"):
+                        doc[field] = doc.get(field, 0) + value.value
+                    else:
+                        doc[field] = value
+
+    def downloads(self, widget_id, day="2026-03-02"):
+        return self.docs.get(f"widget_engagement/{widget_id}/daily/{day}", {}).get("downloads", 0)
+
+
+@pytest.fixture
+def fake_firestore(monkeypatch):
+    # A fresh buffer per test stands in for a fresh worker process.
+    monkeypatch.setattr(widget_engagement, "_pending", Counter())
+    client = _FakeFirestore()
+    monkeypatch.setattr(widget_engagement, "get_firestore_client", lambda: client)
+    return client
+
+
+def test_concurrent_downloads_flush_as_one_increment_per_day(fake_firestore):
+    def download(count):
+        for _ in range(count):
+            record_widget_download("widget-a", now=DAY)
+            record_widget_download("widget-b", now=DAY)
+
+    threads = [threading.Thread(target=download, args=(250,)) for _ in range(8)]
+    flusher_stop = threading.Event()
+
+    def flush_while_downloading():
+        while not flusher_stop.is_set():
+            flush_widget_engagement()
+
+    flusher = threading.Thread(target=flush_while_downloading)
+    flusher.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    flusher_stop.set()
+    flusher.join()
+    flush_widget_engagement()
+
+    assert fake_firestore.downloads("widget-a") == 2000
+    assert fake_firestore.downloads("widget-b") == 2000
+    assert fake_firestore.docs["widget_engagement/widget-a/daily/2026-03-02"]["date"] == "2026-03-02"
+    assert pending_widget_engagement() == {}
+
+
+def test_failed_flush_keeps_counts_for_the_next_one(fake_firestore):
+    fake_firestore.fail_commits = 1
+    for _ in range(5):
+        record_widget_download("widget-a", now=DAY)
+
+    assert flush_widget_engagement() == 0
+    assert pending_widget_engagement() == {("widget-a", "2026-03-02"): 5}
+
+    record_widget_download("widget-a", now=DAY)
+    assert flush_widget_engagement() == 6
+    assert fake_firestore.downloads("widget-a") == 6
+
+
+def test_counts_survive_a_worker_restart(fake_firestore, monkeypatch):
+    for _ in range(3):
+        record_widget_download("widget-a", now=DAY)
+    # Shutdown flushes what the old worker buffered ...
+    shutdown_widget_engagement()
+    # ... and the replacement starts with an empty buffer.
+    monkeypatch.setattr(widget_engagement, "_pending", Counter())
+    for _ in range(4):
+        record_widget_download("widget-a", now=DAY)
+    flush_widget_engagement()
+
+    assert fake_firestore.downloads("widget-a") == 7
+    assert fake_firestore.commits == 2
+
+
+def test_download_endpoint_increments_in_sql_and_buffers(
+    test_client, test_db, mock_auth, fake_firestore
+):
+    test_db.add(Developer(uid=mock_auth.uid))
+    widget = Widget(developer_uid=mock_auth.uid, name="Budget Radar", status="approved")
+    test_db.add(widget)
+    test_db.commit()
+
+    for _ in range(3):
+        response = test_client.post(f"/api/widgets/{widget.id}/download")
+        assert response.status_code == 200
+        assert response.json()["id"] == widget.id
+
+    test_db.expire_all()
+    assert test_db.get(Widget, widget.id).downloads == 3
+    assert fake_firestore.commits == 0
+    assert sum(pending_widget_engagement().values()) == 3
+
+    flush_widget_engagement()
+    today = datetime.now(UTC).strftime("%Y-%m-%d")
+    assert fake_firestore.downloads(widget.id, today) == 3
@@ -2,6 +2,6 @@
 
 # Updated 2025-12-08 17:53 CST by ChatGPT
 
-from .database import get_db
+from .database import get_db, get_read_db
 
-__all__ = ["get_db"]
+__all__ = ["get_db", "get_read_db"]
@@ -0,0 +1,227 @@
+"""In-process TTL cache with negative caching and single-flight loads."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class _InFlight:
+    __slots__ = ("done", "error", "stale", "value")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+        # Set when the key is invalidated mid-load; the result is then not stored.
+        self.stale = False
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe, size-bounded TTL cache.
+
+    - ``get_or_load`` runs the loader once per key even when many threads miss
+      at the same time; the others wait (up to ``load_wait_timeout_seconds``)
+      for and share its result.
+    - Invalidating a key while it is loading keeps that load's result out of
+      the cache, so a value read before a change is never stored after it.
+    - Loader results for which ``is_negative`` is true (``None`` by default)
+      are cached for ``negative_ttl_seconds`` so a failing upstream is not
+      retried on every request.
+    - Least recently used entries are evicted beyond ``max_entries``.
+
+    Caches are registered by name so ``get_cache_stats`` can report on them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl_seconds: float,
+        negative_ttl_seconds: float | None = None,
+        max_entries: int = 1024,
+        is_negative: Callable[[Any], bool] | None = None,
+        load_wait_timeout_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = (
+            ttl_seconds if negative_ttl_seconds is None else negative_ttl_seconds
+        )
+        self.max_entries = max_entries
+        self.load_wait_timeout_seconds = load_wait_timeout_seconds
+        self._is_negative = is_negative or (lambda value: value is None)
+        self._entries: OrderedDict[Hashable, tuple[float, bool, Any]] = OrderedDict()
+        self._in_flight: dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "load_errors": 0,
+            "coalesced": 0,
+            "wait_timeouts": 0,
+            "evictions": 0,
+        }
+        _register(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self._stats["misses"] += 1
+                return default
+            return value
+
+    def set(self, key: Hashable, value: V, *, ttl_seconds: float | None = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], V],
+        *,
+        ttl_seconds: float | None = None,
+    ) -> V:
+        """Return the cached value, loading it (once across threads) on a miss."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            self._stats["misses"] += 1
+            flight = self._in_flight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._in_flight[key] = _InFlight()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not owner:
+            if not flight.done.wait(self.load_wait_timeout_seconds):
+                with self._lock:
+                    self._stats["wait_timeouts"] += 1
+                raise TimeoutError(f"Timed out waiting for the {self.name} load of {key!r}")
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = loader()
+        except BaseException as exc:
+            with self._lock:
+                self._stats["load_errors"] += 1
+                self._end_flight(key, flight)
+            flight.error = exc
+            flight.done.set()
+            raise
+
+        with self._lock:
+            self._stats["loads"] += 1
+            if not flight.stale:
+                self._store(key, value, ttl_seconds)
+            self._end_flight(key, flight)
+        flight.value = value
+        flight.done.set()
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._abandon_flight(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+            for key in [k for k in self._in_flight if predicate(k)]:
+                self._abandon_flight(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for key in list(self._in_flight):
+                self._abandon_flight(key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["negative_hits"] + self._stats["misses"]
+            hit_ratio = (
+                (self._stats["hits"] + self._stats["negative_hits"]) / lookups if lookups else 0.0
+            )
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_ratio": round(hit_ratio, 4),
+            }
+
+    # Callers hold self._lock for the helpers below.
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, negative, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        self._stats["negative_hits" if negative else "hits"] += 1
+        return value
+
+    def _abandon_flight(self, key: Hashable) -> None:
+        # Callers already waiting still get the result; later misses start afresh.
+        flight = self._in_flight.pop(key, None)
+        if flight is not None:
+            flight.stale = True
+
+    def _end_flight(self, key: Hashable, flight: _InFlight) -> None:
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+    def _store(self, key: Hashable, value: Any, ttl_seconds: float | None) -> None:
+        negative = self._is_negative(value)
+        if ttl_seconds is None:
+            ttl_seconds = self.negative_ttl_seconds if negative else self.ttl_seconds
+        if ttl_seconds <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, negative, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+
+_registry: dict[str, TTLCache[Any]] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(cache: TTLCache[Any]) -> None:
+    with _registry_lock:
+        if cache.name in _registry:
+            logger.debug("Replacing registered cache %s.", cache.name)
+        _registry[cache.name] = cache
+
+
+def get_cache_stats() -> dict[str, dict[str, Any]]:
+    """Stats for every registered cache in this process, keyed by name."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+__all__ = ["TTLCache", "get_cache_stats"]
@@ -1,11 +1,17 @@
 # Updated 2025-12-08 17:53 CST by ChatGPT
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
 
-from fastapi import HTTPException, status
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import OperationalError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
-from backend.models import SessionLocal
+from backend.core import settings
+from backend.models import SessionLocal, UserSession, engine, read_engine
+from backend.utils.rls import RLS_USER_STATEMENT
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -29,3 +35,172 @@ def get_db() -> Generator[Session, None, None]:
         raise
     finally:
         db.close()
+
+
+# --- Read replica routing -------------------------------------------------
+
+# Bookkeeping writes made on every authenticated request; they must not force
+# the user's reads back onto the primary.
+_REPLICA_LAG_EXEMPT_TABLES = frozenset({"user_sessions", "audit_log", "rate_limit_buckets"})
+
+# The request's ``UserSession`` row, set by the auth dependency. Its
+# ``last_write_at`` is the read-your-writes marker every instance can see.
+_USER_SESSION_KEY = "user_session"
+# When this session itself last committed a user write.
+_WROTE_AT_KEY = "replica_wrote_at"
+
+
+def replica_configured() -> bool:
+    return read_engine is not engine
+
+
+def track_user_session(db: Session, user_session: UserSession) -> None:
+    """Stamp ``user_session`` whenever ``db`` commits a write for its user."""
+    db.info[_USER_SESSION_KEY] = user_session
+
+
+def _as_utc(ts: datetime) -> datetime:
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=UTC)
+    return ts.astimezone(UTC)
+
+
+def recently_wrote(db: Session) -> bool:
+    """Whether ``db``'s user wrote within the read-your-writes window."""
+    window = settings.replica_read_your_writes_seconds
+    if not window:
+        return False
+    cutoff = datetime.now(UTC) - timedelta(seconds=window)
+    wrote_at = db.info.get(_WROTE_AT_KEY)
+    if wrote_at is None:
+        user_session = db.info.get(_USER_SESSION_KEY)
+        wrote_at = user_session.last_write_at if user_session is not None else None
+    return wrote_at is not None and _as_utc(wrote_at) >= cutoff
+
+
+def read_bind_for(db: Session) -> Engine | Connection:
+    """The replica engine, unless none is configured or ``db``'s user just wrote."""
+    if not replica_configured() or recently_wrote(db):
+        return db.get_bind()
+    return read_engine
+
+
+class ReplicaSession(Session):
+    """
+    Read-only session that routes to the replica per user.
+
+    The user comes from ``info["rls_user_id"]`` or from the request's primary
+    session (``info["rls_source"]``) once the auth dependency has set it; reads
+    stay on the primary while that session's user is inside the
+    read-your-writes window. Every transaction re-applies the RLS user, since
+    ``SET LOCAL`` ends with it.
+    """
+
+    def __init__(self, *args, primary: Engine | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._primary = primary or engine
+
+    def routing_uid(self) -> str | None:
+        uid = self.info.get("rls_user_id")
+        source = self.info.get("rls_source")
+        if uid is None and source is not None:
+            uid = source.info.get("rls_user_id")
+        return uid
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        source = self.info.get("rls_source")
+        if source is not None and recently_wrote(source):
+            return self._primary
+        return read_engine
+
+
+@event.listens_for(ReplicaSession, "after_begin")
+def _apply_replica_rls(session: ReplicaSession, transaction, connection) -> None:
+    uid = session.routing_uid()
+    if uid and connection.dialect.name == "postgresql":
+        connection.execute(RLS_USER_STATEMENT, {"user_id": uid})
+
+
+ReadSessionLocal = sessionmaker(class_=ReplicaSession, autoflush=False, future=True)
+
+
+def get_read_db(db: Session = Depends(get_db)) -> Generator[Session, None, None]:
+    """
+    Session for read-only endpoints: the replica when one is configured,
+    otherwise the request's primary session itself (no second connection).
+    """
+    if not replica_configured():
+        yield db
+        return
+
+    read_db = ReadSessionLocal(primary=db.get_bind(), info={"rls_source": db})
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+@contextmanager
+def read_session(db: Session, uid: str) -> Iterator[Session]:
+    """``db`` itself without a replica, else a replica session scoped to ``uid``."""
+    if not replica_configured():
+        yield db
+        return
+
+    read_db = ReadSessionLocal(
+        primary=db.get_bind(), info={"rls_user_id": uid, "rls_source": db}
+    )
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+def _written_table(obj: object) -> str | None:
+    table = getattr(obj, "__table__", None)
+    return table.name if table is not None else None
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session: Session, flush_context) -> None:
+    tables = session.info.setdefault("written_tables", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tables.add(_written_table(obj))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        orm_execute_state.session.info.setdefault("written_tables", set()).add(
+            getattr(table, "name", None)
+        )
+
+
+def _wrote_user_data(session: Session) -> bool:
+    tables = session.info.get("written_tables")
+    return bool(tables and tables - _REPLICA_LAG_EXEMPT_TABLES)
+
+
+@event.listens_for(Session, "before_commit")
+def _stamp_user_session_write(session: Session) -> None:
+    # Stamped inside the committing transaction, so the marker is visible to
+    # every instance exactly when the write is.
+    user_session = session.info.get(_USER_SESSION_KEY)
+    if user_session is None or not replica_configured() or user_session not in session:
+        return
+    session.flush()
+    if _wrote_user_data(session):
+        user_session.last_write_at = datetime.now(UTC)
+
+
+@event.listens_for(Session, "after_commit")
+def _note_committed_writes(session: Session) -> None:
+    if _wrote_user_data(session):
+        session.info[_WROTE_AT_KEY] = datetime.now(UTC)
+    session.info.pop("written_tables", None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session: Session) -> None:
+    session.info.pop("written_tables", None)
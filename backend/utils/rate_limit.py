@@ -0,0 +1,299 @@
+"""Token-bucket rate limiting with pluggable, memory-bounded state backends."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from sqlalchemy import case, delete, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+from backend.core import settings
+from backend.core.executors import run_db
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitDecision:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class RateLimitBackend(Protocol):
+    # True when acquire() does blocking I/O and must not run on the event loop.
+    blocking: bool
+
+    def acquire(
+        self,
+        key: str,
+        *,
+        capacity: float,
+        refill_per_second: float,
+        cost: float = 1.0,
+    ) -> RateLimitDecision: ...
+
+    def reset(self, prefix: str = "") -> None: ...
+
+
+def _decision(
+    allowed: bool, tokens: float, cost: float, refill_per_second: float
+) -> RateLimitDecision:
+    retry_after = 0.0 if allowed else max(cost - tokens, 0.0) / refill_per_second
+    return RateLimitDecision(allowed=allowed, remaining=tokens, retry_after=retry_after)
+
+
+class LocalRateLimitBackend:
+    """
+    In-process buckets: exact within one process, independent per worker.
+
+    Intended for tests and single-worker deployments. State is one tuple per
+    key. Keys are spread over lock stripes, so callers never share a global
+    lock. Each stripe is kept in LRU order; buckets that have refilled
+    completely carry no state and are dropped from the front as new keys
+    arrive, and ``max_keys`` caps the total even under a flood of distinct
+    clients.
+    """
+
+    blocking = False
+
+    def __init__(self, *, max_keys: int = 100_000, stripes: int = 64):
+        self._stripes: list[tuple[threading.Lock, OrderedDict[str, tuple[float, float, float]]]] = [
+            (threading.Lock(), OrderedDict()) for _ in range(stripes)
+        ]
+        self._max_keys_per_stripe = max(1, max_keys // stripes)
+        self.evictions = 0
+
+    def acquire(
+        self,
+        key: str,
+        *,
+        capacity: float,
+        refill_per_second: float,
+        cost: float = 1.0,
+        now: float | None = None,
+    ) -> RateLimitDecision:
+        now = time.monotonic() if now is None else now
+        lock, buckets = self._stripes[hash(key) % len(self._stripes)]
+        with lock:
+            state = buckets.get(key)
+            if state is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, state[0] + (now - state[1]) * refill_per_second)
+                buckets.move_to_end(key)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_second)
+            self._evict(buckets, now)
+        return _decision(allowed, tokens, cost, refill_per_second)
+
+    def _evict(self, buckets: OrderedDict[str, tuple[float, float, float]], now: float) -> None:
+        while buckets:
+            _, (_, _, full_at) = next(iter(buckets.items()))
+            if full_at > now and len(buckets) <= self._max_keys_per_stripe:
+                return
+            buckets.popitem(last=False)
+            if full_at > now:
+                self.evictions += 1
+
+    def reset(self, prefix: str = "") -> None:
+        for lock, buckets in self._stripes:
+            with lock:
+                if not prefix:
+                    buckets.clear()
+                    continue
+                for key in [k for k in buckets if k.startswith(prefix)]:
+                    del buckets[key]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "keys": sum(len(buckets) for _, buckets in self._stripes),
+            "evictions": self.evictions,
+        }
+
+
+class DatabaseRateLimitBackend:
+    """
+    Buckets in the shared ``rate_limit_buckets`` table, so every worker and
+    instance enforces the same limit.
+
+    Each acquire is a single upsert that refills, spends and returns the
+    outcome atomically; the row lock lasts only for that statement and no
+    application lock is taken. Refilled rows are swept periodically.
+    """
+
+    blocking = True
+
+    def __init__(self, engine: Engine, *, sweep_interval_seconds: float = 60.0):
+        from backend.models import RateLimitBucket
+
+        self._engine = engine
+        self._table = RateLimitBucket.__table__
+        self._insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+        self._sweep_interval_seconds = sweep_interval_seconds
+        self._next_sweep = 0.0
+
+    def acquire(
+        self,
+        key: str,
+        *,
+        capacity: float,
+        refill_per_second: float,
+        cost: float = 1.0,
+        now: float | None = None,
+    ) -> RateLimitDecision:
+        now = time.time() if now is None else now
+        table = self._table
+        cap = literal(float(capacity))
+        rate = literal(float(refill_per_second))
+        spend = literal(float(cost))
+        at = literal(float(now))
+
+        elapsed = case((at > table.c.last_refill, at - table.c.last_refill), else_=0.0)
+        refilled_raw = table.c.tokens + elapsed * rate
+        refilled = case((refilled_raw > cap, cap), else_=refilled_raw)
+        allowed = refilled >= spend
+        tokens = case((allowed, refilled - spend), else_=refilled)
+
+        initial = max(capacity - cost, 0.0)
+        stmt = self._insert(table).values(
+            key=key,
+            tokens=initial,
+            last_refill=now,
+            full_at=now + (capacity - initial) / refill_per_second,
+            allowed=cost <= capacity,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={
+                "tokens": tokens,
+                "last_refill": at,
+                "full_at": at + (cap - tokens) / rate,
+                "allowed": allowed,
+            },
+        ).returning(table.c.tokens, table.c.allowed)
+
+        with self._engine.begin() as conn:
+            row = conn.execute(stmt).one()
+            if now >= self._next_sweep:
+                self._next_sweep = now + self._sweep_interval_seconds
+                conn.execute(delete(table).where(table.c.full_at <= now))
+        return _decision(bool(row.allowed), float(row.tokens), cost, refill_per_second)
+
+    def reset(self, prefix: str = "") -> None:
+        stmt = delete(self._table)
+        if prefix:
+            stmt = stmt.where(self._table.c.key.startswith(prefix, autoescape=True))
+        with self._engine.begin() as conn:
+            conn.execute(stmt)
+
+
+class TokenBucketLimiter:
+    """
+    Named limiter: ``capacity`` requests in a burst, refilled continuously at
+    ``refill_per_second``. Keys are namespaced by ``name`` so limiters can share
+    a backend. Backend errors fail open; a broken store must not take the API
+    down with it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        capacity: float,
+        refill_per_second: float,
+        backend: RateLimitBackend | None = None,
+    ):
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("capacity and refill_per_second must be > 0.")
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._backend = backend
+
+    @classmethod
+    def per_window(
+        cls,
+        name: str,
+        max_requests: int,
+        window_seconds: float,
+        *,
+        backend: RateLimitBackend | None = None,
+    ) -> TokenBucketLimiter:
+        """``max_requests`` per ``window_seconds`` on average, bursting to ``max_requests``."""
+        return cls(
+            name,
+            capacity=max_requests,
+            refill_per_second=max_requests / window_seconds,
+            backend=backend,
+        )
+
+    @property
+    def backend(self) -> RateLimitBackend:
+        if self._backend is None:
+            self._backend = get_rate_limit_backend()
+        return self._backend
+
+    def hit(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        try:
+            return self.backend.acquire(
+                f"{self.name}:{key}",
+                capacity=self.capacity,
+                refill_per_second=self.refill_per_second,
+                cost=cost,
+            )
+        except Exception:
+            logger.warning("Rate limiter %s unavailable; allowing request.", self.name, exc_info=True)
+            return RateLimitDecision(allowed=True, remaining=0.0, retry_after=0.0)
+
+    async def hit_async(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        if self.backend.blocking:
+            return await run_db(self.hit, key, cost)
+        return self.hit(key, cost)
+
+    def reset(self) -> None:
+        self.backend.reset(f"{self.name}:")
+
+
+_backends: dict[str, RateLimitBackend] = {}
+_backend_lock = threading.Lock()
+
+
+def get_rate_limit_backend(kind: str | None = None) -> RateLimitBackend:
+    """
+    Process-wide backend of the given kind ("database" or "local"), defaulting
+    to ``RATE_LIMIT_BACKEND``.
+    """
+    kind = kind or settings.rate_limit_backend
+    backend = _backends.get(kind)
+    if backend is None:
+        with _backend_lock:
+            backend = _backends.get(kind)
+            if backend is None:
+                if kind == "database":
+                    from backend.models import engine
+
+                    backend = DatabaseRateLimitBackend(engine)
+                else:
+                    backend = LocalRateLimitBackend(max_keys=settings.rate_limit_max_keys)
+                _backends[kind] = backend
+    return backend
+
+
+__all__ = [
+    "DatabaseRateLimitBackend",
+    "LocalRateLimitBackend",
+    "RateLimitBackend",
+    "RateLimitDecision",
+    "TokenBucketLimiter",
+    "get_rate_limit_backend",
+]
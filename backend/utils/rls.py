@@ -1,6 +1,9 @@
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+# 'LOCAL' keeps the setting to the current transaction.
+RLS_USER_STATEMENT = text("SET LOCAL app.current_user_id = :user_id")
+
 
 def set_db_user_context(db: Session, user_id: str):
     """
@@ -11,7 +14,7 @@ def set_db_user_context(db: Session, user_id: str):
         db: The SQLAlchemy database session.
         user_id: The unique identifier of the user (e.g., Firebase UID).
     """
-    # Use 'LOCAL' to ensure the setting only persists for the current transaction
     # 'true' in current_setting() in the policy handles cases where this isn't set (returns NULL)
-    stmt = text("SET LOCAL app.current_user_id = :user_id")
-    db.execute(stmt, {"user_id": user_id})
+    # Remembered so replica sessions and read-your-writes tracking know the user.
+    db.info["rls_user_id"] = user_id
+    db.execute(RLS_USER_STATEMENT, {"user_id": user_id})
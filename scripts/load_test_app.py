@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Start the backend locally with seeded data and fake providers for load tests.
+
+Requires DATABASE_URL to point at a migrated local Postgres (the app relies on
+RLS session settings that SQLite lacks). Requests authenticate with the local
+magic token: ``Authorization: Bearer E2E_MAGIC_TOKEN_<uid>``.
+
+    DATABASE_URL=postgresql://... python scripts/load_test_app.py --port 8010 --users 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# The magic-token login only works outside production.
+os.environ.setdefault("APP_ENV", "local")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--users", type=int, default=50, help="Synthetic users to seed.")
+    parser.add_argument("--accounts-per-user", type=int, default=3)
+    parser.add_argument("--transactions-per-account", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument(
+        "--provider-latency-ms",
+        type=float,
+        default=0.0,
+        help="Fixed latency added to every fake Firestore/email call.",
+    )
+    args = parser.parse_args()
+
+    import uvicorn
+
+    from backend.dev_tools.fakes import install_fake_providers
+    from backend.dev_tools.perf_data import seed_perf_dataset
+    from backend.main import app
+    from backend.models import SessionLocal
+
+    install_fake_providers(latency_seconds=args.provider_latency_ms / 1000)
+
+    if not args.skip_seed:
+        with SessionLocal() as db:
+            dataset = seed_perf_dataset(
+                db,
+                users=args.users,
+                accounts_per_user=args.accounts_per_user,
+                transactions_per_account=args.transactions_per_account,
+                seed=args.seed,
+            )
+        print(
+            f"Seeded {len(dataset.user_uids)} users "
+            f"(+{dataset.accounts} accounts, +{dataset.transactions} transactions).",
+            flush=True,
+        )
+
+    # Fakes live in this process, so serve the app object in a single worker.
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark backend hot paths on a seeded dataset and compare with a baseline.
+
+Runs against DATABASE_URL, which must point at a migrated database; on
+anything but PostgreSQL the Postgres-only benchmarks are skipped. Plaid, Tatum,
+Vertex, Firestore and email are replaced with in-process fakes.
+
+    python scripts/run_benchmarks.py --scale dev --save-baseline bench.json
+    python scripts/run_benchmarks.py --scale dev --baseline bench.json --threshold 0.2
+
+Exits with status 1 when a benchmark regressed beyond the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("APP_ENV", "local")
+
+
+def _render(results: list[dict], regressions: list[str]) -> str:
+    lines = [
+        "| benchmark | median ms | min ms | max ms | SQL |",
+        "|---|---:|---:|---:|---:|",
+    ]
+    for entry in results:
+        if "skipped" in entry:
+            lines.append(f"| {entry['name']} | skipped: {entry['skipped']} | | | |")
+            continue
+        lines.append(
+            f"| {entry['name']} | {entry['median_ms']:.2f} | {entry['min_ms']:.2f} "
+            f"| {entry['max_ms']:.2f} | {entry['queries']} |"
+        )
+    if regressions:
+        lines += ["", "Regressions:", *(f"- {line}" for line in regressions)]
+    return "\n".join(lines)
+
+
+def main() -> int:
+    from backend.dev_tools.benchmarks import BENCHMARKS, SCALES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="dev")
+    parser.add_argument("--users", type=int, help="Override the scale's user count.")
+    parser.add_argument("--accounts-per-user", type=int)
+    parser.add_argument("--transactions-per-account", type=int)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=[benchmark.name for benchmark in BENCHMARKS],
+        help="Run just this benchmark (repeatable).",
+    )
+    parser.add_argument("--baseline", type=Path, help="Report from an earlier run to compare with.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed median slowdown as a fraction of the baseline (default 0.25).",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=2.0,
+        help="Ignore slowdowns smaller than this, whatever the ratio.",
+    )
+    parser.add_argument("--save-baseline", type=Path, help="Write this run's report here.")
+    args = parser.parse_args()
+
+    from backend.dev_tools.benchmarks import (
+        compare_to_baseline,
+        prepare_benchmarks,
+        run_benchmarks,
+    )
+    from backend.dev_tools.fakes import install_fake_providers
+    from backend.models import SessionLocal
+
+    sizes = dict(SCALES[args.scale])
+    for key in sizes:
+        override = getattr(args, key)
+        if override is not None:
+            sizes[key] = override
+
+    fakes = install_fake_providers()
+    with SessionLocal() as db:
+        ctx = prepare_benchmarks(db, fakes, seed=args.seed, **sizes)
+        results = run_benchmarks(ctx, rounds=args.rounds, warmup=args.warmup, only=args.only)
+        dialect = db.get_bind().dialect.name
+
+    regressions: list[str] = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_to_baseline(
+            results,
+            baseline["benchmarks"],
+            threshold=args.threshold,
+            min_delta_ms=args.min_delta_ms,
+        )
+
+    print(_render(results, regressions))
+    if args.save_baseline:
+        report = {
+            "generated_at": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "database": dialect,
+            "dataset": {**sizes, "seed": args.seed},
+            "benchmarks": results,
+        }
+        args.save_baseline.write_text(json.dumps(report, indent=2) + "\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
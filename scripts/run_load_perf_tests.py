@@ -1,108 +1,342 @@
 #!/usr/bin/env python3
-"""Lightweight HTTP load/performance test runner for Stage 5 verification."""
+"""Asynchronous HTTP load generator for Stage 5 verification.
+
+Requests are issued in-process from one asyncio loop over a pooled keep-alive
+``httpx.AsyncClient``, so the numbers measure the service rather than process
+spawn cost. Two load models are supported:
+
+- closed loop (default): ``--concurrency`` virtual users, each sending its next
+  request as soon as the previous one completes;
+- open loop (``--rate``): requests arrive at a fixed rate (or as a Poisson
+  process) whether or not earlier ones have finished. Latency is measured from
+  the scheduled arrival, so client-side queueing under overload is counted.
+
+Traffic comes either from ``--urls`` (each URL tested on its own, as before) or
+from a scenario file describing a weighted mix of requests for one user
+journey (see ``scripts/load_scenarios``). Requests issued during ``--warmup``
+are not recorded. ``--start-app`` launches ``scripts/load_test_app.py`` (seeded
+data, fake providers) for the duration of the run.
+
+    python scripts/run_load_perf_tests.py --start-app \\
+        --scenario scripts/load_scenarios/dashboard.json --rate 200 --duration 60
+"""
 
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import math
-import statistics
+import os
+import random
 import subprocess
+import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
+from typing import Any
+
+import httpx
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_BASE_URL = "http://127.0.0.1:8010"
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (about 1% relative error), in ms."""
+
+    _GROWTH = 1.01
+    _LOG_GROWTH = math.log(_GROWTH)
+
+    def __init__(self) -> None:
+        self.buckets: Counter[int] = Counter()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms: float) -> None:
+        # Bucket on microseconds so sub-millisecond responses stay distinct.
+        micros = max(latency_ms * 1000, 1.0)
+        self.buckets[int(math.log(micros) / self._LOG_GROWTH)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # Upper edge of the bucket, capped at the observed maximum.
+                return min(self._GROWTH ** (bucket + 1) / 1000, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "avg": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50": round(self.percentile(0.50), 2),
+            "p95": round(self.percentile(0.95), 2),
+            "p99": round(self.percentile(0.99), 2),
+            "max": round(self.max_ms, 2),
+        }
 
 
 @dataclass
-class Result:
-    url: str
-    ok: bool
-    status: int
-    latency_ms: float
-    error: str | None = None
+class RequestSpec:
+    name: str
+    method: str
+    path: str
+    weight: float = 1.0
+    params: dict[str, Any] = field(default_factory=dict)
+    json_body: Any = None
 
 
-def _request_once(url: str, timeout: float) -> Result:
-    start = time.perf_counter()
-    try:
-        proc = subprocess.run(  # noqa: S603
-            [
-                "curl",
-                "-sS",
-                "--max-time",
-                str(timeout),
-                "-o",
-                "/dev/null",
-                "-w",
-                "%{http_code}",
-                url,
-            ],
-            check=False,
-            capture_output=True,
-            text=True,
-        )
-        latency_ms = (time.perf_counter() - start) * 1000
-        status = int(proc.stdout.strip() or "0")
-        ok = proc.returncode == 0 and 200 <= status < 400
-        err = None if ok else (proc.stderr.strip() or f"curl exit={proc.returncode}")
-        return Result(url=url, ok=ok, status=status, latency_ms=latency_ms, error=err)
-    except Exception as exc:  # noqa: BLE001
-        latency_ms = (time.perf_counter() - start) * 1000
-        return Result(url=url, ok=False, status=0, latency_ms=latency_ms, error=str(exc))
-
-
-def _percentile(values: list[float], pct: float) -> float:
-    if not values:
-        return 0.0
-    if len(values) == 1:
-        return values[0]
-    values_sorted = sorted(values)
-    idx = (len(values_sorted) - 1) * pct
-    lo = math.floor(idx)
-    hi = math.ceil(idx)
-    if lo == hi:
-        return values_sorted[lo]
-    return values_sorted[lo] + (values_sorted[hi] - values_sorted[lo]) * (idx - lo)
-
-
-def run_test(url: str, total_requests: int, concurrency: int, timeout: float) -> dict:
-    results: list[Result] = []
-    start = time.perf_counter()
-    with ThreadPoolExecutor(max_workers=concurrency) as pool:
-        futures = [pool.submit(_request_once, url, timeout) for _ in range(total_requests)]
-        for future in as_completed(futures):
-            results.append(future.result())
-    elapsed_s = time.perf_counter() - start
-
-    latencies = [r.latency_ms for r in results]
-    ok_count = sum(1 for r in results if r.ok)
-    errors = [r for r in results if not r.ok]
-
-    return {
-        "url": url,
-        "requests": total_requests,
-        "concurrency": concurrency,
-        "ok": ok_count,
-        "failed": len(results) - ok_count,
-        "error_rate": round((len(results) - ok_count) / max(len(results), 1), 6),
-        "throughput_rps": round(total_requests / max(elapsed_s, 1e-9), 2),
-        "latency_ms": {
-            "avg": round(statistics.fmean(latencies), 2) if latencies else 0.0,
-            "p50": round(_percentile(latencies, 0.50), 2),
-            "p95": round(_percentile(latencies, 0.95), 2),
-            "p99": round(_percentile(latencies, 0.99), 2),
-            "max": round(max(latencies), 2) if latencies else 0.0,
-        },
-        "sample_errors": [
-            {
-                "status": e.status,
-                "error": e.error,
-                "latency_ms": round(e.latency_ms, 2),
-            }
-            for e in errors[:10]
+@dataclass
+class Scenario:
+    name: str
+    requests: list[RequestSpec]
+    users: list[str] = field(default_factory=lambda: [""])
+    headers: dict[str, str] = field(default_factory=dict)
+    description: str = ""
+
+
+@dataclass
+class EndpointStats:
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    ok: int = 0
+    failed: int = 0
+    statuses: Counter[int] = field(default_factory=Counter)
+    sample_errors: list[dict[str, Any]] = field(default_factory=list)
+
+
+def load_scenario(path: Path) -> Scenario:
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    users_cfg = raw.get("users") or {}
+    if "uids" in users_cfg:
+        users = list(users_cfg["uids"])
+    elif "prefix" in users_cfg:
+        users = [f"{users_cfg['prefix']}_{n:05d}" for n in range(int(users_cfg.get("count", 1)))]
+    else:
+        users = [""]
+    return Scenario(
+        name=raw["name"],
+        description=raw.get("description", ""),
+        users=users,
+        headers=dict(raw.get("headers") or {}),
+        requests=[
+            RequestSpec(
+                name=item["name"],
+                method=item.get("method", "GET").upper(),
+                path=item["path"],
+                weight=float(item.get("weight", 1)),
+                params=dict(item.get("params") or {}),
+                json_body=item.get("json"),
+            )
+            for item in raw["requests"]
         ],
-    }
+    )
+
+
+def _template_values(uid: str) -> dict[str, str]:
+    today = datetime.now(UTC).date()
+    values = {"uid": uid, "today": today.isoformat()}
+    for days in (7, 30, 90, 365):
+        values[f"days_ago_{days}"] = (today - timedelta(days=days)).isoformat()
+    return values
+
+
+def _render(value: Any, values: dict[str, str]) -> Any:
+    if isinstance(value, str):
+        return value.format(**values)
+    if isinstance(value, dict):
+        return {k: _render(v, values) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_render(v, values) for v in value]
+    return value
+
+
+class LoadRun:
+    def __init__(self, scenario: Scenario, *, client: httpx.AsyncClient, seed: int | None):
+        self.scenario = scenario
+        self.client = client
+        self.rng = random.Random(seed)
+        self.stats: dict[str, EndpointStats] = {spec.name: EndpointStats() for spec in scenario.requests}
+        self.weights = [spec.weight for spec in scenario.requests]
+        self.record_after = 0.0
+        self.recorded = 0
+        self.dropped = 0
+
+    def _next_request(self) -> tuple[RequestSpec, str]:
+        spec = self.rng.choices(self.scenario.requests, weights=self.weights)[0]
+        return spec, self.rng.choice(self.scenario.users)
+
+    async def _send(self, spec: RequestSpec, uid: str, scheduled_at: float) -> None:
+        values = _template_values(uid)
+        error: str | None = None
+        status = 0
+        try:
+            response = await self.client.request(
+                spec.method,
+                _render(spec.path, values),
+                params=_render(spec.params, values) or None,
+                json=_render(spec.json_body, values),
+                headers=_render(self.scenario.headers, values),
+            )
+            status = response.status_code
+            await response.aread()
+            if not 200 <= status < 400:
+                error = response.text[:200]
+        except httpx.HTTPError as exc:
+            error = f"{exc.__class__.__name__}: {exc}"
+        latency_ms = (time.perf_counter() - scheduled_at) * 1000
+
+        if scheduled_at < self.record_after:
+            return
+        stats = self.stats[spec.name]
+        stats.histogram.record(latency_ms)
+        stats.statuses[status] += 1
+        self.recorded += 1
+        if error is None:
+            stats.ok += 1
+        else:
+            stats.failed += 1
+            if len(stats.sample_errors) < 5:
+                stats.sample_errors.append(
+                    {"status": status, "error": error, "latency_ms": round(latency_ms, 2)}
+                )
+
+    async def run_closed(
+        self, *, concurrency: int, warmup: float, duration: float | None, requests: int | None
+    ) -> float:
+        start = time.perf_counter()
+        self.record_after = start + warmup
+        deadline = self.record_after + duration if duration else math.inf
+        budget = {"left": requests if requests else math.inf}
+
+        async def user() -> None:
+            while time.perf_counter() < deadline:
+                if time.perf_counter() >= self.record_after:
+                    if budget["left"] <= 0:
+                        return
+                    budget["left"] -= 1
+                spec, uid = self._next_request()
+                await self._send(spec, uid, time.perf_counter())
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        return time.perf_counter() - self.record_after
+
+    async def run_open(
+        self,
+        *,
+        rate: float,
+        poisson: bool,
+        max_in_flight: int,
+        warmup: float,
+        duration: float | None,
+        requests: int | None,
+    ) -> float:
+        start = time.perf_counter()
+        self.record_after = start + warmup
+        deadline = self.record_after + duration if duration else math.inf
+        remaining = requests if requests else math.inf
+        in_flight: set[asyncio.Task] = set()
+        arrival = start
+
+        while arrival < deadline and remaining > 0:
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            recorded = arrival >= self.record_after
+            if len(in_flight) >= max_in_flight:
+                if recorded:
+                    self.dropped += 1
+                    remaining -= 1
+            else:
+                spec, uid = self._next_request()
+                task = asyncio.create_task(self._send(spec, uid, arrival))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                if recorded:
+                    remaining -= 1
+            arrival += self.rng.expovariate(rate) if poisson else 1 / rate
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        return time.perf_counter() - self.record_after
+
+    def report(self, elapsed_s: float) -> dict[str, Any]:
+        endpoints = []
+        for spec in self.scenario.requests:
+            stats = self.stats[spec.name]
+            total = stats.ok + stats.failed
+            endpoints.append(
+                {
+                    "name": spec.name,
+                    "method": spec.method,
+                    "path": spec.path,
+                    "requests": total,
+                    "ok": stats.ok,
+                    "failed": stats.failed,
+                    "error_rate": round(stats.failed / max(total, 1), 6),
+                    "throughput_rps": round(total / max(elapsed_s, 1e-9), 2),
+                    "latency_ms": stats.histogram.summary(),
+                    "statuses": {str(k): v for k, v in sorted(stats.statuses.items())},
+                    "sample_errors": stats.sample_errors,
+                }
+            )
+        overall = LatencyHistogram()
+        for stats in self.stats.values():
+            overall.buckets.update(stats.histogram.buckets)
+            overall.count += stats.histogram.count
+            overall.total_ms += stats.histogram.total_ms
+            overall.max_ms = max(overall.max_ms, stats.histogram.max_ms)
+        failed = sum(e["failed"] for e in endpoints)
+        return {
+            "scenario": self.scenario.name,
+            "requests": self.recorded,
+            "dropped": self.dropped,
+            "failed": failed,
+            "error_rate": round(failed / max(self.recorded, 1), 6),
+            "elapsed_s": round(elapsed_s, 2),
+            "throughput_rps": round(self.recorded / max(elapsed_s, 1e-9), 2),
+            "latency_ms": overall.summary(),
+            "endpoints": endpoints,
+        }
+
+
+async def run_scenario(scenario: Scenario, base_url: str, args: argparse.Namespace) -> dict[str, Any]:
+    pool_size = args.concurrency if args.rate is None else args.max_in_flight
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        run = LoadRun(scenario, client=client, seed=args.seed)
+        if args.rate is None:
+            elapsed = await run.run_closed(
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+                duration=args.duration,
+                requests=args.requests,
+            )
+        else:
+            elapsed = await run.run_open(
+                rate=args.rate,
+                poisson=args.arrivals == "poisson",
+                max_in_flight=args.max_in_flight,
+                warmup=args.warmup,
+                duration=args.duration,
+                requests=args.requests,
+            )
+    return run.report(elapsed)
+
+
+def _url_scenario(url: str) -> Scenario:
+    return Scenario(name=url, requests=[RequestSpec(name=url, method="GET", path=url)])
 
 
 def build_markdown(report: dict) -> str:
@@ -110,22 +344,29 @@ def build_markdown(report: dict) -> str:
         "# Load/Performance Test Report",
         "",
         f"- Generated at: {report['generated_at_utc']}",
-        f"- Requests per URL: {report['requests_per_url']}",
-        f"- Concurrency per URL: {report['concurrency']}",
+        f"- Load model: {report['load_model']}",
+        f"- Warm-up seconds: {report['warmup_seconds']}",
         f"- Timeout seconds: {report['timeout_seconds']}",
         "",
-        "## Results",
-        "",
-        "| URL | OK | Failed | Error Rate | Throughput (rps) | p95 (ms) | p99 (ms) |",
-        "|---|---:|---:|---:|---:|---:|---:|",
     ]
+    for result in report["results"]:
+        lines += [
+            f"## {result['scenario']}",
+            "",
+            f"- Requests: {result['requests']} in {result['elapsed_s']}s "
+            f"({result['throughput_rps']} rps), failed {result['failed']}, dropped {result['dropped']}",
+            "",
+            "| Endpoint | Requests | Failed | Error Rate | Throughput (rps) | p50 (ms) | p95 (ms) | p99 (ms) |",
+            "|---|---:|---:|---:|---:|---:|---:|---:|",
+        ]
+        for row in result["endpoints"]:
+            latency = row["latency_ms"]
+            lines.append(
+                f"| {row['name']} | {row['requests']} | {row['failed']} | {row['error_rate']:.2%} | "
+                f"{row['throughput_rps']} | {latency['p50']} | {latency['p95']} | {latency['p99']} |"
+            )
+        lines.append("")
 
-    for row in report["results"]:
-        lines.append(
-            f"| {row['url']} | {row['ok']} | {row['failed']} | {row['error_rate']:.2%} | {row['throughput_rps']} | {row['latency_ms']['p95']} | {row['latency_ms']['p99']} |"
-        )
-
-    lines.append("")
     lines.append("## Raw JSON")
     lines.append("```json")
     lines.append(json.dumps(report, indent=2))
@@ -133,36 +374,95 @@ def build_markdown(report: dict) -> str:
     return "\n".join(lines)
 
 
+def _start_local_app(base_url: str, extra_args: list[str]) -> subprocess.Popen:
+    port = httpx.URL(base_url).port or 80
+    proc = subprocess.Popen(  # noqa: S603
+        [sys.executable, str(SCRIPTS_DIR / "load_test_app.py"), "--port", str(port), *extra_args],
+        env=os.environ.copy(),
+    )
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"load_test_app.py exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=2).status_code < 500:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("Timed out waiting for the local app to start.")
+
+
 def main() -> int:
-    parser = argparse.ArgumentParser()
-    parser.add_argument(
-        "--urls",
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--urls", nargs="+", help="One or more absolute URLs, each tested alone.")
+    source.add_argument(
+        "--scenario",
+        type=Path,
         nargs="+",
-        required=True,
-        help="One or more HTTP URLs to test.",
+        help="Scenario JSON file(s), e.g. scripts/load_scenarios/dashboard.json.",
     )
-    parser.add_argument("--requests-per-url", type=int, default=200)
-    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="Target for scenario paths.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users (closed loop).")
+    parser.add_argument("--rate", type=float, default=None, help="Arrivals per second (open loop).")
+    parser.add_argument("--arrivals", choices=("constant", "poisson"), default="constant")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=1000,
+        help="Open loop: arrivals beyond this many outstanding requests are dropped and counted.",
+    )
+    parser.add_argument("--duration", type=float, default=None, help="Measured seconds per run.")
+    parser.add_argument("--requests", type=int, default=None, help="Measured requests per run.")
+    parser.add_argument("--requests-per-url", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unrecorded seconds before measuring.")
     parser.add_argument("--timeout", type=float, default=8.0)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for request and user selection.")
+    parser.add_argument("--start-app", action="store_true", help="Run scripts/load_test_app.py for the test.")
+    parser.add_argument(
+        "--app-arg",
+        action="append",
+        default=[],
+        help="Extra argument for load_test_app.py (repeatable), e.g. --app-arg=--users=200.",
+    )
     parser.add_argument("--output", type=Path, default=None)
     args = parser.parse_args()
 
-    generated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    if args.requests_per_url and not args.requests:
+        args.requests = args.requests_per_url
+    if args.duration is None and args.requests is None:
+        args.requests = 200 if args.urls else None
+        args.duration = None if args.urls else 30.0
 
-    results = [
-        run_test(
-            url=url,
-            total_requests=args.requests_per_url,
-            concurrency=args.concurrency,
-            timeout=args.timeout,
-        )
-        for url in args.urls
-    ]
+    scenarios = (
+        [_url_scenario(url) for url in args.urls]
+        if args.urls
+        else [load_scenario(path) for path in args.scenario]
+    )
 
+    app_proc = _start_local_app(args.base_url, args.app_arg) if args.start_app else None
+    generated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    try:
+        results = [
+            asyncio.run(run_scenario(scenario, "" if args.urls else args.base_url, args))
+            for scenario in scenarios
+        ]
+    finally:
+        if app_proc is not None:
+            app_proc.terminate()
+            app_proc.wait(timeout=30)
+
+    load_model = (
+        f"closed loop, {args.concurrency} virtual users"
+        if args.rate is None
+        else f"open loop, {args.rate}/s {args.arrivals} arrivals, max {args.max_in_flight} in flight"
+    )
     report = {
         "generated_at_utc": generated_at,
-        "requests_per_url": args.requests_per_url,
-        "concurrency": args.concurrency,
+        "load_model": load_model,
+        "warmup_seconds": args.warmup,
         "timeout_seconds": args.timeout,
         "results": results,
     }